@@ -10,7 +10,7 @@ import {
 export const runtime = "nodejs";
 
 /**
- * GET /api/homework-review/preview?path=<absolute_server_path>
+ * GET /api/homework-review/preview?path=<absolute_server_path>[&page=<n>&page_size=<n>]
  *
  * 读取服务器上的 .docx 文件，用 mammoth 转换为 HTML 返回给前端预览。
  * 仅允许访问 homework_review/runtime 目录下的文件。
@@ -40,6 +40,13 @@ export async function GET(request: NextRequest) {
 
       const upstreamUrl = new URL(endpoint);
       upstreamUrl.searchParams.set("path", filePath);
+      if (!isDownload) {
+        // 后端按段落分页并缓存渲染结果，这里只透传分页参数
+        for (const name of ["page", "page_size"]) {
+          const value = searchParams.get(name);
+          if (value) upstreamUrl.searchParams.set(name, value);
+        }
+      }
       const upstream = await fetch(upstreamUrl, {
         cache: "no-store",
         signal: request.signal,
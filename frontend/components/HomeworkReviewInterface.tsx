@@ -128,6 +128,8 @@ interface StudentScore {
   name: string;
   full_mark: number;
   total_scores: (number | null)[];
+  attempt_status?: ("ok" | "failed" | "skipped")[];  // 自适应测评：skipped 表示总分收敛后未执行
+  skipped_attempts?: number;
   mean: number | null;
   variance: number | null;
   categories: ScoreEntry[];
@@ -157,6 +159,7 @@ interface SkillPackageUploadResult {
   typeTagId: number;
   metadataUpdated: boolean;
   previewUrl: string;
+  reused?: boolean;
 }
 
 interface GeneratedSkillPackageResponse {
@@ -185,6 +188,7 @@ interface ReviewResult {
   summary: any;
   downloadBaseUrl: string;
   scoreTable: ScoreTable | null;
+  reportsUrl?: string;  // Skills 完整报告按需读取（评语、报告分区不随结果返回）
 }
 
 interface UploadedReviewFile {
@@ -648,6 +652,8 @@ export function HomeworkReviewInterface() {
   const [previewingFile, setPreviewingFile] = useState<string | null>(null); // 正在预览的文件名
   const [previewHtml, setPreviewHtml] = useState<string>("");
   const [previewLoading, setPreviewLoading] = useState(false);
+  const [previewPage, setPreviewPage] = useState(1);
+  const [previewPageCount, setPreviewPageCount] = useState(1);
 
   // 各 Tab 独立的上传文件状态（File 对象不可序列化，无法持久化）
   const [generateFiles, setGenerateFiles] = useState<File[]>([]);         // 生成答案 Tab 的题卷
@@ -747,6 +753,7 @@ export function HomeworkReviewInterface() {
   const [skillMaterialText, setSkillMaterialText] = useState("");
   const [skillBuilding, setSkillBuilding] = useState(false);
   const [skillBuildError, setSkillBuildError] = useState<string | null>(null);
+  const [skillBuildProgress, setSkillBuildProgress] = useState("");
   const [generatedSkillDownloadUrl, setGeneratedSkillDownloadUrl] = useState("");
   const [generatedSkillFileName, setGeneratedSkillFileName] = useState("");
   const [studentSampleCount, setStudentSampleCount] = useState(3);
@@ -956,6 +963,7 @@ export function HomeworkReviewInterface() {
 
     setSkillBuilding(true);
     setSkillBuildError(null);
+    setSkillBuildProgress("");
     setSkillPackageError(null);
     setSkillPackageResult(null);
     try {
@@ -968,6 +976,7 @@ export function HomeworkReviewInterface() {
       formData.append("llm_api_key", llmInfo.apiKey);
       formData.append("llm_api_url", llmInfo.apiUrl);
       formData.append("llm_model", llmInfo.model);
+      formData.append("stream", "true");
       const response = await fetch("/api/homework-review/skill-package/generate", {
         method: "POST",
         body: formData,
@@ -976,7 +985,33 @@ export function HomeworkReviewInterface() {
       if (!response.ok) {
         throw new Error(await readApiError(response, "AI 生成作业批阅 Skill 失败"));
       }
-      const payload = await response.json() as GeneratedSkillPackageResponse;
+      // 流式模式：逐条显示生成进度，最后一条 complete 事件携带完整结果
+      const reader = response.body?.getReader();
+      if (!reader) throw new Error("无法读取响应流");
+      const decoder = new TextDecoder();
+      let buffer = "";
+      let payload: GeneratedSkillPackageResponse | null = null;
+      while (!payload) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const parts = buffer.split("\n\n");
+        buffer = parts.pop() || "";
+        for (const part of parts) {
+          if (!part.startsWith("data: ")) continue;
+          const data = JSON.parse(part.slice(6));
+          if (data.type === "progress") {
+            setSkillBuildProgress(data.message || "");
+          } else if (data.type === "error") {
+            throw new Error(data.message || "AI 生成作业批阅 Skill 失败");
+          } else if (data.type === "complete") {
+            payload = data as GeneratedSkillPackageResponse;
+          }
+        }
+      }
+      if (!payload) {
+        throw new Error("生成连接已中断，请重试");
+      }
       if (!payload.zipBase64 || !payload.zipFileName) {
         throw new Error("后端未返回生成完成的 Skill ZIP");
       }
@@ -999,6 +1034,7 @@ export function HomeworkReviewInterface() {
       setSkillBuildError(error instanceof Error ? error.message : "AI 生成作业批阅 Skill 失败");
     } finally {
       setSkillBuilding(false);
+      setSkillBuildProgress("");
     }
   };
 
@@ -2101,23 +2137,18 @@ export function HomeworkReviewInterface() {
     }
   };
 
-  /** 预览生成的 docx 文件（调用预览接口转为 HTML） */
-  const previewDocx = async (file: { name: string; path: string }) => {
-    if (previewingFile === file.name) {
-      // 点击已展开的文件 → 折叠
-      setPreviewingFile(null);
-      setPreviewHtml("");
-      return;
-    }
-    setPreviewingFile(file.name);
+  /** 加载预览的某一页（后端按段落分页并缓存渲染结果） */
+  const loadPreviewPage = async (file: { name: string; path: string }, page: number) => {
     setPreviewLoading(true);
     setPreviewHtml("");
     try {
-      const previewUrl = `/api/homework-review/preview?path=${encodeURIComponent(file.path)}`;
+      const previewUrl = `/api/homework-review/preview?path=${encodeURIComponent(file.path)}&page=${page}`;
       const res = await fetch(previewUrl);
       const data = await res.json();
       if (!res.ok) throw new Error(data.error || data.detail || "预览失败");
       setPreviewHtml(data.html || "<p>文档内容为空</p>");
+      setPreviewPage(data.page || 1);
+      setPreviewPageCount(data.pageCount || 1);
     } catch (e) {
       setPreviewHtml(`<p style="color:red">预览失败: ${e instanceof Error ? e.message : "未知错误"}</p>`);
     } finally {
@@ -2125,6 +2156,20 @@ export function HomeworkReviewInterface() {
     }
   };
 
+  /** 预览生成的 docx 文件（调用预览接口转为 HTML） */
+  const previewDocx = async (file: { name: string; path: string }) => {
+    if (previewingFile === file.name) {
+      // 点击已展开的文件 → 折叠
+      setPreviewingFile(null);
+      setPreviewHtml("");
+      return;
+    }
+    setPreviewingFile(file.name);
+    setPreviewPage(1);
+    setPreviewPageCount(1);
+    await loadPreviewPage(file, 1);
+  };
+
   /** 下载生成的 docx 文件 */
   const downloadGeneratedFile = (file: { name: string; path: string }) => {
     const url = `/api/homework-review/preview?path=${encodeURIComponent(file.path)}&download=1`;
@@ -2154,6 +2199,19 @@ export function HomeworkReviewInterface() {
     return parts[parts.length - 1] || file;
   };
 
+  const loadSkillReport = async (taskId: string) => {
+    if (!result?.reportsUrl) return null;
+    const response = await fetch(`${result.reportsUrl}?task_id=${encodeURIComponent(taskId)}`, {
+      cache: "no-store",
+      headers: getReviewAuthHeaders(),
+    });
+    if (!response.ok) {
+      throw new Error(await readApiError(response, "读取完整报告失败"));
+    }
+    const payload = await response.json();
+    return payload.reports?.[0] ?? null;
+  };
+
   const fetchOutputFile = (file: string) => fetch(downloadLink(file), {
     cache: "no-store",
     headers: getReviewAuthHeaders(),
@@ -2318,7 +2376,7 @@ export function HomeworkReviewInterface() {
                     {skillPackageResult?.metadataUpdated && (
                       <span className="inline-flex shrink-0 items-center gap-1 rounded-full bg-emerald-50 px-2 py-1 text-[11px] font-semibold text-emerald-700">
                         <CheckCircle2 className="h-3.5 w-3.5" />
-                        已设为批阅类型
+                        {skillPackageResult.reused ? '已复用相同技能包' : '已设为批阅类型'}
                       </span>
                     )}
                   </div>
@@ -2363,7 +2421,7 @@ export function HomeworkReviewInterface() {
                         {skillBuilding
                           ? <Loader2 className="h-4 w-4 animate-spin" />
                           : <Sparkles className="h-4 w-4" />}
-                        {skillBuilding ? "正在生成并上传..." : "AI 生成 Skill ZIP 并上传"}
+                        {skillBuilding ? (skillBuildProgress || "正在生成并上传...") : "AI 生成 Skill ZIP 并上传"}
                       </button>
                     </div>
                     {skillMaterialFiles.length > 0 && (
@@ -3401,12 +3459,33 @@ export function HomeworkReviewInterface() {
                         <div className="max-h-96 overflow-auto">
                           <div className="flex items-center justify-between px-4 py-2 bg-slate-50 border-b border-slate-200">
                             <span className="text-xs font-medium text-slate-600">📄 {f.name}</span>
-                            <button
-                              onClick={() => { setPreviewingFile(null); setPreviewHtml(""); }}
-                              className="text-xs text-slate-500 hover:text-red-500"
-                            >
-                              关闭预览
-                            </button>
+                            <div className="flex items-center gap-3">
+                              {previewPageCount > 1 && (
+                                <div className="flex items-center gap-2 text-xs text-slate-500">
+                                  <button
+                                    onClick={() => loadPreviewPage(f, previewPage - 1)}
+                                    disabled={previewPage <= 1}
+                                    className="hover:text-indigo-600 disabled:opacity-40"
+                                  >
+                                    上一页
+                                  </button>
+                                  <span>{previewPage}/{previewPageCount}</span>
+                                  <button
+                                    onClick={() => loadPreviewPage(f, previewPage + 1)}
+                                    disabled={previewPage >= previewPageCount}
+                                    className="hover:text-indigo-600 disabled:opacity-40"
+                                  >
+                                    下一页
+                                  </button>
+                                </div>
+                              )}
+                              <button
+                                onClick={() => { setPreviewingFile(null); setPreviewHtml(""); }}
+                                className="text-xs text-slate-500 hover:text-red-500"
+                              >
+                                关闭预览
+                              </button>
+                            </div>
                           </div>
                           <div
                             className="prose prose-sm prose-slate max-w-none p-4"
@@ -3508,7 +3587,10 @@ export function HomeworkReviewInterface() {
               )}
 
               {result.summary?.engine === "skill" && (
-                <SkillReviewDetails summary={result.summary} />
+                <SkillReviewDetails
+                  summary={result.summary}
+                  loadReport={result.reportsUrl ? loadSkillReport : undefined}
+                />
               )}
 
               {/* 传统批阅会生成可下载文件；Skills 结果直接在页面展示 */}
@@ -3626,7 +3708,11 @@ export function HomeworkReviewInterface() {
                     </td>
                     {student.total_scores.map((s, j) => (
                       <td key={j} className="px-3 py-2.5 text-center font-medium bg-indigo-50/50">
-                        <ScoreCell value={s} fullMark={student.full_mark} />
+                        {student.attempt_status?.[j] === "skipped" ? (
+                          <span className="text-xs text-slate-400" title="总分已收敛，未执行本次测评">跳过</span>
+                        ) : (
+                          <ScoreCell value={s} fullMark={student.full_mark} />
+                        )}
                       </td>
                     ))}
                     <td className="px-3 py-2.5 text-center font-bold text-indigo-700 bg-indigo-50/50">
@@ -3799,7 +3885,13 @@ function ScoreCell({value, fullMark}: {value: number | null; fullMark: number })
       );
 }
 
-function SkillReviewDetails({ summary }: { summary: any }) {
+function SkillReviewDetails({
+  summary,
+  loadReport,
+}: {
+  summary: any;
+  loadReport?: (taskId: string) => Promise<any>;
+}) {
   const results: any[] = Array.isArray(summary?.results) ? summary.results : [];
   return (
     <div className="bg-white rounded-3xl shadow-sm border border-violet-200 overflow-hidden">
@@ -3819,110 +3911,154 @@ function SkillReviewDetails({ summary }: { summary: any }) {
       </div>
       <div className="divide-y divide-slate-100">
         {results.map((item, index) => (
-          <details key={`${item.taskId || item.fileName}-${item.attemptIndex}-${index}`} className="group px-6 py-4">
-            <summary className="flex cursor-pointer list-none flex-wrap items-center gap-3 text-sm">
-              <span className={clsx(
-                "inline-flex h-6 min-w-6 items-center justify-center rounded-full px-2 text-xs font-bold",
-                item.success ? "bg-emerald-100 text-emerald-700" : "bg-red-100 text-red-700",
-              )}>
-                {item.success ? "成功" : "失败"}
-              </span>
-              <span className="min-w-0 flex-1 truncate font-semibold text-slate-800">{item.fileName}</span>
-              <span className="text-xs text-slate-500">第 {item.attemptIndex} 次</span>
-              <span className="font-bold text-indigo-700">
-                {item.totalScore ?? "—"}{item.fullMark != null ? ` / ${item.fullMark}` : ""}
-              </span>
-              <ChevronDown className="h-4 w-4 text-slate-400 transition group-open:rotate-180" />
-            </summary>
-            <div className="mt-4 space-y-4 pl-9">
-              <div className="flex flex-wrap items-center gap-3 text-xs text-slate-500">
-                <span>Task ID：<code className="font-mono">{item.taskId || "—"}</code></span>
-                <span>状态：{item.reportStatus || "—"}</span>
-                {item.finishedAt && <span>完成：{item.finishedAt}</span>}
-                {item.reportUrl && (
-                  <a href={item.reportUrl} target="_blank" rel="noopener noreferrer" className="font-semibold text-violet-600 hover:text-violet-800">
-                    打开平台报告 ↗
-                  </a>
-                )}
-              </div>
-              {item.error && (
-                <div className="rounded-lg border border-red-200 bg-red-50 px-3 py-2 text-sm text-red-700">{item.error}</div>
-              )}
-              {Array.isArray(item.items) && item.items.length > 0 && (
-                <div className="overflow-x-auto rounded-xl border border-slate-200">
-                  <table className="w-full text-xs">
-                    <thead className="bg-slate-50 text-slate-600">
-                      <tr>
-                        <th className="px-3 py-2 text-left">评分项</th>
-                        <th className="w-24 px-3 py-2 text-center">得分</th>
-                        <th className="px-3 py-2 text-left">评语</th>
-                      </tr>
-                    </thead>
-                    <tbody className="divide-y divide-slate-100">
-                      {item.items.map((scoreItem: any, scoreIndex: number) => (
-                        <tr key={`${scoreItem.itemIndex ?? scoreIndex}-${scoreIndex}`}>
-                          <td className="px-3 py-2 font-medium text-slate-700">{scoreItem.itemName}</td>
-                          <td className="px-3 py-2 text-center font-bold text-indigo-700">{scoreItem.itemScore ?? "—"}/{scoreItem.itemFullMark ?? "—"}</td>
-                          <td className="px-3 py-2 leading-relaxed text-slate-600">{scoreItem.comment || "—"}</td>
-                        </tr>
-                      ))}
-                    </tbody>
-                  </table>
-                </div>
-              )}
-              {Array.isArray(item.sections) && item.sections.filter((section: any) => section.title).length > 0 && (
-                <div className="grid gap-3 md:grid-cols-2">
-                  {item.sections.filter((section: any) => section.title).map((section: any) => (
-                    <div key={section.surfaceId} className="rounded-xl border border-slate-200 bg-slate-50 p-3">
-                      <div className="mb-2 text-sm font-semibold text-slate-800">{section.title}</div>
-                      <div className="space-y-2">
-                        {(section.cards || []).map((card: any, cardIndex: number) => (
-                          <div key={cardIndex} className="rounded-lg bg-white p-2 text-xs text-slate-600">
-                            {card.subtitle && <div className="font-semibold text-slate-700">{card.subtitle}</div>}
-                            {card.description && <div className="mt-1 leading-relaxed">{card.description}</div>}
-                          </div>
-                        ))}
-                        {(section.entries || []).map((entry: any, entryIndex: number) => (
-                          <div key={`entry-${entryIndex}`} className="rounded-lg border border-slate-100 bg-white p-3 text-xs text-slate-600">
-                            <div className="flex flex-wrap items-start justify-between gap-2">
-                              <div className="font-semibold text-slate-800">{entry.title || `验算项 ${entryIndex + 1}`}</div>
-                              {entry.status?.label && (
-                                <span className={clsx(
-                                  "rounded-full px-2 py-0.5 text-[11px] font-semibold",
-                                  entry.status.type === "success"
-                                    ? "bg-emerald-100 text-emerald-700"
-                                    : entry.status.type === "danger"
-                                      ? "bg-red-100 text-red-700"
-                                      : "bg-amber-100 text-amber-700",
-                                )}>
-                                  {entry.status.label}
-                                </span>
-                              )}
-                            </div>
-                            {entry.description && <div className="mt-1 leading-relaxed">{entry.description}</div>}
-                            {(entry.sideA || entry.sideB) && (
-                              <div className="mt-2 grid gap-2 sm:grid-cols-2">
-                                {[entry.sideA, entry.sideB].filter(Boolean).map((side: any, sideIndex: number) => (
-                                  <div key={sideIndex} className="rounded-md bg-slate-50 p-2">
-                                    <div className="font-semibold text-slate-700">{side.label || (sideIndex === 0 ? "学生值" : "验算值")}</div>
-                                    {side.title && <div className="mt-1 text-slate-700">{side.title}</div>}
-                                    {side.description && <div className="mt-1 leading-relaxed text-slate-500">{side.description}</div>}
-                                  </div>
-                                ))}
-                              </div>
-                            )}
-                          </div>
-                        ))}
+          <SkillReportEntry
+            key={`${item.taskId || item.fileName}-${item.variantIndex ?? 0}-${item.attemptIndex}-${index}`}
+            item={item}
+            loadReport={loadReport}
+          />
+        ))}
+      </div>
+    </div>
+  );
+}
+
+/** 单次 Skills 测评：展开时再读取完整报告（评语与报告分区），结果只保留分数摘要 */
+function SkillReportEntry({
+  item: summaryItem,
+  loadReport,
+}: {
+  item: any;
+  loadReport?: (taskId: string) => Promise<any>;
+}) {
+  const [report, setReport] = useState<any>(null);
+  const [reportLoading, setReportLoading] = useState(false);
+  const [reportError, setReportError] = useState<string | null>(null);
+  const item = report ?? summaryItem;
+
+  const handleToggle = async (event: React.SyntheticEvent<HTMLDetailsElement>) => {
+    if (!event.currentTarget.open || report || reportLoading || !loadReport || !summaryItem.taskId) return;
+    if (Array.isArray(summaryItem.sections)) return;  // 旧版结果已包含完整报告
+    setReportLoading(true);
+    setReportError(null);
+    try {
+      setReport(await loadReport(summaryItem.taskId));
+    } catch (error) {
+      setReportError(error instanceof Error ? error.message : "读取完整报告失败");
+    } finally {
+      setReportLoading(false);
+    }
+  };
+
+  return (
+    <details className="group px-6 py-4" onToggle={handleToggle}>
+      <summary className="flex cursor-pointer list-none flex-wrap items-center gap-3 text-sm">
+        <span className={clsx(
+          "inline-flex h-6 min-w-6 items-center justify-center rounded-full px-2 text-xs font-bold",
+          item.success ? "bg-emerald-100 text-emerald-700" : item.skipped ? "bg-slate-100 text-slate-500" : "bg-red-100 text-red-700",
+        )}>
+          {item.success ? "成功" : item.skipped ? "跳过" : "失败"}
+        </span>
+        <span className="min-w-0 flex-1 truncate font-semibold text-slate-800">{item.fileName}</span>
+        <span className="text-xs text-slate-500">第 {item.attemptIndex} 次</span>
+        <span className="font-bold text-indigo-700">
+          {item.totalScore ?? "—"}{item.fullMark != null ? ` / ${item.fullMark}` : ""}
+        </span>
+        <ChevronDown className="h-4 w-4 text-slate-400 transition group-open:rotate-180" />
+      </summary>
+      <div className="mt-4 space-y-4 pl-9">
+        <div className="flex flex-wrap items-center gap-3 text-xs text-slate-500">
+          <span>Task ID：<code className="font-mono">{item.taskId || "—"}</code></span>
+          <span>状态：{item.reportStatus || "—"}</span>
+          {item.finishedAt && <span>完成：{item.finishedAt}</span>}
+          {item.reportUrl && (
+            <a href={item.reportUrl} target="_blank" rel="noopener noreferrer" className="font-semibold text-violet-600 hover:text-violet-800">
+              打开平台报告 ↗
+            </a>
+          )}
+        </div>
+        {reportLoading && (
+          <div className="flex items-center gap-2 text-xs text-slate-500">
+            <Loader2 className="h-3.5 w-3.5 animate-spin" />正在读取完整报告…
+          </div>
+        )}
+        {reportError && (
+          <div className="rounded-lg border border-amber-200 bg-amber-50 px-3 py-2 text-xs text-amber-700">{reportError}</div>
+        )}
+        {item.error && (
+          <div className="rounded-lg border border-red-200 bg-red-50 px-3 py-2 text-sm text-red-700">{item.error}</div>
+        )}
+        {Array.isArray(item.items) && item.items.length > 0 && (
+          <div className="overflow-x-auto rounded-xl border border-slate-200">
+            <table className="w-full text-xs">
+              <thead className="bg-slate-50 text-slate-600">
+                <tr>
+                  <th className="px-3 py-2 text-left">评分项</th>
+                  <th className="w-24 px-3 py-2 text-center">得分</th>
+                  <th className="px-3 py-2 text-left">评语</th>
+                </tr>
+              </thead>
+              <tbody className="divide-y divide-slate-100">
+                {item.items.map((scoreItem: any, scoreIndex: number) => (
+                  <tr key={`${scoreItem.itemIndex ?? scoreIndex}-${scoreIndex}`}>
+                    <td className="px-3 py-2 font-medium text-slate-700">{scoreItem.itemName}</td>
+                    <td className="px-3 py-2 text-center font-bold text-indigo-700">{scoreItem.itemScore ?? "—"}/{scoreItem.itemFullMark ?? "—"}</td>
+                    <td className="px-3 py-2 leading-relaxed text-slate-600">{scoreItem.comment || "—"}</td>
+                  </tr>
+                ))}
+              </tbody>
+            </table>
+          </div>
+        )}
+        {Array.isArray(item.sections) && item.sections.filter((section: any) => section.title).length > 0 && (
+          <div className="grid gap-3 md:grid-cols-2">
+            {item.sections.filter((section: any) => section.title).map((section: any) => (
+              <div key={section.surfaceId} className="rounded-xl border border-slate-200 bg-slate-50 p-3">
+                <div className="mb-2 text-sm font-semibold text-slate-800">{section.title}</div>
+                <div className="space-y-2">
+                  {(section.cards || []).map((card: any, cardIndex: number) => (
+                    <div key={cardIndex} className="rounded-lg bg-white p-2 text-xs text-slate-600">
+                      {card.subtitle && <div className="font-semibold text-slate-700">{card.subtitle}</div>}
+                      {card.description && <div className="mt-1 leading-relaxed">{card.description}</div>}
+                    </div>
+                  ))}
+                  {(section.entries || []).map((entry: any, entryIndex: number) => (
+                    <div key={`entry-${entryIndex}`} className="rounded-lg border border-slate-100 bg-white p-3 text-xs text-slate-600">
+                      <div className="flex flex-wrap items-start justify-between gap-2">
+                        <div className="font-semibold text-slate-800">{entry.title || `验算项 ${entryIndex + 1}`}</div>
+                        {entry.status?.label && (
+                          <span className={clsx(
+                            "rounded-full px-2 py-0.5 text-[11px] font-semibold",
+                            entry.status.type === "success"
+                              ? "bg-emerald-100 text-emerald-700"
+                              : entry.status.type === "danger"
+                                ? "bg-red-100 text-red-700"
+                                : "bg-amber-100 text-amber-700",
+                          )}>
+                            {entry.status.label}
+                          </span>
+                        )}
                       </div>
+                      {entry.description && <div className="mt-1 leading-relaxed">{entry.description}</div>}
+                      {(entry.sideA || entry.sideB) && (
+                        <div className="mt-2 grid gap-2 sm:grid-cols-2">
+                          {[entry.sideA, entry.sideB].filter(Boolean).map((side: any, sideIndex: number) => (
+                            <div key={sideIndex} className="rounded-md bg-slate-50 p-2">
+                              <div className="font-semibold text-slate-700">{side.label || (sideIndex === 0 ? "学生值" : "验算值")}</div>
+                              {side.title && <div className="mt-1 text-slate-700">{side.title}</div>}
+                              {side.description && <div className="mt-1 leading-relaxed text-slate-500">{side.description}</div>}
+                            </div>
+                          ))}
+                        </div>
+                      )}
                     </div>
                   ))}
                 </div>
-              )}
-            </div>
-          </details>
-        ))}
+              </div>
+            ))}
+          </div>
+        )}
       </div>
-    </div>
+    </details>
   );
 }
 
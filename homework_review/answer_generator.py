@@ -3,13 +3,16 @@
 解析 Word 题卷，调用 LLM 生成5个不同等级的学生答案，并生成 .docx 文件
 """
 
+import io
 import json
 import os
 import re
 import asyncio
 import zipfile
+from contextlib import ExitStack
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Union
 from datetime import datetime
 from xml.etree import ElementTree
 
@@ -29,6 +32,13 @@ import requests
 
 # Import Cloud API functions
 from homework_reviewer_v2 import upload_file, homework_file_analysis
+from cloud_request_control import RetryBudget, RetryPolicy, call_with_retry_async, get_circuit_breaker, hedged_call
+from docx_text import DocxParagraph, iter_docx_blocks
+from docx_writer import DocxTemplate, paragraph_xml, run_properties
+from pdf_text import extract_pdf_pages
+
+# LLM 生成：网络/超时/限流/服务端错误最多重试 3 次，认证等客户端错误不重试
+LLM_RETRY_POLICY = RetryPolicy("llm", max_attempts=4, base_delay=5.0, max_delay=30.0)
 
 # 模型名称映射：前端 id → API 实际需要的模型名
 # 某些模型在 API 中需要特定格式的名称（如带空格的大写名）
@@ -260,17 +270,18 @@ def extract_questions_from_cloud(docx_path: Path, context: dict) -> Tuple[str, s
         return extract_questions_from_local(docx_path)
 
 
-def extract_questions_from_local(file_path: Path) -> Tuple[str, str]:
+def extract_questions_from_local(file_path: Path, content: Optional[bytes] = None) -> Tuple[str, str]:
     """
     本地解析作为兜底，支持真正的 .docx / .pdf。
     旧版二进制 .doc 需要云端解析，或先另存为 .docx / PDF。
+    content 为已读入内存的上传内容时，Word 文档直接在内存中解析。
     """
     ext = file_path.suffix.lower()
     
     if ext == ".pdf":
         return _extract_from_pdf(file_path)
     elif ext in (".doc", ".docx"):
-        return _extract_from_docx(file_path)
+        return _extract_from_docx(file_path, content)
     else:
         raise ValueError(f"本地解析不支持 {ext} 格式，仅支持 .docx / .pdf。请转换文件、粘贴题卷文字，或配置智慧树认证信息使用云端解析。")
 
@@ -285,105 +296,110 @@ def extract_questions_from_text(source_text: str, preferred_title: str = "") ->
     return title, exam_content
 
 
-def _file_signature(file_path: Path, size: int = 8) -> bytes:
-    with file_path.open("rb") as f:
-        return f.read(size)
+def _non_zip_docx_error(signature: bytes, ext: str) -> str:
+    if signature.startswith(OLE_SIGNATURE):
+        return (
+            "本地解析检测到旧版二进制 .doc 文件，python-docx 无法直接读取。"
+            "请在 Word/WPS 中另存为 .docx，或导出为 PDF；也可以切换到“粘贴文字”，"
+            "或配置智慧树认证信息走云端解析。"
+        )
+    if signature.startswith(b"%PDF"):
+        return "文件内容是 PDF，但扩展名不是 .pdf。请把文件后缀改为 .pdf 后重新上传。"
+    if signature.startswith(b"PK"):
+        return "文件压缩包结构损坏，无法作为 .docx 解析。请重新另存为 .docx 或 PDF。"
+    return (
+        f"文件不是有效的 Word .docx 压缩包（当前后缀为 {ext or '无后缀'}）。"
+        "请确认没有上传损坏文件、WPS 专有格式或被改后缀的其它文件。"
+    )
 
 
-def _docx_validation_error(docx_path: Path) -> Optional[str]:
-    """返回本地 Word 解析前可识别的格式错误；有效 docx 返回 None。"""
-    ext = docx_path.suffix.lower()
-    signature = _file_signature(docx_path)
+def _docx_package_error(package: zipfile.ZipFile) -> Optional[str]:
+    """在已打开的压缩包上检查 Office 关系结构；有效 docx 返回 None。"""
+    names = set(package.namelist())
+    if "_rels/.rels" not in names:
+        return "文件缺少 Office 根关系文件 _rels/.rels，不是有效的 Word .docx 文档。"
 
-    if not zipfile.is_zipfile(docx_path):
-        if signature.startswith(OLE_SIGNATURE):
+    try:
+        rels_xml = package.read("_rels/.rels")
+        rels_root = ElementTree.fromstring(rels_xml)
+    except (KeyError, ElementTree.ParseError) as exc:
+        return f"文件的 Office 关系文件损坏，无法识别 Word 主文档关系：{exc}"
+
+    main_target = ""
+    strict_target = ""
+    for rel in rels_root.iter():
+        rel_type = rel.attrib.get("Type")
+        if rel_type == OFFICE_DOCUMENT_REL_TYPE:
+            main_target = rel.attrib.get("Target", "").lstrip("/")
+            break
+        if rel_type == STRICT_OFFICE_DOCUMENT_REL_TYPE:
+            strict_target = rel.attrib.get("Target", "").lstrip("/")
+
+    if not main_target:
+        if strict_target:
             return (
-                "本地解析检测到旧版二进制 .doc 文件，python-docx 无法直接读取。"
-                "请在 Word/WPS 中另存为 .docx，或导出为 PDF；也可以切换到“粘贴文字”，"
-                "或配置智慧树认证信息走云端解析。"
+                "文件是 Strict Open XML 格式的 .docx，当前本地解析器不支持。"
+                "请在 Word/WPS 中另存为普通 Word 文档 .docx（非 Strict），或导出 PDF 后重新上传。"
             )
-        if signature.startswith(b"%PDF"):
-            return "文件内容是 PDF，但扩展名不是 .pdf。请把文件后缀改为 .pdf 后重新上传。"
-        return (
-            f"文件不是有效的 Word .docx 压缩包（当前后缀为 {ext or '无后缀'}）。"
-            "请确认没有上传损坏文件、WPS 专有格式或被改后缀的其它文件。"
-        )
+        if any(name.startswith("ppt/") for name in names):
+            return "文件是 PowerPoint 文档，不是 Word 题卷。请上传 .docx 或 PDF。"
+        if any(name.startswith("xl/") for name in names):
+            return "文件是 Excel 文档，不是 Word 题卷。请上传 .docx 或 PDF。"
+        return "文件不是有效的 Word .docx：缺少 officeDocument 主文档关系。请重新另存为 .docx 或 PDF 后上传。"
 
-    try:
-        with zipfile.ZipFile(docx_path) as package:
-            names = set(package.namelist())
-            if "_rels/.rels" not in names:
-                return "文件缺少 Office 根关系文件 _rels/.rels，不是有效的 Word .docx 文档。"
+    if not main_target.startswith("word/"):
+        return f"文件的主文档关系指向 {main_target}，不是 Word 文档结构。请上传真正的 .docx 或 PDF。"
 
-            try:
-                rels_xml = package.read("_rels/.rels")
-                rels_root = ElementTree.fromstring(rels_xml)
-            except (KeyError, ElementTree.ParseError) as exc:
-                return f"文件的 Office 关系文件损坏，无法识别 Word 主文档关系：{exc}"
-
-            main_target = ""
-            strict_target = ""
-            for rel in rels_root.iter():
-                rel_type = rel.attrib.get("Type")
-                if rel_type == OFFICE_DOCUMENT_REL_TYPE:
-                    main_target = rel.attrib.get("Target", "").lstrip("/")
-                    break
-                if rel_type == STRICT_OFFICE_DOCUMENT_REL_TYPE:
-                    strict_target = rel.attrib.get("Target", "").lstrip("/")
-
-            if not main_target:
-                if strict_target:
-                    return (
-                        "文件是 Strict Open XML 格式的 .docx，当前本地解析器不支持。"
-                        "请在 Word/WPS 中另存为普通 Word 文档 .docx（非 Strict），或导出 PDF 后重新上传。"
-                    )
-                if any(name.startswith("ppt/") for name in names):
-                    return "文件是 PowerPoint 文档，不是 Word 题卷。请上传 .docx 或 PDF。"
-                if any(name.startswith("xl/") for name in names):
-                    return "文件是 Excel 文档，不是 Word 题卷。请上传 .docx 或 PDF。"
-                return "文件不是有效的 Word .docx：缺少 officeDocument 主文档关系。请重新另存为 .docx 或 PDF 后上传。"
-
-            if not main_target.startswith("word/"):
-                return f"文件的主文档关系指向 {main_target}，不是 Word 文档结构。请上传真正的 .docx 或 PDF。"
-
-            if main_target not in names:
-                return f"文件声明的 Word 主文档 {main_target} 不存在，文档可能已损坏。请重新另存为 .docx 或 PDF。"
-    except zipfile.BadZipFile:
-        return "文件压缩包结构损坏，无法作为 .docx 解析。请重新另存为 .docx 或 PDF。"
+    if main_target not in names:
+        return f"文件声明的 Word 主文档 {main_target} 不存在，文档可能已损坏。请重新另存为 .docx 或 PDF。"
 
     return None
 
 
-def _collect_docx_text(doc) -> str:
+def _collect_docx_text(package: zipfile.ZipFile) -> str:
+    """先输出全部正文段落，再输出表格行；与按 python-docx 对象逐项拼接的结果一致。"""
     full_text = []
-    for p in doc.paragraphs:
-        if p.text.strip():
-            full_text.append(p.text.strip())
+    table_lines = []
+    for block in iter_docx_blocks(package):
+        if isinstance(block, DocxParagraph):
+            if block.text.strip():
+                full_text.append(block.text.strip())
+            continue
+        cells = [cell.strip() for cell in block.cells if cell.strip()]
+        if cells:
+            table_lines.append("\t".join(cells))
 
-    for table in doc.tables:
-        for row in table.rows:
-            cells = [cell.text.strip() for cell in row.cells if cell.text.strip()]
-            if cells:
-                full_text.append("\t".join(cells))
+    return "\n".join(full_text + table_lines)
 
-    return "\n".join(full_text)
 
+def load_docx_text(source: Union[Path, bytes], file_name: str = "") -> str:
+    """打开一次 Word 文档，在同一个压缩包句柄上完成结构校验与文本提取。
 
-def _extract_from_docx(docx_path: Path) -> Tuple[str, str]:
-    """解析 .docx 文件"""
-    if Document is None:
-        raise ImportError("请安装 python-docx: pip install python-docx")
+    source 可以是文件路径，也可以是已在内存中的上传内容；file_name 仅用于错误提示中的后缀。
+    结构问题抛出 ValueError，消息与逐项校验时一致。
+    """
+    ext = Path(file_name or (source if isinstance(source, Path) else "")).suffix.lower()
+    with ExitStack() as stack:
+        handle = io.BytesIO(source) if isinstance(source, bytes) else stack.enter_context(source.open("rb"))
+        signature = handle.read(8)
+        handle.seek(0)
+        try:
+            package = stack.enter_context(zipfile.ZipFile(handle))
+        except zipfile.BadZipFile:
+            raise ValueError(_non_zip_docx_error(signature, ext)) from None
 
-    validation_error = _docx_validation_error(docx_path)
-    if validation_error:
-        raise ValueError(validation_error)
+        validation_error = _docx_package_error(package)
+        if validation_error:
+            raise ValueError(validation_error)
+        try:
+            return _collect_docx_text(package)
+        except Exception as e:
+            raise ValueError(f"Word 文档打开失败：{e}。请重新另存为标准 .docx 或导出 PDF 后再上传。") from e
 
-    try:
-        doc = Document(docx_path)
-    except Exception as e:
-        raise ValueError(f"Word 文档打开失败：{e}。请重新另存为标准 .docx 或导出 PDF 后再上传。") from e
 
-    full_text_str = _collect_docx_text(doc)
+def _extract_from_docx(docx_path: Path, content: Optional[bytes] = None) -> Tuple[str, str]:
+    """解析 .docx 文件；传入 content 时直接使用内存中的文件内容，不再读取磁盘"""
+    full_text_str = load_docx_text(docx_path if content is None else content, docx_path.name)
     if not full_text_str.strip():
         raise ValueError("Word 文档已打开，但未提取到可复制文字。若题卷是扫描图片，请使用云端解析、导出可选中文字的 PDF，或粘贴题卷文字。")
 
@@ -396,15 +412,10 @@ def _extract_from_pdf(pdf_path: Path) -> Tuple[str, str]:
     if fitz is None:
         raise ImportError("解析 PDF 需要 PyMuPDF，请安装: pip install PyMuPDF")
     
-    doc = fitz.open(str(pdf_path))
-    page_count = len(doc)
+    pages = extract_pdf_pages(pdf_path)
+    page_count = len(pages)
     
-    full_text = []
-    for page in doc:
-        text = page.get_text("text")
-        if text.strip():
-            full_text.append(text.strip())
-    doc.close()
+    full_text = [text.strip() for text in pages if text.strip()]
     
     all_text = "\n".join(full_text)
     
@@ -446,7 +457,7 @@ def build_generation_prompt(title: str, exam_content: str, level: str, level_des
 """
 
 
-async def generate_answer_content(prompt: str, context: dict) -> Optional[str]:
+async def generate_answer_content(prompt: str, context: dict, retry_budget: Optional[RetryBudget] = None) -> Optional[str]:
     """调用 LLM 生成答案内容"""
     api_key, api_url, model = load_llm_config_from_args(context)
     
@@ -484,106 +495,107 @@ async def generate_answer_content(prompt: str, context: dict) -> Optional[str]:
     # 构建流式URL：普通URL + /stream 后缀（避免代理服务器120秒网关超时）
     stream_url = api_url.rstrip("/") + "/stream" if not api_url.endswith("/stream") else api_url
     
-    max_retries = 3
-    for attempt in range(max_retries + 1):
-        try:
-            # 使用流式接口，逐块读取响应，避免 Nginx 504 Gateway Timeout
-            loop = asyncio.get_event_loop()
-            
-            def stream_request():
-                """流式请求LLM API，拼接完整内容返回"""
-                resp = requests.post(stream_url, headers=headers, json=payload, timeout=300, stream=True)
-                if resp.status_code != 200:
-                    body_preview = resp.text[:500] if resp.text else "(empty)"
-                    raise requests.exceptions.HTTPError(
-                        f"LLM API 返回 {resp.status_code}: {body_preview}",
-                        response=resp
-                    )
-                
-                # 从SSE流中拼接完整内容
-                # 兼容两种格式：
-                #   标准 OpenAI: "data: {...}" + choices[0].delta.content
-                #   代理服务器: "data:{...}"  + choices[0].message.content
-                full_content = []
-                for line in resp.iter_lines(decode_unicode=True):
-                    if not line:
-                        continue
-                    # 兼容 "data: {...}" 和 "data:{...}" 两种格式
-                    if line.startswith("data:"):
-                        data_str = line[5:].strip()
-                    else:
-                        continue
-                    if data_str == "[DONE]":
-                        break
-                    try:
-                        chunk = json.loads(data_str)
-                        choices = chunk.get("choices", [])
-                        if choices:
-                            choice = choices[0]
-                            # 兼容 delta.content（标准）和 message.content（代理）
-                            delta = choice.get("delta") or choice.get("message") or {}
-                            content = delta.get("content")
-                            if content:  # 跳过 null 和空字符串
-                                full_content.append(content)
-                    except json.JSONDecodeError:
-                        continue
-                return "".join(full_content)
-            
-            result = await loop.run_in_executor(None, stream_request)
-            if result:
-                return result
-            
-            print(f"⚠️ LLM 流式响应内容为空")
-            return None
-            
-        except requests.exceptions.HTTPError as e:
-            print(f"❌ LLM API 错误: {e}")
-            print(f"   请求 URL: {stream_url}")
-            print(f"   请求 Model: {model}")
-            print(f"   API Key 前缀: {api_key[:10]}..." if len(api_key) > 10 else f"   API Key: (len={len(api_key)})")
-            if attempt < max_retries:
-                wait = 5 * (attempt + 1)
-                print(f"   ⏳ 第 {attempt + 1} 次重试（等待 {wait}s）...")
-                await asyncio.sleep(wait)
+    # 使用流式接口，逐块读取响应，避免 Nginx 504 Gateway Timeout
+    loop = asyncio.get_event_loop()
+
+    def stream_request():
+        """流式请求LLM API，拼接完整内容返回"""
+        resp = requests.post(stream_url, headers=headers, json=payload, timeout=300, stream=True)
+        if resp.status_code != 200:
+            body_preview = resp.text[:500] if resp.text else "(empty)"
+            raise requests.exceptions.HTTPError(
+                f"LLM API 返回 {resp.status_code}: {body_preview}",
+                response=resp
+            )
+        
+        # 从SSE流中拼接完整内容
+        # 兼容两种格式：
+        #   标准 OpenAI: "data: {...}" + choices[0].delta.content
+        #   代理服务器: "data:{...}"  + choices[0].message.content
+        full_content = []
+        for line in resp.iter_lines(decode_unicode=True):
+            if not line:
                 continue
-            return None
-        except Exception as e:
-            print(f"❌ LLM 生成失败: {type(e).__name__}: {e}")
-            if attempt < max_retries:
-                wait = 5 * (attempt + 1)
-                print(f"   ⏳ 第 {attempt + 1} 次重试（等待 {wait}s）...")
-                await asyncio.sleep(wait)
+            # 兼容 "data: {...}" 和 "data:{...}" 两种格式
+            if line.startswith("data:"):
+                data_str = line[5:].strip()
+            else:
                 continue
-            return None
+            if data_str == "[DONE]":
+                break
+            try:
+                chunk = json.loads(data_str)
+                choices = chunk.get("choices", [])
+                if choices:
+                    choice = choices[0]
+                    # 兼容 delta.content（标准）和 message.content（代理）
+                    delta = choice.get("delta") or choice.get("message") or {}
+                    content = delta.get("content")
+                    if content:  # 跳过 null 和空字符串
+                        full_content.append(content)
+            except json.JSONDecodeError:
+                continue
+        return "".join(full_content)
+
+    def log_retry(attempt: int, error_class: str, delay: float, error):
+        print(f"❌ LLM 生成失败: [{error_class}] {type(error).__name__}: {error}")
+        print(f"   ⏳ 第 {attempt} 次重试（等待 {delay:.1f}s）...")
+
+    try:
+        result = await call_with_retry_async(
+            # CLOUD_HEDGE_LLM=1 时对超过近期 p95 耗时的生成补发一次请求
+            lambda: loop.run_in_executor(None, hedged_call, "llm", stream_request),
+            policy=LLM_RETRY_POLICY,
+            budget=retry_budget,
+            breaker=get_circuit_breaker("llm"),
+            on_retry=log_retry,
+        )
+    except requests.exceptions.HTTPError as e:
+        print(f"❌ LLM API 错误: {e}")
+        print(f"   请求 URL: {stream_url}")
+        print(f"   请求 Model: {model}")
+        print(f"   API Key 前缀: {api_key[:10]}..." if len(api_key) > 10 else f"   API Key: (len={len(api_key)})")
+        return None
+    except Exception as e:
+        print(f"❌ LLM 生成失败: {type(e).__name__}: {e}")
+        return None
+
+    if result:
+        return result
+
+    print(f"⚠️ LLM 流式响应内容为空")
+    return None
+
+
+ANSWER_BOLD_RUN = run_properties(bold=True)
+ANSWER_SECTION_TITLE_PATTERN = re.compile(r'^[一二三四五六七八九十]+[、\.]')
+
+
+@lru_cache(maxsize=1)
+def _answer_docx_template() -> DocxTemplate:
+    """默认模板只渲染一次，之后每份答案只拼接正文段落"""
+    return DocxTemplate.from_document(Document())
 
 
 def create_answer_docx(content: str, output_path: Path, title: str, level: str, level_desc: str):
     """将生成的文本写入 Word 文档，模仿标准格式"""
-    doc = Document()
-    
-    # 1. 试卷标题
-    p_title = doc.add_paragraph(f"{title}五等级学生答案")
-    if p_title.runs: p_title.runs[0].bold = True
-    
-    # 2. 等级描述
-    p_level = doc.add_paragraph(f"等级：{level}（{level_desc}）")
-    if p_level.runs: p_level.runs[0].bold = True 
+    paragraphs = [
+        # 1. 试卷标题
+        paragraph_xml(f"{title}五等级学生答案", rpr=ANSWER_BOLD_RUN),
+        # 2. 等级描述
+        paragraph_xml(f"等级：{level}（{level_desc}）", rpr=ANSWER_BOLD_RUN),
+    ]
     
     # 3. 写入内容
-    # 简单处理：按行写入，识别到题型标题加粗
-    lines = content.split('\n')
-    for line in lines:
+    # 简单处理：按行写入，识别到题型标题 (一、xxx) 加粗
+    for line in content.split('\n'):
         line = line.strip()
         if not line:
             continue
+        bold = ANSWER_SECTION_TITLE_PATTERN.match(line) is not None
+        paragraphs.append(paragraph_xml(line, rpr=ANSWER_BOLD_RUN if bold else ""))
             
-        p = doc.add_paragraph(line)
-        
-        # 识别题型标题加粗 (一、xxx)
-        if re.match(r'^[一二三四五六七八九十]+[、\.]', line):
-            if p.runs: p.runs[0].bold = True
-            
-    doc.save(output_path)
+    _answer_docx_template().write(paragraphs, output_path)
 
 
 LEVEL_DEFINITIONS = {
@@ -665,10 +677,11 @@ async def generate_level_answers(
         tasks.append((full_key, desc, output_path))
 
     # 执行生成任务
+    retry_budget = RetryBudget()
     for level, desc, path in tasks:
         print(f"🤖 正在生成: {level}...")
         prompt = build_generation_prompt(title, exam_content, level, desc, custom_template=custom_prompt)
-        content = await generate_answer_content(prompt, context)
+        content = await generate_answer_content(prompt, context, retry_budget)
         
         if content:
             create_answer_docx(content, path, title, level, desc)
@@ -677,4 +690,8 @@ async def generate_level_answers(
         else:
             print(f"❌ 生成失败: {level}")
 
+    retry_stats = retry_budget.snapshot()
+    if retry_stats["retries"] or retry_stats["giveUps"]:
+        print(f"📊 LLM 调用: 共 {retry_stats['attempts']} 次，重试 {retry_stats['retries']} 次，放弃 {sum(retry_stats['giveUps'].values())} 次")
+
     return generated_files
@@ -0,0 +1,183 @@
+"""批阅测评次数调度：按轮次先后发出测评，并按分数收敛情况提前停止后续测评。"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import json
+import math
+import statistics
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+
+# 双侧 95% 置信度的 t 分布临界值，键为自由度；超过 30 时使用正态近似。
+_T_CRITICAL_95 = {
+    1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571,
+    6: 2.447, 7: 2.365, 8: 2.306, 9: 2.262, 10: 2.228,
+    11: 2.201, 12: 2.179, 13: 2.160, 14: 2.145, 15: 2.131,
+    16: 2.120, 17: 2.110, 18: 2.101, 19: 2.093, 20: 2.086,
+    21: 2.080, 22: 2.074, 23: 2.069, 24: 2.064, 25: 2.060,
+    26: 2.056, 27: 2.052, 28: 2.048, 29: 2.045, 30: 2.042,
+}
+
+DEFAULT_MIN_ATTEMPTS = 2
+DEFAULT_SCORE_TOLERANCE = 1.0
+
+ATTEMPT_OK = "ok"
+ATTEMPT_FAILED = "failed"
+ATTEMPT_SKIPPED = "skipped"
+
+
+def confidence_half_width(scores: Sequence[float]) -> float:
+    """总分均值 95% 置信区间的半宽；少于 2 个分数时返回无穷大。"""
+    if len(scores) < 2:
+        return math.inf
+    t_value = _T_CRITICAL_95.get(len(scores) - 1, 1.96)
+    return t_value * statistics.stdev(scores) / math.sqrt(len(scores))
+
+
+def has_converged(scores: Sequence[float], *, min_attempts: int, tolerance: float) -> bool:
+    """有效分数不少于 min_attempts，且置信区间半宽不超过 tolerance 分时视为收敛。"""
+    return len(scores) >= max(2, min_attempts) and confidence_half_width(scores) <= tolerance
+
+
+class AdaptiveAttemptController:
+    """按文件跟踪已完成的测评，决定后续测评是否还需要执行。
+
+    前 min_attempts 次测评立即并发执行；之后的第 k 次测评要等前 k-1 次都有结论
+    （完成、失败或跳过）后才判断：总分已收敛则跳过，否则照常执行。未开启自适应
+    模式时所有测评都会执行。
+    """
+
+    def __init__(
+        self,
+        attempts: int,
+        *,
+        enabled: bool = False,
+        min_attempts: int = DEFAULT_MIN_ATTEMPTS,
+        tolerance: float = DEFAULT_SCORE_TOLERANCE,
+    ) -> None:
+        self.attempts = max(1, int(attempts))
+        self.enabled = bool(enabled)
+        self.min_attempts = min(self.attempts, max(2, int(min_attempts)))
+        self.tolerance = max(0.0, float(tolerance))
+        self._condition = asyncio.Condition()
+        self._resolved: Dict[Hashable, int] = {}
+        self._scores: Dict[Hashable, List[float]] = {}
+        self._skipped: Dict[Hashable, List[int]] = {}
+
+    async def should_run(self, file_key: Hashable, attempt_index: int) -> bool:
+        """等到可以判断时返回是否执行该次测评；返回 False 时该次测评已记为跳过。"""
+        if not self.enabled or attempt_index <= self.min_attempts:
+            return True
+        async with self._condition:
+            await self._condition.wait_for(
+                lambda: self._resolved.get(file_key, 0) >= attempt_index - 1
+            )
+            scores = self._scores.get(file_key, [])
+            if not has_converged(scores, min_attempts=self.min_attempts, tolerance=self.tolerance):
+                return True
+            self._skipped.setdefault(file_key, []).append(attempt_index)
+            self._resolved[file_key] = self._resolved.get(file_key, 0) + 1
+            self._condition.notify_all()
+            return False
+
+    async def record(self, file_key: Hashable, score: Optional[float]) -> None:
+        """记录一次已执行测评的结果；失败或没有总分时 score 为 None。"""
+        async with self._condition:
+            if isinstance(score, (int, float)):
+                self._scores.setdefault(file_key, []).append(float(score))
+            self._resolved[file_key] = self._resolved.get(file_key, 0) + 1
+            self._condition.notify_all()
+
+    def skipped_attempts(self, file_key: Hashable) -> List[int]:
+        return sorted(self._skipped.get(file_key, []))
+
+    def summary(self) -> Dict[str, Any]:
+        skipped = sum(len(items) for items in self._skipped.values())
+        return {
+            "enabled": self.enabled,
+            "minAttempts": self.min_attempts,
+            "scoreTolerance": self.tolerance,
+            "skippedAttempts": skipped,
+        }
+
+
+def attempt_statuses(
+    attempts: int,
+    *,
+    succeeded: Sequence[int],
+    skipped: Sequence[int],
+) -> List[str]:
+    """生成评分表中每次测评的状态列表（ok / failed / skipped）。"""
+    statuses = [ATTEMPT_FAILED] * max(0, attempts)
+    for index in succeeded:
+        if 1 <= index <= attempts:
+            statuses[index - 1] = ATTEMPT_OK
+    for index in skipped:
+        if 1 <= index <= attempts:
+            statuses[index - 1] = ATTEMPT_SKIPPED
+    return statuses
+
+
+def parse_file_priorities(raw: Optional[str]) -> Dict[str, float]:
+    """解析前端传入的 {"文件名": 优先级} JSON；格式不正确时返回空字典。"""
+    if not raw:
+        return {}
+    try:
+        parsed = json.loads(raw)
+    except (json.JSONDecodeError, TypeError):
+        return {}
+    if not isinstance(parsed, dict):
+        return {}
+    priorities: Dict[str, float] = {}
+    for name, value in parsed.items():
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            priorities[str(name)] = float(value)
+    return priorities
+
+
+class BreadthFirstScheduler:
+    """按轮次调度测评：所有文件的第 1 次都发出后才开始第 2 次，依此类推。
+
+    同一轮内优先级高的文件先执行，优先级相同时保持提交顺序。最多 concurrency
+    个测评同时进行，空出的位置总是交给当前最早一轮里优先级最高的测评，
+    因此每份作业的首个分数大约在一轮耗时内全部返回。
+    """
+
+    def __init__(self, concurrency: int) -> None:
+        self.concurrency = max(1, int(concurrency))
+        self._queue: List[Tuple[int, float, int, Callable[[], Awaitable[Any]]]] = []
+        self._counter = itertools.count()
+
+    def submit(
+        self,
+        attempt_index: int,
+        factory: Callable[[], Awaitable[Any]],
+        *,
+        priority: float = 0,
+    ) -> int:
+        """登记一次测评，返回它在 run() 结果列表中的位置。"""
+        seq = next(self._counter)
+        heapq.heappush(self._queue, (attempt_index, -priority, seq, factory))
+        return seq
+
+    async def run(self) -> List[Any]:
+        """执行全部已登记的测评，按提交顺序返回结果；任一测评抛出异常时取消其余测评。"""
+        results: List[Any] = [None] * len(self._queue)
+
+        async def worker() -> None:
+            while self._queue:
+                _, _, seq, factory = heapq.heappop(self._queue)
+                results[seq] = await factory()
+
+        workers = [asyncio.ensure_future(worker()) for _ in range(min(self.concurrency, len(self._queue)))]
+        try:
+            await asyncio.gather(*workers)
+        except BaseException:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            raise
+        return results
@@ -0,0 +1,125 @@
+"""
+本地题卷解析基准：逐段多次 re.search 的旧实现 vs 编译后的 QuestionGrammar
+用法: python benchmark_local_parser.py [提交目录 ...] [--repeat 5]
+传入目录时读取其中全部 .docx 作为语料；不传时生成一份合成语料
+"""
+
+import argparse
+import re
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from docx_text import docx_paragraph_texts
+from local_parser import DEFAULT_GRAMMAR, normalize_judge_answer, parse_paragraphs
+
+SUBJECTIVE_SECTIONS = ["简答题", "论述题", "案例分析题"]
+
+
+def legacy_parse(paragraphs: List[str]) -> List[Dict]:
+    """改造前的逐段解析逻辑，仅作为对照基线"""
+
+    def detect_section(text: str) -> Optional[str]:
+        text_clean = text.replace("*", "").strip()
+        for name in ["单项选择题", "判断题", *SUBJECTIVE_SECTIONS]:
+            if re.search(r'[一二三四五六七八九十]、?\s*' + name, text_clean):
+                return name
+        return None
+
+    def is_case_background(text: str) -> bool:
+        text_clean = text.replace("*", "").strip()
+        return any(re.match(p, text_clean) for p in (r'^案例背景', r'^背景[:：]', r'^\*{0,2}案例背景'))
+
+    def is_question_start(text: str) -> Optional[int]:
+        match = re.match(r'^(\d+)[\.．、\\\\\.]\s*(.+)', text.replace("*", "").strip())
+        if not match or re.match(r'^\d+%', match.group(2)):
+            return None
+        num = int(match.group(1))
+        return num if 1 <= num <= 10 else None
+
+    def save(items: List[Dict], section: str, num: int, lines: List[str]) -> None:
+        unit = "问" if section == "案例分析题" else "题"
+        items.append({"itemId": "", "itemName": f"{section}第{num}{unit}", "stuAnswerContent": "\n\n".join(lines)})
+
+    items: List[Dict] = []
+    section, num, lines = None, 0, []
+    for text in paragraphs:
+        found = detect_section(text)
+        if found:
+            if section in SUBJECTIVE_SECTIONS and lines:
+                save(items, section, num, lines)
+            section, num, lines = found, 0, []
+            continue
+        clean = text.replace("*", "").replace("**", "").strip()
+        if section == "单项选择题":
+            for n, answer in re.findall(r'(\d+)[\.．]([A-Da-d])', clean):
+                items.append({"itemId": "", "itemName": f"单项选择题第{n}题", "stuAnswerContent": answer.upper()})
+        elif section == "判断题":
+            for n, answer in re.findall(r'(\d+)[\.．]([√×✓✗对错是否TtFf])', clean):
+                items.append({"itemId": "", "itemName": f"判断题第{n}题", "stuAnswerContent": normalize_judge_answer(answer)})
+        elif section in SUBJECTIVE_SECTIONS:
+            if is_case_background(text):
+                continue
+            q = is_question_start(text)
+            if q:
+                if lines:
+                    save(items, section, num, lines)
+                num, lines = q, [text]
+            elif num > 0:
+                lines.append(text)
+    if section in SUBJECTIVE_SECTIONS and lines:
+        save(items, section, num, lines)
+    return items
+
+
+def synthetic_corpus(submissions: int = 300) -> List[List[str]]:
+    body = [
+        "一、单项选择题", "1.B 2.C 3.A 4.D 5.B 6.A 7.C 8.B 9.D 10.A",
+        "二、判断题", "1.√ 2.× 3.对 4.错 5.√ 6.× 7.√ 8.× 9.√ 10.×",
+        "三、简答题",
+    ]
+    for number in range(1, 6):
+        body.append(f"{number}. 请简述实验原理与误差来源。")
+        body.extend(f"第{number}题作答第{line}段：数据增长 1.8% 后趋于稳定。" for line in range(8))
+    body.append("四、案例分析题")
+    body.append("案例背景：某企业在数字化转型中遇到组织阻力。")
+    for number in range(1, 4):
+        body.append(f"{number}、结合案例分析原因。")
+        body.extend(f"分析要点{line}：管理层沟通、流程再造与激励机制。" for line in range(10))
+    return [list(body) for _ in range(submissions)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="对比题卷语法解析耗时")
+    parser.add_argument("corpus", nargs="*", help="包含学生提交 .docx 的目录")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.corpus:
+        files = [path for folder in args.corpus for path in sorted(Path(folder).rglob("*.docx"))]
+        corpus = [docx_paragraph_texts(path) for path in files]
+        print(f"语料: {len(files)} 份提交")
+    else:
+        corpus = synthetic_corpus()
+        print(f"语料: 合成 {len(corpus)} 份提交")
+    paragraph_count = sum(len(paragraphs) for paragraphs in corpus)
+
+    for paragraphs in corpus:
+        if legacy_parse(paragraphs) != parse_paragraphs(paragraphs, DEFAULT_GRAMMAR):
+            raise SystemExit("❌ 新旧解析结果不一致")
+
+    timings = {}
+    for label, func in (("旧实现", legacy_parse), ("QuestionGrammar", lambda p: parse_paragraphs(p, DEFAULT_GRAMMAR))):
+        best = float("inf")
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            for paragraphs in corpus:
+                func(paragraphs)
+            best = min(best, time.perf_counter() - started)
+        timings[label] = best
+        print(f"{label}: {best * 1000:.1f} ms, {paragraph_count / best:,.0f} 段落/秒")
+    print(f"加速 {timings['旧实现'] / timings['QuestionGrammar']:.1f}x，解析结果一致（{paragraph_count} 段落）")
+
+
+if __name__ == "__main__":
+    main()
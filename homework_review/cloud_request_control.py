@@ -0,0 +1,1047 @@
+"""Shared flow-control primitives for calls to the Zhihuishu cloud APIs."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, FrozenSet, Optional, Tuple, TypeVar
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows development machines
+    fcntl = None
+
+
+ERROR_NETWORK = "network"
+# The connection was never established, so the request cannot have reached the server.
+ERROR_CONNECT = "connect"
+ERROR_TIMEOUT = "timeout"
+ERROR_THROTTLED = "throttled"
+ERROR_SERVER = "server"
+ERROR_CLIENT = "client"
+ERROR_UNKNOWN = "unknown"
+ERROR_CIRCUIT_OPEN = "circuit_open"
+
+RETRYABLE_ERROR_CLASSES = frozenset({ERROR_CONNECT, ERROR_NETWORK, ERROR_TIMEOUT, ERROR_THROTTLED, ERROR_SERVER})
+OVERLOAD_ERROR_CLASSES = frozenset({ERROR_TIMEOUT, ERROR_THROTTLED, ERROR_SERVER})
+# Throttling is handled by the AIMD window; only an unreachable or failing
+# endpoint should trip its circuit breaker.
+BREAKER_FAILURE_CLASSES = frozenset({ERROR_CONNECT, ERROR_NETWORK, ERROR_TIMEOUT, ERROR_SERVER})
+
+# Sub-second jitter on fast endpoints should not count as a latency regression.
+_LATENCY_SLACK_SECONDS = 0.25
+
+OUTCOME_SUCCESS = "success"
+OUTCOME_FAILURE = "failure"
+OUTCOME_OVERLOAD = "overload"
+
+
+class CircuitOpenError(RuntimeError):
+    """A call was rejected because its endpoint's circuit breaker is open."""
+
+    def __init__(self, endpoint: str, retry_after: float) -> None:
+        super().__init__(f"「{endpoint}」接口暂时不可用，已熔断，约 {max(1, round(retry_after))} 秒后再探测")
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+
+
+def _status_code(value: Any) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def classify_status(status: Any) -> Optional[str]:
+    """Map an HTTP (or platform ``code``) status to an error class; ``None`` if not an error."""
+    code = _status_code(status)
+    if code is None or code < 400:
+        return None
+    if code == 429:
+        return ERROR_THROTTLED
+    if code == 408:
+        return ERROR_TIMEOUT
+    if code >= 500:
+        return ERROR_SERVER
+    return ERROR_CLIENT
+
+
+def _connection_never_established(exc: BaseException) -> bool:
+    """True when a connection error happened before any byte of the request was sent."""
+    try:
+        from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+    except ImportError:  # pragma: no cover - urllib3 ships with requests
+        return isinstance(exc, ConnectionRefusedError)
+    seen = set()
+    pending = [exc]
+    while pending:
+        current = pending.pop()
+        if current is None or id(current) in seen:
+            continue
+        seen.add(id(current))
+        if isinstance(current, (ConnectTimeoutError, NewConnectionError, ConnectionRefusedError)):
+            return True
+        # requests wraps urllib3's MaxRetryError, which keeps the cause in ``reason``
+        pending.extend(arg for arg in getattr(current, "args", ()) if isinstance(arg, BaseException))
+        pending.extend([getattr(current, "reason", None), current.__cause__, current.__context__])
+    return False
+
+
+def classify_exception(exc: BaseException) -> str:
+    """Classify an exception by its type and attached HTTP status, never by its message.
+
+    Wrapper exceptions may carry the class of the error they replace in an
+    ``error_class`` attribute.
+    """
+    if isinstance(exc, CircuitOpenError):
+        return ERROR_CIRCUIT_OPEN
+    explicit = getattr(exc, "error_class", None)
+    if explicit:
+        return str(explicit)
+    status_class = classify_status(getattr(exc, "status_code", None))
+    response = getattr(exc, "response", None)
+    if status_class is None and response is not None:
+        status_class = classify_status(getattr(response, "status_code", None))
+    if status_class is not None:
+        return status_class
+    try:
+        import requests
+    except ImportError:  # pragma: no cover - requests is a hard dependency
+        requests = None
+    if isinstance(exc, (TimeoutError, asyncio.TimeoutError)):
+        return ERROR_TIMEOUT
+    if requests is not None:
+        if isinstance(exc, requests.ConnectTimeout):
+            return ERROR_CONNECT
+        if isinstance(exc, requests.Timeout):
+            return ERROR_TIMEOUT
+        if isinstance(
+            exc,
+            (
+                requests.ConnectionError,
+                requests.exceptions.ChunkedEncodingError,
+                requests.exceptions.ContentDecodingError,
+            ),
+        ):
+            return ERROR_CONNECT if _connection_never_established(exc) else ERROR_NETWORK
+    if isinstance(exc, ConnectionError):
+        return ERROR_CONNECT if _connection_never_established(exc) else ERROR_NETWORK
+    return ERROR_UNKNOWN
+
+
+def classify_result(result: Any) -> str:
+    """Classify the error dicts returned by the legacy review engine.
+
+    They carry an explicit ``errorClass`` when built from an exception, a
+    ``status_code`` for non-JSON responses, or the platform's own ``code``.
+    """
+    if not isinstance(result, dict):
+        return ERROR_UNKNOWN
+    explicit = result.get("errorClass")
+    if explicit:
+        return str(explicit)
+    return (
+        classify_status(result.get("status_code"))
+        or classify_status(result.get("code"))
+        or ERROR_UNKNOWN
+    )
+
+
+def is_overload_error(exc: BaseException) -> bool:
+    """Return whether an exception means the platform is throttling or saturated."""
+    return classify_exception(exc) in OVERLOAD_ERROR_CLASSES
+
+
+def is_overload_result(result: Any) -> bool:
+    """Return whether a legacy ``(success, result)`` failure means the platform is saturated."""
+    return classify_result(result) in OVERLOAD_ERROR_CLASSES
+
+
+class AdaptivePermit:
+    """One admitted call; callers report its outcome before the slot is released."""
+
+    __slots__ = ("epoch", "started_at", "outcome")
+
+    def __init__(self, epoch: int, started_at: float) -> None:
+        self.epoch = epoch
+        self.started_at = started_at
+        self.outcome = OUTCOME_SUCCESS
+
+    def mark_failure(self) -> None:
+        if self.outcome != OUTCOME_OVERLOAD:
+            self.outcome = OUTCOME_FAILURE
+
+    def mark_overload(self) -> None:
+        self.outcome = OUTCOME_OVERLOAD
+
+    def observe(self, success: bool, result: Any = None) -> None:
+        """Record a legacy ``(success, result)`` pair."""
+        if success:
+            return
+        if is_overload_result(result):
+            self.mark_overload()
+        else:
+            self.mark_failure()
+
+
+class AdaptiveConcurrencyLimiter:
+    """Bound in-flight cloud calls with an AIMD window.
+
+    Every healthy completion grows the window by ``increase_step / window``, so the
+    limit rises by roughly one per window's worth of successes. A completion whose
+    latency exceeds ``latency_tolerance`` times the running average holds the window
+    instead. Throttling, 5xx responses and timeouts cut the window multiplicatively,
+    at most once per cohort: calls admitted before a cut cannot cut again.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        *,
+        minimum: int = 1,
+        maximum: Optional[int] = None,
+        increase_step: float = 1.0,
+        decrease_factor: float = 0.5,
+        latency_tolerance: float = 2.0,
+        name: str = "cloud",
+        on_change: Optional[Callable[[int, int, str], None]] = None,
+    ) -> None:
+        self.minimum = max(1, int(minimum))
+        self.maximum = max(self.minimum, int(maximum if maximum is not None else initial))
+        self.increase_step = max(0.0, float(increase_step))
+        self.decrease_factor = min(0.95, max(0.05, float(decrease_factor)))
+        self.latency_tolerance = max(1.0, float(latency_tolerance))
+        self.name = name
+        self._on_change = on_change
+        self._window = float(min(self.maximum, max(self.minimum, int(initial))))
+        _note_concurrency_ceiling(self.maximum)
+        self._condition = asyncio.Condition()
+        self._active = 0
+        self._waiting = 0
+        self._epoch = 0
+        self._latency_ewma: Optional[float] = None
+        self._completed = 0
+        self._failures = 0
+        self._overloads = 0
+        self._slow = 0
+        self._increases = 0
+        self._decreases = 0
+
+    @property
+    def limit(self) -> int:
+        return max(self.minimum, min(self.maximum, int(self._window)))
+
+    async def acquire(self) -> AdaptivePermit:
+        async with self._condition:
+            self._waiting += 1
+            try:
+                await self._condition.wait_for(lambda: self._active < self.limit)
+            finally:
+                self._waiting -= 1
+            self._active += 1
+            return AdaptivePermit(self._epoch, time.monotonic())
+
+    async def release(self, permit: AdaptivePermit) -> None:
+        latency = time.monotonic() - permit.started_at
+        async with self._condition:
+            self._active -= 1
+            change = self._record_locked(permit, latency)
+            self._condition.notify_all()
+        if change and self._on_change is not None:
+            self._on_change(*change)
+
+    def _record_locked(self, permit: AdaptivePermit, latency: float) -> Optional[tuple]:
+        previous = self.limit
+        reason = ""
+        self._completed += 1
+        if permit.outcome == OUTCOME_OVERLOAD:
+            self._overloads += 1
+            if permit.epoch == self._epoch:
+                self._window = max(float(self.minimum), self._window * self.decrease_factor)
+                self._epoch += 1
+                self._decreases += 1
+                reason = OUTCOME_OVERLOAD
+        elif permit.outcome == OUTCOME_FAILURE:
+            self._failures += 1
+        else:
+            baseline = self._latency_ewma
+            self._latency_ewma = latency if baseline is None else baseline + 0.2 * (latency - baseline)
+            if (
+                baseline is not None
+                and latency > baseline * self.latency_tolerance
+                and latency - baseline > _LATENCY_SLACK_SECONDS
+            ):
+                self._slow += 1
+            elif self._window < self.maximum:
+                self._window = min(
+                    float(self.maximum),
+                    self._window + self.increase_step / max(1.0, self._window),
+                )
+                reason = "healthy"
+
+        current = self.limit
+        if current > previous:
+            self._increases += 1
+        if current != previous:
+            return previous, current, reason
+        return None
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[AdaptivePermit]:
+        permit = await self.acquire()
+        try:
+            yield permit
+        except asyncio.CancelledError:
+            permit.mark_failure()
+            raise
+        except Exception as exc:
+            if is_overload_error(exc):
+                permit.mark_overload()
+            else:
+                permit.mark_failure()
+            raise
+        finally:
+            await asyncio.shield(self.release(permit))
+
+    async def snapshot(self) -> Dict[str, Any]:
+        async with self._condition:
+            return {
+                "name": self.name,
+                "limit": self.limit,
+                "window": round(self._window, 2),
+                "minimum": self.minimum,
+                "maximum": self.maximum,
+                "active": self._active,
+                "waiting": self._waiting,
+                "completed": self._completed,
+                "failures": self._failures,
+                "overloads": self._overloads,
+                "slowCompletions": self._slow,
+                "increases": self._increases,
+                "decreases": self._decreases,
+                "latencyEwmaMs": (
+                    round(self._latency_ewma * 1000) if self._latency_ewma is not None else None
+                ),
+            }
+
+
+# Requests per second and burst size for each cloud endpoint. Override with
+# CLOUD_RATE_<KEY> / CLOUD_BURST_<KEY> (e.g. CLOUD_RATE_EXECUTE_AGENT=1.5);
+# a rate of 0 disables throttling for that endpoint.
+CLOUD_ENDPOINT_RATE_DEFAULTS: Dict[str, Tuple[float, int]] = {
+    "file-upload": (4.0, 8),
+    "homework-file-analysis": (2.0, 4),
+    "execute-agent": (2.0, 4),
+    "get-task": (10.0, 20),
+    "correction-skill-execute": (2.0, 4),
+    "correction-skill-report": (10.0, 20),
+}
+
+
+class TokenBucket:
+    """Thread-safe token bucket; with ``state_path`` it is shared across processes.
+
+    Callers reserve a token first and then sleep until it matures, so concurrent
+    waiters queue in arrival order instead of polling the bucket.
+    """
+
+    def __init__(self, rate: float, burst: int, *, state_path: Optional[Path] = None) -> None:
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self.state_path = state_path if fcntl is not None else None
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst)
+        self._updated = time.time()
+        self._calls = 0
+        self._throttled = 0
+        self._waited_seconds = 0.0
+
+    def _take(self, tokens: float, updated: float, now: float) -> Tuple[float, float]:
+        tokens = min(float(self.burst), tokens + max(0.0, now - updated) * self.rate)
+        tokens -= 1.0
+        wait = -tokens / self.rate if tokens < 0 else 0.0
+        return tokens, wait
+
+    def _reserve_shared(self, now: float) -> float:
+        assert self.state_path is not None and fcntl is not None
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.state_path, "a+", encoding="utf-8") as handle:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            try:
+                handle.seek(0)
+                try:
+                    state = json.loads(handle.read() or "{}")
+                    tokens = float(state["tokens"])
+                    updated = float(state["updated"])
+                except (ValueError, KeyError, TypeError):
+                    tokens, updated = float(self.burst), now
+                tokens, wait = self._take(tokens, updated, now)
+                handle.seek(0)
+                handle.truncate()
+                handle.write(json.dumps({"tokens": tokens, "updated": now}))
+                handle.flush()
+            finally:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+        return wait
+
+    def reserve(self) -> float:
+        """Take one token and return how many seconds the caller must wait for it."""
+        now = time.time()
+        with self._lock:
+            if self.state_path is not None:
+                wait = self._reserve_shared(now)
+            else:
+                self._tokens, wait = self._take(self._tokens, self._updated, now)
+                self._updated = now
+            self._calls += 1
+            if wait > 0:
+                self._throttled += 1
+                self._waited_seconds += wait
+        return wait
+
+    def acquire(self) -> float:
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self) -> float:
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "rate": self.rate,
+                "burst": self.burst,
+                "shared": self.state_path is not None,
+                "calls": self._calls,
+                "throttled": self._throttled,
+                "waitedSeconds": round(self._waited_seconds, 2),
+            }
+
+
+_RATE_LIMITERS: Dict[str, Optional[TokenBucket]] = {}
+_RATE_LIMITERS_LOCK = threading.Lock()
+
+
+def env_float(name: str, default: float, *, minimum: Optional[float] = None) -> float:
+    """Read a numeric setting from the environment; malformed values fall back to ``default``."""
+    try:
+        value = float(os.getenv(name, str(default)))
+    except (TypeError, ValueError):
+        value = default
+    return value if minimum is None else max(minimum, value)
+
+
+def get_cloud_rate_limiter(endpoint: str) -> Optional[TokenBucket]:
+    """Return the process-wide bucket for ``endpoint``, or ``None`` when it is unthrottled.
+
+    When ``CLOUD_RATE_STATE_DIR`` is set, bucket state lives in that directory so the
+    API process and every review subprocess draw from the same quota.
+    """
+    with _RATE_LIMITERS_LOCK:
+        if endpoint in _RATE_LIMITERS:
+            return _RATE_LIMITERS[endpoint]
+        default_rate, default_burst = CLOUD_ENDPOINT_RATE_DEFAULTS.get(endpoint, (0.0, 1))
+        env_key = endpoint.upper().replace("-", "_")
+        rate = env_float(f"CLOUD_RATE_{env_key}", default_rate)
+        burst = int(env_float(f"CLOUD_BURST_{env_key}", default_burst))
+        bucket = None
+        if rate > 0:
+            state_dir = os.getenv("CLOUD_RATE_STATE_DIR", "").strip()
+            bucket = TokenBucket(
+                rate,
+                burst,
+                state_path=Path(state_dir) / f"{endpoint}.json" if state_dir else None,
+            )
+        _RATE_LIMITERS[endpoint] = bucket
+        return bucket
+
+
+def throttle_cloud_endpoint(endpoint: str) -> float:
+    """Block the calling thread until ``endpoint`` may be called; return the wait."""
+    bucket = get_cloud_rate_limiter(endpoint)
+    return bucket.acquire() if bucket is not None else 0.0
+
+
+def cloud_rate_snapshot() -> Dict[str, Any]:
+    with _RATE_LIMITERS_LOCK:
+        buckets = dict(_RATE_LIMITERS)
+    return {
+        endpoint: bucket.snapshot()
+        for endpoint, bucket in buckets.items()
+        if bucket is not None
+    }
+
+
+BREAKER_CLOSED = "closed"
+BREAKER_OPEN = "open"
+BREAKER_HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker for one endpoint.
+
+    ``failure_threshold`` consecutive endpoint failures open the circuit, and every
+    call then fails fast for ``open_seconds``. After that, up to
+    ``half_open_max_calls`` probes are let through at a time; ``success_threshold``
+    probe successes close the circuit again and any probe failure reopens it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        failure_threshold: int = 5,
+        open_seconds: float = 30.0,
+        half_open_max_calls: int = 1,
+        success_threshold: int = 2,
+        on_change: Optional[Callable[[str, str, str], None]] = None,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.open_seconds = max(0.0, float(open_seconds))
+        self.half_open_max_calls = max(1, int(half_open_max_calls))
+        self.success_threshold = max(1, int(success_threshold))
+        self._on_change = on_change
+        self._lock = threading.Lock()
+        self._state = BREAKER_CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self._opens = 0
+        self._rejected = 0
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def _transition_locked(self, state: str) -> Optional[Tuple[str, str, str]]:
+        previous = self._state
+        if previous == state:
+            return None
+        self._state = state
+        if state == BREAKER_OPEN:
+            self._opened_at = time.monotonic()
+            self._opens += 1
+        self._consecutive_failures = 0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        return self.name, previous, state
+
+    def _notify(self, change: Optional[Tuple[str, str, str]]) -> None:
+        if change is not None and self._on_change is not None:
+            self._on_change(*change)
+
+    def before_call(self) -> bool:
+        """Admit a call or raise :class:`CircuitOpenError`; return whether it is a probe."""
+        change = None
+        try:
+            with self._lock:
+                if self._state == BREAKER_OPEN:
+                    remaining = self.open_seconds - (time.monotonic() - self._opened_at)
+                    if remaining > 0:
+                        self._rejected += 1
+                        raise CircuitOpenError(self.name, remaining)
+                    change = self._transition_locked(BREAKER_HALF_OPEN)
+                if self._state == BREAKER_HALF_OPEN:
+                    if self._probes_in_flight >= self.half_open_max_calls:
+                        self._rejected += 1
+                        raise CircuitOpenError(self.name, 1.0)
+                    self._probes_in_flight += 1
+                    return True
+                return False
+        finally:
+            self._notify(change)
+
+    def record(self, error_class: Optional[str], *, probe: bool) -> None:
+        """Record a finished call; ``error_class`` is ``None`` for success."""
+        failed = error_class in BREAKER_FAILURE_CLASSES
+        change = None
+        with self._lock:
+            if probe and self._state == BREAKER_HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+                if failed:
+                    change = self._transition_locked(BREAKER_OPEN)
+                else:
+                    self._probe_successes += 1
+                    if self._probe_successes >= self.success_threshold:
+                        change = self._transition_locked(BREAKER_CLOSED)
+            elif self._state == BREAKER_CLOSED:
+                if failed:
+                    self._consecutive_failures += 1
+                    if self._consecutive_failures >= self.failure_threshold:
+                        change = self._transition_locked(BREAKER_OPEN)
+                else:
+                    self._consecutive_failures = 0
+        self._notify(change)
+
+    def release_probe(self) -> None:
+        """Give back a probe slot whose call was cancelled before it finished."""
+        with self._lock:
+            if self._state == BREAKER_HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            retry_after = 0.0
+            if self._state == BREAKER_OPEN:
+                retry_after = max(0.0, self.open_seconds - (time.monotonic() - self._opened_at))
+            return {
+                "state": self._state,
+                "consecutiveFailures": self._consecutive_failures,
+                "opens": self._opens,
+                "rejected": self._rejected,
+                "retryAfterSeconds": round(retry_after, 1),
+            }
+
+
+_CIRCUIT_BREAKERS: Dict[str, CircuitBreaker] = {}
+_CIRCUIT_LISTENERS: list = []
+_CIRCUIT_BREAKERS_LOCK = threading.Lock()
+
+
+def add_circuit_breaker_listener(listener: Callable[[str, str, str], None]) -> None:
+    """Call ``listener(endpoint, previous_state, state)`` on every breaker transition."""
+    with _CIRCUIT_BREAKERS_LOCK:
+        _CIRCUIT_LISTENERS.append(listener)
+
+
+def _notify_circuit_listeners(endpoint: str, previous: str, state: str) -> None:
+    with _CIRCUIT_BREAKERS_LOCK:
+        listeners = list(_CIRCUIT_LISTENERS)
+    for listener in listeners:
+        listener(endpoint, previous, state)
+
+
+def get_circuit_breaker(endpoint: str) -> CircuitBreaker:
+    """Return the process-wide breaker for ``endpoint``.
+
+    Thresholds come from ``CIRCUIT_FAILURE_THRESHOLD``, ``CIRCUIT_OPEN_SECONDS``,
+    ``CIRCUIT_HALF_OPEN_MAX_CALLS`` and ``CIRCUIT_SUCCESS_THRESHOLD``.
+    """
+    with _CIRCUIT_BREAKERS_LOCK:
+        breaker = _CIRCUIT_BREAKERS.get(endpoint)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                endpoint,
+                failure_threshold=int(env_float("CIRCUIT_FAILURE_THRESHOLD", 5)),
+                open_seconds=env_float("CIRCUIT_OPEN_SECONDS", 30.0),
+                half_open_max_calls=int(env_float("CIRCUIT_HALF_OPEN_MAX_CALLS", 1)),
+                success_threshold=int(env_float("CIRCUIT_SUCCESS_THRESHOLD", 2)),
+                on_change=_notify_circuit_listeners,
+            )
+            _CIRCUIT_BREAKERS[endpoint] = breaker
+        return breaker
+
+
+def circuit_breaker_snapshot() -> Dict[str, Any]:
+    with _CIRCUIT_BREAKERS_LOCK:
+        breakers = dict(_CIRCUIT_BREAKERS)
+    return {endpoint: breaker.snapshot() for endpoint, breaker in breakers.items()}
+
+
+T = TypeVar("T")
+
+
+# Reads that may be hedged by default; anything else (e.g. "llm") must opt in
+# with CLOUD_HEDGE_<KEY>=1 because a duplicate costs real tokens.
+HEDGED_ENDPOINT_DEFAULTS = {"get-task", "correction-skill-report"}
+_HEDGE_LOCK = threading.Lock()
+_HEDGE_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_HEDGE_EXECUTOR_SIZE = 0
+# Largest AIMD ceiling seen in this process; hedged reads run inside those windows.
+_CONCURRENCY_CEILING = 0
+
+
+def _note_concurrency_ceiling(maximum: int) -> None:
+    global _CONCURRENCY_CEILING
+    with _HEDGE_LOCK:
+        _CONCURRENCY_CEILING = max(_CONCURRENCY_CEILING, maximum)
+
+
+def _hedge_executor() -> ThreadPoolExecutor:
+    """Return the shared hedging pool, sized for every primary plus its backup.
+
+    The default follows the cloud concurrency ceiling so primaries do not queue
+    behind each other; ``CLOUD_HEDGE_WORKERS`` overrides it. A pool that became
+    too small for a higher ceiling is replaced, letting its running calls finish.
+    """
+    global _HEDGE_EXECUTOR, _HEDGE_EXECUTOR_SIZE
+    with _HEDGE_LOCK:
+        size = max(2, int(env_float("CLOUD_HEDGE_WORKERS", max(32, 2 * _CONCURRENCY_CEILING))))
+        if _HEDGE_EXECUTOR is None or _HEDGE_EXECUTOR_SIZE < size:
+            previous = _HEDGE_EXECUTOR
+            _HEDGE_EXECUTOR = ThreadPoolExecutor(max_workers=size, thread_name_prefix="cloud-hedge")
+            _HEDGE_EXECUTOR_SIZE = size
+            if previous is not None:
+                previous.shutdown(wait=False)
+        return _HEDGE_EXECUTOR
+
+
+class RequestHedger:
+    """Send a backup copy of a slow idempotent request and keep the first answer.
+
+    The backup is sent once the primary has run longer than the ``quantile`` of
+    recently observed latencies. Backups are capped at ``max_extra_ratio`` of all
+    calls, so hedging adds a bounded amount of load. The slower copy is not
+    cancelled (``requests`` cannot abort a call in flight); its answer is dropped.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        *,
+        enabled: bool = True,
+        max_extra_ratio: float = 0.1,
+        quantile: float = 0.95,
+        min_samples: int = 20,
+        min_delay: float = 0.05,
+        window: int = 256,
+    ) -> None:
+        self.endpoint = endpoint
+        self.enabled = enabled
+        self.max_extra_ratio = max(0.0, float(max_extra_ratio))
+        self.quantile = min(0.999, max(0.5, float(quantile)))
+        self.min_samples = max(1, int(min_samples))
+        self.min_delay = max(0.0, float(min_delay))
+        self._latencies: deque = deque(maxlen=max(self.min_samples, int(window)))
+        self._lock = threading.Lock()
+        self._calls = 0
+        self._hedges_sent = 0
+        self._hedges_won = 0
+        self._hedges_skipped = 0
+
+    def hedge_delay(self) -> Optional[float]:
+        """Return the current trigger latency, or ``None`` until enough samples exist."""
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            ordered = sorted(self._latencies)
+        index = min(len(ordered) - 1, int(self.quantile * len(ordered)))
+        return max(self.min_delay, ordered[index])
+
+    def _timed(self, func: Callable[[], T]) -> Callable[[], T]:
+        def run() -> T:
+            started = time.monotonic()
+            result = func()
+            with self._lock:
+                self._latencies.append(time.monotonic() - started)
+            return result
+
+        return run
+
+    def _reserve_hedge(self) -> bool:
+        with self._lock:
+            if self._hedges_sent + 1 > self.max_extra_ratio * self._calls:
+                self._hedges_skipped += 1
+                return False
+            self._hedges_sent += 1
+            return True
+
+    def call(self, func: Callable[[], T]) -> T:
+        """Run ``func`` (a blocking, idempotent request), hedging it when it is slow."""
+        timed = self._timed(func)
+        with self._lock:
+            self._calls += 1
+        delay = self.hedge_delay() if self.enabled else None
+        if delay is None:
+            return timed()
+
+        started = threading.Event()
+
+        def run_primary() -> T:
+            started.set()
+            return timed()
+
+        executor = _hedge_executor()
+        primary = executor.submit(run_primary)
+        # Time spent queued in the pool is not server latency, so the hedge
+        # delay only starts counting once the primary is actually running.
+        started.wait()
+        done, _ = wait([primary], timeout=delay)
+        if done or not self._reserve_hedge():
+            return primary.result()
+
+        backup = executor.submit(timed)
+        pending = {primary, backup}
+        first_error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                error = future.exception()
+                if error is None:
+                    if future is backup:
+                        with self._lock:
+                            self._hedges_won += 1
+                    return future.result()
+                first_error = first_error or error
+        assert first_error is not None
+        raise first_error
+
+    def snapshot(self) -> Dict[str, Any]:
+        delay = self.hedge_delay()
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "calls": self._calls,
+                "hedgesSent": self._hedges_sent,
+                "hedgesWon": self._hedges_won,
+                "hedgesSkipped": self._hedges_skipped,
+                "hedgeDelayMs": round(delay * 1000) if delay is not None else None,
+            }
+
+
+_REQUEST_HEDGERS: Dict[str, RequestHedger] = {}
+
+
+def get_request_hedger(endpoint: str) -> RequestHedger:
+    """Return the process-wide hedger for ``endpoint``.
+
+    ``CLOUD_HEDGE_<KEY>`` turns hedging on or off per endpoint and
+    ``CLOUD_HEDGE_MAX_RATIO`` caps backups as a fraction of calls (default 0.1).
+    """
+    with _HEDGE_LOCK:
+        hedger = _REQUEST_HEDGERS.get(endpoint)
+        if hedger is None:
+            env_key = endpoint.upper().replace("-", "_")
+            default = "1" if endpoint in HEDGED_ENDPOINT_DEFAULTS else "0"
+            hedger = RequestHedger(
+                endpoint,
+                enabled=os.getenv(f"CLOUD_HEDGE_{env_key}", default).strip().lower() in {"1", "true", "yes", "on"},
+                max_extra_ratio=env_float("CLOUD_HEDGE_MAX_RATIO", 0.1),
+            )
+            _REQUEST_HEDGERS[endpoint] = hedger
+        return hedger
+
+
+def hedged_call(endpoint: str, func: Callable[[], T]) -> T:
+    """Run a blocking idempotent read through ``endpoint``'s hedger."""
+    return get_request_hedger(endpoint).call(func)
+
+
+def hedge_snapshot() -> Dict[str, Any]:
+    with _HEDGE_LOCK:
+        hedgers = dict(_REQUEST_HEDGERS)
+    return {endpoint: hedger.snapshot() for endpoint, hedger in hedgers.items()}
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """How often and how long to retry one kind of call.
+
+    Delays follow "decorrelated jitter": each wait is drawn uniformly between
+    ``base_delay`` and three times the previous wait, capped at ``max_delay``, so
+    calls that failed together do not retry together.
+    """
+
+    name: str
+    max_attempts: int = 3
+    base_delay: float = 1.0
+    max_delay: float = 30.0
+    retry_on: FrozenSet[str] = RETRYABLE_ERROR_CLASSES
+
+    def next_delay(self, previous_delay: float) -> float:
+        upper = max(self.base_delay, previous_delay * 3)
+        return min(self.max_delay, random.uniform(self.base_delay, upper))
+
+
+class RetryBudget:
+    """Cap the retries of one job and count every attempt, retry and give-up.
+
+    Retries are allowed while they stay below ``minimum`` plus ``ratio`` times the
+    number of first attempts, so a platform outage cannot multiply a job's load.
+    """
+
+    def __init__(self, *, ratio: float = 0.2, minimum: int = 10) -> None:
+        self.ratio = max(0.0, float(ratio))
+        self.minimum = max(0, int(minimum))
+        self._lock = threading.Lock()
+        self._first_attempts = 0
+        self._retries = 0
+        self._errors: Dict[str, int] = {}
+        self._give_ups: Dict[str, int] = {}
+
+    def _limit_locked(self) -> int:
+        return self.minimum + int(self.ratio * self._first_attempts)
+
+    def record_attempt(self) -> None:
+        with self._lock:
+            self._first_attempts += 1
+
+    def record_error(self, error_class: str) -> None:
+        with self._lock:
+            self._errors[error_class] = self._errors.get(error_class, 0) + 1
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self._retries >= self._limit_locked():
+                return False
+            self._retries += 1
+            return True
+
+    def record_give_up(self, reason: str) -> None:
+        with self._lock:
+            self._give_ups[reason] = self._give_ups.get(reason, 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "attempts": self._first_attempts + self._retries,
+                "firstAttempts": self._first_attempts,
+                "retries": self._retries,
+                "retryLimit": self._limit_locked(),
+                "errors": dict(self._errors),
+                "giveUps": dict(self._give_ups),
+            }
+
+
+def classify_legacy_outcome(outcome: Any) -> Optional[str]:
+    """Classify a legacy ``(success, result, ...)`` tuple; ``None`` means success."""
+    if outcome and outcome[0]:
+        return None
+    return classify_result(outcome[1] if outcome else None)
+
+
+class _RetryRun:
+    """Book-keeping shared by the async and blocking retry loops."""
+
+    def __init__(
+        self,
+        policy: RetryPolicy,
+        budget: Optional[RetryBudget],
+        breaker: Optional[CircuitBreaker],
+        on_retry: Optional[Callable[[int, str, float, Any], None]],
+    ) -> None:
+        self.policy = policy
+        self.budget = budget
+        self.breaker = breaker
+        self.on_retry = on_retry
+        self.attempt = 0
+        self.delay = policy.base_delay
+        self.probe: Optional[bool] = None
+
+    def start(self) -> None:
+        """Begin an attempt; raises :class:`CircuitOpenError` when the breaker rejects it."""
+        self.attempt += 1
+        if self.budget is not None and self.attempt == 1:
+            self.budget.record_attempt()
+        self.probe = None
+        if self.breaker is not None:
+            self.probe = self.breaker.before_call()
+
+    def cancelled(self) -> None:
+        if self.breaker is not None and self.probe:
+            self.breaker.release_probe()
+
+    def finish(self, error_class: Optional[str], value: Any) -> Optional[float]:
+        """Record the attempt; return the delay before retrying, or ``None`` to stop."""
+        if self.breaker is not None and self.probe is not None:
+            self.breaker.record(error_class, probe=self.probe)
+        if error_class is None:
+            return None
+        if self.budget is not None:
+            self.budget.record_error(error_class)
+        reason = self._give_up_reason(error_class)
+        if reason is not None:
+            if self.budget is not None:
+                self.budget.record_give_up(reason)
+            return None
+        self.delay = self.policy.next_delay(self.delay)
+        if self.on_retry is not None:
+            self.on_retry(self.attempt, error_class, self.delay, value)
+        return self.delay
+
+    def _give_up_reason(self, error_class: str) -> Optional[str]:
+        if error_class == ERROR_CIRCUIT_OPEN:
+            return "circuitOpen"
+        if error_class not in self.policy.retry_on:
+            return "nonRetryable"
+        if self.attempt >= self.policy.max_attempts:
+            return "exhausted"
+        if self.budget is not None and not self.budget.try_spend():
+            return "budget"
+        return None
+
+
+async def call_with_retry_async(
+    call: Callable[[], Awaitable[T]],
+    *,
+    policy: RetryPolicy,
+    budget: Optional[RetryBudget] = None,
+    breaker: Optional[CircuitBreaker] = None,
+    classify_outcome: Optional[Callable[[T], Optional[str]]] = None,
+    on_retry: Optional[Callable[[int, str, float, Any], None]] = None,
+) -> T:
+    """Run ``call`` under ``policy``.
+
+    Exceptions are classified with :func:`classify_exception`; returned values are
+    classified with ``classify_outcome`` (``None`` meaning success). When retrying
+    stops, the last exception is re-raised or the last value is returned. With a
+    ``breaker``, attempts fail fast with :class:`CircuitOpenError` while it is open.
+    ``on_retry(attempt, error_class, delay, error_or_value)`` runs before each wait.
+    """
+    run = _RetryRun(policy, budget, breaker, on_retry)
+    while True:
+        error: Optional[BaseException] = None
+        outcome: Any = None
+        try:
+            run.start()
+            outcome = await call()
+        except asyncio.CancelledError:
+            run.cancelled()
+            raise
+        except Exception as exc:
+            error = exc
+            error_class: Optional[str] = classify_exception(exc)
+        else:
+            error_class = classify_outcome(outcome) if classify_outcome is not None else None
+        delay = run.finish(error_class, error if error is not None else outcome)
+        if delay is None:
+            if error is not None:
+                raise error
+            return outcome
+        await asyncio.sleep(delay)
+
+
+def call_with_retry(
+    call: Callable[[], T],
+    *,
+    policy: RetryPolicy,
+    budget: Optional[RetryBudget] = None,
+    breaker: Optional[CircuitBreaker] = None,
+    classify_outcome: Optional[Callable[[T], Optional[str]]] = None,
+    on_retry: Optional[Callable[[int, str, float, Any], None]] = None,
+) -> T:
+    """Blocking counterpart of :func:`call_with_retry_async` for worker threads."""
+    run = _RetryRun(policy, budget, breaker, on_retry)
+    while True:
+        error: Optional[BaseException] = None
+        outcome: Any = None
+        try:
+            run.start()
+            outcome = call()
+        except Exception as exc:
+            error = exc
+            error_class: Optional[str] = classify_exception(exc)
+        else:
+            error_class = classify_outcome(outcome) if classify_outcome is not None else None
+        delay = run.finish(error_class, error if error is not None else outcome)
+        if delay is None:
+            if error is not None:
+                raise error
+            return outcome
+        time.sleep(delay)
@@ -0,0 +1,210 @@
+"""
+Word 文档流式文本提取
+直接从 ZIP 中增量解析 word/document.xml，按文档顺序产出段落与表格行，
+不构建 python-docx 的完整对象模型；文本规则与 python-docx 的 paragraph.text / cell.text 一致。
+"""
+
+import posixpath
+import zipfile
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+from xml.etree import ElementTree
+
+W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+R_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+OFFICE_DOCUMENT_REL_TYPE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"
+STYLES_REL_TYPE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles"
+DEFAULT_DOCUMENT_PART = "word/document.xml"
+
+_P = W_NS + "p"
+_TBL = W_NS + "tbl"
+_TR = W_NS + "tr"
+_TC = W_NS + "tc"
+_BODY = W_NS + "body"
+_VAL = W_NS + "val"
+
+
+class DocxParagraph(NamedTuple):
+    """正文顶层段落；style_id 为段落样式 ID，未设置时为空字符串。"""
+    text: str
+    style_id: str
+
+
+class DocxTableRow(NamedTuple):
+    """正文顶层表格中的一行；table_index 从 1 开始，cells 与 python-docx row.cells 对齐（合并单元格会重复）。"""
+    table_index: int
+    cells: Tuple[str, ...]
+
+
+DocxBlock = Union[DocxParagraph, DocxTableRow]
+
+
+def _run_text(run: ElementTree.Element) -> str:
+    parts = []
+    for child in run:
+        tag = child.tag
+        if tag == W_NS + "t":
+            parts.append(child.text or "")
+        elif tag in (W_NS + "tab", W_NS + "ptab"):
+            parts.append("\t")
+        elif tag == W_NS + "br":
+            if child.get(W_NS + "type", "textWrapping") == "textWrapping":
+                parts.append("\n")
+        elif tag == W_NS + "cr":
+            parts.append("\n")
+        elif tag == W_NS + "noBreakHyphen":
+            parts.append("-")
+    return "".join(parts)
+
+
+def paragraph_text(paragraph: ElementTree.Element) -> str:
+    """与 python-docx 相同：只统计段落直接子级的 w:r 与 w:hyperlink。"""
+    parts = []
+    for child in paragraph:
+        if child.tag == W_NS + "r":
+            parts.append(_run_text(child))
+        elif child.tag == W_NS + "hyperlink":
+            parts.extend(_run_text(run) for run in child.findall(W_NS + "r"))
+    return "".join(parts)
+
+
+def _paragraph_style_id(paragraph: ElementTree.Element) -> str:
+    style = paragraph.find(f"{W_NS}pPr/{W_NS}pStyle")
+    return style.get(_VAL, "") if style is not None else ""
+
+
+def _int_property(parent: Optional[ElementTree.Element], path: str, default: int) -> int:
+    if parent is None:
+        return default
+    element = parent.find(path)
+    if element is None:
+        return default
+    try:
+        return int(element.get(_VAL, default))
+    except ValueError:
+        return default
+
+
+def _row_cells(
+    row: ElementTree.Element,
+    above: Dict[int, Tuple[str, int]],
+) -> Tuple[Tuple[str, ...], Dict[int, Tuple[str, int]]]:
+    """按 python-docx 的规则展开一行：横向合并重复 gridSpan 次，纵向合并沿用上一行同列内容。"""
+    offset = _int_property(row.find(W_NS + "trPr"), W_NS + "gridBefore", 0)
+    cells: List[str] = []
+    resolved: Dict[int, Tuple[str, int]] = {}
+    for cell in row.findall(_TC):
+        properties = cell.find(W_NS + "tcPr")
+        span = max(1, _int_property(properties, W_NS + "gridSpan", 1))
+        merge = properties.find(W_NS + "vMerge") if properties is not None else None
+        if merge is not None and merge.get(_VAL, "continue") == "continue":
+            text, repeat = above.get(offset, ("", span))
+        else:
+            text = "\n".join(paragraph_text(paragraph) for paragraph in cell.findall(_P))
+            repeat = span
+        resolved[offset] = (text, repeat)
+        cells.extend([text] * repeat)
+        offset += span
+    return tuple(cells), resolved
+
+
+def _relationship_target(archive: zipfile.ZipFile, rels_path: str, rel_type: str, base_dir: str) -> Optional[str]:
+    try:
+        root = ElementTree.fromstring(archive.read(rels_path))
+    except (KeyError, ElementTree.ParseError):
+        return None
+    for rel in root.iter(R_NS + "Relationship"):
+        if rel.get("Type") == rel_type and rel.get("TargetMode") != "External":
+            target = rel.get("Target", "")
+            if target.startswith("/"):
+                return target.lstrip("/")
+            return posixpath.normpath(posixpath.join(base_dir, target))
+    return None
+
+
+def main_document_part(archive: zipfile.ZipFile, default: str = DEFAULT_DOCUMENT_PART) -> str:
+    """按 _rels/.rels 找到主文档部件（Word 为 document.xml，PPT 为 presentation.xml），缺失时回退到 default。"""
+    return _relationship_target(archive, "_rels/.rels", OFFICE_DOCUMENT_REL_TYPE, "") or default
+
+
+def iter_docx_blocks(source: Union[str, Path, zipfile.ZipFile]) -> Iterator[DocxBlock]:
+    """按文档顺序逐个产出正文顶层段落和表格行。
+
+    与 doc.paragraphs / doc.tables 的范围一致：内容控件、修订标记等包裹层中的段落不计入。
+    每处理完一个顶层段落或表格行即释放对应的 XML 节点，内存占用与文档总长度无关。
+    """
+    if isinstance(source, zipfile.ZipFile):
+        yield from _iter_archive_blocks(source)
+        return
+    with zipfile.ZipFile(source) as archive:
+        yield from _iter_archive_blocks(archive)
+
+
+def _iter_archive_blocks(archive: zipfile.ZipFile) -> Iterator[DocxBlock]:
+    part = main_document_part(archive)
+    try:
+        stream = archive.open(part)
+    except KeyError as exc:
+        raise ValueError(f"Word 文档缺少主文档部件 {part}") from exc
+
+    with stream:
+        stack: List[ElementTree.Element] = []
+        table_index = 0
+        above: Dict[int, Tuple[str, int]] = {}
+        for event, element in ElementTree.iterparse(stream, events=("start", "end")):
+            if event == "start":
+                if element.tag == _TBL and len(stack) == 2 and stack[-1].tag == _BODY:
+                    table_index += 1
+                    above = {}
+                stack.append(element)
+                continue
+            stack.pop()
+            depth = len(stack)
+            parent = stack[-1] if stack else None
+            if parent is None:
+                continue
+            if depth == 2 and parent.tag == _BODY:
+                if element.tag == _P:
+                    yield DocxParagraph(paragraph_text(element), _paragraph_style_id(element))
+                parent.remove(element)
+            elif depth == 3 and element.tag == _TR and parent.tag == _TBL and stack[1].tag == _BODY:
+                cells, above = _row_cells(element, above)
+                parent.remove(element)
+                yield DocxTableRow(table_index, cells)
+
+
+def docx_paragraph_texts(source: Union[str, Path, zipfile.ZipFile]) -> List[str]:
+    """返回正文顶层段落去除首尾空白后的非空文本，等价于 python-docx 的 doc.paragraphs。"""
+    return [
+        block.text.strip()
+        for block in iter_docx_blocks(source)
+        if isinstance(block, DocxParagraph) and block.text.strip()
+    ]
+
+
+def paragraph_style_names(archive: zipfile.ZipFile) -> Tuple[Dict[str, str], str]:
+    """读取段落样式 ID → 显示名称映射以及默认段落样式名称，名称规则与 python-docx 的 style.name 一致。"""
+    document_part = main_document_part(archive)
+    base_dir = posixpath.dirname(document_part)
+    rels_path = posixpath.join(base_dir, "_rels", posixpath.basename(document_part) + ".rels")
+    styles_part = _relationship_target(archive, rels_path, STYLES_REL_TYPE, base_dir)
+    names: Dict[str, str] = {}
+    default_name = ""
+    if not styles_part:
+        return names, default_name
+    try:
+        root = ElementTree.fromstring(archive.read(styles_part))
+    except (KeyError, ElementTree.ParseError):
+        return names, default_name
+    for style in root.iter(W_NS + "style"):
+        if style.get(W_NS + "type") != "paragraph":
+            continue
+        name_element = style.find(W_NS + "name")
+        name = name_element.get(_VAL, "") if name_element is not None else ""
+        # python-docx 把内置的小写标题样式名转换为界面名称，例如 heading 1 → Heading 1
+        if len(name) == 9 and name.startswith("heading ") and name[8] in "123456789":
+            name = "Heading " + name[8]
+        names.setdefault(style.get(W_NS + "styleId", ""), name)
+        if style.get(W_NS + "default") in ("1", "true", "on"):
+            default_name = name
+    return names, default_name
@@ -0,0 +1,146 @@
+"""
+模板化 DOCX 快速写出
+样式、页面设置与文档属性只用 python-docx 渲染一次，得到模板包；
+之后每份文档直接拼接段落 XML 写入 word/document.xml，其余部件原样复制，
+不再为每份文档加载默认模板、逐段构建对象模型。
+"""
+
+import io
+import re
+import zipfile
+from pathlib import Path
+from typing import Any, BinaryIO, Iterable, List, Optional, Tuple, Union
+from xml.sax.saxutils import escape
+
+DOCUMENT_PART = "word/document.xml"
+CORE_PROPERTIES_PART = "docProps/core.xml"
+TITLE_PLACEHOLDER = "__docx_writer_title__"
+_BODY_MARKER = "__docx_writer_body__"
+
+# XML 1.0 不允许的控制字符；python-docx 遇到时直接报错，这里改为剔除
+_INVALID_XML_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+# 与 python-docx 设置 run.text 的规则一致：制表符写为 w:tab，换行写为 w:br
+_RUN_BREAKS = re.compile(r"(\t|\r\n|\n|\r)")
+
+
+def run_properties(
+    *,
+    fonts: Optional[Tuple[str, str]] = None,
+    bold: bool = False,
+    color: Optional[str] = None,
+    size: Optional[int] = None,
+) -> str:
+    """生成 w:rPr 片段（子元素按 schema 顺序）；fonts 为 (西文字体, 东亚字体)，size 单位为磅。"""
+    children = []
+    if fonts:
+        latin, east_asia = (escape(name, {'"': "&quot;"}) for name in fonts)
+        children.append(
+            f'<w:rFonts w:ascii="{latin}" w:hAnsi="{latin}" w:eastAsia="{east_asia}" w:cs="{east_asia}" w:hint="eastAsia"/>'
+        )
+    if bold:
+        children.append("<w:b/>")
+    if color:
+        children.append(f'<w:color w:val="{color}"/>')
+    if size:
+        children.append(f'<w:sz w:val="{size * 2}"/>')
+    return f"<w:rPr>{''.join(children)}</w:rPr>" if children else ""
+
+
+def paragraph_properties(
+    *,
+    style_id: Optional[str] = None,
+    space_before: Optional[int] = None,
+    space_after: Optional[int] = None,
+    line_spacing: Optional[float] = None,
+    align: Optional[str] = None,
+) -> str:
+    """生成 w:pPr 片段（子元素按 schema 顺序）；段前段后单位为磅，line_spacing 为倍数行距。"""
+    children = []
+    if style_id:
+        children.append(f'<w:pStyle w:val="{style_id}"/>')
+    spacing = []
+    if space_before is not None:
+        spacing.append(f'w:before="{space_before * 20}"')
+    if space_after is not None:
+        spacing.append(f'w:after="{space_after * 20}"')
+    if line_spacing is not None:
+        spacing.append(f'w:line="{round(line_spacing * 240)}" w:lineRule="auto"')
+    if spacing:
+        children.append(f"<w:spacing {' '.join(spacing)}/>")
+    if align:
+        children.append(f'<w:jc w:val="{align}"/>')
+    return f"<w:pPr>{''.join(children)}</w:pPr>" if children else ""
+
+
+def _run_content(text: str) -> str:
+    parts = []
+    for piece in _RUN_BREAKS.split(text):
+        if not piece:
+            continue
+        if piece == "\t":
+            parts.append("<w:tab/>")
+        elif piece in ("\r\n", "\n", "\r"):
+            parts.append("<w:br/>")
+        elif len(piece.strip()) < len(piece):
+            parts.append(f'<w:t xml:space="preserve">{escape(piece)}</w:t>')
+        else:
+            parts.append(f"<w:t>{escape(piece)}</w:t>")
+    return "".join(parts)
+
+
+def paragraph_xml(text: str, *, ppr: str = "", rpr: str = "") -> str:
+    """单个段落（至多一个文本 run）的 XML；ppr / rpr 为预先生成的属性片段。"""
+    text = _INVALID_XML_CHARS.sub("", text)
+    run = f"<w:r>{rpr}{_run_content(text)}</w:r>" if text or rpr else ""
+    return f"<w:p>{ppr}{run}</w:p>"
+
+
+class DocxTemplate:
+    """已渲染好的 DOCX 模板包。
+
+    from_document 在模板文档中插入一个标记段落并保存一次，把 document.xml 切成
+    “正文前 / 正文后（含 sectPr）”两段；写出时只在两段之间填入新的段落 XML。
+    模板的 core.xml 标题若为 TITLE_PLACEHOLDER，写出时替换为每份文档的标题。
+    """
+
+    def __init__(self, parts: List[Tuple[str, bytes]], body_prefix: bytes, body_suffix: bytes) -> None:
+        self.parts = parts
+        self.body_prefix = body_prefix
+        self.body_suffix = body_suffix
+
+    @classmethod
+    def from_document(cls, document: Any) -> "DocxTemplate":
+        document.add_paragraph(_BODY_MARKER)
+        buffer = io.BytesIO()
+        document.save(buffer)
+        with zipfile.ZipFile(buffer) as archive:
+            parts = [(item.filename, archive.read(item.filename)) for item in archive.infolist()]
+        document_xml = dict(parts)[DOCUMENT_PART]
+        marker = document_xml.index(_BODY_MARKER.encode("utf-8"))
+        start = document_xml.rindex(b"<w:p>", 0, marker)
+        end = document_xml.index(b"</w:p>", marker) + len(b"</w:p>")
+        return cls(parts, document_xml[:start], document_xml[end:])
+
+    def write(
+        self,
+        paragraphs: Iterable[str],
+        output: Union[str, Path, BinaryIO],
+        *,
+        title: Optional[str] = None,
+    ) -> None:
+        """把 paragraph_xml 生成的段落依次写入正文，其余部件按模板原样写出。"""
+        with zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as archive:
+            for name, data in self.parts:
+                if name == DOCUMENT_PART:
+                    with archive.open(name, "w") as stream:
+                        stream.write(self.body_prefix)
+                        for paragraph in paragraphs:
+                            stream.write(paragraph.encode("utf-8"))
+                        stream.write(self.body_suffix)
+                    continue
+                if name == CORE_PROPERTIES_PART and title is not None:
+                    data = data.replace(
+                        TITLE_PLACEHOLDER.encode("utf-8"),
+                        escape(_INVALID_XML_CHARS.sub("", title)).encode("utf-8"),
+                    )
+                archive.writestr(name, data)
@@ -0,0 +1,191 @@
+"""
+作业文件预览
+将 Word 正文渲染为 HTML 片段、从 PPTX 清单统计幻灯片数，
+并按“路径 + mtime + 大小 → 内容哈希 → 预览片段”两级缓存，分页返回。
+"""
+
+import html
+import threading
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from xml.etree import ElementTree
+
+try:
+    from .docx_text import DocxParagraph, iter_docx_blocks, main_document_part, paragraph_style_names
+    from .skill_package_registry import package_digest
+except ImportError:
+    from docx_text import DocxParagraph, iter_docx_blocks, main_document_part, paragraph_style_names
+    from skill_package_registry import package_digest
+
+P_NS = "{http://schemas.openxmlformats.org/presentationml/2006/main}"
+DEFAULT_PRESENTATION_PART = "ppt/presentation.xml"
+PREVIEW_PAGE_SIZE = 200
+PREVIEW_MAX_PAGE_SIZE = 1000
+EMPTY_DOCUMENT_HTML = "<p>文档内容为空</p>"
+
+PreviewRenderer = Callable[[Path], List[str]]
+
+
+def render_docx_preview_blocks(file_path: Path) -> List[str]:
+    """按文档顺序返回正文段落的 HTML 片段：标题样式渲染为 h3，其余为 p。"""
+    with zipfile.ZipFile(file_path) as archive:
+        style_names, default_style = paragraph_style_names(archive)
+        blocks = []
+        for block in iter_docx_blocks(archive):
+            if not isinstance(block, DocxParagraph):
+                continue
+            text = block.text.strip()
+            if text:
+                style_name = style_names.get(block.style_id, default_style) if block.style_id else default_style
+                tag = "h3" if "Heading" in style_name else "p"
+                blocks.append(f"<{tag}>{html.escape(text, quote=False)}</{tag}>")
+    return blocks or [EMPTY_DOCUMENT_HTML]
+
+
+def count_pptx_slides(file_path: Path) -> int:
+    """从演示文稿部件的 sldIdLst 统计幻灯片数，与 len(Presentation(...).slides) 一致，无需加载全部幻灯片。"""
+    with zipfile.ZipFile(file_path) as archive:
+        part = main_document_part(archive, DEFAULT_PRESENTATION_PART)
+        try:
+            root = ElementTree.fromstring(archive.read(part))
+        except KeyError as exc:
+            raise ValueError(f"PPT 文档缺少演示文稿部件 {part}") from exc
+    slide_list = root.find(f"{P_NS}sldIdLst")
+    return 0 if slide_list is None else len(slide_list.findall(f"{P_NS}sldId"))
+
+
+def render_pptx_preview_blocks(file_path: Path) -> List[str]:
+    """只返回与文件名无关的片段，文件名标题由 load_preview_page 在读取时补上。"""
+    try:
+        slide_count = count_pptx_slides(file_path)
+    except Exception as exc:
+        return [f"<p style='color:red'>预览失败: {html.escape(str(exc))}</p>"]
+    return [
+        f"<p>共 {slide_count} 页幻灯片</p>",
+        "<p style='color:#b45309;font-size:0.85em'>PPT 类型作业跳过 LLM 校验</p>",
+    ]
+
+
+def preview_header_blocks(file_path: Path) -> List[str]:
+    """按文件名生成的标题片段；缓存以内容哈希为键，因此文件名不能进入缓存。"""
+    if file_path.suffix.lower() in (".ppt", ".pptx"):
+        return [f"<p>📊 PPT 文件: {html.escape(file_path.name)}</p>"]
+    return []
+
+
+def preview_renderer(file_path: Path) -> Optional[PreviewRenderer]:
+    """返回该格式的预览渲染函数；不在缓存范围内的格式返回 None。"""
+    suffix = file_path.suffix.lower()
+    if suffix in (".ppt", ".pptx"):
+        return render_pptx_preview_blocks
+    if suffix in (".docx", ".doc"):
+        return render_docx_preview_blocks
+    return None
+
+
+def paginate_preview(blocks: List[str], page: int = 1, page_size: int = PREVIEW_PAGE_SIZE) -> Dict[str, Any]:
+    """按片段数分页；页码越界时取最近的有效页。"""
+    page_size = min(PREVIEW_MAX_PAGE_SIZE, max(1, page_size))
+    page_count = max(1, -(-len(blocks) // page_size))
+    page = min(page_count, max(1, page))
+    start = (page - 1) * page_size
+    return {
+        "html": "\n".join(blocks[start:start + page_size]),
+        "page": page,
+        "pageSize": page_size,
+        "pageCount": page_count,
+        "blockCount": len(blocks),
+    }
+
+
+class PreviewCache:
+    """预览片段缓存。
+
+    第一级以“路径 + mtime + 大小”记住文件的内容哈希，未修改的文件不必重新计算哈希；
+    第二级以内容哈希保存渲染结果，同一份文件出现在不同任务目录下时也只渲染一次。
+    同一内容的并发请求（如后台预渲染与用户点击预览）共享同一次渲染。
+    """
+
+    def __init__(self, max_entries: int = 64) -> None:
+        self.max_entries = max(1, int(max_entries))
+        self._digests: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+        self._entries: "OrderedDict[Tuple[str, str], List[str]]" = OrderedDict()
+        self._pending: Dict[Tuple[str, str], Future] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _digest(self, file_path: Path) -> str:
+        stat = file_path.stat()
+        stat_key = (str(file_path), stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            digest = self._digests.get(stat_key)
+            if digest is not None:
+                self._digests.move_to_end(stat_key)
+                return digest
+        digest = package_digest(str(file_path))
+        with self._lock:
+            self._digests[stat_key] = digest
+            while len(self._digests) > self.max_entries * 4:
+                self._digests.popitem(last=False)
+        return digest
+
+    def blocks(self, file_path: Path, render: PreviewRenderer) -> List[str]:
+        key = (self._digest(file_path), getattr(render, "__name__", repr(render)))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+            pending = self._pending.get(key)
+            owner = pending is None
+            if owner:
+                pending = self._pending[key] = Future()
+        if not owner:
+            return pending.result()
+
+        try:
+            entry = render(file_path)
+        except BaseException as exc:
+            pending.set_exception(exc)
+            raise
+        else:
+            pending.set_result(entry)
+            with self._lock:
+                self._entries[key] = entry
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            return entry
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+
+def load_preview_page(
+    file_path: Path,
+    cache: PreviewCache,
+    page: int = 1,
+    page_size: int = PREVIEW_PAGE_SIZE,
+) -> Dict[str, Any]:
+    """读取（或渲染并缓存）文件的预览片段，返回指定页。"""
+    render = preview_renderer(file_path)
+    if render is None:
+        raise ValueError(f"不支持预览 {file_path.suffix or '未知'} 格式")
+    blocks = preview_header_blocks(file_path) + cache.blocks(file_path, render)
+    return paginate_preview(blocks, page, page_size)
+
+
+def prerender_preview(file_path: Path, cache: PreviewCache) -> bool:
+    """后台预渲染：文件上传或生成完成后提前填充缓存；失败只返回 False，留给正式请求报告错误。"""
+    render = preview_renderer(file_path)
+    if render is None:
+        return False
+    try:
+        cache.blocks(file_path, render)
+    except Exception:
+        return False
+    return True
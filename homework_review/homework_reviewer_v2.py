@@ -4,15 +4,38 @@ import json.decoder
 import os
 import tempfile
 import time
-import uuid
 from collections import defaultdict
 from datetime import datetime
+from functools import partial
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 import requests
 from dotenv import load_dotenv
 
+from cloud_request_control import (
+    ERROR_CIRCUIT_OPEN,
+    ERROR_TIMEOUT,
+    ERROR_UNKNOWN,
+    RETRYABLE_ERROR_CLASSES,
+    AdaptiveConcurrencyLimiter,
+    CircuitOpenError,
+    RetryBudget,
+    RetryPolicy,
+    add_circuit_breaker_listener,
+    call_with_retry_async,
+    circuit_breaker_snapshot,
+    classify_exception,
+    classify_legacy_outcome,
+    env_float,
+    get_circuit_breaker,
+    hedge_snapshot,
+    hedged_call,
+    throttle_cloud_endpoint,
+)
+from attempt_scheduling import AdaptiveAttemptController, BreadthFirstScheduler, parse_file_priorities
+from resource_upload import ResourceUploadError, upload_resource_file
+
 # 本地解析模块（跳过云端 API）
 try:
     from local_parser import parse_word_to_text_input
@@ -22,7 +45,7 @@ except ImportError:
 
 # LLM 答案校验模块
 try:
-    from llm_answer_corrector import async_correct_answers_with_llm
+    from llm_answer_corrector import async_correct_answers_in_batches
     LLM_CORRECTOR_AVAILABLE = True
 except ImportError:
     LLM_CORRECTOR_AVAILABLE = False
@@ -192,85 +215,68 @@ def upload_file(file_path):
     """
     上传文件到服务器
 
+    超过 RESOURCE_UPLOAD_CHUNK_THRESHOLD_BYTES 的大文件会拆成多个分片，
+    在同一个 identifyCode 下并发上传，失败的分片单独重试。
+
     Args:
         file_path: 本地文件路径
 
     Returns:
         dict: 包含 fileName 和 fileUrl 的字典，如果上传失败返回 None
     """
-    url = "https://cloudapi.polymas.com/basic-resource/file/upload"
-
-    # 生成唯一标识码
-    identify_code = str(uuid.uuid4())
-
     try:
-        # 打开文件
-        with open(file_path, 'rb') as f:
-            # 获取文件名和大小
-            file_name = os.path.basename(file_path)
-            file_size = os.path.getsize(file_path)
-
-            # 根据文件扩展名判断 MIME 类型
-            file_ext = os.path.splitext(file_name)[1].lower()
-            mime_types = {
-                '.png': 'image/png',
-                '.jpg': 'image/jpeg',
-                '.jpeg': 'image/jpeg',
-                '.gif': 'image/gif',
-                '.pdf': 'application/pdf',
-                '.doc': 'application/msword',
-                '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-            }
-            mime_type = mime_types.get(file_ext, 'application/octet-stream')
-
-            # 准备表单数据
-            files = {
-                'file': (file_name, f, mime_type)
-            }
-
-            data = {
-                'identifyCode': identify_code,
-                'name': file_name,
-                'chunk': '0',
-                'chunks': '1',
-                'size': str(file_size)
-            }
+        file_name = os.path.basename(file_path)
+
+        # 根据文件扩展名判断 MIME 类型
+        file_ext = os.path.splitext(file_name)[1].lower()
+        mime_types = {
+            '.png': 'image/png',
+            '.jpg': 'image/jpeg',
+            '.jpeg': 'image/jpeg',
+            '.gif': 'image/gif',
+            '.pdf': 'application/pdf',
+            '.doc': 'application/msword',
+            '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+        }
+        mime_type = mime_types.get(file_ext, 'application/octet-stream')
 
-            # 从环境变量中读取配置
-            authorization = os.getenv('AUTHORIZATION')
-            cookie = os.getenv('COOKIE')
+        # 从环境变量中读取配置
+        authorization = os.getenv('AUTHORIZATION')
+        cookie = os.getenv('COOKIE')
 
-            if not authorization:
-                raise ValueError("未找到AUTHORIZATION环境变量，请在.env文件中配置AUTHORIZATION")
-            if not cookie:
-                raise ValueError("未找到COOKIE环境变量，请在.env文件中配置COOKIE")
+        if not authorization:
+            raise ValueError("未找到AUTHORIZATION环境变量，请在.env文件中配置AUTHORIZATION")
+        if not cookie:
+            raise ValueError("未找到COOKIE环境变量，请在.env文件中配置COOKIE")
 
-            headers = {
-                'Authorization': authorization,
-                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/142.0.0.0 Safari/537.36',
-                'Cookie': cookie
-            }
-
-            # 发送请求
-            print(f"⏳ 正在上传文件: {file_name}")
-            response = requests.post(url, headers=headers, data=data, files=files)
-            result = response.json()
+        headers = {
+            'Authorization': authorization,
+            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/142.0.0.0 Safari/537.36',
+            'Cookie': cookie
+        }
 
-            if result.get('success'):
-                data = result.get('data', {})
-                file_url = data.get('ossUrl')
-                print(f"✅ 文件上传成功: {file_name}")
-                return {
-                    'fileName': file_name,
-                    'fileUrl': file_url
-                }
-            else:
-                print(f"❌ 文件上传失败: {file_name}, 错误信息: {result.get('msg')}")
-                return None
+        # 发送请求
+        print(f"⏳ 正在上传文件: {file_name}")
+        result = upload_resource_file(
+            file_path,
+            headers=headers,
+            file_name=file_name,
+            mime_type=mime_type,
+        )
+        data = result.get('data') or {}
+        file_url = data.get('ossUrl')
+        print(f"✅ 文件上传成功: {file_name}")
+        return {
+            'fileName': file_name,
+            'fileUrl': file_url
+        }
 
     except FileNotFoundError:
         print(f"❌ 文件不存在: {file_path}")
         return None
+    except ResourceUploadError as e:
+        print(f"❌ 文件上传失败: {os.path.basename(file_path)}, 错误信息: {str(e)}")
+        return None
     except Exception as e:
         print(f"❌ 上传文件时发生错误: {file_path}, 错误: {str(e)}")
         return None
@@ -308,12 +314,15 @@ def fetch_task_result(task_id: str, context: dict):
         }
     }
 
+    body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+
+    def send():
+        throttle_cloud_endpoint("get-task")
+        return requests.post(url, headers=headers, data=body, timeout=60)
+
     try:
-        response = requests.post(
-            url,
-            headers=headers,
-            data=json.dumps(payload, ensure_ascii=False).encode('utf-8')
-        )
+        # 查询任务是幂等读操作：慢于近期 p95 时补发一次，取先返回的结果
+        response = hedged_call("get-task", send)
         try:
             result = response.json()
         except json.decoder.JSONDecodeError:
@@ -325,7 +334,7 @@ def fetch_task_result(task_id: str, context: dict):
         return is_success_response(result), result
 
     except Exception as e:
-        return False, {"error": str(e)}
+        return False, {"error": str(e), "errorClass": classify_exception(e)}
 
 
 def poll_task_until_complete(task_id: str, context: dict, interval_seconds: int = 2, timeout_seconds: int = 300):
@@ -353,6 +362,7 @@ def poll_task_until_complete(task_id: str, context: dict, interval_seconds: int
         if time.monotonic() - start_time >= timeout_seconds:
             return False, {
                 "error": "任务超时",
+                "errorClass": ERROR_TIMEOUT,
                 "taskId": task_id,
                 "last_response": last_result
             }
@@ -410,8 +420,8 @@ def _normalize_content_items(items) -> list:
     return normalized
 
 
-def homework_file_analysis(file_info: dict, context: dict):
-    """调用 homeworkFileAnalysis 接口解析作业文件"""
+def homework_file_analysis(file_info: dict, context: dict, throttle: bool = True):
+    """调用 homeworkFileAnalysis 接口解析作业文件；throttle=False 表示调用方已取得限速令牌"""
     url = "https://cloudapi.polymas.com/agents/v1/file/homeworkFileAnalysis"
 
     authorization = os.getenv('AUTHORIZATION')
@@ -439,6 +449,8 @@ def homework_file_analysis(file_info: dict, context: dict):
     }
 
     try:
+        if throttle:
+            throttle_cloud_endpoint("homework-file-analysis")
         response = requests.post(
             url,
             headers=headers,
@@ -463,11 +475,11 @@ def homework_file_analysis(file_info: dict, context: dict):
         return True, result, text_input
 
     except Exception as e:
-        return False, {"error": str(e)}, None
+        return False, {"error": str(e), "errorClass": classify_exception(e)}, None
 
 
-def execute_agent_text(text_input: str, context: dict):
-    """调用 agent API 执行作业批改（TEXT_INPUT）"""
+def execute_agent_text(text_input: str, context: dict, throttle: bool = True):
+    """调用 agent API 执行作业批改（TEXT_INPUT）；throttle=False 表示调用方已取得限速令牌"""
     url = "https://cloudapi.polymas.com/agents/v1/execute/agent"
 
     authorization = os.getenv('AUTHORIZATION')
@@ -520,6 +532,8 @@ def execute_agent_text(text_input: str, context: dict):
     }
 
     try:
+        if throttle:
+            throttle_cloud_endpoint("execute-agent")
         response = requests.post(
             url,
             headers=headers,
@@ -537,11 +551,16 @@ def execute_agent_text(text_input: str, context: dict):
         return is_success_response(result), result
 
     except Exception as e:
-        return False, {"error": str(e)}
+        return False, {"error": str(e), "errorClass": classify_exception(e)}
 
 
 def execute_agent_text_with_poll(text_input: str, context: dict, interval_seconds: int = 2, timeout_seconds: int = 300):
     success, result = execute_agent_text(text_input, context)
+    return poll_agent_result(success, result, context, interval_seconds, timeout_seconds)
+
+
+def poll_agent_result(success: bool, result, context: dict, interval_seconds: int = 2, timeout_seconds: int = 300):
+    """execute_agent_text 返回异步任务时轮询到任务结束，否则原样返回"""
     if not success:
         return False, result
 
@@ -849,7 +868,14 @@ def generate_excel_summary(summary_items, file_paths, attempts: int, output_root
     order_by_label = {}
     category_order_by_label = {}  # 分类题型顺序
 
+    skipped_by_label = defaultdict(set)  # 自适应模式下因总分收敛而跳过的测评
+
     for item in summary_items:
+        if item and item.get("skipped"):
+            file_path = item.get("file_path", "")
+            label = label_by_path.get(file_path, Path(file_path).stem if file_path else "未命名")
+            skipped_by_label[label].add(item.get("attempt_index", 0))
+            continue
         if not item or not item.get("success"):
             continue
         core_data = extract_core_data(item.get("result", {}))
@@ -943,6 +969,8 @@ def generate_excel_summary(summary_items, file_paths, attempts: int, output_root
         ws.cell(row=row_idx, column=2).value = total_label
         total_scores = entry.get("total_scores", [])
         for idx, score in enumerate(total_scores, start=3):
+            if score is None and idx - 2 in skipped_by_label.get(label, ()):
+                score = "跳过"
             ws.cell(row=row_idx, column=idx).value = score
         # 添加均值和方差
         valid_scores = [s for s in total_scores if s is not None]
@@ -1004,63 +1032,112 @@ def generate_excel_summary(summary_items, file_paths, attempts: int, output_root
     return output_path
 
 
-async def async_upload_file(file_path: str, semaphore: asyncio.Semaphore):
-    async with semaphore:
-        return await asyncio.to_thread(upload_file, file_path)
+# 批改接口：仅对网络/超时/限流/服务端错误重试，最多 5 次尝试
+EVALUATE_RETRY_POLICY = RetryPolicy("execute-agent", max_attempts=5, base_delay=3.0, max_delay=30.0)
+# 云端解析偶发返回空结果（未分类错误），保留原有的重试行为
+PARSE_RETRY_POLICY = RetryPolicy(
+    "homework-file-analysis",
+    max_attempts=3,
+    base_delay=2.0,
+    max_delay=10.0,
+    retry_on=RETRYABLE_ERROR_CLASSES | {ERROR_UNKNOWN},
+)
+
+
+def log_circuit_change(endpoint: str, previous: str, state: str):
+    """打印熔断器状态变化"""
+    labels = {"closed": "恢复正常", "open": "已熔断，快速失败", "half_open": "半开，放行探测请求"}
+    icon = "🟢" if state == "closed" else ("🔴" if state == "open" else "🟡")
+    print(f"{icon} 熔断器「{endpoint}」: {previous} -> {state}（{labels.get(state, state)}）")
+
+
+add_circuit_breaker_listener(log_circuit_change)
+
+
+def log_concurrency_change(previous: int, current: int, reason: str):
+    """打印云端自适应并发窗口的变化"""
+    if current < previous:
+        print(f"📉 云端并发窗口 {previous} -> {current}（检测到限流/服务端错误/超时）")
+    else:
+        print(f"📈 云端并发窗口 {previous} -> {current}（延迟与成功率正常）")
+
+
+def create_cloud_limiter(max_concurrency: int) -> AdaptiveConcurrencyLimiter:
+    """
+    创建云端调用共享的 AIMD 并发窗口
+
+    初始窗口为 max_concurrency，上限默认相同，可通过 CLOUD_CONCURRENCY_CEILING 放宽。
+    """
+    ceiling = int(env_float("CLOUD_CONCURRENCY_CEILING", max_concurrency))
+    return AdaptiveConcurrencyLimiter(
+        max_concurrency,
+        maximum=max(max_concurrency, ceiling),
+        on_change=log_concurrency_change,
+    )
+
+
+def classify_parse_outcome(outcome) -> Optional[str]:
+    """解析成功但没有 textInput 也视为失败"""
+    success, result, text_input = outcome
+    if success and text_input:
+        return None
+    return classify_legacy_outcome((False, result))
+
 
+async def async_upload_file(file_path: str, limiter: AdaptiveConcurrencyLimiter):
+    async with limiter.slot() as permit:
+        result = await asyncio.to_thread(upload_file, file_path)
+        if not result:
+            permit.mark_failure()
+        return result
 
-async def async_homework_analysis(file_info: dict, context: dict, semaphore: asyncio.Semaphore):
-    async with semaphore:
-        return await asyncio.to_thread(homework_file_analysis, file_info, context)
 
+async def async_homework_analysis(file_info: dict, context: dict, limiter: AdaptiveConcurrencyLimiter):
+    # 先在窗口外等限速令牌：排队等待不是服务端延迟，不应占用并发名额或被计为慢响应
+    await asyncio.to_thread(throttle_cloud_endpoint, "homework-file-analysis")
+    async with limiter.slot() as permit:
+        success, result, text_input = await asyncio.to_thread(homework_file_analysis, file_info, context, False)
+        permit.observe(success, result)
+        return success, result, text_input
 
-async def async_execute_agent_text(text_input: str, context: dict, semaphore: asyncio.Semaphore):
-    async with semaphore:
-        return await asyncio.to_thread(execute_agent_text_with_poll, text_input, context)
 
+async def async_execute_agent_text(text_input: str, context: dict, limiter: AdaptiveConcurrencyLimiter):
+    await asyncio.to_thread(throttle_cloud_endpoint, "execute-agent")
+    async with limiter.slot() as permit:
+        success, result = await asyncio.to_thread(execute_agent_text, text_input, context, False)
+        permit.observe(success, result)
+    # 窗口只计提交请求的耗时；轮询时长取决于批改本身，在窗口外进行
+    return await asyncio.to_thread(poll_agent_result, success, result, context)
 
-async def evaluate_and_save(file_path: Path, file_info: dict, text_input: str, context: dict, output_dir: Path, attempt_index: int, attempt_total: int, output_format: str, semaphore: asyncio.Semaphore):
+
+async def evaluate_and_save(file_path: Path, file_info: dict, text_input: str, context: dict, output_dir: Path, attempt_index: int, attempt_total: int, output_format: str, limiter: AdaptiveConcurrencyLimiter, retry_budget: RetryBudget):
     print(f"⏳ 批改中: {file_info['fileName']} ({attempt_index}/{attempt_total})")
-    
-    # 批改重试机制（增强版 - 5次重试 + 指数退避）
-    max_retries = 5
-    base_delay = 3  # 基础延迟秒数
-    success = False
-    result = None
-    
-    for retry in range(max_retries):
-        success, result = await async_execute_agent_text(text_input, context, semaphore)
-        
-        if success:
-            break
-        
-        # 检查是否为可重试的错误
-        error_msg = str(result.get("error", "")) if isinstance(result, dict) else str(result)
-        error_msg_lower = error_msg.lower()
-        is_retryable = any(keyword in error_msg for keyword in [
-            "SSLError", "ConnectionError", "TimeoutError", "Max retries exceeded",
-            "EOF occurred", "Connection reset", "Connection refused",
-            "BadStatusLine", "RemoteDisconnected", "BrokenPipeError",
-            "ChunkedEncodingError", "IncompleteRead",
-        ]) or any(keyword in error_msg_lower for keyword in [
-            "rate limit", "too many requests", "429",
-            "500", "502", "503", "504",
-            "internal server error", "bad gateway", "service unavailable", "gateway timeout",
-            "network", "timeout", "connection", "reset", "broken pipe",
-        ])
-        
-        if is_retryable and retry < max_retries - 1:
-            # 指数退避：3s, 6s, 12s, 24s
-            delay = base_delay * (2 ** retry)
-            print(f"🔄 批改重试 ({retry + 1}/{max_retries - 1}): {file_info['fileName']} ({attempt_index}/{attempt_total}) - 等待{delay}s")
-            print(f"   原因: {error_msg[:200]}")
-            await asyncio.sleep(delay)
-        else:
-            if retry > 0:
-                print(f"❌ 重试{retry}次后仍失败: {file_info['fileName']} ({attempt_index}/{attempt_total})")
-            print(f"❌ 批改失败: {file_info['fileName']} ({attempt_index}/{attempt_total}) - {extract_failure_detail(result)}")
-            break
-    
+
+    # 批改重试：按错误类型判断是否重试，退避带随机抖动，并受整批任务的重试预算约束
+    retries = 0
+
+    def log_retry(attempt: int, error_class: str, delay: float, outcome):
+        nonlocal retries
+        retries = attempt
+        print(f"🔄 批改重试 ({attempt}/{EVALUATE_RETRY_POLICY.max_attempts - 1}): {file_info['fileName']} ({attempt_index}/{attempt_total}) - 等待{delay:.1f}s")
+        print(f"   原因: [{error_class}] {extract_failure_detail(outcome[1])[:200]}")
+
+    try:
+        success, result = await call_with_retry_async(
+            lambda: async_execute_agent_text(text_input, context, limiter),
+            policy=EVALUATE_RETRY_POLICY,
+            budget=retry_budget,
+            breaker=get_circuit_breaker("execute-agent"),
+            classify_outcome=classify_legacy_outcome,
+            on_retry=log_retry,
+        )
+    except CircuitOpenError as e:
+        success, result = False, {"error": str(e), "errorClass": ERROR_CIRCUIT_OPEN}
+    if not success:
+        if retries > 0:
+            print(f"❌ 重试{retries}次后仍失败: {file_info['fileName']} ({attempt_index}/{attempt_total})")
+        print(f"❌ 批改失败: {file_info['fileName']} ({attempt_index}/{attempt_total}) - {extract_failure_detail(result)}")
+
     output_path = save_output(output_dir, file_info, attempt_index, attempt_total, success, result, output_format)
     if output_path:
         print(f"✅ 完成: {file_info['fileName']} ({attempt_index}/{attempt_total}) -> {output_path}")
@@ -1075,8 +1152,32 @@ async def evaluate_and_save(file_path: Path, file_info: dict, text_input: str, c
     }
 
 
-async def run_batch(file_paths, attempts: int, context: dict, output_root: Optional[Path], output_format: str, max_concurrency: int = 5, local_parse: bool = False, skip_llm_files: str = None, file_groups: str = None):
-    semaphore = asyncio.Semaphore(max_concurrency)
+async def evaluate_adaptively(controller: AdaptiveAttemptController, item_key: int, file_path: Path, file_info: dict, text_input: str, context: dict, output_dir: Path, attempt_index: int, attempt_total: int, output_format: str, limiter: AdaptiveConcurrencyLimiter, retry_budget: RetryBudget):
+    # 自适应模式下，前几次总分已收敛时不再发起后续测评
+    if not await controller.should_run(item_key, attempt_index):
+        print(f"⏭️ 跳过: {file_info['fileName']} ({attempt_index}/{attempt_total}) - 总分已收敛（±{controller.tolerance:g} 分）")
+        return {
+            "file_path": str(file_path),
+            "attempt_index": attempt_index,
+            "attempt_total": attempt_total,
+            "success": False,
+            "skipped": True,
+            "result": None,
+        }
+    outcome = None
+    try:
+        outcome = await evaluate_and_save(file_path, file_info, text_input, context, output_dir, attempt_index, attempt_total, output_format, limiter, retry_budget)
+        return outcome
+    finally:
+        score = None
+        if outcome and outcome.get("success"):
+            score = (extract_core_data(outcome.get("result") or {}) or {}).get("total_score")
+        await controller.record(item_key, score)
+
+
+async def run_batch(file_paths, attempts: int, context: dict, output_root: Optional[Path], output_format: str, max_concurrency: int = 5, local_parse: bool = False, skip_llm_files: str = None, file_groups: str = None, adaptive_attempts: bool = False, min_attempts: int = 2, score_tolerance: float = 1.0, file_priorities: str = None):
+    limiter = create_cloud_limiter(max_concurrency)
+    retry_budget = RetryBudget()
 
     # 解析需要跳过 LLM 校验的文件名列表
     skip_llm_set: set = set()
@@ -1102,7 +1203,7 @@ async def run_batch(file_paths, attempts: int, context: dict, output_root: Optio
         except (json.JSONDecodeError, TypeError):
             groups_map = {}
 
-    upload_tasks = [async_upload_file(str(path), semaphore) for path in file_paths]
+    upload_tasks = [async_upload_file(str(path), limiter) for path in file_paths]
     upload_results = await asyncio.gather(*upload_tasks)
 
     file_infos = []
@@ -1145,29 +1246,28 @@ async def run_batch(file_paths, attempts: int, context: dict, output_root: Optio
                 print(f"❌ 本地解析失败: {file_info.get('fileName')} ({e})")
     else:
         # 云端解析模式（带重试机制）
-        max_parse_retries = 3
-        parse_retry_delay = 2  # 重试间隔秒数
-        
+        llm_pending: List[int] = []  # 需要 LLM 校验的 prepared_files 下标，全部解析完后合并校验
         for path, file_info in file_infos:
-            success = False
-            text_input = None
-            analysis_result = None
-            
-            for retry in range(max_parse_retries):
-                if retry > 0:
-                    print(f"🔄 重试解析 ({retry}/{max_parse_retries-1}): {file_info.get('fileName')}")
-                    await asyncio.sleep(parse_retry_delay)
-                
-                success, analysis_result, text_input = await async_homework_analysis(file_info, context, semaphore)
-                
-                if success and text_input:
-                    break
-            
+            def log_parse_retry(attempt: int, error_class: str, delay: float, outcome, file_info=file_info):
+                print(f"🔄 重试解析 ({attempt}/{PARSE_RETRY_POLICY.max_attempts - 1}): {file_info.get('fileName')} [{error_class}]，等待{delay:.1f}s")
+
+            try:
+                success, analysis_result, text_input = await call_with_retry_async(
+                    lambda file_info=file_info: async_homework_analysis(file_info, context, limiter),
+                    policy=PARSE_RETRY_POLICY,
+                    budget=retry_budget,
+                    breaker=get_circuit_breaker("homework-file-analysis"),
+                    classify_outcome=classify_parse_outcome,
+                    on_retry=log_parse_retry,
+                )
+            except CircuitOpenError as e:
+                success, analysis_result, text_input = False, {"error": str(e), "errorClass": ERROR_CIRCUIT_OPEN}, None
+
             if not success or not text_input:
                 reason = "解析失败"
                 if isinstance(analysis_result, dict):
                     reason = analysis_result.get("msg") or analysis_result.get("error") or reason
-                print(f"❌ 解析失败 (已重试{max_parse_retries-1}次): {file_info.get('fileName')} ({reason})")
+                print(f"❌ 解析失败: {file_info.get('fileName')} ({reason})")
                 continue
 
             file_root = output_root if output_root else (path.parent / "review_results")
@@ -1182,13 +1282,21 @@ async def run_batch(file_paths, attempts: int, context: dict, output_root: Optio
             if should_skip_llm:
                 print(f"ℹ️ 用户已标记跳过 LLM 校验: {file_name}")
             elif LLM_CORRECTOR_AVAILABLE:
-                try:
-                    text_input = await async_correct_answers_with_llm(path, text_input)
-                except Exception as e:
-                    print(f"⚠️ LLM 校验失败: {e}，继续使用原始解析结果")
+                llm_pending.append(len(prepared_files))
 
             prepared_files.append((path, file_info, text_input, file_output_dir))
 
+        if llm_pending:
+            try:
+                corrected = await async_correct_answers_in_batches(
+                    [(prepared_files[i][0], prepared_files[i][2]) for i in llm_pending]
+                )
+                for i, text_input in zip(llm_pending, corrected):
+                    path, file_info, _, file_output_dir = prepared_files[i]
+                    prepared_files[i] = (path, file_info, text_input, file_output_dir)
+            except Exception as e:
+                print(f"⚠️ LLM 校验失败: {e}，继续使用原始解析结果")
+
     if not prepared_files:
         print("\n❌ 没有成功解析的文件，无法执行批改")
         return
@@ -1241,11 +1349,27 @@ async def run_batch(file_paths, attempts: int, context: dict, output_root: Optio
     else:
         eval_items = prepared_files
 
-    tasks = []
-    for path, file_info, text_input, file_output_dir in eval_items:
+    attempt_controller = AdaptiveAttemptController(
+        attempts,
+        enabled=adaptive_attempts,
+        min_attempts=min_attempts,
+        tolerance=score_tolerance,
+    )
+    if attempt_controller.enabled:
+        print(f"ℹ️ 自适应测评: 至少 {attempt_controller.min_attempts} 次，总分置信区间 ±{attempt_controller.tolerance:g} 分内即停止")
+
+    # 按轮次调度：先让每份作业都跑完第 1 次，再开始第 2 次；同一轮内按优先级排序
+    priorities = parse_file_priorities(file_priorities)
+    scheduler = BreadthFirstScheduler(limiter.maximum)
+    for item_key, (path, file_info, text_input, file_output_dir) in enumerate(eval_items):
+        priority = priorities.get(file_info.get("fileName") or Path(path).name, 0)
         for attempt_index in range(1, attempts + 1):
-            tasks.append(
-                evaluate_and_save(
+            scheduler.submit(
+                attempt_index,
+                partial(
+                    evaluate_adaptively,
+                    attempt_controller,
+                    item_key,
                     path,
                     file_info,
                     text_input,
@@ -1254,13 +1378,26 @@ async def run_batch(file_paths, attempts: int, context: dict, output_root: Optio
                     attempt_index,
                     attempts,
                     output_format,
-                    semaphore
-                )
+                    limiter,
+                    retry_budget,
+                ),
+                priority=priority,
             )
 
-    results = await asyncio.gather(*tasks)
+    results = await scheduler.run()
     success_count = sum(1 for item in results if item and item.get("success"))
-    print(f"\n✅ 已完成 {len(results)} 次测评（成功 {success_count}）")
+    skipped_count = sum(1 for item in results if item and item.get("skipped"))
+    print(f"\n✅ 已完成 {len(results) - skipped_count} 次测评（成功 {success_count}，跳过 {skipped_count}）")
+    cloud_concurrency = await limiter.snapshot()
+    print(
+        f"📊 云端并发窗口: 当前 {cloud_concurrency['limit']}（上限 {cloud_concurrency['maximum']}），"
+        f"扩容 {cloud_concurrency['increases']} 次，收缩 {cloud_concurrency['decreases']} 次"
+    )
+    retry_stats = retry_budget.snapshot()
+    print(
+        f"📊 云端调用: 共 {retry_stats['attempts']} 次，重试 {retry_stats['retries']} 次"
+        f"（预算 {retry_stats['retryLimit']}），放弃 {sum(retry_stats['giveUps'].values())} 次"
+    )
     generate_excel_summary(results, [item[0] for item in eval_items], attempts, output_root)
 
     return {
@@ -1270,6 +1407,11 @@ async def run_batch(file_paths, attempts: int, context: dict, output_root: Optio
         "attempts": attempts,
         "output_format": output_format,
         "success_count": success_count,
+        "cloud_concurrency": cloud_concurrency,
+        "retry_stats": retry_stats,
+        "circuit_breakers": circuit_breaker_snapshot(),
+        "hedging": hedge_snapshot(),
+        "adaptive_attempts": attempt_controller.summary(),
     }
 
 
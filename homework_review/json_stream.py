@@ -0,0 +1,154 @@
+"""
+流式 JSON 增量扫描
+大模型逐段输出 JSON 对象时，按字符跟踪字符串、转义与嵌套层级，
+在顶层字段或顶层数组中的元素一结束就交给调用方解析，无需等待整段输出完成。
+"""
+
+import json
+import re
+from bisect import bisect_right
+from typing import Any, List, NamedTuple, Optional
+
+_MEMBER_KEY = re.compile(r'\s*("(?:[^"\\]|\\.)*")\s*:\s*$', re.S)
+
+
+class JsonStreamError(ValueError):
+    """已结束的字段不是合法 JSON。"""
+
+
+class JsonMember(NamedTuple):
+    """已完整输出的顶层字段。"""
+
+    key: str
+    value: Any
+
+
+class JsonArrayItem(NamedTuple):
+    """顶层数组字段中已完整输出的一个元素，index 从 0 开始。"""
+
+    key: str
+    index: int
+    value: Any
+
+
+class IncrementalObjectScanner:
+    """增量扫描文本中的第一个顶层 JSON 对象。
+
+    对象之前的说明文字或代码块标记会被跳过；对象闭合后 finished 为 True，
+    其后的内容不再扫描。每次 feed 只处理新到达的字符，已到达的分片按原样保存、
+    只在字段或元素结束时拼接一次，已结束字段之前的分片随即丢弃，总开销与输出长度成正比。
+    """
+
+    def __init__(self) -> None:
+        self._chunks: List[str] = []
+        # 各分片首字符在整段输出中的位置，用于按绝对位置取片段
+        self._offsets: List[int] = []
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._started = False
+        self.finished = False
+        self._member_start = 0
+        self._array_key: Optional[str] = None
+        self._item_start = 0
+        self._item_index = 0
+
+    def feed(self, chunk: str) -> List[Any]:
+        """追加一段输出，返回其中新完成的 JsonMember / JsonArrayItem（按出现顺序）。"""
+        events: List[Any] = []
+        if self.finished or not chunk:
+            return events
+        self._offsets.append(self._pos)
+        self._chunks.append(chunk)
+        for char in chunk:
+            index = self._pos
+            self._pos += 1
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+            if not self._started:
+                if char == "{":
+                    self._started = True
+                    self._depth = 1
+                    self._member_start = index + 1
+                continue
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                if char == "[" and self._depth == 1:
+                    self._array_key = self._member_key(self._slice(self._member_start, index))
+                    self._item_start = index + 1
+                    self._item_index = 0
+                self._depth += 1
+            elif char in "}]":
+                if char == "]" and self._depth == 2 and self._array_key is not None:
+                    self._emit_item(events, self._slice(self._item_start, index))
+                    self._array_key = None
+                self._depth -= 1
+                if self._depth == 0:
+                    self._emit_member(events, self._slice(self._member_start, index))
+                    self.finished = True
+                    break
+            elif char == ",":
+                if self._depth == 1:
+                    self._emit_member(events, self._slice(self._member_start, index))
+                    self._member_start = index + 1
+                elif self._depth == 2 and self._array_key is not None:
+                    self._emit_item(events, self._slice(self._item_start, index))
+                    self._item_start = index + 1
+                    self._item_index += 1
+        self._discard_consumed()
+        return events
+
+    def _slice(self, start: int, stop: int) -> str:
+        """按整段输出中的绝对位置取 [start, stop) 片段。"""
+        parts = []
+        for position in range(max(0, bisect_right(self._offsets, start) - 1), len(self._chunks)):
+            offset = self._offsets[position]
+            if offset >= stop:
+                break
+            parts.append(self._chunks[position][max(0, start - offset):stop - offset])
+        return "".join(parts)
+
+    def _discard_consumed(self) -> None:
+        # 只需保留当前未结束字段的文本；对象开始前或闭合后的内容都不再需要
+        keep_from = self._member_start if self._started and not self.finished else self._pos
+        drop = bisect_right(self._offsets, keep_from) - 1
+        if drop > 0:
+            del self._chunks[:drop]
+            del self._offsets[:drop]
+        if self.finished:
+            self._chunks.clear()
+            self._offsets.clear()
+
+    @staticmethod
+    def _member_key(prefix: str) -> str:
+        match = _MEMBER_KEY.fullmatch(prefix)
+        if not match:
+            raise JsonStreamError(f"字段名格式错误：{prefix.strip()[:40]}")
+        return json.loads(match.group(1))
+
+    def _emit_member(self, events: List[Any], member_text: str) -> None:
+        if not member_text.strip():
+            return
+        try:
+            member = json.loads("{" + member_text + "}")
+        except json.JSONDecodeError as exc:
+            raise JsonStreamError(f"字段 JSON 格式错误：{exc.msg}") from exc
+        for key, value in member.items():
+            events.append(JsonMember(key, value))
+
+    def _emit_item(self, events: List[Any], item_text: str) -> None:
+        if not item_text.strip():
+            return
+        try:
+            value = json.loads(item_text)
+        except json.JSONDecodeError as exc:
+            raise JsonStreamError(f"{self._array_key} 第 {self._item_index + 1} 项 JSON 格式错误：{exc.msg}") from exc
+        events.append(JsonArrayItem(self._array_key, self._item_index, value))
@@ -1,21 +1,32 @@
 """
 LLM 答案校验模块
 用于校验和补充云端 OCR 解析中空白或错误的答案
+只把待校验题目附近的文档片段发给 LLM，多份文件的小修正合并为一次调用
 """
 
 import json
 import os
 import re
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Sequence, Set
 
 import requests
 from dotenv import load_dotenv
 
-try:
-    from docx import Document
-except ImportError:
-    Document = None
+from cloud_request_control import (
+    ERROR_CONNECT,
+    ERROR_NETWORK,
+    ERROR_SERVER,
+    ERROR_THROTTLED,
+    CircuitOpenError,
+    RetryPolicy,
+    call_with_retry,
+    classify_exception,
+    get_circuit_breaker,
+)
+from docx_text import docx_paragraph_texts
+from local_parser import SUBJECTIVE_KIND, QuestionGrammar, load_default_grammar
 
 MODEL_NAME_MAPPING = {
     "claude-sonnet-4.5": "Claude Sonnet 4.5",
@@ -28,6 +39,23 @@ MODEL_NAME_MAPPING = {
     "grok-4": "grok-4",
 }
 
+# 全文方式下发送的文档字符上限（也用于无法定位题目时的回退）
+FULL_DOCUMENT_CHARS = 8000
+# 每道题在文档中截取的片段长度：客观题答案通常集中在一两行，主观题需要整段作答
+OBJECTIVE_CONTEXT_CHARS = 600
+SUBJECTIVE_CONTEXT_CHARS = 3000
+# 单次合并调用的上限：片段总字符数与文件数
+CORRECTION_BATCH_CHARS = 6000
+CORRECTION_BATCH_FILES = 8
+# 校验失败时保留原解析结果即可：只对限流、5xx 和网络错误短暂重试一次，超时不再重等
+LLM_CORRECTION_RETRY_POLICY = RetryPolicy(
+    "答案校验",
+    max_attempts=2,
+    base_delay=2.0,
+    max_delay=10.0,
+    retry_on=frozenset({ERROR_THROTTLED, ERROR_SERVER, ERROR_CONNECT, ERROR_NETWORK}),
+)
+
 
 def load_llm_config() -> Tuple[str, str, str]:
     """加载 LLM API 配置"""
@@ -41,12 +69,7 @@ def load_llm_config() -> Tuple[str, str, str]:
 
 def extract_text_from_docx(docx_path: Path) -> str:
     """从 Word 文档提取纯文本"""
-    if Document is None:
-        raise ImportError("请安装 python-docx: pip install python-docx")
-    
-    doc = Document(docx_path)
-    paragraphs = [p.text.strip() for p in doc.paragraphs if p.text.strip()]
-    return "\n".join(paragraphs)
+    return "\n".join(docx_paragraph_texts(docx_path))
 
 
 def find_answer_issues(items: List[Dict]) -> List[Dict]:
@@ -115,7 +138,7 @@ def build_correction_prompt(doc_text: str, items: List[Dict], issues: List[Dict]
     prompt = f"""你是一个作业答案校验助手。请对比【原始文档内容】和【OCR解析结果】，找出并补充缺失或错误的答案。
 
 【原始文档内容】
-{doc_text[:8000]}
+{doc_text[:FULL_DOCUMENT_CHARS]}
 
 【OCR解析结果摘要】
 {chr(10).join(items_summary[:30])}
@@ -162,16 +185,22 @@ def call_llm_api(prompt: str, api_key: str, api_url: str, model: str) -> Optiona
         "n": 1
     }
     
-    try:
+    def send():
         response = requests.post(api_url, headers=headers, json=payload, timeout=120)
         response.raise_for_status()
-        result = response.json()
-        
+        return response.json()
+
+    try:
+        # 与答案生成共用 "llm" 熔断器：服务不可用时整批文件快速跳过校验
+        result = call_with_retry(send, policy=LLM_CORRECTION_RETRY_POLICY, breaker=get_circuit_breaker("llm"))
         if "choices" in result and len(result["choices"]) > 0:
             return result["choices"][0]["message"]["content"]
         return None
+    except CircuitOpenError as e:
+        print(f"⚠️ LLM 服务暂不可用，跳过校验: {e}")
+        return None
     except Exception as e:
-        print(f"❌ LLM API 调用失败: {e}")
+        print(f"❌ LLM API 调用失败 [{classify_exception(e)}]: {e}")
         return None
 
 
@@ -192,13 +221,13 @@ def parse_llm_response(response: str) -> List[Dict]:
     return []
 
 
-def apply_corrections(items: List[Dict], corrections: List[Dict]) -> List[Dict]:
-    """将修正结果应用到原始数据"""
+def apply_corrections(items: List[Dict], corrections: List[Dict], allowed_names: Optional[Set[str]] = None) -> List[Dict]:
+    """将修正结果应用到原始数据；allowed_names 不为空时只接受其中的题目"""
     # 创建 itemName -> correction 映射
     correction_map = {}
     for corr in corrections:
         name = corr.get("itemName", "")
-        if name:
+        if name and (allowed_names is None or name in allowed_names):
             correction_map[name] = corr.get("stuAnswerContent", "")
     
     # 应用修正
@@ -216,6 +245,298 @@ def apply_corrections(items: List[Dict], corrections: List[Dict]) -> List[Dict]:
     return items
 
 
+def estimate_tokens(text: str) -> int:
+    """粗略估算 token 数：中日韩字符约 1 个 token，其余字符约 4 个一个 token"""
+    cjk = len(re.findall(r'[\u3000-\u9fff\uff00-\uffef]', text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def _section_bounds(cleaned: List[str], grammar: QuestionGrammar, section: str) -> Optional[Tuple[int, int]]:
+    """题型所在段落区间 [标题, 下一个题型标题)，标题判定与本地解析一致"""
+    sections = [grammar.section(text) for text in cleaned]
+    start = next((i for i, rule in enumerate(sections) if rule and rule.name == section), None)
+    if start is None:
+        return None
+    end = next((i for i in range(start + 1, len(cleaned)) if sections[i]), len(cleaned))
+    return start, end
+
+
+def locate_item(
+    paragraphs: List[str],
+    item_name: str,
+    grammar: Optional[QuestionGrammar] = None,
+) -> Optional[Tuple[int, int, int]]:
+    """
+    在文档段落中定位题目，返回 (题型标题, 片段起点, 片段终点)；无法可靠定位时返回 None
+    主观题只认段首题号（与本地解析相同的判定），题号在段首出现多次视为无法定位；
+    客观题答案常挤在同一行，题型整段不超过片段上限时整段发送
+    """
+    grammar = grammar or load_default_grammar()
+    cleaned = [grammar.clean(text) for text in paragraphs]
+    name = item_name.strip()
+    for rule in grammar.sections:
+        prefix, suffix = f"{rule.name}第", rule.item_unit
+        number = name[len(prefix):-len(suffix)] if name.startswith(prefix) and name.endswith(suffix) else ""
+        if not number.isdigit():
+            continue
+        bounds = _section_bounds(cleaned, grammar, rule.name)
+        if bounds is None:
+            return None
+        start, end = bounds
+        if rule.kind != SUBJECTIVE_KIND:
+            if sum(len(paragraphs[i]) for i in range(start, end)) > OBJECTIVE_CONTEXT_CHARS:
+                return None
+            return start, start + 1, end
+        starts = {i: grammar.line_start(cleaned[i])[1] for i in range(start + 1, end)}
+        hits = [i for i, found in starts.items() if found == int(number)]
+        if len(hits) != 1:
+            return None
+        hit = hits[0]
+        # 片段止于下一道题的题号，避免把其他题目的作答当作本题上下文
+        stop = next((i for i in range(hit + 1, end) if starts[i]), end)
+        return start, hit, stop
+    # 云端解析的题目名称不符合本地语法时，只接受段首唯一出现的题目名称
+    hits = [i for i, text in enumerate(cleaned) if name and text.startswith(name)]
+    if len(hits) == 1:
+        return hits[0], hits[0], len(paragraphs)
+    return None
+
+
+def _issue_context_chars(issue: Dict) -> int:
+    name = issue.get("itemName", "")
+    return OBJECTIVE_CONTEXT_CHARS if ("选择题" in name or "判断题" in name) else SUBJECTIVE_CONTEXT_CHARS
+
+
+def select_issue_context(paragraphs: List[str], issues: List[Dict]) -> Optional[str]:
+    """
+    为每道待校验题目截取题型标题与题目起始的若干段文档片段，重叠片段合并
+    任一题目无法定位时返回 None，由调用方退回全文方式
+    """
+    grammar = load_default_grammar()
+    selected = set()
+    for issue in issues:
+        located = locate_item(paragraphs, issue.get("itemName", ""), grammar)
+        if located is None:
+            return None
+        heading, first, end = located
+        selected.add(heading)
+        budget = _issue_context_chars(issue)
+        for i in range(first, end):
+            if i > first and budget <= 0:
+                break
+            selected.add(i)
+            budget -= len(paragraphs[i])
+
+    parts = []
+    previous = None
+    for i in sorted(selected):
+        if previous is not None and i != previous + 1:
+            parts.append("……")
+        parts.append(paragraphs[i])
+        previous = i
+    return "\n".join(parts)
+
+
+@dataclass
+class CorrectionRequest:
+    """单个文件的校验请求：located=True 时 context 为题目附近片段，否则为全文方式的截断文本"""
+    key: str
+    items: List[Dict]
+    issues: List[Dict]
+    context: str
+    located: bool
+    baseline_tokens: int
+
+
+@dataclass
+class CorrectionUsage:
+    """一次批量校验的调用次数与输入 token 估算（baseline 为逐文件发送全文的估算值）"""
+    files: int = 0
+    calls: int = 0
+    prompt_tokens: int = 0
+    baseline_tokens: int = 0
+    failed_files: List[str] = field(default_factory=list)
+
+    @property
+    def saved_ratio(self) -> float:
+        if not self.baseline_tokens:
+            return 0.0
+        return max(0.0, 1 - self.prompt_tokens / self.baseline_tokens)
+
+
+def prepare_correction_request(key: str, docx_path: Path, items: List[Dict]) -> Optional[CorrectionRequest]:
+    """检测问题并截取上下文；无需校验或文档读取失败时返回 None"""
+    issues = find_answer_issues(items)
+    if not issues:
+        return None
+    try:
+        paragraphs = docx_paragraph_texts(docx_path)
+    except Exception as e:
+        print(f"⚠️ 文档读取失败: {docx_path.name} ({e})，跳过 LLM 校验")
+        return None
+
+    doc_text = "\n".join(paragraphs)
+    baseline_tokens = estimate_tokens(build_correction_prompt(doc_text, items, issues))
+    context = select_issue_context(paragraphs, issues)
+    if context is None:
+        return CorrectionRequest(key, items, issues, doc_text, False, baseline_tokens)
+    # 短文档的片段可能覆盖全文，此时直接发送全文，仍可参与合并
+    return CorrectionRequest(key, items, issues, doc_text if len(context) >= len(doc_text) else context, True, baseline_tokens)
+
+
+def plan_correction_batches(
+    pending: Sequence[CorrectionRequest],
+    max_chars: int = CORRECTION_BATCH_CHARS,
+    max_files: int = CORRECTION_BATCH_FILES,
+) -> List[List[CorrectionRequest]]:
+    """片段较小的文件按顺序装入同一批；全文方式或超出上限的文件单独调用"""
+    batches: List[List[CorrectionRequest]] = []
+    current: List[CorrectionRequest] = []
+    current_chars = 0
+    for request in pending:
+        if not request.located or len(request.context) > max_chars:
+            batches.append([request])
+            continue
+        if current and (current_chars + len(request.context) > max_chars or len(current) >= max_files):
+            batches.append(current)
+            current, current_chars = [], 0
+        current.append(request)
+        current_chars += len(request.context)
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _issue_lines(issues: List[Dict]) -> str:
+    return "\n".join(f"- {issue['itemName']}: {issue['issue']}，当前值=\"{issue['current']}\"" for issue in issues)
+
+
+def build_batch_correction_prompt(batch: Sequence[CorrectionRequest]) -> str:
+    """构建多文件合并校验的 prompt，每份文件只附带待校验题目附近的片段"""
+    sections = []
+    for request in batch:
+        sections.append(f"""=== 文件 {request.key} ===
+【原始文档片段】
+{request.context}
+
+【需要校验补充的题目】
+{_issue_lines(request.issues)}""")
+
+    return f"""你是一个作业答案校验助手。下面每份文件给出了原始文档中待校验题目附近的片段（不相邻的片段之间用“……”分隔）以及需要校验补充的题目，请根据片段找出这些题目的正确答案。
+
+{chr(10).join(sections)}
+
+输出要求：
+1. 直接输出 JSON 格式，按文件给出需要修正的题目
+2. 格式为: {{"files": [{{"file": "文件编号", "corrections": [{{"itemName": "题目名称", "stuAnswerContent": "正确答案"}}]}}]}}
+3. 选择题只输出选项字母（如 A/B/C/D）
+4. 判断题输出 √ 或 ×
+5. 主观题输出完整答案内容
+6. 片段中找不到答案的题目不要输出
+7. 只输出 JSON，不要其他解释
+
+请开始："""
+
+
+def parse_batch_response(response: str, keys: Sequence[str]) -> Dict[str, List[Dict]]:
+    """解析合并调用的结果，返回 文件编号 -> 修正列表"""
+    if not response:
+        return {}
+    try:
+        json_match = re.search(r'\{[\s\S]*\}', response)
+        data = json.loads(json_match.group()) if json_match else {}
+    except json.JSONDecodeError:
+        return {}
+    if not isinstance(data, dict):
+        return {}
+
+    result: Dict[str, List[Dict]] = {}
+    for entry in data.get("files") or []:
+        if isinstance(entry, dict) and str(entry.get("file")) in keys:
+            result[str(entry.get("file"))] = [c for c in entry.get("corrections") or [] if isinstance(c, dict)]
+    # 只有一份文件时兼容直接返回 corrections 的写法
+    if not result and len(keys) == 1 and isinstance(data.get("corrections"), list):
+        result[keys[0]] = [c for c in data["corrections"] if isinstance(c, dict)]
+    return result
+
+
+def correct_answers_in_batches(entries: Sequence[Tuple[Path, str]]) -> Tuple[List[str], CorrectionUsage]:
+    """
+    批量校验多份文件
+
+    Args:
+        entries: (原始 Word 文档路径, 云端 OCR 解析的 textInput JSON 字符串) 列表
+
+    Returns:
+        (与 entries 一一对应的修正后 textInput, 调用次数与 token 估算)
+    """
+    outputs = [text_input for _, text_input in entries]
+    usage = CorrectionUsage()
+
+    api_key, api_url, model = load_llm_config()
+    if not api_key:
+        print("⚠️ 未配置 LLM_API_KEY，跳过 LLM 校验")
+        return outputs, usage
+
+    prepared: Dict[str, Tuple[int, CorrectionRequest]] = {}
+    for index, (docx_path, text_input) in enumerate(entries):
+        try:
+            items = json.loads(text_input)
+        except json.JSONDecodeError:
+            print(f"⚠️ textInput 格式错误，跳过 LLM 校验: {docx_path.name}")
+            continue
+        if not isinstance(items, list):
+            continue
+        request = prepare_correction_request(f"F{index + 1}", docx_path, items)
+        if request is None:
+            continue
+        print(f"🔍 {docx_path.name}: 检测到 {len(request.issues)} 个问题答案" + ("" if request.located else "（未能定位题目，发送全文）"))
+        prepared[request.key] = (index, request)
+
+    if not prepared:
+        print("✅ 所有答案格式正常，无需 LLM 校验")
+        return outputs, usage
+
+    usage.files = len(prepared)
+    for batch in plan_correction_batches([request for _, request in prepared.values()]):
+        if not batch[0].located:
+            request = batch[0]
+            prompt = build_correction_prompt(request.context, request.items, request.issues)
+        else:
+            prompt = build_batch_correction_prompt(batch)
+        keys = [request.key for request in batch]
+        usage.calls += 1
+        usage.prompt_tokens += estimate_tokens(prompt)
+        usage.baseline_tokens += sum(request.baseline_tokens for request in batch)
+        print(f"🤖 调用 LLM 校验中（{len(batch)} 个文件）...")
+
+        llm_response = call_llm_api(prompt, api_key, api_url, model)
+        if batch[0].located:
+            corrections_by_key = parse_batch_response(llm_response, keys)
+        else:
+            corrections_by_key = {keys[0]: parse_llm_response(llm_response)}
+        for request in batch:
+            index, _ = prepared[request.key]
+            corrections = corrections_by_key.get(request.key)
+            if not corrections:
+                usage.failed_files.append(entries[index][0].name)
+                continue
+            print(f"\n📝 {entries[index][0].name}: 应用 {len(corrections)} 个修正...")
+            # 合并调用时只接受本文件待校验的题目，避免串用其他文件或题目的修正
+            allowed_names = {issue["itemName"] for issue in request.issues} if request.located else None
+            corrected_items = apply_corrections(request.items, corrections, allowed_names)
+            outputs[index] = json.dumps(corrected_items, ensure_ascii=False)
+
+    if usage.failed_files:
+        print(f"⚠️ LLM 未返回有效修正: {', '.join(usage.failed_files)}")
+    print(
+        f"📉 LLM 校验 {usage.files} 个文件共调用 {usage.calls} 次，输入约 {usage.prompt_tokens} tokens"
+        f"（逐文件全文方式约 {usage.baseline_tokens} tokens，节省 {usage.saved_ratio:.0%}）"
+    )
+    print("✅ LLM 校验完成")
+    return outputs, usage
+
+
 def correct_answers_with_llm(docx_path: Path, text_input: str) -> str:
     """
     使用 LLM 校验并补充空白答案
@@ -227,59 +548,8 @@ def correct_answers_with_llm(docx_path: Path, text_input: str) -> str:
     Returns:
         修正后的 textInput JSON 字符串
     """
-    # 加载配置
-    api_key, api_url, model = load_llm_config()
-    if not api_key:
-        print("⚠️ 未配置 LLM_API_KEY，跳过 LLM 校验")
-        return text_input
-    
-    # 解析 textInput
-    try:
-        items = json.loads(text_input)
-    except json.JSONDecodeError:
-        print("⚠️ textInput 格式错误，跳过 LLM 校验")
-        return text_input
-    
-    # 检测问题
-    issues = find_answer_issues(items)
-    if not issues:
-        print("✅ 所有答案格式正常，无需 LLM 校验")
-        return text_input
-    
-    print(f"\n🔍 检测到 {len(issues)} 个问题答案，启动 LLM 校验...")
-    for issue in issues[:5]:  # 只显示前5个
-        print(f"  - {issue['itemName']}: {issue['issue']}")
-    if len(issues) > 5:
-        print(f"  ... 还有 {len(issues) - 5} 个问题")
-    
-    # 提取文档文本
-    try:
-        doc_text = extract_text_from_docx(docx_path)
-    except Exception as e:
-        print(f"⚠️ 文档读取失败: {e}，跳过 LLM 校验")
-        return text_input
-    
-    # 构建 prompt 并调用 LLM
-    prompt = build_correction_prompt(doc_text, items, issues)
-    print("🤖 调用 LLM 校验中...")
-    
-    llm_response = call_llm_api(prompt, api_key, api_url, model)
-    if not llm_response:
-        print("⚠️ LLM 未返回结果，跳过校验")
-        return text_input
-    
-    # 解析修正结果
-    corrections = parse_llm_response(llm_response)
-    if not corrections:
-        print("⚠️ LLM 未返回有效修正，跳过校验")
-        return text_input
-    
-    # 应用修正
-    print(f"\n📝 应用 {len(corrections)} 个修正...")
-    corrected_items = apply_corrections(items, corrections)
-    
-    print("✅ LLM 校验完成")
-    return json.dumps(corrected_items, ensure_ascii=False)
+    outputs, _ = correct_answers_in_batches([(docx_path, text_input)])
+    return outputs[0]
 
 
 # 异步版本
@@ -291,6 +561,14 @@ async def async_correct_answers_with_llm(docx_path: Path, text_input: str) -> st
     return await loop.run_in_executor(None, correct_answers_with_llm, docx_path, text_input)
 
 
+async def async_correct_answers_in_batches(entries: Sequence[Tuple[Path, str]]) -> List[str]:
+    """异步版本的批量 LLM 校验，返回与 entries 一一对应的 textInput"""
+    import asyncio
+    loop = asyncio.get_event_loop()
+    outputs, _ = await loop.run_in_executor(None, correct_answers_in_batches, entries)
+    return outputs
+
+
 if __name__ == "__main__":
     # 测试用
     import sys
@@ -4,112 +4,250 @@
 """
 
 import re
+import os
 import json
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Sequence, Tuple, Union
 
-try:
-    from docx import Document
-except ImportError:
-    raise ImportError("请安装 python-docx: pip install python-docx")
+from docx_text import docx_paragraph_texts
 
 
-def parse_word_to_text_input(docx_path: Path) -> str:
+SECTION_NUMERALS = "一二三四五六七八九十"
+CHOICE_KIND = "choice"
+JUDGE_KIND = "judge"
+SUBJECTIVE_KIND = "subjective"
+SECTION_KINDS = {CHOICE_KIND, JUDGE_KIND, SUBJECTIVE_KIND}
+
+JUDGE_POSITIVE = {"√", "✓", "对", "是", "T", "t"}
+JUDGE_NEGATIVE = {"×", "✗", "错", "否", "F", "f"}
+
+
+@dataclass(frozen=True)
+class SectionRule:
+    """一种题型：标题名称、答案形态以及小题命名方式"""
+    name: str
+    kind: str
+    item_unit: str = "题"
+    answer_pattern: str = ""
+
+    def item_name(self, number: str) -> str:
+        return f"{self.name}第{number}{self.item_unit}"
+
+
+DEFAULT_SECTION_RULES = (
+    SectionRule("单项选择题", CHOICE_KIND, answer_pattern=r'(\d+)[\.．]([A-Da-d])'),
+    SectionRule("判断题", JUDGE_KIND, answer_pattern=r'(\d+)[\.．]([√×✓✗对错是否TtFf])'),
+    SectionRule("简答题", SUBJECTIVE_KIND),
+    SectionRule("论述题", SUBJECTIVE_KIND),
+    SectionRule("案例分析题", SUBJECTIVE_KIND, item_unit="问"),
+)
+DEFAULT_BACKGROUND_PREFIXES = ("案例背景", "背景[:：]")
+DEFAULT_MAX_QUESTION_NUMBER = 10
+
+
+class QuestionGrammar:
+    """
+    编译后的题卷语法：题型标题、案例背景、主观题题号与客观题答案格式
+    所有正则在构造时编译一次；每个段落只做一次清洗，并用合并后的正则一次判定
+    """
+
+    def __init__(
+        self,
+        sections: Sequence[SectionRule] = DEFAULT_SECTION_RULES,
+        background_prefixes: Sequence[str] = DEFAULT_BACKGROUND_PREFIXES,
+        max_question_number: int = DEFAULT_MAX_QUESTION_NUMBER,
+    ):
+        if not sections:
+            raise ValueError("题卷语法至少需要一种题型")
+        for rule in sections:
+            if rule.kind not in SECTION_KINDS:
+                raise ValueError(f"未知题型类别: {rule.kind}")
+            if rule.kind != SUBJECTIVE_KIND and not rule.answer_pattern:
+                raise ValueError(f"客观题 {rule.name} 缺少 answer_pattern")
+        self.sections = tuple(sections)
+        self.max_question_number = max_question_number
+        # 按配置顺序排列分支，同一段落命中多个题型时取配置中靠前的题型
+        self._section_re = re.compile(
+            f"[{SECTION_NUMERALS}]、?\\s*(?:"
+            + "|".join(f"(?P<s{index}>{re.escape(rule.name)})" for index, rule in enumerate(self.sections))
+            + ")"
+        )
+        self._line_start_re = re.compile(
+            "^(?:(?P<background>" + "|".join(background_prefixes) + ")"
+            + r"|(?P<number>\d+)[\.．、\\\.]\s*(?P<rest>.+))",
+            re.S,
+        )
+        self._percent_re = re.compile(r'^\d+%')
+        self._answer_res = {
+            rule: re.compile(rule.answer_pattern)
+            for rule in self.sections
+            if rule.answer_pattern
+        }
+
+    @classmethod
+    def from_config(cls, config: Dict) -> "QuestionGrammar":
+        """
+        从配置构造语法，新增作业模板无需改代码，例如:
+        {"sections": [{"name": "多项选择题", "kind": "choice", "answerPattern": "(\\d+)[\\.．]([A-Ha-h]+)"}]}
+        默认在内置题型之后追加；"replaceDefaults": true 时只使用配置中的题型
+        """
+        custom = [
+            SectionRule(
+                name=str(item["name"]).strip(),
+                kind=str(item.get("kind", SUBJECTIVE_KIND)),
+                item_unit=str(item.get("itemUnit", "题")),
+                answer_pattern=str(item.get("answerPattern", "")),
+            )
+            for item in config.get("sections", [])
+        ]
+        sections = custom if config.get("replaceDefaults") else [*DEFAULT_SECTION_RULES, *custom]
+        return cls(
+            sections=sections,
+            background_prefixes=config.get("backgroundPrefixes", DEFAULT_BACKGROUND_PREFIXES),
+            max_question_number=int(config.get("maxQuestionNumber", DEFAULT_MAX_QUESTION_NUMBER)),
+        )
+
+    @classmethod
+    def from_file(cls, path: Path) -> "QuestionGrammar":
+        return cls.from_config(json.loads(Path(path).read_text(encoding="utf-8")))
+
+    @staticmethod
+    def clean(text: str) -> str:
+        return text.replace("*", "").strip()
+
+    def section(self, text_clean: str) -> Optional[SectionRule]:
+        best = None
+        for match in self._section_re.finditer(text_clean):
+            index = int(match.lastgroup[1:])
+            if best is None or index < best:
+                best = index
+                if index == 0:
+                    break
+        return self.sections[best] if best is not None else None
+
+    def line_start(self, text_clean: str) -> Tuple[bool, Optional[int]]:
+        """返回 (是否案例背景, 主观题题号)；排除 "1.8%" 这类假题目与超出范围的题号"""
+        match = self._line_start_re.match(text_clean)
+        if not match:
+            return False, None
+        if match.group("background"):
+            return True, None
+        if self._percent_re.match(match.group("rest")):
+            return False, None
+        number = int(match.group("number"))
+        if number < 1 or number > self.max_question_number:
+            return False, None
+        return False, number
+
+    def objective_answers(self, rule: SectionRule, text_clean: str) -> List[Dict]:
+        items = []
+        answer_re = self._answer_res.get(rule) or re.compile(rule.answer_pattern)
+        for num_str, answer in answer_re.findall(text_clean):
+            if rule.kind == JUDGE_KIND:
+                answer = normalize_judge_answer(answer)
+            else:
+                answer = answer.upper()
+            items.append({
+                "itemId": "",
+                "itemName": rule.item_name(num_str),
+                "stuAnswerContent": answer
+            })
+        return items
+
+
+DEFAULT_GRAMMAR = QuestionGrammar()
+
+
+def load_default_grammar() -> QuestionGrammar:
+    """LOCAL_PARSER_GRAMMAR_FILE 指向 JSON 配置时使用自定义题型，否则使用内置语法"""
+    config_path = os.getenv("LOCAL_PARSER_GRAMMAR_FILE", "").strip()
+    if not config_path:
+        return DEFAULT_GRAMMAR
+    return _load_grammar_file(config_path)
+
+
+@lru_cache(maxsize=8)
+def _load_grammar_file(config_path: str) -> QuestionGrammar:
+    return QuestionGrammar.from_file(Path(config_path))
+
+
+def parse_word_to_text_input(docx_path: Path, grammar: Optional[QuestionGrammar] = None) -> str:
     """
     本地解析 Word 文档，生成符合 textInput 格式的 JSON
     
     Args:
         docx_path: Word 文档路径
+        grammar: 题卷语法，默认使用内置题型（或 LOCAL_PARSER_GRAMMAR_FILE 配置）
         
     Returns:
         textInput JSON 字符串
     """
-    doc = Document(docx_path)
-    paragraphs = [p.text.strip() for p in doc.paragraphs if p.text.strip()]
-    
+    paragraphs = docx_paragraph_texts(docx_path)
+    items = parse_paragraphs(paragraphs, grammar or load_default_grammar())
+    return json.dumps(items, ensure_ascii=False)
+
+
+def parse_paragraphs(paragraphs: Sequence[str], grammar: QuestionGrammar = DEFAULT_GRAMMAR) -> List[Dict]:
+    """按题卷语法把段落序列解析为 textInput 条目"""
     items: List[Dict] = []
     
     # 状态机变量
-    current_section = None  # 当前题型: 选择题/判断题/简答题/论述题/案例分析题
+    current_rule: Optional[SectionRule] = None  # 当前题型
     current_question_num = 0
     current_answer_lines = []
-    current_question_title = ""
     
-    for i, text in enumerate(paragraphs):
+    for text in paragraphs:
+        text_clean = grammar.clean(text)
         # 检测题型标题
-        section = detect_section(text)
-        if section:
+        rule = grammar.section(text_clean)
+        if rule:
             # 保存上一题的答案
-            if current_section in ["简答题", "论述题", "案例分析题"] and current_answer_lines:
-                save_subjective_answer(items, current_section, current_question_num, current_answer_lines)
-            current_section = section
+            if current_rule and current_rule.kind == SUBJECTIVE_KIND and current_answer_lines:
+                save_subjective_answer(items, current_rule, current_question_num, current_answer_lines)
+            current_rule = rule
             current_question_num = 0
             current_answer_lines = []
             continue
         
+        if current_rule is None:
+            continue
         # 根据当前题型解析
-        if current_section == "单项选择题":
-            parse_choice_answers(text, items, "单项选择题")
-        elif current_section == "判断题":
-            parse_judge_answers(text, items)
-        elif current_section in ["简答题", "论述题", "案例分析题"]:
-            # 跳过案例背景等非答案内容
-            if is_case_background(text):
-                continue
-            
-            # 检测是否是新题目（更严格的匹配）
-            q_match = is_question_start(text)
-            if q_match:
-                # 保存上一题
-                if current_answer_lines:
-                    save_subjective_answer(items, current_section, current_question_num, current_answer_lines)
-                current_question_num = q_match
-                current_answer_lines = [text]
-            elif current_question_num > 0:
-                # 继续收集当前题目的答案
-                current_answer_lines.append(text)
+        if current_rule.kind != SUBJECTIVE_KIND:
+            items.extend(grammar.objective_answers(current_rule, text_clean))
+            continue
+
+        # 跳过案例背景等非答案内容；检测是否是新题目（更严格的匹配）
+        is_background, q_match = grammar.line_start(text_clean)
+        if is_background:
+            continue
+        if q_match:
+            # 保存上一题
+            if current_answer_lines:
+                save_subjective_answer(items, current_rule, current_question_num, current_answer_lines)
+            current_question_num = q_match
+            current_answer_lines = [text]
+        elif current_question_num > 0:
+            # 继续收集当前题目的答案
+            current_answer_lines.append(text)
     
     # 保存最后一题
-    if current_section in ["简答题", "论述题", "案例分析题"] and current_answer_lines:
-        save_subjective_answer(items, current_section, current_question_num, current_answer_lines)
+    if current_rule and current_rule.kind == SUBJECTIVE_KIND and current_answer_lines:
+        save_subjective_answer(items, current_rule, current_question_num, current_answer_lines)
     
-    return json.dumps(items, ensure_ascii=False)
+    return items
 
 
 def detect_section(text: str) -> Optional[str]:
     """检测题型标题"""
-    text_clean = text.replace("*", "").strip()
-    
-    if re.search(r'[一二三四五六七八九十]、?\s*单项选择题', text_clean):
-        return "单项选择题"
-    elif re.search(r'[一二三四五六七八九十]、?\s*判断题', text_clean):
-        return "判断题"
-    elif re.search(r'[一二三四五六七八九十]、?\s*简答题', text_clean):
-        return "简答题"
-    elif re.search(r'[一二三四五六七八九十]、?\s*论述题', text_clean):
-        return "论述题"
-    elif re.search(r'[一二三四五六七八九十]、?\s*案例分析题', text_clean):
-        return "案例分析题"
-    
-    return None
+    rule = DEFAULT_GRAMMAR.section(DEFAULT_GRAMMAR.clean(text))
+    return rule.name if rule else None
 
 
 def is_case_background(text: str) -> bool:
     """判断是否为案例背景（非答案内容）"""
-    text_clean = text.replace("*", "").strip()
-    
-    # 检测案例背景关键词
-    background_patterns = [
-        r'^案例背景',
-        r'^背景[:：]',
-        r'^\*{0,2}案例背景',
-    ]
-    
-    for pattern in background_patterns:
-        if re.match(pattern, text_clean):
-            return True
-    
-    return False
+    return DEFAULT_GRAMMAR.line_start(DEFAULT_GRAMMAR.clean(text))[0]
 
 
 def is_question_start(text: str) -> Optional[int]:
@@ -117,30 +255,16 @@ def is_question_start(text: str) -> Optional[int]:
     判断是否为题目开始，返回题号或 None
     更严格的匹配：排除 "1.8%" 这类假题目
     """
-    text_clean = text.replace("*", "").strip()
-    
-    # 匹配题目开始的模式
-    # 格式: "1. 题目内容" 或 "1、题目内容"
-    # 但排除 "1.8%" 这种百分比格式
-    
-    # 先检查是否以数字开头
-    match = re.match(r'^(\d+)[\.．、\\\\\.]\s*(.+)', text_clean)
-    if not match:
-        return None
-    
-    num = int(match.group(1))
-    rest = match.group(2)
-    
-    # 排除假题目（如 "1.8%" 开头）
-    # 如果数字后面紧跟着百分号或小数，则不是题目
-    if re.match(r'^\d+%', rest):
-        return None
-    
-    # 检查题号是否合理（1-10 以内）
-    if num < 1 or num > 10:
-        return None
-    
-    return num
+    return DEFAULT_GRAMMAR.line_start(DEFAULT_GRAMMAR.clean(text))[1]
+
+
+def _legacy_rule(name: str, kind: str) -> SectionRule:
+    """旧接口按题型名称传参：内置题型沿用其规则，其他名称沿用同类内置题型的格式"""
+    for rule in DEFAULT_SECTION_RULES:
+        if rule.name == name:
+            return rule
+    template = next(rule for rule in DEFAULT_SECTION_RULES if rule.kind == kind)
+    return SectionRule(name, kind, template.item_unit, template.answer_pattern)
 
 
 def parse_choice_answers(text: str, items: List[Dict], section_name: str):
@@ -148,19 +272,8 @@ def parse_choice_answers(text: str, items: List[Dict], section_name: str):
     解析选择题答案
     格式: "1.B 2.B 3.B 4.B 5.C 6.C 7.B 8.B 9.C 10.A"
     """
-    # 清理文本
-    text_clean = text.replace("*", "").replace("**", "").strip()
-    
-    # 匹配 "题号.答案" 格式
-    pattern = r'(\d+)[\.．]([A-Da-d])'
-    matches = re.findall(pattern, text_clean)
-    
-    for num_str, answer in matches:
-        items.append({
-            "itemId": "",
-            "itemName": f"{section_name}第{num_str}题",
-            "stuAnswerContent": answer.upper()
-        })
+    rule = _legacy_rule(section_name, CHOICE_KIND)
+    items.extend(DEFAULT_GRAMMAR.objective_answers(rule, DEFAULT_GRAMMAR.clean(text)))
 
 
 def parse_judge_answers(text: str, items: List[Dict]):
@@ -168,53 +281,36 @@ def parse_judge_answers(text: str, items: List[Dict]):
     解析判断题答案
     格式: "1.√ 2.× 3.√ 4.× 5.√ 6.× 7.√ 8.× 9.√ 10.×"
     """
-    # 清理文本
-    text_clean = text.replace("*", "").replace("**", "").strip()
-    
-    # 匹配 "题号.判断符号" 格式
-    # 支持: √ × ✓ ✗ 对 错 是 否 T F
-    pattern = r'(\d+)[\.．]([√×✓✗对错是否TtFf])'
-    matches = re.findall(pattern, text_clean)
-    
-    for num_str, answer in matches:
-        # 统一转换为 √ 或 ×
-        normalized = normalize_judge_answer(answer)
-        items.append({
-            "itemId": "",
-            "itemName": f"判断题第{num_str}题",
-            "stuAnswerContent": normalized
-        })
+    rule = _legacy_rule("判断题", JUDGE_KIND)
+    items.extend(DEFAULT_GRAMMAR.objective_answers(rule, DEFAULT_GRAMMAR.clean(text)))
 
 
 def normalize_judge_answer(answer: str) -> str:
     """标准化判断题答案"""
-    positive = ["√", "✓", "对", "是", "T", "t"]
-    negative = ["×", "✗", "错", "否", "F", "f"]
-    
-    if answer in positive:
+    if answer in JUDGE_POSITIVE:
         return "√"
-    elif answer in negative:
+    elif answer in JUDGE_NEGATIVE:
         return "×"
     return answer
 
 
-def save_subjective_answer(items: List[Dict], section: str, question_num: int, answer_lines: List[str]):
-    """保存主观题答案"""
+def save_subjective_answer(
+    items: List[Dict],
+    section: Union[SectionRule, str],
+    question_num: int,
+    answer_lines: List[str],
+):
+    """保存主观题答案；section 可以是题型规则，也可以是旧接口使用的题型名称"""
     if not answer_lines:
         return
+    rule = section if isinstance(section, SectionRule) else _legacy_rule(section, SUBJECTIVE_KIND)
     
     # 合并所有行，用换行符连接
     full_answer = "\n\n".join(answer_lines)
     
-    # 确定题目名称
-    if section == "案例分析题":
-        item_name = f"案例分析题第{question_num}问"
-    else:
-        item_name = f"{section}第{question_num}题"
-    
     items.append({
         "itemId": "",
-        "itemName": item_name,
+        "itemName": rule.item_name(str(question_num)),
         "stuAnswerContent": full_answer
     })
 
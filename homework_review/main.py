@@ -12,8 +12,9 @@ import tempfile
 import time
 import uuid
 from datetime import datetime, timezone
+from functools import partial
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from fastapi import Depends, FastAPI, File, Form, Header, UploadFile, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
@@ -21,6 +22,29 @@ from fastapi.responses import StreamingResponse, FileResponse
 from dotenv import load_dotenv
 
 try:
+    from .attempt_scheduling import AdaptiveAttemptController, BreadthFirstScheduler, parse_file_priorities
+    from .cloud_request_control import (
+        ERROR_CONNECT,
+        ERROR_THROTTLED,
+        AdaptiveConcurrencyLimiter,
+        RetryBudget,
+        RetryPolicy,
+        add_circuit_breaker_listener,
+        call_with_retry_async,
+        circuit_breaker_snapshot,
+        cloud_rate_snapshot,
+        get_circuit_breaker,
+        hedge_snapshot,
+    )
+    from .file_preview import (
+        PREVIEW_MAX_PAGE_SIZE,
+        PREVIEW_PAGE_SIZE,
+        PreviewCache,
+        load_preview_page,
+        prerender_preview,
+    )
+    from .resource_upload import uses_chunked_upload
+    from .response_cache import StaleWhileRevalidateCache
     from .review_job_control import (
         FairUserConcurrencyLimiter,
         ReviewAuthConfigurationError,
@@ -29,12 +53,16 @@ try:
         extract_bearer_token,
     )
     from .skill_generation_service import (
-        encode_file_base64,
+        MaterialTextCache,
         generate_grading_skill_zip,
         generate_student_sample_docx_files,
     )
+    from .skill_package_registry import SkillPackageRegistry, credential_scope
+    from .skill_report_poller import SkillReportPoller
+    from .skill_report_store import SkillReportStore
     from .skill_review_service import (
         build_submission_requirement_from_overview,
+        build_skill_comparison_table,
         build_skill_score_table,
         compact_skill_report,
         execute_correction_skill,
@@ -42,10 +70,34 @@ try:
         get_correction_skill_report,
         list_correction_skill_models,
         platform_report_url,
+        summarize_skill_result,
         upload_and_prepare_grading_skill,
         upload_student_attachment,
     )
 except ImportError:
+    from attempt_scheduling import AdaptiveAttemptController, BreadthFirstScheduler, parse_file_priorities
+    from cloud_request_control import (
+        ERROR_CONNECT,
+        ERROR_THROTTLED,
+        AdaptiveConcurrencyLimiter,
+        RetryBudget,
+        RetryPolicy,
+        add_circuit_breaker_listener,
+        call_with_retry_async,
+        circuit_breaker_snapshot,
+        cloud_rate_snapshot,
+        get_circuit_breaker,
+        hedge_snapshot,
+    )
+    from file_preview import (
+        PREVIEW_MAX_PAGE_SIZE,
+        PREVIEW_PAGE_SIZE,
+        PreviewCache,
+        load_preview_page,
+        prerender_preview,
+    )
+    from resource_upload import uses_chunked_upload
+    from response_cache import StaleWhileRevalidateCache
     from review_job_control import (
         FairUserConcurrencyLimiter,
         ReviewAuthConfigurationError,
@@ -54,12 +106,16 @@ except ImportError:
         extract_bearer_token,
     )
     from skill_generation_service import (
-        encode_file_base64,
+        MaterialTextCache,
         generate_grading_skill_zip,
         generate_student_sample_docx_files,
     )
+    from skill_package_registry import SkillPackageRegistry, credential_scope
+    from skill_report_poller import SkillReportPoller
+    from skill_report_store import SkillReportStore
     from skill_review_service import (
         build_submission_requirement_from_overview,
+        build_skill_comparison_table,
         build_skill_score_table,
         compact_skill_report,
         execute_correction_skill,
@@ -67,6 +123,7 @@ except ImportError:
         get_correction_skill_report,
         list_correction_skill_models,
         platform_report_url,
+        summarize_skill_result,
         upload_and_prepare_grading_skill,
         upload_student_attachment,
     )
@@ -113,6 +170,13 @@ MAX_GLOBAL_SKILL_ATTEMPTS = env_int("MAX_GLOBAL_SKILL_ATTEMPTS", 10, maximum=50)
 MAX_SKILL_ATTEMPTS_PER_USER = env_int("MAX_SKILL_ATTEMPTS_PER_USER", 3, maximum=10)
 MAX_GLOBAL_SKILL_UPLOADS = env_int("MAX_GLOBAL_SKILL_UPLOADS", 4, maximum=20)
 MAX_SKILL_UPLOADS_PER_USER = env_int("MAX_SKILL_UPLOADS_PER_USER", 2, maximum=10)
+MAX_SKILL_CLOUD_REQUESTS = env_int("MAX_SKILL_CLOUD_REQUESTS", MAX_GLOBAL_SKILL_ATTEMPTS, maximum=50)
+MAX_SKILL_COMPARE_VARIANTS = 6
+SKILL_MODELS_CACHE_SECONDS = env_int("SKILL_MODELS_CACHE_SECONDS", 300, minimum=0, maximum=86400)
+SKILL_OVERVIEW_CACHE_SECONDS = env_int("SKILL_OVERVIEW_CACHE_SECONDS", 1800, minimum=0, maximum=86400)
+PREVIEW_CACHE_ENTRIES = env_int("PREVIEW_CACHE_ENTRIES", 64, maximum=1024)
+PREVIEW_PRERENDER = env_int("PREVIEW_PRERENDER", 1, minimum=0, maximum=1)
+STUDENT_SAMPLE_PER_LEVEL = env_int("STUDENT_SAMPLE_PER_LEVEL", 1, minimum=0, maximum=1)
 
 # A single Railway process owns the transient task state. Every job is bound to
 # a verified Supabase user id, while request-level limiters rotate fairly across
@@ -129,10 +193,87 @@ SKILL_UPLOAD_LIMITER = FairUserConcurrencyLimiter(
     MAX_GLOBAL_SKILL_UPLOADS,
     MAX_SKILL_UPLOADS_PER_USER,
 )
+
+
+def log_skill_cloud_window_change(previous: int, current: int, reason: str) -> None:
+    if current < previous:
+        message = f"📉 Skills 云端并发窗口 {previous} -> {current}（检测到限流/服务端错误/超时）"
+        level = "warn"
+    else:
+        message = f"📈 Skills 云端并发窗口 {previous} -> {current}（延迟与成功率正常）"
+        level = "info"
+    print(message)
+    for job in REVIEW_JOBS.values():
+        if job.get("engine") == "skill" and job.get("status") == "running":
+            append_review_job_log(job, message, level)
+
+
+# Mirror circuit breaker transitions into the logs of running Skills jobs.
+def log_skill_circuit_change(endpoint: str, previous: str, state: str) -> None:
+    labels = {"closed": "恢复正常", "open": "已熔断，快速失败", "half_open": "半开，放行探测请求"}
+    message = f"🔌 熔断器「{endpoint}」: {previous} -> {state}（{labels.get(state, state)}）"
+    print(message)
+    for job in REVIEW_JOBS.values():
+        if job.get("engine") == "skill" and job.get("status") == "running":
+            append_review_job_log(job, message, "warn" if state != "closed" else "info")
+
+
+add_circuit_breaker_listener(log_skill_circuit_change)
+
+# Uploads and report reads are idempotent. A submission is only retried when the
+# platform cannot have accepted it (throttled, or the connection was never
+# established), so one taskId never starts two grading runs; a disconnect after
+# the body was sent may have started one and is not retried.
+SKILL_UPLOAD_RETRY_POLICY = RetryPolicy("上传作业", max_attempts=3, base_delay=2.0, max_delay=20.0)
+# Chunked uploads already retry each part; retrying the whole upload on top of
+# that would resend every part.
+SKILL_CHUNKED_UPLOAD_RETRY_POLICY = RetryPolicy("上传作业", max_attempts=1)
+SKILL_EXECUTE_RETRY_POLICY = RetryPolicy(
+    "启动批阅",
+    max_attempts=3,
+    base_delay=2.0,
+    max_delay=20.0,
+    retry_on=frozenset({ERROR_THROTTLED, ERROR_CONNECT}),
+)
+SKILL_REPORT_RETRY_POLICY = RetryPolicy("读取报告", max_attempts=4, base_delay=1.0, max_delay=15.0)
+# Every Skills upload/execute/report request shares one AIMD window, so platform
+# throttling shrinks the whole process's request rate instead of each task
+# backing off on its own.
+SKILL_CLOUD_LIMITER = AdaptiveConcurrencyLimiter(
+    MAX_SKILL_CLOUD_REQUESTS,
+    maximum=MAX_SKILL_CLOUD_REQUESTS,
+    name="skill-cloud",
+    on_change=log_skill_cloud_window_change,
+)
+# Model lists and skill overviews change rarely. Entries are scoped by a hash of
+# the caller's credentials so one account never reads another account's data;
+# stale entries are served instantly while a background request refreshes them.
+SKILL_MODELS_CACHE = StaleWhileRevalidateCache(
+    ttl=SKILL_MODELS_CACHE_SECONDS,
+    stale_ttl=SKILL_MODELS_CACHE_SECONDS * 12,
+    name="skill-models",
+)
+SKILL_OVERVIEW_CACHE = StaleWhileRevalidateCache(
+    ttl=SKILL_OVERVIEW_CACHE_SECONDS,
+    stale_ttl=SKILL_OVERVIEW_CACHE_SECONDS * 24,
+    name="skill-overview",
+)
+# Unchanged skill ZIPs re-submitted by the same account reuse the uploaded skill.
+GRADING_SKILL_PACKAGE_REGISTRY = SkillPackageRegistry()
+# Extracted course-material text keyed by content hash, so regenerating a skill
+# from the same materials skips parsing them again.
+SKILL_MATERIAL_TEXT_CACHE = MaterialTextCache()
+# Rendered preview fragments keyed by file content; uploads and generated answers
+# are pre-rendered in the background so the first click on a file is a cache hit.
+PREVIEW_CACHE = PreviewCache(PREVIEW_CACHE_ENTRIES)
+PREVIEW_PRERENDER_TASKS: set[asyncio.Task] = set()
 SUPABASE_TOKEN_VERIFIER = SupabaseTokenVerifier.from_env()
 SYSTEM_TEMP_ROOT = Path(tempfile.gettempdir()).resolve()
 REVIEW_JOBS_ROOT = SYSTEM_TEMP_ROOT / "homework_review_jobs"
 REVIEW_JOBS_ROOT.mkdir(parents=True, exist_ok=True)
+# Review subprocesses inherit this, so every engine draws from the same
+# per-endpoint token buckets (see cloud_request_control.get_cloud_rate_limiter).
+os.environ.setdefault("CLOUD_RATE_STATE_DIR", str(REVIEW_JOBS_ROOT / "cloud_rate_limits"))
 
 def clamp_review_concurrency(value: int) -> int:
     return min(MAX_REVIEW_CONCURRENCY, max(1, int(value)))
@@ -221,6 +362,16 @@ def unique_upload_path(upload_dir: Path, filename: str) -> Path:
         index += 1
 
 
+def schedule_preview_prerender(paths: List[str]) -> None:
+    """Warm PREVIEW_CACHE for freshly written files without delaying the response."""
+    if not PREVIEW_PRERENDER:
+        return
+    for path in paths:
+        task = asyncio.create_task(asyncio.to_thread(prerender_preview, Path(path), PREVIEW_CACHE))
+        PREVIEW_PRERENDER_TASKS.add(task)
+        task.add_done_callback(PREVIEW_PRERENDER_TASKS.discard)
+
+
 async def terminate_review_job_process(job: Dict[str, Any]) -> None:
     process = job.get("_process")
     if process is None or process.returncode is not None:
@@ -278,6 +429,10 @@ async def execute_async_review_job(
     llm_model: str,
     skip_llm_files: Optional[str],
     file_groups: Optional[str],
+    adaptive_attempts: bool = False,
+    min_attempts: int = 2,
+    score_tolerance: float = 1.0,
+    file_priorities: Optional[str] = None,
 ) -> None:
     job = get_review_job(job_id)
     job["status"] = "running"
@@ -310,6 +465,14 @@ async def execute_async_review_job(
         cmd.extend(["--skip-llm-files", skip_llm_files])
     if file_groups:
         cmd.extend(["--file-groups", file_groups])
+    if file_priorities:
+        cmd.extend(["--file-priorities", file_priorities])
+    if adaptive_attempts:
+        cmd.extend([
+            "--adaptive-attempts",
+            "--min-attempts", str(min_attempts),
+            "--score-tolerance", str(score_tolerance),
+        ])
 
     result_payload: Optional[Dict[str, Any]] = None
     process: Optional[asyncio.subprocess.Process] = None
@@ -416,6 +579,49 @@ SKILL_SUCCESS_STATES = {"SUCCESS"}
 SKILL_FAILURE_STATES = {"FAILED", "FAILURE", "ERROR", "CANCELLED", "CANCELED"}
 
 
+def skill_report_status(response: Dict[str, Any]) -> str:
+    skill = ((response.get("data") or {}).get("skill") or {})
+    return str(skill.get("reportStatus") or "").upper()
+
+
+# One poller tracks every outstanding Skills taskId across jobs. Unfinished
+# reports are re-checked at a growing interval capped by SKILL_REPORT_MAX_POLL_SECONDS.
+SKILL_REPORT_POLLER = SkillReportPoller(
+    lambda response: skill_report_status(response) in SKILL_SUCCESS_STATES | SKILL_FAILURE_STATES,
+    max_interval=env_int("SKILL_REPORT_MAX_POLL_SECONDS", 30, minimum=2, maximum=300),
+)
+
+
+async def call_skill_cloud(
+    func: Any,
+    *args: Any,
+    endpoint: str,
+    retry_policy: RetryPolicy,
+    retry_budget: Optional[RetryBudget] = None,
+    job: Optional[Dict[str, Any]] = None,
+    **kwargs: Any,
+) -> Any:
+    async def attempt() -> Any:
+        async with SKILL_CLOUD_LIMITER.slot():
+            return await asyncio.to_thread(func, *args, **kwargs)
+
+    def log_retry(attempt_number: int, error_class: str, delay: float, error: Any) -> None:
+        if job is not None:
+            append_review_job_log(
+                job,
+                f"🔄 {retry_policy.name} 第 {attempt_number} 次失败（{error_class}），{delay:.1f} 秒后重试：{error}",
+                "warn",
+            )
+
+    return await call_with_retry_async(
+        attempt,
+        policy=retry_policy,
+        budget=retry_budget,
+        breaker=get_circuit_breaker(endpoint),
+        on_retry=log_retry,
+    )
+
+
 def make_skill_task_id() -> str:
     return f"test-{int(time.time() * 1000)}-{uuid.uuid4().hex[:8]}"
 
@@ -435,7 +641,14 @@ async def execute_skill_attempt(
     submission_requirement: str,
     student_submission: str,
     poll_interval_seconds: int,
+    submitted: Optional[asyncio.Event] = None,
+    retry_budget: Optional[RetryBudget] = None,
 ) -> Dict[str, Any]:
+    """Submit one grading run and wait for its report.
+
+    ``submitted`` is set as soon as the platform accepts the run, so the caller
+    can hand the submission slot to the next run while the report is pending.
+    """
     task_id = make_skill_task_id()
     report_url = platform_report_url(
         skill_version_id=skill_version_id,
@@ -443,65 +656,77 @@ async def execute_skill_attempt(
         task_id=task_id,
     )
     try:
-        await asyncio.to_thread(
-            execute_correction_skill,
-            skill_version_id=skill_version_id,
-            task_id=task_id,
-            model_name=model_name,
-            submission_requirement=submission_requirement,
-            student_submission=student_submission,
-            student_attachments=[attachment],
-            requirement_attachments=[],
-            authorization=authorization,
-            cookie=cookie,
-        )
+        # Only the submission holds the per-user slot; waiting for the report is
+        # handed to the shared poller.
+        async with SKILL_ATTEMPT_LIMITER.slot(job["ownerId"]):
+            await call_skill_cloud(
+                execute_correction_skill,
+                endpoint="correction-skill-execute",
+                retry_policy=SKILL_EXECUTE_RETRY_POLICY,
+                retry_budget=retry_budget,
+                job=job,
+                skill_version_id=skill_version_id,
+                task_id=task_id,
+                model_name=model_name,
+                submission_requirement=submission_requirement,
+                student_submission=student_submission,
+                student_attachments=[attachment],
+                requirement_attachments=[],
+                authorization=authorization,
+                cookie=cookie,
+            )
+        if submitted is not None:
+            submitted.set()
         append_review_job_log(
             job,
             f"🧪 「{file_name}」第 {attempt_index} 次 Skills 批阅已启动（{task_id}）",
         )
 
-        started_at = time.monotonic()
-        next_wait_log = 60
-        while True:
-            await asyncio.sleep(poll_interval_seconds)
-            response = await asyncio.to_thread(
+        def log_waiting(elapsed: int) -> None:
+            append_review_job_log(
+                job,
+                f"⏳ 「{file_name}」第 {attempt_index} 次仍在批阅，已等待 {elapsed} 秒",
+            )
+
+        response = await SKILL_REPORT_POLLER.wait_for_report(
+            task_id,
+            partial(
+                call_skill_cloud,
                 get_correction_skill_report,
                 task_id,
                 authorization,
                 cookie,
+                endpoint="correction-skill-report",
+                retry_policy=SKILL_REPORT_RETRY_POLICY,
+                retry_budget=retry_budget,
+                job=job,
+            ),
+            interval=poll_interval_seconds,
+            on_waiting=log_waiting,
+        )
+        report_status = skill_report_status(response)
+        if report_status in SKILL_SUCCESS_STATES:
+            return compact_skill_report(
+                response,
+                file_name=file_name,
+                file_index=file_index,
+                attempt_index=attempt_index,
+                task_id=task_id,
+                report_url=report_url,
             )
-            skill = ((response.get("data") or {}).get("skill") or {})
-            report_status = str(skill.get("reportStatus") or "").upper()
-            if report_status in SKILL_SUCCESS_STATES:
-                return compact_skill_report(
-                    response,
-                    file_name=file_name,
-                    file_index=file_index,
-                    attempt_index=attempt_index,
-                    task_id=task_id,
-                    report_url=report_url,
-                )
-            if report_status in SKILL_FAILURE_STATES:
-                return {
-                    "success": False,
-                    "fileName": file_name,
-                    "fileIndex": file_index,
-                    "attemptIndex": attempt_index,
-                    "taskId": task_id,
-                    "reportUrl": report_url,
-                    "reportStatus": report_status,
-                    "error": skill.get("message") or skill.get("error") or f"批阅终态：{report_status}",
-                    "items": [],
-                    "sections": [],
-                }
-
-            elapsed = int(time.monotonic() - started_at)
-            if elapsed >= next_wait_log:
-                append_review_job_log(
-                    job,
-                    f"⏳ 「{file_name}」第 {attempt_index} 次仍在批阅，已等待 {elapsed} 秒",
-                )
-                next_wait_log += 60
+        skill = ((response.get("data") or {}).get("skill") or {})
+        return {
+            "success": False,
+            "fileName": file_name,
+            "fileIndex": file_index,
+            "attemptIndex": attempt_index,
+            "taskId": task_id,
+            "reportUrl": report_url,
+            "reportStatus": report_status,
+            "error": skill.get("message") or skill.get("error") or f"批阅终态：{report_status}",
+            "items": [],
+            "sections": [],
+        }
     except asyncio.CancelledError:
         raise
     except Exception as exc:
@@ -524,40 +749,76 @@ async def execute_async_skill_review_job(
     *,
     authorization: str,
     cookie: str,
-    skill_version_id: str,
-    skill_nid: str,
+    variants: List[Dict[str, str]],
     submission_requirement: str,
     student_submission: str,
-    model_name: str,
     attempts: int,
     max_concurrency: int,
     poll_interval_seconds: int,
+    adaptive_attempts: bool = False,
+    min_attempts: int = 2,
+    score_tolerance: float = 1.0,
+    file_priorities: Optional[str] = None,
 ) -> None:
+    """Run every (variant, file, attempt) of a Skills job.
+
+    A comparison job passes several skill-version/model variants. Each student
+    file is uploaded once and the attachment is shared by all variants, so only
+    the grading runs scale with the number of variants.
+    """
     job = get_review_job(job_id)
     owner_id = job["ownerId"]
     job["status"] = "running"
     job["engine"] = "skill"
-    total_runs = len(job["files"]) * attempts
+    comparing = len(variants) > 1
+    total_runs = len(job["files"]) * attempts * len(variants)
     append_review_job_log(
         job,
-        f"🚀 Skills 批量测试已启动：{len(job['files'])} 份作业，每份 {attempts} 次，共 {total_runs} 次",
+        f"🚀 Skills 批量测试已启动：{len(job['files'])} 份作业，每份 {attempts} 次"
+        + (f"，对比 {len(variants)} 个变体" if comparing else "")
+        + f"，共 {total_runs} 次",
     )
 
     concurrency = clamp_review_concurrency(max_concurrency)
     semaphore = asyncio.Semaphore(concurrency)
+    retry_budget = RetryBudget()
+    job["_retryBudget"] = retry_budget
+    attempt_controller = AdaptiveAttemptController(
+        attempts,
+        enabled=adaptive_attempts,
+        min_attempts=min_attempts,
+        tolerance=score_tolerance,
+    )
+    if attempt_controller.enabled:
+        append_review_job_log(
+            job,
+            f"ℹ️ 自适应测评：每份至少 {attempt_controller.min_attempts} 次，总分置信区间 ±{attempt_controller.tolerance:g} 分内即停止",
+        )
+    # Full reports (item comments, decoded sections) go to disk as each run
+    # finishes; the job result keeps only the score summary.
+    report_store = SkillReportStore(Path(job["outputRoot"]))
+    job["_reportStore"] = report_store
     uploaded: Dict[int, Dict[str, str]] = {}
     upload_errors: Dict[int, str] = {}
 
     async def upload_one(file_index: int, file_path: str) -> None:
         file_name = Path(file_path).name
+        try:
+            chunked = uses_chunked_upload(Path(file_path).stat().st_size)
+        except OSError:
+            chunked = False
         async with semaphore:
             async with SKILL_UPLOAD_LIMITER.slot(owner_id):
                 try:
-                    uploaded[file_index] = await asyncio.to_thread(
+                    uploaded[file_index] = await call_skill_cloud(
                         upload_student_attachment,
                         file_path,
                         authorization,
                         cookie,
+                        endpoint="file-upload",
+                        retry_policy=SKILL_CHUNKED_UPLOAD_RETRY_POLICY if chunked else SKILL_UPLOAD_RETRY_POLICY,
+                        retry_budget=retry_budget,
+                        job=job,
                     )
                     append_review_job_log(job, f"☁️ 「{file_name}」已上传到智慧树资源服务")
                 except Exception as exc:
@@ -572,10 +833,15 @@ async def execute_async_skill_review_job(
 
         completed_runs = 0
         results: List[Dict[str, Any]] = []
-
-        async def run_one(file_index: int, file_path: str, attempt_index: int) -> None:
-            nonlocal completed_runs
-            file_name = Path(file_path).name
+        report_tasks: List[asyncio.Future] = []
+
+        async def run_attempt(
+            variant: Dict[str, str],
+            file_index: int,
+            file_name: str,
+            attempt_index: int,
+            submitted: asyncio.Event,
+        ) -> Dict[str, Any]:
             if file_index in upload_errors:
                 result = {
                     "success": False,
@@ -590,64 +856,164 @@ async def execute_async_skill_review_job(
                     "sections": [],
                 }
             else:
-                async with semaphore:
-                    async with SKILL_ATTEMPT_LIMITER.slot(owner_id):
-                        result = await execute_skill_attempt(
-                            job=job,
-                            file_name=file_name,
-                            file_index=file_index,
-                            attempt_index=attempt_index,
-                            attachment=uploaded[file_index],
-                            authorization=authorization,
-                            cookie=cookie,
-                            skill_version_id=skill_version_id,
-                            skill_nid=skill_nid,
-                            model_name=model_name,
-                            submission_requirement=submission_requirement,
-                            student_submission=student_submission,
-                            poll_interval_seconds=poll_interval_seconds,
-                        )
-            results.append(result)
+                result = await execute_skill_attempt(
+                    job=job,
+                    file_name=file_name,
+                    file_index=file_index,
+                    attempt_index=attempt_index,
+                    attachment=uploaded[file_index],
+                    authorization=authorization,
+                    cookie=cookie,
+                    skill_version_id=variant["skillVersionId"],
+                    skill_nid=variant["skillNid"],
+                    model_name=variant["modelName"],
+                    submission_requirement=submission_requirement,
+                    student_submission=student_submission,
+                    poll_interval_seconds=poll_interval_seconds,
+                    submitted=submitted,
+                    retry_budget=retry_budget,
+                )
+            return result
+
+        async def run_one(variant_index: int, file_index: int, file_path: str, attempt_index: int) -> None:
+            """调度器的一个提交名额：平台受理本次测评后立即返回，等待报告交给单独跟踪的任务。"""
+            nonlocal completed_runs
+            file_name = Path(file_path).name
+            variant = variants[variant_index]
+            run_label = f"[{variant['label']}] 「{file_name}」" if comparing else f"「{file_name}」"
+            # 自适应模式下第 k 次要等同一文件前 k-1 次出分才能判断是否执行，这段等待会占用本名额
+            if not await attempt_controller.should_run((variant_index, file_index), attempt_index):
+                results.append({
+                    "success": False,
+                    "skipped": True,
+                    "variantIndex": variant_index,
+                    "fileName": file_name,
+                    "fileIndex": file_index,
+                    "attemptIndex": attempt_index,
+                    "taskId": "",
+                    "reportUrl": "",
+                    "reportStatus": "SKIPPED",
+                    "error": "",
+                    "items": [],
+                    "sections": [],
+                })
+                completed_runs += 1
+                append_review_job_log(
+                    job,
+                    f"⏭️ {run_label}第 {attempt_index} 次已跳过：总分已收敛（{completed_runs}/{total_runs}）",
+                )
+                return
+            submitted = asyncio.Event()
+            task = asyncio.ensure_future(
+                finish_one(variant_index, file_index, file_name, attempt_index, run_label, submitted)
+            )
+            report_tasks.append(task)
+            waiter = asyncio.ensure_future(submitted.wait())
+            try:
+                # 提交成功或提前失败都会释放名额
+                await asyncio.wait({task, waiter}, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                waiter.cancel()
+
+        async def finish_one(
+            variant_index: int,
+            file_index: int,
+            file_name: str,
+            attempt_index: int,
+            run_label: str,
+            submitted: asyncio.Event,
+        ) -> None:
+            nonlocal completed_runs
+            result: Optional[Dict[str, Any]] = None
+            try:
+                result = await run_attempt(variants[variant_index], file_index, file_name, attempt_index, submitted)
+            finally:
+                score = result.get("totalScore") if result and result.get("success") else None
+                await attempt_controller.record((variant_index, file_index), score)
+            result["variantIndex"] = variant_index
+            if result.get("taskId"):
+                await asyncio.to_thread(report_store.append, result)
+            results.append(summarize_skill_result(result))
             completed_runs += 1
             if result.get("success"):
                 append_review_job_log(
                     job,
-                    f"✅ 「{file_name}」第 {attempt_index} 次完成：{result.get('totalScore', '—')}/{result.get('fullMark', '—')} 分（{completed_runs}/{total_runs}）",
+                    f"✅ {run_label}第 {attempt_index} 次完成：{result.get('totalScore', '—')}/{result.get('fullMark', '—')} 分（{completed_runs}/{total_runs}）",
                 )
             else:
                 append_review_job_log(
                     job,
-                    f"❌ 「{file_name}」第 {attempt_index} 次失败：{result.get('error') or result.get('reportStatus')}（{completed_runs}/{total_runs}）",
+                    f"❌ {run_label}第 {attempt_index} 次失败：{result.get('error') or result.get('reportStatus')}（{completed_runs}/{total_runs}）",
                     "error",
                 )
 
-        await asyncio.gather(*[
-            run_one(file_index, file_path, attempt_index)
-            for file_index, file_path in enumerate(job["files"])
-            for attempt_index in range(1, attempts + 1)
-        ])
+        # 按轮次提交：所有作业的第 1 次先提交，之后再补齐后续次数；同一轮内按优先级排序，
+        # 对比任务的各变体在每一轮里交替提交。调度器只限制同时进行的提交数，
+        # 已受理的测评在 report_tasks 中等待报告，不占用提交名额
+        priorities = parse_file_priorities(file_priorities)
+        scheduler = BreadthFirstScheduler(concurrency)
+        for file_index, file_path in enumerate(job["files"]):
+            priority = priorities.get(Path(file_path).name, 0)
+            for attempt_index in range(1, attempts + 1):
+                for variant_index in range(len(variants)):
+                    scheduler.submit(
+                        attempt_index,
+                        partial(run_one, variant_index, file_index, file_path, attempt_index),
+                        priority=priority,
+                    )
+        try:
+            await scheduler.run()
+            await asyncio.gather(*report_tasks)
+        except BaseException:
+            for task in report_tasks:
+                task.cancel()
+            await asyncio.gather(*report_tasks, return_exceptions=True)
+            raise
 
-        results.sort(key=lambda item: (int(item.get("fileIndex", 0)), int(item.get("attemptIndex", 0))))
+        results.sort(key=lambda item: (
+            int(item.get("variantIndex", 0)),
+            int(item.get("fileIndex", 0)),
+            int(item.get("attemptIndex", 0)),
+        ))
         succeeded = sum(1 for item in results if item.get("success"))
+        skipped_runs = sum(1 for item in results if item.get("skipped"))
+        summary: Dict[str, Any] = {
+            "engine": "skill",
+            "skillVersionId": variants[0]["skillVersionId"],
+            "skillNid": variants[0]["skillNid"],
+            "modelName": variants[0]["modelName"],
+            "attempts": attempts,
+            "totalRuns": total_runs,
+            "succeededRuns": succeeded,
+            "failedRuns": total_runs - succeeded - skipped_runs,
+            "skippedRuns": skipped_runs,
+            "uploadedFiles": len(uploaded),
+            "storedReports": len(report_store),
+            "adaptiveAttempts": attempt_controller.summary(),
+            "cloudConcurrency": await SKILL_CLOUD_LIMITER.snapshot(),
+            "retryStats": retry_budget.snapshot(),
+            "circuitBreakers": circuit_breaker_snapshot(),
+            "hedging": hedge_snapshot(),
+            "results": results,
+        }
+        if comparing:
+            summary["variants"] = variants
+            score_table = build_skill_comparison_table(results, attempts, [item["label"] for item in variants])
+        else:
+            score_table = build_skill_score_table(results, attempts)
         job["result"] = {
             "jobId": job_id,
             "outputFiles": [],
             "downloadBaseUrl": "",
-            "summary": {
-                "engine": "skill",
-                "skillVersionId": skill_version_id,
-                "skillNid": skill_nid,
-                "modelName": model_name,
-                "attempts": attempts,
-                "totalRuns": total_runs,
-                "succeededRuns": succeeded,
-                "failedRuns": total_runs - succeeded,
-                "results": results,
-            },
-            "scoreTable": build_skill_score_table(results, attempts),
+            "summary": summary,
+            "scoreTable": score_table,
+            "reportsUrl": f"/api/homework-review/jobs/{job_id}/reports",
         }
         job["status"] = "completed"
-        append_review_job_log(job, f"🎉 Skills 批量测试完成：成功 {succeeded}/{total_runs} 次")
+        append_review_job_log(
+            job,
+            f"🎉 Skills 批量测试完成：成功 {succeeded}/{total_runs} 次" + (f"，跳过 {skipped_runs} 次" if skipped_runs else ""),
+        )
     except asyncio.CancelledError:
         if job.get("status") != "cancelled":
             job["status"] = "cancelled"
@@ -698,11 +1064,15 @@ async def get_skill_review_models(
         raise HTTPException(status_code=400, detail="请填写完整的智慧树认证信息")
     normalized_scene = min(100, max(1, scene))
     try:
-        models = await asyncio.to_thread(
-            list_correction_skill_models,
-            authorization.strip(),
-            cookie.strip(),
-            scene=normalized_scene,
+        models = await SKILL_MODELS_CACHE.get(
+            (credential_scope(authorization), normalized_scene),
+            partial(
+                asyncio.to_thread,
+                list_correction_skill_models,
+                authorization.strip(),
+                cookie.strip(),
+                scene=normalized_scene,
+            ),
         )
     except Exception as exc:
         raise HTTPException(status_code=502, detail=str(exc)) from exc
@@ -732,15 +1102,23 @@ async def generate_skill_submission_requirement(
         raise HTTPException(status_code=400, detail="请填写 Skill Version ID")
 
     normalized_type = skill_type.strip() or "1"
-    try:
-        overview = await asyncio.to_thread(
+
+    async def load_overview() -> Tuple[Dict[str, Any], str]:
+        response = await asyncio.to_thread(
             get_correction_skill_overview,
             skill_version_id.strip(),
             authorization.strip(),
             cookie.strip(),
             skill_type=normalized_type,
         )
-        requirement = build_submission_requirement_from_overview(overview)
+        # Only overviews that convert cleanly are cached; pending extractions raise here.
+        return response, build_submission_requirement_from_overview(response)
+
+    try:
+        overview, requirement = await SKILL_OVERVIEW_CACHE.get(
+            (credential_scope(authorization), skill_version_id.strip(), normalized_type),
+            load_overview,
+        )
     except Exception as exc:
         raise HTTPException(status_code=502, detail=str(exc)) from exc
 
@@ -789,6 +1167,7 @@ async def upload_grading_skill_package(
                 str(target),
                 authorization.strip(),
                 cookie.strip(),
+                registry=GRADING_SKILL_PACKAGE_REGISTRY,
             )
         except HTTPException:
             raise
@@ -807,8 +1186,13 @@ async def generate_upload_grading_skill_package(
     llm_api_key: str = Form(""),
     llm_api_url: str = Form(""),
     llm_model: str = Form(""),
+    stream: bool = Form(False),
 ):
-    """使用 AgentEval LLM 生成 Skill ZIP，并自动上传和切换为批阅类型。"""
+    """使用 AgentEval LLM 生成 Skill ZIP，并自动上传和切换为批阅类型。
+
+    stream=true 时以 SSE 返回：生成过程中推送 progress 事件，结束时推送 complete 或 error 事件。
+    客户端在上传开始前断开时跳过上传；已经开始的上传会继续完成。
+    """
     if not authorization.strip() or not cookie.strip():
         raise HTTPException(status_code=400, detail="请填写完整的智慧树认证信息")
     valid_materials = [item for item in (materials or []) if item.filename]
@@ -823,66 +1207,128 @@ async def generate_upload_grading_skill_package(
     if not effective_api_key or not effective_model:
         raise HTTPException(status_code=400, detail="请先在 AgentEval 全局设置中配置 LLM API Key 和作业批阅模型")
 
-    with tempfile.TemporaryDirectory(prefix="grading_skill_generate_") as temp_dir:
-        temp_root = Path(temp_dir)
-        material_dir = temp_root / "materials"
-        output_dir = temp_root / "output"
-        material_dir.mkdir(parents=True, exist_ok=True)
-        material_paths: List[Path] = []
-        total_bytes = 0
-        try:
-            for upload in valid_materials:
-                target = unique_upload_path(material_dir, upload.filename or "material")
-                with target.open("wb") as output:
-                    while True:
-                        chunk = await upload.read(REVIEW_UPLOAD_CHUNK_SIZE)
-                        if not chunk:
-                            break
-                        total_bytes += len(chunk)
-                        if total_bytes > MAX_SKILL_MATERIAL_BYTES:
-                            raise HTTPException(status_code=413, detail="课程材料总大小不能超过 80 MB")
-                        output.write(chunk)
-                material_paths.append(target)
-        finally:
-            for upload in valid_materials:
-                await upload.close()
+    temp_dir = tempfile.TemporaryDirectory(prefix="grading_skill_generate_")
+    material_dir = Path(temp_dir.name) / "materials"
+    material_dir.mkdir(parents=True, exist_ok=True)
+    material_paths: List[Path] = []
+    total_bytes = 0
+    try:
+        for upload in valid_materials:
+            target = unique_upload_path(material_dir, upload.filename or "material")
+            with target.open("wb") as output:
+                while True:
+                    chunk = await upload.read(REVIEW_UPLOAD_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    total_bytes += len(chunk)
+                    if total_bytes > MAX_SKILL_MATERIAL_BYTES:
+                        raise HTTPException(status_code=413, detail="课程材料总大小不能超过 80 MB")
+                    output.write(chunk)
+            material_paths.append(target)
+    except BaseException:
+        temp_dir.cleanup()
+        raise
+    finally:
+        for upload in valid_materials:
+            await upload.close()
+
+    # 流式模式下客户端断开后置位：生成线程无法中断，但不再上传无人接收的 Skill
+    client_gone = asyncio.Event()
 
+    async def run_generation(on_progress: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
         try:
             generated = await asyncio.to_thread(
                 generate_grading_skill_zip,
                 material_paths=material_paths,
                 material_text=material_text,
-                output_dir=output_dir,
                 api_key=effective_api_key,
                 api_url=effective_api_url,
                 model=effective_model,
+                material_cache=SKILL_MATERIAL_TEXT_CACHE,
+                stream=stream,
+                on_progress=on_progress,
             )
-            zip_path = Path(generated.pop("zipPath"))
-            zip_base64 = await asyncio.to_thread(encode_file_base64, zip_path)
+            zip_bytes = generated.pop("zipBytes")
 
             uploaded = None
             upload_error = None
-            try:
-                uploaded = await asyncio.to_thread(
-                    upload_and_prepare_grading_skill,
-                    str(zip_path),
-                    authorization.strip(),
-                    cookie.strip(),
-                )
-            except Exception as exc:
-                upload_error = str(exc)
+            if client_gone.is_set():
+                upload_error = "客户端已断开，未上传 Skill"
+            else:
+                if on_progress:
+                    on_progress("正在上传 Skill 并切换为批阅类型")
+                try:
+                    uploaded = await asyncio.to_thread(
+                        upload_and_prepare_grading_skill,
+                        generated["zipFileName"],
+                        authorization.strip(),
+                        cookie.strip(),
+                        registry=GRADING_SKILL_PACKAGE_REGISTRY,
+                        validated_package=generated["package"],
+                        package_bytes=zip_bytes,
+                    )
+                except Exception as exc:
+                    upload_error = str(exc)
         except HTTPException:
             raise
         except Exception as exc:
             raise HTTPException(status_code=502, detail=str(exc)) from exc
 
-    return {
-        **generated,
-        "zipBase64": zip_base64,
-        "upload": uploaded,
-        "uploadError": upload_error,
-        "model": effective_model,
-    }
+        return {
+            **generated,
+            "upload": uploaded,
+            "uploadError": upload_error,
+            "model": effective_model,
+        }
+
+    if not stream:
+        try:
+            return await run_generation()
+        finally:
+            temp_dir.cleanup()
+
+    # 流式模式：生成在后台任务中进行，进度以 SSE 推送，避免长时间无响应被当作挂起
+    loop = asyncio.get_running_loop()
+    events: asyncio.Queue = asyncio.Queue()
+
+    def report_progress(message: str) -> None:
+        loop.call_soon_threadsafe(events.put_nowait, {"type": "progress", "message": message})
+
+    task = asyncio.create_task(run_generation(report_progress))
+    # 客户端断开后生成线程仍会跑完（之后跳过上传），材料目录等任务结束再清理
+    task.add_done_callback(lambda _: temp_dir.cleanup())
+    task.add_done_callback(lambda _: events.put_nowait(None))
+
+    async def event_stream():
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(events.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                    continue
+                if event is None:
+                    break
+                yield f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
+        finally:
+            if not task.done():
+                client_gone.set()
+        try:
+            result = {"type": "complete", **task.result()}
+        except HTTPException as exc:
+            result = {"type": "error", "message": str(exc.detail)}
+        except Exception as exc:
+            result = {"type": "error", "message": str(exc)}
+        yield f"data: {json.dumps(result, ensure_ascii=False)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+        },
+    )
 
 
 @app.post("/api/review/student-samples/generate")
@@ -915,6 +1361,7 @@ async def generate_skill_student_samples(
                 api_key=effective_api_key,
                 api_url=effective_api_url,
                 model=effective_model,
+                per_level=bool(STUDENT_SAMPLE_PER_LEVEL),
             )
         except Exception as exc:
             raise HTTPException(status_code=502, detail=str(exc)) from exc
@@ -943,48 +1390,28 @@ async def download_file(path: str = Query(..., description="文件路径")):
 
 
 @app.get("/api/preview")
-async def preview_file(path: str = Query(..., description="文件路径")):
-    """预览文件 - 支持 docx/pdf/ppt/pptx"""
+async def preview_file(
+    path: str = Query(..., description="文件路径"),
+    page: int = Query(1, ge=1, description="页码"),
+    page_size: int = Query(PREVIEW_PAGE_SIZE, ge=1, le=PREVIEW_MAX_PAGE_SIZE, description="每页段落数"),
+):
+    """预览文件 - 支持 docx/pdf/ppt/pptx，Word 正文按段落分页"""
     file_path = resolve_temp_file(path)
     if not file_path.is_file():
         raise HTTPException(status_code=404, detail=f"文件不存在: {path}")
     
     ext = file_path.suffix.lower()
     
-    if ext in (".ppt", ".pptx"):
-        # PPT 文件返回简要信息
-        try:
-            from pptx import Presentation
-            prs = Presentation(str(file_path))
-            slide_count = len(prs.slides)
-            html = f"<p>📊 PPT 文件: {file_path.name}</p><p>共 {slide_count} 页幻灯片</p><p style='color:#b45309;font-size:0.85em'>PPT 类型作业跳过 LLM 校验</p>"
-        except ImportError:
-            html = f"<p>📊 PPT 文件: {file_path.name}</p><p style='color:#b45309;font-size:0.85em'>PPT 类型作业跳过 LLM 校验</p>"
-        except Exception as e:
-            html = f"<p>📊 PPT 文件: {file_path.name}</p><p style='color:red'>预览失败: {str(e)}</p>"
-        return {"html": html, "fileName": file_path.name}
-    
     if ext == ".pdf":
         html = f"<p>📄 PDF 文件: {file_path.name}</p><p style='color:#6366f1;font-size:0.85em'>PDF 文件将通过云端解析</p>"
-        return {"html": html, "fileName": file_path.name}
+        return {"html": html, "fileName": file_path.name, "page": 1, "pageCount": 1}
     
-    if ext not in (".docx", ".doc"):
+    if ext not in (".docx", ".doc", ".ppt", ".pptx"):
         raise HTTPException(status_code=400, detail="仅支持预览 .docx/.pdf/.ppt/.pptx 文件")
     
     try:
-        from docx import Document
-        doc = Document(str(file_path))
-        paragraphs = []
-        for p in doc.paragraphs:
-            text = p.text.strip()
-            if text:
-                # 简单样式处理
-                if p.style and p.style.name and "Heading" in p.style.name:
-                    paragraphs.append(f"<h3>{text}</h3>")
-                else:
-                    paragraphs.append(f"<p>{text}</p>")
-        html = "\n".join(paragraphs) if paragraphs else "<p>文档内容为空</p>"
-        return {"html": html, "fileName": file_path.name}
+        preview = await asyncio.to_thread(load_preview_page, file_path, PREVIEW_CACHE, page, page_size)
+        return {**preview, "fileName": file_path.name}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"预览失败: {str(e)}")
 
@@ -1114,6 +1541,11 @@ async def generate_answers(
                 # 直接转发为SSE
                 try:
                     data = json.loads(msg)
+                    if isinstance(data, dict) and data.get("type") == "generate_complete":
+                        # 生成的答案通常会被逐个预览，提前在后台渲染
+                        schedule_preview_prerender([
+                            item["path"] for item in data.get("files") or [] if isinstance(item, dict) and item.get("path")
+                        ])
                     yield f'data: {json.dumps(data, ensure_ascii=False)}\n\n'
                 except json.JSONDecodeError:
                     # 非JSON行作为日志
@@ -1240,6 +1672,7 @@ async def upload_review_job_files(
     }
     job["uploadBatches"][batch_id] = response
     append_review_job_log(job, f"📦 已上传 {len(job['files'])}/{MAX_REVIEW_FILES} 份文件")
+    schedule_preview_prerender(job["files"][-len(uploaded):])
     return response
 
 
@@ -1316,6 +1749,7 @@ async def upload_review_job_chunk(
         job["files"].append(str(target_path))
         job["uploadedNames"].append(target_path.name)
         append_review_job_log(job, f"📦 已上传 {len(job['files'])}/{MAX_REVIEW_FILES} 份文件")
+        schedule_preview_prerender([str(target_path)])
 
     return {
         "jobId": job_id,
@@ -1345,6 +1779,10 @@ async def start_review_job(
     llm_model: Optional[str] = Form(None),
     skip_llm_files: Optional[str] = Form(None),
     file_groups: Optional[str] = Form(None),
+    file_priorities: Optional[str] = Form(None),
+    adaptive_attempts: bool = Form(False),
+    min_attempts: int = Form(2),
+    score_tolerance: float = Form(1.0),
     review_user_id: str = Depends(require_review_user),
 ):
     """Start the worker and return immediately; progress is read by polling."""
@@ -1382,6 +1820,10 @@ async def start_review_job(
         llm_model=(llm_model or "").strip(),
         skip_llm_files=skip_llm_files,
         file_groups=file_groups,
+        file_priorities=file_priorities,
+        adaptive_attempts=adaptive_attempts,
+        min_attempts=max(2, min_attempts),
+        score_tolerance=max(0.0, score_tolerance),
     ))
     REVIEW_JOB_TASKS.add(task)
     job["_task"] = task
@@ -1395,6 +1837,82 @@ async def start_review_job(
     return {"jobId": job_id, "status": "queued", "maxConcurrency": concurrency}
 
 
+def check_skill_job_startable(
+    job: Dict[str, Any],
+    *,
+    authorization: str,
+    cookie: str,
+    submission_requirement: str,
+) -> Optional[Dict[str, Any]]:
+    """Validate a Skills start request; returns the response for an already started job."""
+    if job["status"] in {"queued", "running", "completed"}:
+        return {"jobId": job["jobId"], "status": job["status"]}
+    if job["status"] == "cancelled":
+        raise HTTPException(status_code=409, detail="任务已取消")
+    if job["status"] == "failed":
+        raise HTTPException(status_code=409, detail=job.get("error") or "任务已失败")
+    if not job["files"]:
+        raise HTTPException(status_code=400, detail="请先上传学生作业文件")
+    if any(not item.get("complete") for item in job["chunkUploads"].values()):
+        raise HTTPException(status_code=409, detail="仍有大文件分片未上传完成")
+    if not authorization.strip() or not cookie.strip():
+        raise HTTPException(status_code=400, detail="请填写完整的智慧树认证信息")
+    if not submission_requirement.strip():
+        raise HTTPException(status_code=400, detail="请填写所有学生共用的作业要求")
+    return None
+
+
+def queue_skill_review_job(job: Dict[str, Any], queued_message: str, **settings: Any) -> None:
+    job["status"] = "queued"
+    job["engine"] = "skill"
+    job["configuredConcurrency"] = settings["max_concurrency"]
+    append_review_job_log(job, queued_message)
+    task = asyncio.create_task(run_async_skill_review_job(job["jobId"], **settings))
+    REVIEW_JOB_TASKS.add(task)
+    job["_task"] = task
+
+    def clear_task(completed_task: asyncio.Task) -> None:
+        REVIEW_JOB_TASKS.discard(completed_task)
+        if job.get("_task") is completed_task:
+            job.pop("_task", None)
+
+    task.add_done_callback(clear_task)
+
+
+def parse_skill_variants(raw: str) -> List[Dict[str, str]]:
+    """Parse the comparison variants form field into normalized variant dicts."""
+    try:
+        parsed = json.loads(raw)
+    except (json.JSONDecodeError, TypeError):
+        raise HTTPException(status_code=400, detail="variants 必须是 JSON 数组")
+    if not isinstance(parsed, list) or not 2 <= len(parsed) <= MAX_SKILL_COMPARE_VARIANTS:
+        raise HTTPException(status_code=400, detail=f"对比任务需要 2～{MAX_SKILL_COMPARE_VARIANTS} 个变体")
+
+    variants: List[Dict[str, str]] = []
+    seen = set()
+    for index, item in enumerate(parsed, start=1):
+        if not isinstance(item, dict):
+            raise HTTPException(status_code=400, detail=f"第 {index} 个变体格式不正确")
+        skill_version_id = str(item.get("skillVersionId") or "").strip()
+        model_name = str(item.get("modelName") or "").strip()
+        if not skill_version_id:
+            raise HTTPException(status_code=400, detail=f"第 {index} 个变体缺少 Skill Version ID")
+        if not model_name:
+            raise HTTPException(status_code=400, detail=f"第 {index} 个变体缺少 Skills 批阅模型")
+        if (skill_version_id, model_name) in seen:
+            raise HTTPException(status_code=400, detail=f"第 {index} 个变体与前面的变体重复")
+        seen.add((skill_version_id, model_name))
+        variants.append({
+            "skillVersionId": skill_version_id,
+            "skillNid": str(item.get("skillNid") or "").strip(),
+            "modelName": model_name,
+            "label": str(item.get("label") or "").strip()[:40] or f"变体{index}",
+        })
+    if len({item["label"] for item in variants}) != len(variants):
+        raise HTTPException(status_code=400, detail="变体名称不能重复")
+    return variants
+
+
 @app.post("/api/review/jobs/{job_id}/start-skill", status_code=202)
 async def start_skill_review_job(
     job_id: str,
@@ -1408,66 +1926,115 @@ async def start_skill_review_job(
     attempts: int = Form(1),
     max_concurrency: int = Form(3),
     poll_interval_seconds: int = Form(5),
+    file_priorities: Optional[str] = Form(None),
+    adaptive_attempts: bool = Form(False),
+    min_attempts: int = Form(2),
+    score_tolerance: float = Form(1.0),
     review_user_id: str = Depends(require_review_user),
 ):
     """启动多份学生作业的 Skills 批量测试。"""
     job = get_review_job(job_id, review_user_id)
-    if job["status"] in {"queued", "running", "completed"}:
-        return {"jobId": job_id, "status": job["status"]}
-    if job["status"] == "cancelled":
-        raise HTTPException(status_code=409, detail="任务已取消")
-    if job["status"] == "failed":
-        raise HTTPException(status_code=409, detail=job.get("error") or "任务已失败")
-    if not job["files"]:
-        raise HTTPException(status_code=400, detail="请先上传学生作业文件")
-    if any(not item.get("complete") for item in job["chunkUploads"].values()):
-        raise HTTPException(status_code=409, detail="仍有大文件分片未上传完成")
-    if not authorization.strip() or not cookie.strip():
-        raise HTTPException(status_code=400, detail="请填写完整的智慧树认证信息")
+    started = check_skill_job_startable(
+        job,
+        authorization=authorization,
+        cookie=cookie,
+        submission_requirement=submission_requirement,
+    )
+    if started:
+        return started
     if not skill_version_id.strip():
         raise HTTPException(status_code=400, detail="请填写 Skill Version ID")
-    if not submission_requirement.strip():
-        raise HTTPException(status_code=400, detail="请填写所有学生共用的作业要求")
     if not model_name.strip():
         raise HTTPException(status_code=400, detail="请填写 Skills 批阅模型")
 
     normalized_attempts = min(20, max(1, attempts))
     concurrency = clamp_review_concurrency(max_concurrency)
-    poll_interval = min(30, max(2, poll_interval_seconds))
-    job["status"] = "queued"
-    job["engine"] = "skill"
-    job["configuredConcurrency"] = concurrency
-    append_review_job_log(
+    queue_skill_review_job(
         job,
         f"✅ {len(job['files'])} 份文件已就绪，Skills 批量测试进入队列",
-    )
-    task = asyncio.create_task(run_async_skill_review_job(
-        job_id,
         authorization=authorization.strip(),
         cookie=cookie.strip(),
-        skill_version_id=skill_version_id.strip(),
-        skill_nid=skill_nid.strip(),
+        variants=[{
+            "skillVersionId": skill_version_id.strip(),
+            "skillNid": skill_nid.strip(),
+            "modelName": model_name.strip(),
+            "label": model_name.strip(),
+        }],
         submission_requirement=submission_requirement.strip(),
         student_submission=student_submission.strip() or "见附件",
-        model_name=model_name.strip(),
         attempts=normalized_attempts,
         max_concurrency=concurrency,
-        poll_interval_seconds=poll_interval,
-    ))
-    REVIEW_JOB_TASKS.add(task)
-    job["_task"] = task
+        poll_interval_seconds=min(30, max(2, poll_interval_seconds)),
+        file_priorities=file_priorities,
+        adaptive_attempts=adaptive_attempts,
+        min_attempts=max(2, min_attempts),
+        score_tolerance=max(0.0, score_tolerance),
+    )
+    return {
+        "jobId": job_id,
+        "status": "queued",
+        "engine": "skill",
+        "attempts": normalized_attempts,
+        "maxConcurrency": concurrency,
+    }
 
-    def clear_task(completed_task: asyncio.Task) -> None:
-        REVIEW_JOB_TASKS.discard(completed_task)
-        if job.get("_task") is completed_task:
-            job.pop("_task", None)
 
-    task.add_done_callback(clear_task)
+@app.post("/api/review/jobs/{job_id}/start-skill-compare", status_code=202)
+async def start_skill_compare_job(
+    job_id: str,
+    authorization: str = Form(...),
+    cookie: str = Form(...),
+    variants: str = Form(...),
+    submission_requirement: str = Form(...),
+    student_submission: str = Form("见附件"),
+    attempts: int = Form(1),
+    max_concurrency: int = Form(3),
+    poll_interval_seconds: int = Form(5),
+    file_priorities: Optional[str] = Form(None),
+    adaptive_attempts: bool = Form(False),
+    min_attempts: int = Form(2),
+    score_tolerance: float = Form(1.0),
+    review_user_id: str = Depends(require_review_user),
+):
+    """启动多个 Skill 版本 / 模型的对比测试：学生作业只上传一次，各变体共用同一调度。
+
+    variants 为 JSON 数组，每项包含 skillVersionId、modelName，可选 skillNid 与 label。
+    """
+    job = get_review_job(job_id, review_user_id)
+    started = check_skill_job_startable(
+        job,
+        authorization=authorization,
+        cookie=cookie,
+        submission_requirement=submission_requirement,
+    )
+    if started:
+        return started
+    parsed_variants = parse_skill_variants(variants)
+
+    normalized_attempts = min(20, max(1, attempts))
+    concurrency = clamp_review_concurrency(max_concurrency)
+    queue_skill_review_job(
+        job,
+        f"✅ {len(job['files'])} 份文件已就绪，{len(parsed_variants)} 个变体的 Skills 对比测试进入队列",
+        authorization=authorization.strip(),
+        cookie=cookie.strip(),
+        variants=parsed_variants,
+        submission_requirement=submission_requirement.strip(),
+        student_submission=student_submission.strip() or "见附件",
+        attempts=normalized_attempts,
+        max_concurrency=concurrency,
+        poll_interval_seconds=min(30, max(2, poll_interval_seconds)),
+        file_priorities=file_priorities,
+        adaptive_attempts=adaptive_attempts,
+        min_attempts=max(2, min_attempts),
+        score_tolerance=max(0.0, score_tolerance),
+    )
     return {
         "jobId": job_id,
         "status": "queued",
         "engine": "skill",
         "attempts": normalized_attempts,
+        "variants": parsed_variants,
         "maxConcurrency": concurrency,
     }
 
@@ -1549,6 +2116,35 @@ async def download_review_job_artifact(
     return FileResponse(path=str(artifact), filename=artifact.name)
 
 
+@app.get("/api/review/jobs/{job_id}/reports")
+async def list_review_job_reports(
+    job_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    task_id: Optional[str] = Query(None, min_length=1),
+    review_user_id: str = Depends(require_review_user),
+):
+    """Page through full Skills reports, or fetch one by taskId."""
+    job = get_review_job(job_id, review_user_id)
+    store: Optional[SkillReportStore] = job.get("_reportStore")
+    if store is None:
+        raise HTTPException(status_code=404, detail="该任务没有 Skills 报告")
+    if task_id:
+        report = await asyncio.to_thread(store.get, task_id)
+        if report is None:
+            raise HTTPException(status_code=404, detail="报告不存在或尚未完成")
+        reports = [report]
+    else:
+        reports = await asyncio.to_thread(store.read, offset, limit)
+    return {
+        "jobId": job_id,
+        "total": len(store),
+        "offset": offset,
+        "limit": limit,
+        "reports": reports,
+    }
+
+
 @app.get("/api/review/jobs/{job_id}")
 async def get_review_job_status(
     job_id: str,
@@ -1571,6 +2167,14 @@ async def get_review_job_status(
         "createdAt": job["createdAt"],
         "updatedAt": job["updatedAt"],
     }
+    if job.get("engine") == "skill" and job["status"] == "running":
+        response["cloudConcurrency"] = await SKILL_CLOUD_LIMITER.snapshot()
+        response["cloudRateLimits"] = cloud_rate_snapshot()
+        response["circuitBreakers"] = circuit_breaker_snapshot()
+        response["hedging"] = hedge_snapshot()
+        response["reportPoller"] = SKILL_REPORT_POLLER.snapshot()
+        if job.get("_retryBudget") is not None:
+            response["retryStats"] = job["_retryBudget"].snapshot()
     if job["status"] == "completed":
         response["result"] = job["result"]
     return response
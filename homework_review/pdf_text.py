@@ -0,0 +1,156 @@
+"""PDF 分页文本提取：大文件按页段分发到进程池并行解析，可在达到字符预算后提前停止。"""
+
+from __future__ import annotations
+
+import atexit
+import math
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Deque, Iterator, List, Optional, Sequence, Tuple
+
+PDF_PARALLEL_MIN_PAGES = 32
+PDF_PAGES_PER_TASK = 16
+PDF_MAX_WORKERS = max(1, min(8, len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1))
+
+_PDF_POOL: Optional[ProcessPoolExecutor] = None
+_PDF_POOL_LOCK = threading.Lock()
+
+
+def _pdf_pool() -> ProcessPoolExecutor:
+    """进程内共享的解析进程池，首次需要时创建；并发解析多个 PDF 时子进程总数不超过 PDF_MAX_WORKERS。"""
+    global _PDF_POOL
+    with _PDF_POOL_LOCK:
+        if _PDF_POOL is None:
+            # 子进程使用 spawn，避免在多线程的 Web 进程里 fork
+            _PDF_POOL = ProcessPoolExecutor(
+                max_workers=PDF_MAX_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _PDF_POOL
+
+
+def shutdown_pdf_pool() -> None:
+    """关闭共享进程池并取消排队中的页段；之后再解析时会重新创建。"""
+    global _PDF_POOL
+    with _PDF_POOL_LOCK:
+        pool, _PDF_POOL = _PDF_POOL, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _discard_pdf_pool(pool: ProcessPoolExecutor) -> None:
+    global _PDF_POOL
+    with _PDF_POOL_LOCK:
+        if _PDF_POOL is pool:
+            _PDF_POOL = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+atexit.register(shutdown_pdf_pool)
+
+
+def _extract_page_range(path: str, start: int, stop: int) -> List[str]:
+    """进程池任务：在子进程中独立打开 PDF，返回 [start, stop) 页的文本。"""
+    import fitz
+
+    document = fitz.open(path)
+    try:
+        return [document[index].get_text("text") for index in range(start, stop)]
+    finally:
+        document.close()
+
+
+def _budget_chars(pages: Sequence[str]) -> int:
+    # 按去掉空字符与首尾空白后的长度计入预算：累计超过预算时，截断后的结果就与完整提取一致
+    return sum(len(text.replace("\x00", "").strip()) for text in pages)
+
+
+def iter_pdf_pages(path: Path, *, max_workers: Optional[int] = None) -> Iterator[str]:
+    """按页序逐页产出 PDF 文本（page.get_text("text") 的原始结果）。
+
+    先在当前进程解析第一段页面；剩余页数达到 PDF_PARALLEL_MIN_PAGES 时，
+    其余页段交给共享进程池并行解析，单个文件同时最多有 max_workers 个页段在解析，
+    并按页序产出。调用方提前停止迭代时，尚未开始的页段会被取消，不再提交新的页段。
+    """
+    import fitz
+
+    document = fitz.open(str(path))
+    try:
+        page_count = document.page_count
+        first_stop = min(page_count, PDF_PAGES_PER_TASK)
+        remaining = page_count - first_stop
+        workers = min(max_workers or PDF_MAX_WORKERS, math.ceil(remaining / PDF_PAGES_PER_TASK))
+        parallel = remaining >= PDF_PARALLEL_MIN_PAGES and workers > 1
+        for index in range(first_stop if parallel else page_count):
+            yield document[index].get_text("text")
+    finally:
+        document.close()
+    if not parallel:
+        return
+
+    ranges = deque(_page_ranges(first_stop, page_count))
+    in_flight: Deque[Tuple[Tuple[int, int], Future]] = deque()
+    try:
+        pool = _pdf_pool()
+
+        def submit_next() -> None:
+            if ranges:
+                page_range = ranges.popleft()
+                in_flight.append((page_range, pool.submit(_extract_page_range, str(path), *page_range)))
+
+        try:
+            for _ in range(workers):
+                submit_next()
+            while in_flight:
+                page_range, future = in_flight[0]
+                chunk = future.result()
+                in_flight.popleft()
+                submit_next()
+                yield from chunk
+        finally:
+            for _, pending in in_flight:
+                pending.cancel()
+    except BrokenProcessPool:
+        # 进程池不可用时（例如受限环境无法创建子进程），丢弃该进程池并在当前进程解析剩余页段
+        _discard_pdf_pool(pool)
+        ranges.extendleft(reversed([page_range for page_range, _ in in_flight]))
+        for start, stop in ranges:
+            yield from _extract_page_range(str(path), start, stop)
+
+
+def extract_pdf_pages(
+    path: Path,
+    *,
+    char_budget: Optional[int] = None,
+    max_workers: Optional[int] = None,
+) -> List[str]:
+    """按页序返回 PDF 每页文本。
+
+    传入 char_budget 时进入提前停止模式：已提取文本超过预算后不再解析后续页面，
+    只返回截至该处的页面，调用方按预算截断后与完整提取的结果相同。
+    """
+    budget = math.inf if char_budget is None else char_budget
+    used = 0
+    pages: List[str] = []
+    page_iter = iter_pdf_pages(path, max_workers=max_workers)
+    try:
+        for text in page_iter:
+            pages.append(text)
+            used += _budget_chars(pages[-1:])
+            if used > budget:
+                break
+    finally:
+        page_iter.close()
+    return pages
+
+
+def _page_ranges(start: int, stop: int) -> List[Tuple[int, int]]:
+    return [
+        (offset, min(stop, offset + PDF_PAGES_PER_TASK))
+        for offset in range(start, stop, PDF_PAGES_PER_TASK)
+    ]
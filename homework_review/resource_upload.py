@@ -0,0 +1,179 @@
+"""智慧树资源服务文件上传：小文件单次提交，大文件按分片并发上传。"""
+
+from __future__ import annotations
+
+import mimetypes
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+try:
+    from .cloud_request_control import (
+        RetryPolicy,
+        call_with_retry,
+        classify_exception,
+        env_float,
+        throttle_cloud_endpoint,
+    )
+except ImportError:
+    from cloud_request_control import (
+        RetryPolicy,
+        call_with_retry,
+        classify_exception,
+        env_float,
+        throttle_cloud_endpoint,
+    )
+
+
+RESOURCE_UPLOAD_URL = "https://cloudapi.polymas.com/basic-resource/file/upload"
+
+
+# 超过阈值的文件走分片模式；分片大小与并发数可按部署环境调整。
+CHUNKED_UPLOAD_THRESHOLD_BYTES = int(env_float("RESOURCE_UPLOAD_CHUNK_THRESHOLD_BYTES", 8 * 1024 * 1024, minimum=1))
+DEFAULT_UPLOAD_CHUNK_BYTES = int(env_float("RESOURCE_UPLOAD_CHUNK_BYTES", 4 * 1024 * 1024, minimum=256 * 1024))
+DEFAULT_UPLOAD_PART_CONCURRENCY = int(env_float("RESOURCE_UPLOAD_PART_CONCURRENCY", 4, minimum=1))
+DEFAULT_UPLOAD_PART_RETRIES = int(env_float("RESOURCE_UPLOAD_PART_RETRIES", 3, minimum=0))
+DEFAULT_UPLOAD_PART_TIMEOUT_SECONDS = 120
+
+
+class ResourceUploadError(RuntimeError):
+    """资源服务上传失败；status_code 为资源服务返回的 HTTP 状态码，error_class 为底层网络错误的分类。"""
+
+    def __init__(self, message: str, *, status_code: Optional[int] = None, error_class: Optional[str] = None) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+        self.error_class = error_class
+
+
+def plan_upload_chunks(size: int, chunk_bytes: int) -> List[Tuple[int, int]]:
+    """把文件切成 (offset, length) 分片；空文件也保留一个分片。"""
+    chunk_bytes = max(1, int(chunk_bytes))
+    if size <= 0:
+        return [(0, 0)]
+    return [
+        (offset, min(chunk_bytes, size - offset))
+        for offset in range(0, size, chunk_bytes)
+    ]
+
+
+def uses_chunked_upload(size: int) -> bool:
+    """文件是否走分片上传；分片模式下每个分片自行重试，调用方不应再整体重试。"""
+    return size > CHUNKED_UPLOAD_THRESHOLD_BYTES
+
+
+def _read_upload_payload(response: Any, operation: str) -> Dict[str, Any]:
+    try:
+        payload = response.json()
+    except ValueError as exc:
+        raise ResourceUploadError(
+            f"{operation}返回了非 JSON 响应（HTTP {response.status_code}）：{response.text[:500]}",
+            status_code=response.status_code,
+        ) from exc
+
+    if not isinstance(payload, dict):
+        raise ResourceUploadError(f"{operation}返回了异常响应：{payload}")
+    message = payload.get("msg") or payload.get("message") or payload.get("error")
+    if not response.ok:
+        raise ResourceUploadError(
+            f"{operation}失败（HTTP {response.status_code}）：{message or payload}",
+            status_code=response.status_code,
+        )
+    code = payload.get("code")
+    if payload.get("success") is False or (code is not None and code != 200):
+        raise ResourceUploadError(f"{operation}失败：{message or payload}")
+    return payload
+
+
+def upload_resource_file(
+    file_path: str,
+    *,
+    headers: Mapping[str, str],
+    url: str = RESOURCE_UPLOAD_URL,
+    file_name: Optional[str] = None,
+    mime_type: Optional[str] = None,
+    chunked: Optional[bool] = None,
+    chunk_bytes: Optional[int] = None,
+    max_workers: Optional[int] = None,
+    part_retries: Optional[int] = None,
+    timeout_seconds: Optional[float] = None,
+) -> Dict[str, Any]:
+    """上传一个文件，返回资源服务最后一次响应的完整 JSON。
+
+    chunked 为 None 时按 CHUNKED_UPLOAD_THRESHOLD_BYTES 自动选择模式。分片模式下
+    所有分片共用同一个 identifyCode：除最后一片外并发发送，失败的分片单独重试，
+    全部成功后再发送最后一片，由服务端在收到末片时合并并返回 ossUrl。
+    """
+    import requests
+
+    path = Path(file_path)
+    size = path.stat().st_size
+    name = file_name or path.name
+    content_type = mime_type or mimetypes.guess_type(name)[0] or "application/octet-stream"
+    identify_code = str(uuid.uuid4())
+    use_chunks = uses_chunked_upload(size) if chunked is None else chunked
+
+    if not use_chunks:
+        data = {
+            "identifyCode": identify_code,
+            "name": name,
+            "chunk": "0",
+            "chunks": "1",
+            "size": str(size),
+        }
+        throttle_cloud_endpoint("file-upload")
+        with path.open("rb") as source:
+            response = requests.post(
+                url,
+                headers=dict(headers),
+                data=data,
+                files={"file": (name, source, content_type)},
+                timeout=timeout_seconds,
+            )
+        return _read_upload_payload(response, f"上传「{name}」")
+
+    chunks = plan_upload_chunks(size, chunk_bytes or DEFAULT_UPLOAD_CHUNK_BYTES)
+    total = len(chunks)
+    retries = DEFAULT_UPLOAD_PART_RETRIES if part_retries is None else max(0, part_retries)
+    part_timeout = timeout_seconds or DEFAULT_UPLOAD_PART_TIMEOUT_SECONDS
+    part_policy = RetryPolicy("file-upload-part", max_attempts=retries + 1, base_delay=0.5, max_delay=8.0)
+
+    def send_part(index: int) -> Dict[str, Any]:
+        offset, length = chunks[index]
+        with path.open("rb") as source:
+            source.seek(offset)
+            blob = source.read(length)
+        data = {
+            "identifyCode": identify_code,
+            "name": name,
+            "chunk": str(index),
+            "chunks": str(total),
+            "size": str(size),
+        }
+        operation = f"上传「{name}」第 {index + 1}/{total} 个分片"
+
+        def post_part() -> Dict[str, Any]:
+            throttle_cloud_endpoint("file-upload")
+            response = requests.post(
+                url,
+                headers=dict(headers),
+                data=data,
+                files={"file": (name, blob, content_type)},
+                timeout=part_timeout,
+            )
+            return _read_upload_payload(response, operation)
+
+        try:
+            return call_with_retry(post_part, policy=part_policy)
+        except requests.RequestException as exc:
+            raise ResourceUploadError(
+                f"{operation}失败（已重试 {retries} 次）：{exc}",
+                error_class=classify_exception(exc),
+            ) from exc
+
+    if total > 1:
+        workers = min(total - 1, max_workers or DEFAULT_UPLOAD_PART_CONCURRENCY)
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="resource-upload") as pool:
+            # list() 会在首个失败分片处抛出异常；其余分片仍会各自完成重试。
+            list(pool.map(send_part, range(total - 1)))
+    return send_part(total - 1)
@@ -0,0 +1,127 @@
+"""In-process stale-while-revalidate cache for slow, rarely changing upstream reads.
+
+Fresh entries are served directly. Entries past their TTL but inside the stale
+window are still served immediately while one background task refreshes them.
+Concurrent misses for the same key share a single upstream load.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+@dataclass
+class _CacheEntry:
+    value: Any
+    fresh_until: float
+    stale_until: float
+
+
+class StaleWhileRevalidateCache:
+    """Bounded LRU cache with a fresh TTL and a longer stale-serving window.
+
+    ``get(key, loader)`` returns the cached value when available and only awaits
+    ``loader`` on a miss. A failed background refresh keeps serving the stale
+    value; the next stale hit tries again.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl: float,
+        stale_ttl: float,
+        max_entries: int = 256,
+        name: str = "cache",
+    ) -> None:
+        self.ttl = max(0.0, float(ttl))
+        self.stale_ttl = max(self.ttl, float(stale_ttl))
+        self.max_entries = max(1, int(max_entries))
+        self.name = name
+        self._entries: "OrderedDict[Hashable, _CacheEntry]" = OrderedDict()
+        self._loading: Dict[Hashable, asyncio.Future] = {}
+        self._refreshes: set[asyncio.Task] = set()
+        self._hits = 0
+        self._stale_hits = 0
+        self._misses = 0
+        self._refresh_errors = 0
+
+    async def get(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None and now < entry.stale_until:
+            self._entries.move_to_end(key)
+            if now < entry.fresh_until:
+                self._hits += 1
+            else:
+                self._stale_hits += 1
+                self._schedule_refresh(key, loader)
+            return entry.value
+
+        self._misses += 1
+        return await self._load(key, loader)
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """Drop one key, or every key when ``key`` is None."""
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "entries": len(self._entries),
+            "hits": self._hits,
+            "staleHits": self._stale_hits,
+            "misses": self._misses,
+            "refreshErrors": self._refresh_errors,
+        }
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        pending = self._loading.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._loading[key] = future
+        try:
+            value = await loader()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # Waiters re-raise it; mark it retrieved for the no-waiter case.
+            future.exception()
+            raise
+        else:
+            self._store(key, value)
+            future.set_result(value)
+            return value
+        finally:
+            self._loading.pop(key, None)
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        now = time.monotonic()
+        self._entries[key] = _CacheEntry(value, now + self.ttl, now + self.stale_ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _schedule_refresh(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> None:
+        if key in self._loading:
+            return
+
+        async def refresh() -> None:
+            try:
+                await self._load(key, loader)
+            except Exception:
+                self._refresh_errors += 1
+
+        task = asyncio.create_task(refresh())
+        self._refreshes.add(task)
+        task.add_done_callback(self._refreshes.discard)
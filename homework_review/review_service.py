@@ -9,6 +9,7 @@ import os
 from pathlib import Path
 from typing import List, Optional
 
+from attempt_scheduling import attempt_statuses
 from homework_reviewer_v2 import (
     load_env_config,
     ensure_instance_context,
@@ -29,11 +30,19 @@ def parse_args():
     parser.add_argument("--local-parse", action="store_true")
     parser.add_argument("--skip-llm-files", default=None, help="JSON array of filenames to skip LLM validation")
     parser.add_argument("--file-groups", default=None, help="JSON object mapping group names to lists of filenames")
+    parser.add_argument("--file-priorities", default=None, help="JSON object mapping filenames to scheduling priority")
     parser.add_argument(
         "--compact-result",
         action="store_true",
         help="Return compact per-attempt metadata for large asynchronous jobs",
     )
+    parser.add_argument(
+        "--adaptive-attempts",
+        action="store_true",
+        help="Stop scheduling attempts for a file once its total score has converged",
+    )
+    parser.add_argument("--min-attempts", type=int, default=2, help="自适应模式下每份作业的最少评测次数")
+    parser.add_argument("--score-tolerance", type=float, default=1.0, help="总分均值 95%% 置信区间的半宽阈值（分）")
     return parser.parse_args()
 
 
@@ -57,8 +66,10 @@ def build_score_table(results: list, file_paths: list, attempts: int) -> dict:
             {
                 "name": "等级一_优秀_学生答案",
                 "full_mark": 100,
-                "total_scores": [85, 87, 86, null, 85],
-                "mean": 85.75,
+                "total_scores": [85, 87, 86, null, null],
+                "attempt_status": ["ok", "ok", "ok", "failed", "skipped"],
+                "skipped_attempts": 1,
+                "mean": 86.0,
                 "variance": 0.69,
                 "categories": [
                     { "name": "单项选择题", "total": 20, "scores": [18,18,...], "mean": 18.0, "variance": 0 }
@@ -87,8 +98,14 @@ def build_score_table(results: list, file_paths: list, attempts: int) -> dict:
     dim_order_by_label: dict = {}
     cat_order_by_label: dict = {}
     question_order_by_label: dict = {}  # 逐题评分顺序
+    skipped_by_label: dict = defaultdict(list)  # 自适应模式下跳过的测评序号
 
     for item in (results or []):
+        if item and item.get("skipped"):
+            fp = item.get("file_path", "")
+            label = label_by_path.get(fp, Path(fp).stem if fp else "未命名")
+            skipped_by_label[label].append(item.get("attempt_index", 0))
+            continue
         if not item or not item.get("success"):
             continue
         core = extract_core_data(item.get("result", {}))
@@ -212,10 +229,17 @@ def build_score_table(results: list, file_paths: list, attempts: int) -> dict:
                 "variance": d_var,
             })
 
+        skipped = skipped_by_label.get(label, [])
         students.append({
             "name": label,
             "full_mark": entry.get("full_mark", 100),
             "total_scores": ts,
+            "attempt_status": attempt_statuses(
+                attempts,
+                succeeded=[i for i, score in enumerate(ts, start=1) if score is not None],
+                skipped=skipped,
+            ),
+            "skipped_attempts": len(skipped),
             "mean": t_mean,
             "variance": t_var,
             "categories": cats,
@@ -272,6 +296,10 @@ def main():
                 local_parse=args.local_parse,
                 skip_llm_files=args.skip_llm_files,
                 file_groups=args.file_groups,
+                adaptive_attempts=args.adaptive_attempts,
+                min_attempts=args.min_attempts,
+                score_tolerance=args.score_tolerance,
+                file_priorities=args.file_priorities,
             )
         )
     except Exception as e:
@@ -299,7 +327,9 @@ def main():
                 "attempt_total": item.get("attempt_total", args.attempts),
                 "success": bool(item.get("success")),
             }
-            if not compact_item["success"]:
+            if item.get("skipped"):
+                compact_item["skipped"] = True
+            elif not compact_item["success"]:
                 compact_item["result"] = {"error": extract_failure_detail(item.get("result"))}
             compact_results.append(compact_item)
 
@@ -3,23 +3,82 @@
 from __future__ import annotations
 
 import base64
+import io
 import json
 import re
+import threading
 import zipfile
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Sequence
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
 
 try:
-    from .skill_review_service import CorrectionSkillError, validate_grading_skill_package
+    from .cloud_request_control import (
+        ERROR_CONNECT,
+        ERROR_SERVER,
+        ERROR_THROTTLED,
+        CircuitOpenError,
+        RetryPolicy,
+        call_with_retry,
+        get_circuit_breaker,
+    )
+    from .docx_text import DocxParagraph, iter_docx_blocks
+    from .docx_writer import TITLE_PLACEHOLDER, DocxTemplate, paragraph_properties, paragraph_xml, run_properties
+    from .json_stream import IncrementalObjectScanner, JsonArrayItem, JsonStreamError
+    from .pdf_text import iter_pdf_pages
+    from .skill_package_registry import package_digest
+    from .skill_review_service import CorrectionSkillError, validate_grading_skill_texts
 except ImportError:
-    from skill_review_service import CorrectionSkillError, validate_grading_skill_package
+    from cloud_request_control import (
+        ERROR_CONNECT,
+        ERROR_SERVER,
+        ERROR_THROTTLED,
+        CircuitOpenError,
+        RetryPolicy,
+        call_with_retry,
+        get_circuit_breaker,
+    )
+    from docx_text import DocxParagraph, iter_docx_blocks
+    from docx_writer import TITLE_PLACEHOLDER, DocxTemplate, paragraph_properties, paragraph_xml, run_properties
+    from json_stream import IncrementalObjectScanner, JsonArrayItem, JsonStreamError
+    from pdf_text import iter_pdf_pages
+    from skill_package_registry import package_digest
+    from skill_review_service import CorrectionSkillError, validate_grading_skill_texts
 
 
 DEFAULT_LLM_API_URL = "https://llm-service.polymas.com/api/openai/v1/chat/completions"
+# 连接阶段单独限时：服务不可达时很快失败，而不是等满整段生成的读超时
+LLM_CONNECT_TIMEOUT_SECONDS = 10
+# 生成可能持续数分钟，读超时后不再整段重试；只重试限流、5xx 和未建立的连接
+AGENTEVAL_LLM_RETRY_POLICY = RetryPolicy(
+    "AgentEval 大模型",
+    max_attempts=3,
+    base_delay=2.0,
+    max_delay=20.0,
+    retry_on=frozenset({ERROR_THROTTLED, ERROR_SERVER, ERROR_CONNECT}),
+)
 MAX_MATERIAL_CHARS_PER_FILE = 18_000
 MAX_MATERIAL_CONTEXT_CHARS = 60_000
+MATERIAL_EXTRACT_WORKERS = 4
+TRUNCATION_MARKER = "\n[内容已截断]"
+SAMPLE_GENERATION_MAX_WORKERS = 5
+SAMPLE_PER_LEVEL_MAX_TOKENS = 4_000
 SKILL_NAME_PATTERN = re.compile(r"^[a-z0-9]+(?:-[a-z0-9]+)*$")
 SUPPORTED_MATERIAL_SUFFIXES = {".txt", ".md", ".csv", ".docx", ".pdf", ".xlsx"}
+BLUEPRINT_VALIDATED_FIELDS = (
+    "skillName",
+    "displayName",
+    "description",
+    "submissionRequirement",
+    "scoreType",
+    "fullScore",
+    "scoreItems",
+    "workflow",
+    "missingRules",
+    "evaluationItems",
+)
 
 README_TEMPLATE = """# 批阅技能 · 文件结构说明
 
@@ -64,7 +123,19 @@ SAMPLE_LABEL_LEAK_PATTERNS = (
 
 
 class SkillGenerationError(RuntimeError):
-    """AgentEval LLM 生成或产物组装失败。"""
+    """AgentEval LLM 生成或产物组装失败；status_code 为大模型接口返回的 HTTP 状态码。"""
+
+    def __init__(self, message: str, *, status_code: Optional[int] = None) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class MaterialText(NamedTuple):
+    """单个材料的提取结果：规范化后的文本前缀、已读字符数，以及是否读完整个文件。"""
+
+    text: str
+    used: int
+    complete: bool
 
 
 def normalize_chat_completion_endpoint(api_url: str) -> str:
@@ -96,19 +167,15 @@ def _extract_llm_content(payload: Dict[str, Any]) -> str:
     raise SkillGenerationError("AgentEval 大模型响应内容为空")
 
 
-def call_agenteval_llm(
+def _agenteval_request(
     *,
     system_prompt: str,
     user_prompt: str,
     api_key: str,
     api_url: str,
     model: str,
-    max_tokens: int = 12_000,
-    timeout_seconds: int = 600,
-) -> str:
-    """调用 AgentEval 全局设置对应的 OpenAI 兼容接口。"""
-    import requests
-
+    max_tokens: int,
+) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
     endpoint = normalize_chat_completion_endpoint(api_url)
     normalized_model = model.strip()
     if not api_key.strip():
@@ -130,21 +197,61 @@ def call_agenteval_llm(
         ],
         "n": 1,
     }
+    return endpoint, headers, request_payload
+
+
+def _open_agenteval_response(endpoint: str, *, timeout_seconds: int, **kwargs: Any) -> Any:
+    """发送请求并返回状态正常的响应。
+
+    与 answer_generator、答案校验共用 "llm" 熔断器：大模型服务不可用时所有调用快速失败；
+    失败按 AGENTEVAL_LLM_RETRY_POLICY 分类后决定是否重试。
+    """
+    import requests
+
+    def send() -> Any:
+        response = requests.post(endpoint, timeout=(LLM_CONNECT_TIMEOUT_SECONDS, timeout_seconds), **kwargs)
+        if not response.ok:
+            preview = response.text[:1000]
+            response.close()
+            raise SkillGenerationError(
+                f"AgentEval 大模型请求失败（HTTP {response.status_code}）：{preview}",
+                status_code=response.status_code,
+            )
+        return response
+
     try:
-        response = requests.post(
-            endpoint,
-            headers=headers,
-            json=request_payload,
-            timeout=timeout_seconds,
-        )
+        return call_with_retry(send, policy=AGENTEVAL_LLM_RETRY_POLICY, breaker=get_circuit_breaker("llm"))
+    except CircuitOpenError as exc:
+        raise SkillGenerationError(f"AgentEval 大模型暂不可用，已暂停请求：{exc}") from exc
     except requests.RequestException as exc:
         raise SkillGenerationError(f"连接 AgentEval 大模型失败：{exc}") from exc
 
-    if not response.ok:
-        preview = response.text[:1000]
-        raise SkillGenerationError(
-            f"AgentEval 大模型请求失败（HTTP {response.status_code}）：{preview}"
-        )
+
+def call_agenteval_llm(
+    *,
+    system_prompt: str,
+    user_prompt: str,
+    api_key: str,
+    api_url: str,
+    model: str,
+    max_tokens: int = 12_000,
+    timeout_seconds: int = 600,
+) -> str:
+    """调用 AgentEval 全局设置对应的 OpenAI 兼容接口。"""
+    endpoint, headers, request_payload = _agenteval_request(
+        system_prompt=system_prompt,
+        user_prompt=user_prompt,
+        api_key=api_key,
+        api_url=api_url,
+        model=model,
+        max_tokens=max_tokens,
+    )
+    response = _open_agenteval_response(
+        endpoint,
+        headers=headers,
+        json=request_payload,
+        timeout_seconds=timeout_seconds,
+    )
     try:
         payload = response.json()
     except ValueError as exc:
@@ -152,6 +259,93 @@ def call_agenteval_llm(
     return _extract_llm_content(payload)
 
 
+def _stream_delta_text(payload: Dict[str, Any]) -> str:
+    if payload.get("error"):
+        raise SkillGenerationError(f"AgentEval 大模型流式输出中断：{payload['error']}")
+    choices = payload.get("choices")
+    if not isinstance(choices, list) or not choices or not isinstance(choices[0], dict):
+        return ""
+    delta = choices[0].get("delta") or choices[0].get("message") or {}
+    content = delta.get("content") if isinstance(delta, dict) else None
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(
+            item.get("text") or ""
+            for item in content
+            if isinstance(item, dict) and isinstance(item.get("text"), str)
+        )
+    return ""
+
+
+def stream_agenteval_llm(
+    *,
+    system_prompt: str,
+    user_prompt: str,
+    api_key: str,
+    api_url: str,
+    model: str,
+    max_tokens: int = 12_000,
+    timeout_seconds: int = 600,
+) -> Iterator[str]:
+    """以 SSE 流式调用 AgentEval 接口，逐段产出模型输出文本。
+
+    timeout_seconds 作用于相邻两段输出之间的等待（连接阶段另有较短时限）；调用方提前关闭生成器时
+    连接随之关闭，服务端停止生成。接口不支持流式而直接返回完整 JSON 时整段产出。
+    """
+    import requests
+
+    endpoint, headers, request_payload = _agenteval_request(
+        system_prompt=system_prompt,
+        user_prompt=user_prompt,
+        api_key=api_key,
+        api_url=api_url,
+        model=model,
+        max_tokens=max_tokens,
+    )
+    request_payload["stream"] = True
+    response = _open_agenteval_response(
+        endpoint,
+        headers=headers,
+        json=request_payload,
+        stream=True,
+        timeout_seconds=timeout_seconds,
+    )
+
+    try:
+        if "text/event-stream" not in response.headers.get("Content-Type", ""):
+            try:
+                payload = response.json()
+            except ValueError as exc:
+                raise SkillGenerationError("AgentEval 大模型返回了非 JSON 响应") from exc
+            yield _extract_llm_content(payload)
+            return
+
+        received = False
+        try:
+            for raw_line in response.iter_lines():
+                line = raw_line.decode("utf-8", errors="replace").strip()
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                try:
+                    payload = json.loads(data)
+                except json.JSONDecodeError:
+                    continue
+                text = _stream_delta_text(payload) if isinstance(payload, dict) else ""
+                if text:
+                    received = True
+                    yield text
+        except requests.RequestException as exc:
+            raise SkillGenerationError(f"AgentEval 大模型流式输出中断：{exc}") from exc
+        if not received:
+            raise SkillGenerationError("AgentEval 大模型响应内容为空")
+    finally:
+        response.close()
+
+
 def parse_json_object(text: str) -> Dict[str, Any]:
     cleaned = text.strip()
     fenced = re.search(r"```(?:json)?\s*([\s\S]*?)```", cleaned, re.I)
@@ -175,76 +369,240 @@ def parse_json_object(text: str) -> Dict[str, Any]:
 
 def _truncate_text(text: str, limit: int) -> str:
     normalized = text.replace("\x00", "").strip()
-    return normalized if len(normalized) <= limit else normalized[:limit] + "\n[内容已截断]"
+    return normalized if len(normalized) <= limit else normalized[:limit] + TRUNCATION_MARKER
 
 
-def _extract_docx_text(path: Path) -> str:
-    from docx import Document
+def _iter_text_lines(path: Path) -> Iterator[str]:
+    with path.open(encoding="utf-8-sig", errors="replace") as source:
+        for line in source:
+            yield line[:-1] if line.endswith("\n") else line
 
-    document = Document(str(path))
-    lines = [paragraph.text.strip() for paragraph in document.paragraphs if paragraph.text.strip()]
-    for table_index, table in enumerate(document.tables, start=1):
-        lines.append(f"[表格 {table_index}]")
-        for row in table.rows:
-            cells = [cell.text.strip().replace("\n", " ") for cell in row.cells]
-            lines.append("\t".join(cells))
-    return "\n".join(lines)
 
+def _iter_docx_lines(path: Path) -> Iterator[str]:
+    # 表格统一放在正文之后，与按块解析后再拼接的顺序一致
+    table_lines: List[str] = []
+    current_table = 0
+    for block in iter_docx_blocks(path):
+        if isinstance(block, DocxParagraph):
+            if block.text.strip():
+                yield block.text.strip()
+            continue
+        if block.table_index != current_table:
+            current_table = block.table_index
+            table_lines.append(f"[表格 {current_table}]")
+        table_lines.append("\t".join(cell.strip().replace("\n", " ") for cell in block.cells))
+    yield from table_lines
 
-def _extract_pdf_text(path: Path) -> str:
-    import fitz
 
-    document = fitz.open(str(path))
-    try:
-        return "\n".join(page.get_text("text") for page in document)
-    finally:
-        document.close()
-
-
-def _extract_xlsx_text(path: Path) -> str:
+def _iter_xlsx_lines(path: Path) -> Iterator[str]:
     from openpyxl import load_workbook
 
     workbook = load_workbook(path, read_only=True, data_only=True)
-    lines: List[str] = []
     try:
         for sheet in workbook.worksheets:
-            lines.append(f"[工作表：{sheet.title}]")
+            yield f"[工作表：{sheet.title}]"
             for row_index, row in enumerate(sheet.iter_rows(values_only=True), start=1):
                 values = ["" if value is None else str(value) for value in row]
                 if any(value.strip() for value in values):
-                    lines.append("\t".join(values))
+                    yield "\t".join(values)
                 if row_index >= 300:
-                    lines.append("[工作表内容已截断]")
+                    yield "[工作表内容已截断]"
                     break
     finally:
         workbook.close()
-    return "\n".join(lines)
 
 
-def extract_material_text(path: Path) -> str:
+def _material_suffix(path: Path) -> str:
     suffix = path.suffix.lower()
     if suffix not in SUPPORTED_MATERIAL_SUFFIXES:
         raise SkillGenerationError(f"课程材料暂不支持 {suffix or '未知'} 格式")
+    return suffix
+
+
+def _iter_material_lines(path: Path) -> Iterator[str]:
+    suffix = _material_suffix(path)
     if suffix in {".txt", ".md", ".csv"}:
-        text = path.read_text(encoding="utf-8-sig", errors="replace")
-    elif suffix == ".docx":
-        text = _extract_docx_text(path)
-    elif suffix == ".pdf":
-        text = _extract_pdf_text(path)
-    else:
-        text = _extract_xlsx_text(path)
-    return _truncate_text(text, MAX_MATERIAL_CHARS_PER_FILE)
+        return _iter_text_lines(path)
+    if suffix == ".docx":
+        return _iter_docx_lines(path)
+    if suffix == ".pdf":
+        return iter_pdf_pages(path)
+    return _iter_xlsx_lines(path)
 
 
-def build_material_context(material_paths: Sequence[Path], material_text: str) -> str:
+def _read_material(path: Path, keep_reading: Callable[[int], bool]) -> MaterialText:
+    """逐行读取材料，keep_reading 返回 False 时停止解析后续内容。
+
+    已读字符数按每行去掉空字符与首尾空白后的长度累计，不超过最终规范化文本的长度，
+    因此停止时已读前缀足以覆盖不大于该字符数的任何截断额度。
+    """
+    lines: List[str] = []
+    used = 0
+    complete = True
+    line_iter = _iter_material_lines(path)
+    try:
+        for line in line_iter:
+            lines.append(line)
+            used += len(line.replace("\x00", "").strip())
+            if not keep_reading(used):
+                complete = False
+                break
+    finally:
+        close = getattr(line_iter, "close", None)
+        if close is not None:
+            close()
+    # 只保留单文件上限多一个字符的前缀：足以判断是否需要截断，也限制缓存占用
+    text = "\n".join(lines).replace("\x00", "").strip()[:MAX_MATERIAL_CHARS_PER_FILE + 1]
+    return MaterialText(text=text, used=used, complete=complete)
+
+
+def extract_material_text(path: Path) -> str:
+    material = _read_material(path, lambda used: used <= MAX_MATERIAL_CHARS_PER_FILE)
+    return _truncate_text(material.text, MAX_MATERIAL_CHARS_PER_FILE)
+
+
+def _fair_shares(demands: Sequence[float], total: int) -> List[int]:
+    """最大最小公平分配：需求小于均分额度的材料全额保留，剩余额度继续均分给其余材料。"""
+    shares = [0] * len(demands)
+    remaining = max(0, total)
+    order = sorted(range(len(demands)), key=lambda index: demands[index])
+    for position, index in enumerate(order):
+        share = int(min(demands[index], remaining // (len(order) - position)))
+        shares[index] = share
+        remaining -= share
+    return shares
+
+
+class MaterialTextCache:
+    """按“文件内容哈希 + 格式”缓存材料的提取结果。
+
+    同一批课程材料重复生成 Skill 时直接复用已提取的文本。提前停止的结果只保存已读前缀，
+    若本次分配的额度超过该前缀，则重新解析该文件。生成流程在线程中执行，因此读写都加锁。
+    """
+
+    def __init__(self, max_entries: int = 256) -> None:
+        self.max_entries = max(1, int(max_entries))
+        self._entries: "OrderedDict[Tuple[str, str], MaterialText]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def key(path: Path) -> Tuple[str, str]:
+        return package_digest(str(path)), path.suffix.lower()
+
+    def get(self, key: Tuple[str, str]) -> Optional[MaterialText]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: Tuple[str, str], material: MaterialText) -> None:
+        with self._lock:
+            current = self._entries.get(key)
+            if current is None or current.used <= material.used or material.complete:
+                self._entries[key] = material
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class _MaterialBudget:
+    """多个材料共享的上下文字符预算。
+
+    记录每个材料已读的字符数；某个材料在其他材料保持当前进度时所能分到的公平额度，
+    是它最终额度的上界（其他材料只会越读越多），已读超过该上界即可停止解析。
+    """
+
+    def __init__(self, count: int, total: int) -> None:
+        self.total = total
+        self._used = [0] * count
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def report(self, index: int, used: int) -> bool:
+        """登记第 index 个材料已读的字符数，返回是否仍需继续解析。"""
+        with self._lock:
+            self._used[index] = max(self._used[index], used)
+            if self._closed or used > MAX_MATERIAL_CHARS_PER_FILE:
+                return False
+            demands: List[float] = [min(value, MAX_MATERIAL_CHARS_PER_FILE) for value in self._used]
+            demands[index] = MAX_MATERIAL_CHARS_PER_FILE
+            return used <= _fair_shares(demands, self.total)[index]
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+
+
+def _extract_materials_within_budget(
+    material_paths: Sequence[Path],
+    total: int,
+    cache: Optional[MaterialTextCache],
+) -> List[str]:
+    """并发提取多个材料，在共享预算用尽后提前停止，并按公平额度截断每个材料。"""
+    budget = _MaterialBudget(len(material_paths), total)
+    materials: List[Optional[MaterialText]] = [None] * len(material_paths)
+    keys: List[Optional[Tuple[str, str]]] = [None] * len(material_paths)
+    if cache is not None:
+        for index, path in enumerate(material_paths):
+            keys[index] = cache.key(path)
+            materials[index] = cache.get(keys[index])
+            if materials[index] is not None:
+                budget.report(index, materials[index].used)
+    # 先登记全部缓存结果再判断：缓存的前缀若已超过当前额度上界，就无需重新解析
+    pending = [
+        index
+        for index, material in enumerate(materials)
+        if material is None or (not material.complete and budget.report(index, material.used))
+    ]
+
+    def read(index: int) -> MaterialText:
+        return _read_material(material_paths[index], lambda used: budget.report(index, used))
+
+    if pending:
+        workers = max(1, min(MATERIAL_EXTRACT_WORKERS, len(pending)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="skill-material") as pool:
+            futures = [(index, pool.submit(read, index)) for index in pending]
+            try:
+                for index, future in futures:
+                    materials[index] = future.result()
+                    if cache is not None:
+                        cache.put(keys[index], materials[index])
+            except BaseException:
+                budget.close()
+                raise
+
+    demands = [min(len(material.text), MAX_MATERIAL_CHARS_PER_FILE) for material in materials]
+    shares = _fair_shares(demands, total)
+    return [_truncate_text(material.text, share) for material, share in zip(materials, shares)]
+
+
+def build_material_context(
+    material_paths: Sequence[Path],
+    material_text: str,
+    *,
+    material_cache: Optional[MaterialTextCache] = None,
+) -> str:
     sections: List[str] = []
     if material_text.strip():
         sections.append("【教师补充说明】\n" + _truncate_text(material_text, 20_000))
-    for index, path in enumerate(material_paths, start=1):
-        extracted = extract_material_text(path)
-        sections.append(
-            f"【材料 {index}｜文件名：{path.name}｜格式：{path.suffix.lower()}】\n{extracted}"
-        )
+    headers = [
+        f"【材料 {index}｜文件名：{path.name}｜格式：{_material_suffix(path)}】"
+        for index, path in enumerate(material_paths, start=1)
+    ]
+    # 扣除补充说明、材料标题、分隔符与截断标记后，剩余额度在材料之间公平分配
+    overhead = sum(len(section) for section in sections)
+    overhead += sum(len(header) + 1 + len(TRUNCATION_MARKER) for header in headers)
+    overhead += 2 * max(0, len(sections) + len(headers) - 1)
+    texts = _extract_materials_within_budget(
+        material_paths,
+        MAX_MATERIAL_CONTEXT_CHARS - overhead,
+        material_cache,
+    )
+    sections.extend(f"{header}\n{text}" for header, text in zip(headers, texts))
     context = "\n\n".join(sections).strip()
     if not context:
         raise SkillGenerationError("请上传课程材料或填写教师补充说明")
@@ -257,64 +615,92 @@ def _string_list(value: Any) -> List[str]:
     return [str(item).strip() for item in value if str(item).strip()]
 
 
-def validate_skill_blueprint(blueprint: Dict[str, Any]) -> List[str]:
+def _score_item_errors(index: int, item: Any) -> List[str]:
+    if not isinstance(item, dict):
+        return [f"scoreItems[{index}] 不是对象"]
     errors: List[str] = []
-    skill_name = str(blueprint.get("skillName") or "").strip()
-    if not SKILL_NAME_PATTERN.fullmatch(skill_name) or len(skill_name) > 64:
-        errors.append("skillName 必须为不超过64字符的小写英文连字符名称")
-    if len(str(blueprint.get("displayName") or "").strip()) < 4:
-        errors.append("displayName 需要是清晰的教师端中文批阅名称")
-    if len(str(blueprint.get("description") or "").strip()) < 30:
-        errors.append("description 过短")
-    if len(str(blueprint.get("submissionRequirement") or "").strip()) < 40:
-        errors.append("submissionRequirement 过短")
-
-    score_type = str(blueprint.get("scoreType") or "").strip().lower()
-    if score_type not in {"dimension", "item"}:
-        errors.append("scoreType 仅支持 dimension 或 item")
+    if not str(item.get("name") or "").strip():
+        errors.append(f"scoreItems[{index}] 缺少 name")
+    try:
+        score = int(item.get("score"))
+    except (TypeError, ValueError):
+        score = 0
+    if score <= 0:
+        errors.append(f"scoreItems[{index}] score 必须为正整数")
+    if len(str(item.get("description") or "").strip()) < 8:
+        errors.append(f"scoreItems[{index}] description 过短")
+    if not _string_list(item.get("rules")):
+        errors.append(f"scoreItems[{index}] 缺少 rules")
+    return errors
+
+
+def _full_score(value: Any) -> int:
     try:
-        full_score = int(blueprint.get("fullScore"))
+        return int(value)
     except (TypeError, ValueError):
-        full_score = 0
-    if full_score <= 0:
-        errors.append("fullScore 必须为正整数")
+        return 0
 
+
+def _score_total_errors(blueprint: Dict[str, Any]) -> List[str]:
+    full_score = _full_score(blueprint.get("fullScore"))
     score_items = blueprint.get("scoreItems")
-    if not isinstance(score_items, list) or not score_items:
-        errors.append("scoreItems 至少包含一项")
-    else:
-        total = 0
-        for index, item in enumerate(score_items, start=1):
-            if not isinstance(item, dict):
-                errors.append(f"scoreItems[{index}] 不是对象")
-                continue
-            if not str(item.get("name") or "").strip():
-                errors.append(f"scoreItems[{index}] 缺少 name")
-            try:
-                score = int(item.get("score"))
-            except (TypeError, ValueError):
-                score = 0
-            if score <= 0:
-                errors.append(f"scoreItems[{index}] score 必须为正整数")
-            total += score
-            if len(str(item.get("description") or "").strip()) < 8:
-                errors.append(f"scoreItems[{index}] description 过短")
-            if not _string_list(item.get("rules")):
-                errors.append(f"scoreItems[{index}] 缺少 rules")
-        if full_score and total != full_score:
-            errors.append(f"scoreItems 分值合计 {total}，应为 {full_score}")
-
-    if len(_string_list(blueprint.get("workflow"))) < 3:
-        errors.append("workflow 至少需要3步")
-    if not _string_list(blueprint.get("missingRules")):
-        errors.append("missingRules 不能为空")
-    evaluation_names = {
-        str(item.get("name") or "").strip()
-        for item in blueprint.get("evaluationItems", [])
-        if isinstance(item, dict)
-    }
-    if not {"综合评语", "改进建议"}.issubset(evaluation_names):
-        errors.append("evaluationItems 必须包含综合评语和改进建议")
+    if not full_score or not isinstance(score_items, list) or not score_items:
+        return []
+    total = 0
+    for item in score_items:
+        if isinstance(item, dict):
+            total += _full_score(item.get("score"))
+    return [f"scoreItems 分值合计 {total}，应为 {full_score}"] if total != full_score else []
+
+
+def _blueprint_field_errors(key: str, value: Any) -> List[str]:
+    """单个顶层字段的校验；流式生成时字段一完整即可调用。"""
+    if key == "skillName":
+        skill_name = str(value or "").strip()
+        if not SKILL_NAME_PATTERN.fullmatch(skill_name) or len(skill_name) > 64:
+            return ["skillName 必须为不超过64字符的小写英文连字符名称"]
+    elif key == "displayName":
+        if len(str(value or "").strip()) < 4:
+            return ["displayName 需要是清晰的教师端中文批阅名称"]
+    elif key == "description":
+        if len(str(value or "").strip()) < 30:
+            return ["description 过短"]
+    elif key == "submissionRequirement":
+        if len(str(value or "").strip()) < 40:
+            return ["submissionRequirement 过短"]
+    elif key == "scoreType":
+        if str(value or "").strip().lower() not in {"dimension", "item"}:
+            return ["scoreType 仅支持 dimension 或 item"]
+    elif key == "fullScore":
+        if _full_score(value) <= 0:
+            return ["fullScore 必须为正整数"]
+    elif key == "scoreItems":
+        if not isinstance(value, list) or not value:
+            return ["scoreItems 至少包含一项"]
+        return [error for index, item in enumerate(value, start=1) for error in _score_item_errors(index, item)]
+    elif key == "workflow":
+        if len(_string_list(value)) < 3:
+            return ["workflow 至少需要3步"]
+    elif key == "missingRules":
+        if not _string_list(value):
+            return ["missingRules 不能为空"]
+    elif key == "evaluationItems":
+        names = {
+            str(item.get("name") or "").strip()
+            for item in (value if isinstance(value, list) else [])
+            if isinstance(item, dict)
+        }
+        if not {"综合评语", "改进建议"}.issubset(names):
+            return ["evaluationItems 必须包含综合评语和改进建议"]
+    return []
+
+
+def validate_skill_blueprint(blueprint: Dict[str, Any]) -> List[str]:
+    errors: List[str] = []
+    for key in BLUEPRINT_VALIDATED_FIELDS:
+        errors.extend(_blueprint_field_errors(key, blueprint.get(key)))
+        if key == "scoreItems":
+            errors.extend(_score_total_errors(blueprint))
     return errors
 
 
@@ -362,6 +748,101 @@ JSON 结构：
 {material_context}{feedback_section}"""
 
 
+BLUEPRINT_FIELD_LABELS = {
+    "skillName": "Skill 名称",
+    "displayName": "显示名称",
+    "description": "Skill 描述",
+    "submissionRequirement": "学生提交要求",
+    "scoreType": "评分方式",
+    "fullScore": "总分",
+    "itemSplit": "拆项说明",
+    "scoreItems": "全部评分项",
+    "workflow": "批阅流程",
+    "evidenceRules": "证据规则",
+    "missingRules": "缺项规则",
+    "courseRules": "课程规则",
+    "calibrationNotes": "校准说明",
+    "evaluationItems": "评价项",
+}
+SKILL_BLUEPRINT_SYSTEM_PROMPT = (
+    "你是作业批阅 Skill 架构师。严格依据用户材料生成可复核评分蓝图，"
+    "保护学生隐私，输出必须是单一 JSON 对象。"
+)
+
+
+class BlueprintStreamCheck:
+    """流式生成时的增量校验：顶层字段或评分项一输出完整就校验，发现问题即可中止本次生成。
+
+    只做与 validate_skill_blueprint 相同的逐字段检查；字段缺失等整体问题仍由
+    输出结束后的完整校验判定。
+    """
+
+    def __init__(self, on_progress: Optional[Callable[[str], None]] = None) -> None:
+        self.scanner = IncrementalObjectScanner()
+        self.fields: Dict[str, Any] = {}
+        self.errors: List[str] = []
+        self.on_progress = on_progress
+
+    def feed(self, chunk: str) -> List[str]:
+        """追加一段模型输出，返回本段新发现的校验问题。"""
+        try:
+            events = self.scanner.feed(chunk)
+        except JsonStreamError as exc:
+            self.errors.append(f"大模型 JSON 解析失败：{exc}")
+            return self.errors
+        for event in events:
+            if isinstance(event, JsonArrayItem):
+                if event.key != "scoreItems":
+                    continue
+                errors = _score_item_errors(event.index + 1, event.value)
+                if not errors and isinstance(event.value, dict):
+                    self._progress(f"已生成评分项 {event.index + 1}：{str(event.value.get('name')).strip()}")
+            else:
+                self.fields[event.key] = event.value
+                errors = _blueprint_field_errors(event.key, event.value)
+                if event.key in ("fullScore", "scoreItems") and {"fullScore", "scoreItems"} <= self.fields.keys():
+                    errors = errors or _score_total_errors(self.fields)
+                if not errors and event.key in BLUEPRINT_FIELD_LABELS:
+                    self._progress(f"已生成{BLUEPRINT_FIELD_LABELS[event.key]}")
+            if errors:
+                self.errors.extend(errors)
+                return self.errors
+        return []
+
+    def _progress(self, message: str) -> None:
+        if self.on_progress:
+            self.on_progress(message)
+
+
+def _stream_skill_blueprint_text(
+    *,
+    user_prompt: str,
+    api_key: str,
+    api_url: str,
+    model: str,
+    on_progress: Optional[Callable[[str], None]],
+) -> Tuple[str, List[str]]:
+    """流式取得蓝图输出；返回（已收到的文本, 增量校验发现的问题），有问题时已提前中止。"""
+    check = BlueprintStreamCheck(on_progress)
+    parts: List[str] = []
+    chunks = stream_agenteval_llm(
+        system_prompt=SKILL_BLUEPRINT_SYSTEM_PROMPT,
+        user_prompt=user_prompt,
+        api_key=api_key,
+        api_url=api_url,
+        model=model,
+    )
+    try:
+        for chunk in chunks:
+            parts.append(chunk)
+            errors = check.feed(chunk)
+            if errors:
+                return "".join(parts), errors
+    finally:
+        chunks.close()
+    return "".join(parts), []
+
+
 def generate_skill_blueprint(
     *,
     material_context: str,
@@ -369,30 +850,53 @@ def generate_skill_blueprint(
     api_url: str,
     model: str,
     max_attempts: int = 2,
+    stream: bool = False,
+    on_progress: Optional[Callable[[str], None]] = None,
 ) -> Dict[str, Any]:
+    """生成并校验 Skill 蓝图，未通过校验时带着问题重新生成。
+
+    stream=True 时流式接收模型输出并增量校验，字段出错即中止本次生成进入重试，
+    同时通过 on_progress 报告进度；最终结果仍以完整解析与校验为准。
+    """
     feedback = ""
     last_error = ""
-    for _ in range(max(1, max_attempts)):
-        response_text = call_agenteval_llm(
-            system_prompt=(
-                "你是作业批阅 Skill 架构师。严格依据用户材料生成可复核评分蓝图，"
-                "保护学生隐私，输出必须是单一 JSON 对象。"
-            ),
-            user_prompt=build_skill_blueprint_prompt(material_context, feedback),
-            api_key=api_key,
-            api_url=api_url,
-            model=model,
-        )
-        try:
-            blueprint = parse_json_object(response_text)
-            errors = validate_skill_blueprint(blueprint)
-        except SkillGenerationError as exc:
-            errors = [str(exc)]
-            blueprint = {}
+    attempts = max(1, max_attempts)
+    for attempt in range(1, attempts + 1):
+        user_prompt = build_skill_blueprint_prompt(material_context, feedback)
+        early_errors: List[str] = []
+        if stream:
+            if on_progress:
+                on_progress(f"正在生成 Skill 蓝图（第 {attempt}/{attempts} 次）")
+            response_text, early_errors = _stream_skill_blueprint_text(
+                user_prompt=user_prompt,
+                api_key=api_key,
+                api_url=api_url,
+                model=model,
+                on_progress=on_progress,
+            )
+        else:
+            response_text = call_agenteval_llm(
+                system_prompt=SKILL_BLUEPRINT_SYSTEM_PROMPT,
+                user_prompt=user_prompt,
+                api_key=api_key,
+                api_url=api_url,
+                model=model,
+            )
+        if early_errors:
+            errors = early_errors
+        else:
+            try:
+                blueprint = parse_json_object(response_text)
+                errors = validate_skill_blueprint(blueprint)
+            except SkillGenerationError as exc:
+                errors = [str(exc)]
+                blueprint = {}
         if not errors:
             return blueprint
         last_error = "；".join(errors)
         feedback = last_error
+        if stream and on_progress and attempt < attempts:
+            on_progress(f"Skill 蓝图未通过校验，正在重新生成：{last_error}")
     raise SkillGenerationError(f"大模型生成的 Skill 蓝图未通过校验：{last_error}")
 
 
@@ -574,53 +1078,76 @@ def render_course_rules_reference(blueprint: Dict[str, Any]) -> str:
 def build_grading_skill_zip(
     *,
     blueprint: Dict[str, Any],
-    output_dir: Path,
+    output_dir: Optional[Path] = None,
 ) -> Dict[str, Any]:
-    output_dir.mkdir(parents=True, exist_ok=True)
+    """在内存中渲染并打包技能 ZIP，返回 zipBytes 与 zipBase64。
+
+    只有传入 output_dir 时才把 ZIP 写入磁盘，并额外返回 zipPath。
+    """
     skill_name = str(blueprint["skillName"]).strip()
-    skill_dir = output_dir / skill_name
-    references_dir = skill_dir / "references"
-    references_dir.mkdir(parents=True, exist_ok=True)
-    (skill_dir / "README.md").write_text(README_TEMPLATE, encoding="utf-8")
-    (skill_dir / "SKILL.md").write_text(render_skill_markdown(blueprint), encoding="utf-8")
-    (references_dir / "course-rules.md").write_text(
-        render_course_rules_reference(blueprint),
-        encoding="utf-8",
-    )
+    skill_text = render_skill_markdown(blueprint)
+    # 结构由本函数决定，只需校验渲染出的模板文本，不必再把打好的 ZIP 重新解析一遍
+    package_info: Dict[str, Any] = validate_grading_skill_texts(skill_name, skill_text, README_TEMPLATE)
+    files = {
+        "README.md": README_TEMPLATE,
+        "SKILL.md": skill_text,
+        "references/course-rules.md": render_course_rules_reference(blueprint),
+    }
 
-    zip_path = output_dir / f"{skill_name}.zip"
-    with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
-        for path in sorted(skill_dir.rglob("*")):
-            if path.is_file():
-                archive.write(path, Path(skill_name) / path.relative_to(skill_dir))
-    package_info = validate_grading_skill_package(str(zip_path))
-    return {
-        "zipPath": str(zip_path),
-        "zipFileName": zip_path.name,
+    buffer = io.BytesIO()
+    uncompressed_size = 0
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for relative_path, text in sorted(files.items()):
+            data = text.encode("utf-8")
+            archive.writestr(f"{skill_name}/{relative_path}", data)
+            uncompressed_size += len(data)
+    zip_bytes = buffer.getvalue()
+    package_info.update(fileCount=len(files), uncompressedBytes=uncompressed_size)
+
+    zip_file_name = f"{skill_name}.zip"
+    result: Dict[str, Any] = {
+        "zipFileName": zip_file_name,
+        "zipBytes": zip_bytes,
+        "zipBase64": base64.b64encode(zip_bytes).decode("ascii"),
         "skillName": skill_name,
         "displayName": str(blueprint["displayName"]).strip(),
         "description": str(blueprint["description"]).strip(),
         "submissionRequirement": str(blueprint["submissionRequirement"]).strip(),
         "package": package_info,
     }
+    if output_dir is not None:
+        output_dir.mkdir(parents=True, exist_ok=True)
+        zip_path = output_dir / zip_file_name
+        zip_path.write_bytes(zip_bytes)
+        result["zipPath"] = str(zip_path)
+    return result
 
 
 def generate_grading_skill_zip(
     *,
     material_paths: Sequence[Path],
     material_text: str,
-    output_dir: Path,
     api_key: str,
     api_url: str,
     model: str,
+    output_dir: Optional[Path] = None,
+    material_cache: Optional[MaterialTextCache] = None,
+    stream: bool = False,
+    on_progress: Optional[Callable[[str], None]] = None,
 ) -> Dict[str, Any]:
-    material_context = build_material_context(material_paths, material_text)
+    if on_progress:
+        on_progress("正在读取课程材料")
+    material_context = build_material_context(material_paths, material_text, material_cache=material_cache)
     blueprint = generate_skill_blueprint(
         material_context=material_context,
         api_key=api_key,
         api_url=api_url,
         model=model,
+        stream=stream,
+        on_progress=on_progress,
     )
+    if on_progress:
+        on_progress("正在打包 Skill")
     result = build_grading_skill_zip(blueprint=blueprint, output_dir=output_dir)
     result["blueprint"] = blueprint
     return result
@@ -648,7 +1175,9 @@ def build_student_samples_prompt(
     submission_requirement: str,
     levels: Sequence[tuple[str, str]],
     validation_feedback: str = "",
+    target_index: Optional[int] = None,
 ) -> str:
+    """levels 为完整档位梯度；给出 target_index（从 1 开始）时只请求该位置的一份样例。"""
     level_text = "\n".join(
         f"- 样例 {index}：内部目标档位为{level}；质量特征：{description}"
         for index, (level, description) in enumerate(levels, start=1)
@@ -658,7 +1187,18 @@ def build_student_samples_prompt(
         if validation_feedback
         else ""
     )
-    return f"""请为以下作业要求生成 {len(levels)} 份彼此独立的简单学生作业测试样例。
+    if target_index is None:
+        count = len(levels)
+        scope = f"请为以下作业要求生成 {count} 份彼此独立的简单学生作业测试样例。"
+        order_note = "顺序与内部测试档位顺序一致。"
+    else:
+        count = 1
+        scope = (
+            f"以下作业要求共需 {len(levels)} 份不同档位的学生作业测试样例，其余样例由其他请求分别生成。"
+            f"本次只生成样例 {target_index}，其内部目标档位为{levels[target_index - 1][0]}。"
+        )
+        order_note = f"这份作业的完成质量须符合样例 {target_index} 在档位梯度中的位置，与相邻档位拉开差距。"
+    return f"""{scope}
 
 【作业标题】
 {assignment_title or '课程作业'}
@@ -689,7 +1229,7 @@ JSON 结构：
   ]
 }}
 
-assignments 数量必须恰好为 {len(levels)}，顺序与内部测试档位顺序一致。{feedback_section}"""
+assignments 数量必须恰好为 {count}，{order_note}{feedback_section}"""
 
 
 def _normalize_student_sample_blueprints(
@@ -697,13 +1237,14 @@ def _normalize_student_sample_blueprints(
     *,
     assignment_title: str,
     expected_count: int,
+    first_index: int = 1,
 ) -> List[Dict[str, Any]]:
     assignments = payload.get("assignments")
     if not isinstance(assignments, list) or len(assignments) != expected_count:
         raise SkillGenerationError(f"大模型应返回 {expected_count} 份学生作业")
 
     normalized: List[Dict[str, Any]] = []
-    for index, item in enumerate(assignments, start=1):
+    for index, item in enumerate(assignments, start=first_index):
         if not isinstance(item, dict):
             raise SkillGenerationError(f"第 {index} 份学生作业格式错误")
         title = str(item.get("title") or assignment_title or "课程作业").strip()
@@ -739,7 +1280,7 @@ def _normalize_student_sample_blueprints(
     return normalized
 
 
-def generate_student_sample_blueprints(
+def _request_student_samples(
     *,
     assignment_title: str,
     submission_requirement: str,
@@ -747,7 +1288,9 @@ def generate_student_sample_blueprints(
     api_key: str,
     api_url: str,
     model: str,
-    max_attempts: int = 2,
+    max_attempts: int,
+    max_tokens: int,
+    target_index: Optional[int] = None,
 ) -> List[Dict[str, Any]]:
     feedback = ""
     last_error = ""
@@ -762,18 +1305,20 @@ def generate_student_sample_blueprints(
                 submission_requirement=submission_requirement,
                 levels=levels,
                 validation_feedback=feedback,
+                target_index=target_index,
             ),
             api_key=api_key,
             api_url=api_url,
             model=model,
-            max_tokens=10_000,
+            max_tokens=max_tokens,
         )
         try:
             payload = parse_json_object(response_text)
             return _normalize_student_sample_blueprints(
                 payload,
                 assignment_title=assignment_title,
-                expected_count=len(levels),
+                expected_count=len(levels) if target_index is None else 1,
+                first_index=target_index or 1,
             )
         except SkillGenerationError as exc:
             last_error = str(exc)
@@ -781,23 +1326,66 @@ def generate_student_sample_blueprints(
     raise SkillGenerationError(f"大模型生成的学生作业未通过校验：{last_error}")
 
 
-def _set_run_font(run: Any, *, latin: str = "PingFang SC", east_asia: str = "PingFang SC", size: int = 11) -> None:
-    from docx.oxml.ns import qn
-    from docx.shared import Pt
+def generate_student_sample_blueprints(
+    *,
+    assignment_title: str,
+    submission_requirement: str,
+    levels: Sequence[tuple[str, str]],
+    api_key: str,
+    api_url: str,
+    model: str,
+    max_attempts: int = 2,
+) -> List[Dict[str, Any]]:
+    """一次请求生成全部档位；任一份未通过校验时整批重新生成。"""
+    return _request_student_samples(
+        assignment_title=assignment_title,
+        submission_requirement=submission_requirement,
+        levels=levels,
+        api_key=api_key,
+        api_url=api_url,
+        model=model,
+        max_attempts=max_attempts,
+        max_tokens=10_000,
+    )
+
+
+def generate_student_sample_blueprint_for_level(
+    *,
+    assignment_title: str,
+    submission_requirement: str,
+    levels: Sequence[tuple[str, str]],
+    index: int,
+    api_key: str,
+    api_url: str,
+    model: str,
+    max_attempts: int = 2,
+) -> Dict[str, Any]:
+    """只生成档位梯度中第 index 份（从 1 开始）样例；提示词仍给出完整梯度，未通过校验时仅重试该份。"""
+    return _request_student_samples(
+        assignment_title=assignment_title,
+        submission_requirement=submission_requirement,
+        levels=levels,
+        api_key=api_key,
+        api_url=api_url,
+        model=model,
+        max_attempts=max_attempts,
+        max_tokens=SAMPLE_PER_LEVEL_MAX_TOKENS,
+        target_index=index,
+    )[0]
 
-    run.font.name = latin
-    run.font.size = Pt(size)
-    run._element.get_or_add_rPr().rFonts.set(qn("w:ascii"), latin)
-    run._element.get_or_add_rPr().rFonts.set(qn("w:hAnsi"), latin)
-    run._element.get_or_add_rPr().rFonts.set(qn("w:eastAsia"), east_asia)
-    run._element.get_or_add_rPr().rFonts.set(qn("w:cs"), east_asia)
-    run._element.get_or_add_rPr().rFonts.set(qn("w:hint"), "eastAsia")
 
+STUDENT_SAMPLE_FONTS = ("PingFang SC", "PingFang SC")
+_SAMPLE_TITLE_PPR = paragraph_properties(style_id="StudentSampleTitle", align="center")
+_SAMPLE_TITLE_RPR = run_properties(fonts=STUDENT_SAMPLE_FONTS, bold=True, color="1F4D78", size=20)
+_SAMPLE_HEADING_PPR = paragraph_properties(style_id="Heading1")
+_SAMPLE_BODY_PPR = paragraph_properties(space_before=0, space_after=6, line_spacing=1.25)
+_SAMPLE_BODY_RPR = run_properties(fonts=STUDENT_SAMPLE_FONTS, size=11)
 
-def create_student_sample_docx(sample: Dict[str, Any], output_path: Path) -> None:
-    """使用 compact_reference_guide 风格生成简单、稳定的学生 DOCX。"""
+
+@lru_cache(maxsize=1)
+def _student_sample_template() -> DocxTemplate:
+    """compact_reference_guide 风格的页面与样式，只用 python-docx 渲染一次。"""
     from docx import Document
-    from docx.enum.text import WD_ALIGN_PARAGRAPH
     from docx.enum.style import WD_STYLE_TYPE
     from docx.oxml.ns import qn
     from docx.shared import Inches, Pt, RGBColor
@@ -854,27 +1442,34 @@ def create_student_sample_docx(sample: Dict[str, Any], output_path: Path) -> Non
     title_style.paragraph_format.space_after = Pt(14)
     title_style.paragraph_format.keep_with_next = True
 
-    title_paragraph = document.add_paragraph(style="Student Sample Title")
-    title_paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    title_run = title_paragraph.add_run(str(sample.get("title") or "课程作业"))
-    _set_run_font(title_run, size=20)
-    title_run.bold = True
-    title_run.font.color.rgb = RGBColor(31, 77, 120)
+    document.core_properties.title = TITLE_PLACEHOLDER
+    document.core_properties.author = ""
+    document.core_properties.last_modified_by = ""
+    return DocxTemplate.from_document(document)
+
 
+def create_student_sample_docx(sample: Dict[str, Any], output_path: Path) -> None:
+    """使用 compact_reference_guide 风格生成简单、稳定的学生 DOCX。"""
+    title = str(sample.get("title") or "课程作业")
+    paragraphs = [paragraph_xml(title, ppr=_SAMPLE_TITLE_PPR, rpr=_SAMPLE_TITLE_RPR)]
     for section_data in sample.get("sections", []):
-        document.add_heading(str(section_data.get("heading") or "正文"), level=1)
+        paragraphs.append(paragraph_xml(str(section_data.get("heading") or "正文"), ppr=_SAMPLE_HEADING_PPR))
         for paragraph_text in section_data.get("paragraphs", []):
-            paragraph = document.add_paragraph()
-            paragraph.paragraph_format.space_before = Pt(0)
-            paragraph.paragraph_format.space_after = Pt(6)
-            paragraph.paragraph_format.line_spacing = 1.25
-            run = paragraph.add_run(str(paragraph_text).strip())
-            _set_run_font(run, size=11)
-
-    document.core_properties.title = str(sample.get("title") or "课程作业")
-    document.core_properties.author = ""
-    document.core_properties.last_modified_by = ""
-    document.save(str(output_path))
+            paragraphs.append(
+                paragraph_xml(str(paragraph_text).strip(), ppr=_SAMPLE_BODY_PPR, rpr=_SAMPLE_BODY_RPR)
+            )
+    _student_sample_template().write(paragraphs, output_path, title=title)
+
+
+def _student_sample_file(sample: Dict[str, Any], level_info: tuple[str, str], path: Path) -> Dict[str, Any]:
+    create_student_sample_docx(sample, path)
+    return {
+        "name": path.name,
+        "contentType": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+        "base64": encode_file_base64(path),
+        "level": level_info[0],
+        "size": path.stat().st_size,
+    }
 
 
 def generate_student_sample_docx_files(
@@ -886,30 +1481,57 @@ def generate_student_sample_docx_files(
     api_key: str,
     api_url: str,
     model: str,
+    per_level: bool = False,
 ) -> List[Dict[str, Any]]:
+    """生成学生 DOCX 样例。
+
+    per_level 为 True 时每个档位单独并发请求、单独校验与重试，
+    先返回的档位立即渲染 DOCX 并编码，与仍在进行的请求重叠。
+    """
     if len(submission_requirement.strip()) < 20:
         raise SkillGenerationError("请先生成或填写完整的学生作业要求")
     levels = select_sample_levels(count)
-    blueprints = generate_student_sample_blueprints(
-        assignment_title=assignment_title,
-        submission_requirement=submission_requirement,
-        levels=levels,
-        api_key=api_key,
-        api_url=api_url,
-        model=model,
-    )
     output_dir.mkdir(parents=True, exist_ok=True)
-    results = []
-    for index, (sample, level_info) in enumerate(zip(blueprints, levels), start=1):
-        path = output_dir / f"学生作业_{index:02d}.docx"
-        create_student_sample_docx(sample, path)
-        results.append({
-            "name": path.name,
-            "contentType": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-            "base64": encode_file_base64(path),
-            "level": level_info[0],
-            "size": path.stat().st_size,
-        })
+    paths = [output_dir / f"学生作业_{index:02d}.docx" for index in range(1, len(levels) + 1)]
+    if not per_level:
+        blueprints = generate_student_sample_blueprints(
+            assignment_title=assignment_title,
+            submission_requirement=submission_requirement,
+            levels=levels,
+            api_key=api_key,
+            api_url=api_url,
+            model=model,
+        )
+        return [
+            _student_sample_file(sample, level_info, path)
+            for sample, level_info, path in zip(blueprints, levels, paths)
+        ]
+
+    results: List[Optional[Dict[str, Any]]] = [None] * len(levels)
+    pool = ThreadPoolExecutor(
+        max_workers=min(SAMPLE_GENERATION_MAX_WORKERS, len(levels)),
+        thread_name_prefix="student-sample",
+    )
+    try:
+        futures = {
+            pool.submit(
+                generate_student_sample_blueprint_for_level,
+                assignment_title=assignment_title,
+                submission_requirement=submission_requirement,
+                levels=levels,
+                index=index + 1,
+                api_key=api_key,
+                api_url=api_url,
+                model=model,
+            ): index
+            for index in range(len(levels))
+        }
+        for future in as_completed(futures):
+            index = futures[future]
+            results[index] = _student_sample_file(future.result(), levels[index], paths[index])
+    finally:
+        # 某个档位最终失败时不再等待其余请求，尚未开始的请求直接取消
+        pool.shutdown(wait=False, cancel_futures=True)
     return results
 
 
@@ -0,0 +1,66 @@
+"""批阅技能包的内容哈希登记表：相同 ZIP 重复提交时复用已上传的 Skill，而不是重新上传。"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+PACKAGE_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def package_digest(file_path: str) -> str:
+    """按块读取 ZIP，返回其内容的 sha256 十六进制摘要。"""
+    digest = hashlib.sha256()
+    with Path(file_path).open("rb") as source:
+        for chunk in iter(lambda: source.read(PACKAGE_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def credential_scope(authorization: str) -> str:
+    """平台凭证的稳定、不可逆缓存作用域；首尾空白不影响结果。"""
+    return hashlib.sha256(authorization.strip().encode("utf-8")).hexdigest()[:32]
+
+
+class SkillPackageRegistry:
+    """记录“技能包哈希 → 上传并切换为批阅类型后的结果”。
+
+    登记按账号凭证隔离：同一份 ZIP 由不同账号上传时互不复用，避免把某个账号的
+    Skill 交给另一个账号。上传流程在线程中执行，因此所有读写都加锁。
+    """
+
+    def __init__(self, max_entries: int = 128) -> None:
+        self.max_entries = max(1, int(max_entries))
+        self._entries: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _key(authorization: str, digest: str) -> Tuple[str, str]:
+        return credential_scope(authorization), digest
+
+    def get(self, authorization: str, digest: str) -> Optional[Dict[str, Any]]:
+        key = self._key(authorization, digest)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return dict(entry)
+
+    def put(self, authorization: str, digest: str, result: Dict[str, Any]) -> None:
+        key = self._key(authorization, digest)
+        with self._lock:
+            self._entries[key] = dict(result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, authorization: str, digest: str) -> None:
+        with self._lock:
+            self._entries.pop(self._key(authorization, digest), None)
@@ -0,0 +1,146 @@
+"""Skills 批阅报告的集中轮询：所有任务共用一个后台循环，按任务自适应调整查询间隔。"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+ReportFetcher = Callable[[], Awaitable[Dict[str, Any]]]
+
+
+@dataclass
+class _PendingReport:
+    task_id: str
+    fetch: ReportFetcher
+    interval: float
+    next_poll: float
+    future: asyncio.Future
+    in_flight: bool = False
+    polls: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+
+
+class SkillReportPoller:
+    """跟踪所有已提交、尚未出结果的 Skills 任务，并集中发出报告查询。
+
+    到期的任务在同一轮里一起查询；查询结果仍未到终态时，该任务的间隔按
+    backoff 倍数拉长，直到 max_interval。判断终态的逻辑由 is_final 提供。
+    等待报告的协程不占用任何并发槽位，因此同时在批阅中的任务数只受平台处理能力限制。
+    """
+
+    def __init__(
+        self,
+        is_final: Callable[[Dict[str, Any]], bool],
+        *,
+        max_interval: float = 30.0,
+        backoff: float = 1.5,
+    ) -> None:
+        self._is_final = is_final
+        self.max_interval = max(1.0, float(max_interval))
+        self.backoff = max(1.0, float(backoff))
+        self._pending: Dict[str, _PendingReport] = {}
+        self._fetches: set[asyncio.Task] = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._runner: Optional[asyncio.Task] = None
+        self._polls = 0
+        self._completed = 0
+
+    async def wait_for_report(
+        self,
+        task_id: str,
+        fetch: ReportFetcher,
+        *,
+        interval: float,
+        on_waiting: Optional[Callable[[int], None]] = None,
+        waiting_log_seconds: float = 60.0,
+    ) -> Dict[str, Any]:
+        """登记任务并等待终态报告；查询失败时抛出 fetch 的异常。
+
+        on_waiting 每隔 waiting_log_seconds 秒以已等待秒数回调一次，用于写任务日志。
+        """
+        loop = asyncio.get_running_loop()
+        interval = max(0.1, float(interval))
+        entry = _PendingReport(
+            task_id=task_id,
+            fetch=fetch,
+            interval=interval,
+            next_poll=time.monotonic() + interval,
+            future=loop.create_future(),
+        )
+        self._pending[task_id] = entry
+        self._ensure_runner()
+        try:
+            while True:
+                try:
+                    return await asyncio.wait_for(asyncio.shield(entry.future), timeout=waiting_log_seconds)
+                except asyncio.TimeoutError:
+                    if on_waiting is not None:
+                        on_waiting(int(time.monotonic() - entry.started_at))
+        finally:
+            self._pending.pop(task_id, None)
+            if not entry.future.done():
+                entry.future.cancel()
+
+    def snapshot(self) -> Dict[str, Any]:
+        intervals = [entry.interval for entry in self._pending.values()]
+        return {
+            "pending": len(self._pending),
+            "polls": self._polls,
+            "completed": self._completed,
+            "maxInterval": self.max_interval,
+            "averageInterval": round(sum(intervals) / len(intervals), 2) if intervals else None,
+        }
+
+    def _ensure_runner(self) -> None:
+        if self._runner is None or self._runner.done():
+            # 后台循环在没有待查任务时退出，下次登记时在当前事件循环里重新创建
+            self._wakeup = asyncio.Event()
+            self._runner = asyncio.create_task(self._run())
+        elif self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run(self) -> None:
+        assert self._wakeup is not None
+        while self._pending:
+            self._wakeup.clear()
+            now = time.monotonic()
+            next_poll = now + self.max_interval
+            for entry in list(self._pending.values()):
+                if entry.in_flight:
+                    continue
+                if entry.next_poll <= now:
+                    entry.in_flight = True
+                    task = asyncio.create_task(self._poll(entry))
+                    self._fetches.add(task)
+                    task.add_done_callback(self._fetches.discard)
+                else:
+                    next_poll = min(next_poll, entry.next_poll)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=max(0.0, next_poll - now))
+            except asyncio.TimeoutError:
+                pass
+
+    async def _poll(self, entry: _PendingReport) -> None:
+        self._polls += 1
+        entry.polls += 1
+        try:
+            response = await entry.fetch()
+        except Exception as exc:
+            self._pending.pop(entry.task_id, None)
+            if not entry.future.done():
+                entry.future.set_exception(exc)
+        else:
+            if self._is_final(response):
+                self._completed += 1
+                self._pending.pop(entry.task_id, None)
+                if not entry.future.done():
+                    entry.future.set_result(response)
+            else:
+                entry.interval = min(self.max_interval, entry.interval * self.backoff)
+                entry.next_poll = time.monotonic() + entry.interval
+        finally:
+            entry.in_flight = False
+            if self._wakeup is not None:
+                self._wakeup.set()
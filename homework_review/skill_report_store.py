@@ -0,0 +1,62 @@
+"""Skills 完整报告的按任务落盘存储：内存里只保留分数摘要，完整报告按需分页读取。"""
+
+from __future__ import annotations
+
+import json
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+REPORT_FILE_NAME = "skill_reports.jsonl"
+
+
+class SkillReportStore:
+    """把每次 Skills 批阅的完整报告追加写入任务目录下的 JSONL 文件。
+
+    内存中只记录每行的字节偏移量和 taskId 索引，读取时直接定位到对应行，
+    不需要把整份文件加载进内存。
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self.path = Path(directory) / REPORT_FILE_NAME
+        self._offsets: List[int] = []
+        self._by_task: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def append(self, report: Dict[str, Any]) -> int:
+        """写入一份完整报告，返回它在存储中的序号。"""
+        line = (json.dumps(report, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("ab") as handle:
+                offset = handle.tell()
+                handle.write(line)
+            index = len(self._offsets)
+            self._offsets.append(offset)
+            task_id = str(report.get("taskId") or "")
+            if task_id:
+                self._by_task[task_id] = index
+            return index
+
+    def read(self, offset: int = 0, limit: int = 20) -> List[Dict[str, Any]]:
+        """按写入顺序读取第 offset 条起的至多 limit 份报告。"""
+        with self._lock:
+            positions = self._offsets[max(0, offset):max(0, offset) + max(0, limit)]
+        if not positions:
+            return []
+        reports = []
+        with self.path.open("rb") as handle:
+            handle.seek(positions[0])
+            for _ in positions:
+                reports.append(json.loads(handle.readline()))
+        return reports
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        index = self._by_task.get(task_id)
+        if index is None:
+            return None
+        reports = self.read(index, 1)
+        return reports[0] if reports else None
@@ -2,16 +2,26 @@
 
 from __future__ import annotations
 
+import hashlib
 import mimetypes
 import re
 import stat
 import statistics
 import time
-import uuid
 import zipfile
 from pathlib import Path, PurePosixPath
 from typing import Any, Dict, Iterable, List, Optional
 
+try:
+    from .attempt_scheduling import attempt_statuses
+    from .cloud_request_control import classify_exception, hedged_call, throttle_cloud_endpoint
+    from .resource_upload import ResourceUploadError, upload_resource_file
+    from .skill_package_registry import SkillPackageRegistry, package_digest
+except ImportError:
+    from attempt_scheduling import attempt_statuses
+    from cloud_request_control import classify_exception, hedged_call, throttle_cloud_endpoint
+    from resource_upload import ResourceUploadError, upload_resource_file
+    from skill_package_registry import SkillPackageRegistry, package_digest
 
 UPLOAD_URL = "https://cloudapi.polymas.com/basic-resource/file/upload?hidden=false"
 EXECUTE_URL = "https://cloudapi.polymas.com/ai-biz/v1/correction-skill/execute"
@@ -28,77 +38,71 @@ SKILL_PACKAGE_EXCLUDED_PARTS = {".DS_Store", "__MACOSX", "__pycache__", "agents"
 SKILL_PACKAGE_EXCLUDED_SUFFIXES = {".pyc", ".pyo"}
 SKILL_PACKAGE_MAX_FILES = 500
 SKILL_PACKAGE_MAX_UNCOMPRESSED_BYTES = 100 * 1024 * 1024
+SKILL_PACKAGE_MAX_TEXT_BYTES = 512 * 1024
+SKILL_PACKAGE_MAX_COMPRESSION_RATIO = 100
+SKILL_PACKAGE_RATIO_CHECK_MIN_BYTES = 1024 * 1024
 SKILL_FRONTMATTER_RE = re.compile(r"\A---\s*\n(.*?)\n---\s*\n", re.S)
 SKILL_NAME_RE = re.compile(r"^name:\s*[\"']?([a-z0-9]+(?:-[a-z0-9]+)*)[\"']?\s*$", re.M)
 SKILL_DESCRIPTION_RE = re.compile(r"^description:\s*(.+)$", re.M)
 
 
 class CorrectionSkillError(RuntimeError):
-    """智慧树作业批阅 Skill 接口返回异常。"""
-
-
-def validate_grading_skill_package(file_path: str) -> Dict[str, Any]:
-    """按作业批阅技能模板校验 ZIP，并提取上传后元数据的回退值。"""
-    path = Path(file_path)
-    if path.suffix.lower() != ".zip" or not path.is_file() or not zipfile.is_zipfile(path):
-        raise CorrectionSkillError("请上传有效的 .zip 作业批阅技能包")
-
-    with zipfile.ZipFile(path) as archive:
-        file_entries = [item for item in archive.infolist() if not item.is_dir()]
-        if not file_entries:
-            raise CorrectionSkillError("技能包为空")
-        if len(file_entries) > SKILL_PACKAGE_MAX_FILES:
-            raise CorrectionSkillError(f"技能包文件数超过 {SKILL_PACKAGE_MAX_FILES} 个")
-
-        roots = set()
-        normalized_entries: Dict[str, zipfile.ZipInfo] = {}
-        uncompressed_size = 0
-        for item in file_entries:
-            raw_name = item.filename.replace("\\", "/")
-            relative = PurePosixPath(raw_name)
-            parts = relative.parts
-            if relative.is_absolute() or not parts or any(part in {"", ".", ".."} for part in parts):
-                raise CorrectionSkillError(f"技能包包含不安全路径：{item.filename}")
-            file_mode = (item.external_attr >> 16) & 0o170000
-            if file_mode == stat.S_IFLNK:
-                raise CorrectionSkillError(f"技能包不允许符号链接：{item.filename}")
-            if item.flag_bits & 0x1:
-                raise CorrectionSkillError(f"技能包不允许加密文件：{item.filename}")
-            if any(part in SKILL_PACKAGE_EXCLUDED_PARTS for part in parts):
-                raise CorrectionSkillError(f"技能包包含模板外目录或缓存：{item.filename}")
-            if PurePosixPath(parts[-1]).suffix.lower() in SKILL_PACKAGE_EXCLUDED_SUFFIXES:
-                raise CorrectionSkillError(f"技能包包含缓存文件：{item.filename}")
-
-            roots.add(parts[0])
-            if len(parts) == 1:
-                raise CorrectionSkillError("ZIP 内文件必须位于唯一的技能根目录中")
-            if len(parts) == 2 and parts[1] not in SKILL_PACKAGE_ALLOWED_ROOT_FILES:
-                raise CorrectionSkillError(f"技能根目录包含模板外文件：{item.filename}")
-            if len(parts) > 2 and parts[1] not in SKILL_PACKAGE_ALLOWED_ROOT_DIRS:
-                raise CorrectionSkillError(f"技能包包含模板外目录：{item.filename}")
-
-            uncompressed_size += item.file_size
-            if uncompressed_size > SKILL_PACKAGE_MAX_UNCOMPRESSED_BYTES:
-                raise CorrectionSkillError("技能包解压后超过 100 MB")
-            normalized_entries[raw_name] = item
-
-        if len(roots) != 1:
-            raise CorrectionSkillError("技能包必须且只能包含一个根目录")
-        root_name = next(iter(roots))
-        required = {
-            f"{root_name}/README.md",
-            f"{root_name}/SKILL.md",
-        }
-        missing = sorted(required - normalized_entries.keys())
-        if missing:
-            raise CorrectionSkillError("技能包缺少根目录下的 README.md 或 SKILL.md")
+    """智慧树作业批阅 Skill 接口返回异常；status_code 为平台返回的 HTTP 状态码，error_class 为底层网络错误的分类。"""
+
+    def __init__(self, message: str, *, status_code: Optional[int] = None, error_class: Optional[str] = None) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+        self.error_class = error_class
+
+
+def _check_package_entry(item: zipfile.ZipInfo) -> PurePosixPath:
+    """校验单个中央目录条目的路径、类型与压缩比，返回规范化后的相对路径。"""
+    raw_name = item.filename.replace("\\", "/")
+    relative = PurePosixPath(raw_name)
+    parts = relative.parts
+    if relative.is_absolute() or not parts or any(part in {"", ".", ".."} for part in parts):
+        raise CorrectionSkillError(f"技能包包含不安全路径：{item.filename}")
+    file_mode = (item.external_attr >> 16) & 0o170000
+    if file_mode == stat.S_IFLNK:
+        raise CorrectionSkillError(f"技能包不允许符号链接：{item.filename}")
+    if item.flag_bits & 0x1:
+        raise CorrectionSkillError(f"技能包不允许加密文件：{item.filename}")
+    if any(part in SKILL_PACKAGE_EXCLUDED_PARTS for part in parts):
+        raise CorrectionSkillError(f"技能包包含模板外目录或缓存：{item.filename}")
+    if PurePosixPath(parts[-1]).suffix.lower() in SKILL_PACKAGE_EXCLUDED_SUFFIXES:
+        raise CorrectionSkillError(f"技能包包含缓存文件：{item.filename}")
+    if len(parts) == 1:
+        raise CorrectionSkillError("ZIP 内文件必须位于唯一的技能根目录中")
+    if len(parts) == 2 and parts[1] not in SKILL_PACKAGE_ALLOWED_ROOT_FILES:
+        raise CorrectionSkillError(f"技能根目录包含模板外文件：{item.filename}")
+    if len(parts) > 2 and parts[1] not in SKILL_PACKAGE_ALLOWED_ROOT_DIRS:
+        raise CorrectionSkillError(f"技能包包含模板外目录：{item.filename}")
+    if (
+        item.file_size >= SKILL_PACKAGE_RATIO_CHECK_MIN_BYTES
+        and item.file_size > item.compress_size * SKILL_PACKAGE_MAX_COMPRESSION_RATIO
+    ):
+        raise CorrectionSkillError(f"技能包文件压缩比异常，疑似压缩炸弹：{item.filename}")
+    return relative
+
+
+def _read_package_text(archive: zipfile.ZipFile, item: zipfile.ZipInfo) -> str:
+    """只解压到 SKILL_PACKAGE_MAX_TEXT_BYTES 为止，防止声明大小与实际内容不符。"""
+    name = PurePosixPath(item.filename).name
+    limit = SKILL_PACKAGE_MAX_TEXT_BYTES
+    if item.file_size > limit:
+        raise CorrectionSkillError(f"{name} 不能超过 {limit // 1024} KB")
+    with archive.open(item) as handle:
+        data = handle.read(limit + 1)
+    if len(data) > limit:
+        raise CorrectionSkillError(f"{name} 不能超过 {limit // 1024} KB")
+    try:
+        return data.decode("utf-8")
+    except UnicodeDecodeError as exc:
+        raise CorrectionSkillError("README.md 和 SKILL.md 必须使用 UTF-8 编码") from exc
 
-        try:
-            skill_text = archive.read(normalized_entries[f"{root_name}/SKILL.md"]).decode("utf-8")
-            readme_text = archive.read(normalized_entries[f"{root_name}/README.md"]).decode("utf-8")
-        except UnicodeDecodeError as exc:
-            raise CorrectionSkillError("README.md 和 SKILL.md 必须使用 UTF-8 编码") from exc
 
+def validate_grading_skill_texts(root_name: str, skill_text: str, readme_text: str) -> Dict[str, str]:
+    """按作业批阅技能模板校验 SKILL.md 与 README.md，并提取元数据回退值。"""
     frontmatter = SKILL_FRONTMATTER_RE.search(skill_text)
     if not frontmatter:
         raise CorrectionSkillError("SKILL.md 缺少有效 YAML frontmatter")
@@ -139,7 +143,54 @@ def validate_grading_skill_package(file_path: str) -> Dict[str, Any]:
         "skillName": skill_name,
         "skillDescription": skill_description,
         "displayName": display_name,
-        "fileCount": len(file_entries),
+    }
+
+
+def validate_grading_skill_package(file_path: str) -> Dict[str, Any]:
+    """按作业批阅技能模板校验 ZIP，并提取上传后元数据的回退值。
+
+    中央目录只遍历一遍，文件数、解压总量和单文件压缩比超限时立即失败；
+    只有 SKILL.md 和 README.md 会被解压，且读取量有上限。
+    """
+    path = Path(file_path)
+    if path.suffix.lower() != ".zip" or not path.is_file():
+        raise CorrectionSkillError("请上传有效的 .zip 作业批阅技能包")
+    try:
+        archive = zipfile.ZipFile(path)
+    except (zipfile.BadZipFile, OSError) as exc:
+        raise CorrectionSkillError("请上传有效的 .zip 作业批阅技能包") from exc
+
+    with archive:
+        root_name = ""
+        text_entries: Dict[str, zipfile.ZipInfo] = {}
+        file_count = 0
+        uncompressed_size = 0
+        for item in archive.infolist():
+            if item.is_dir():
+                continue
+            file_count += 1
+            if file_count > SKILL_PACKAGE_MAX_FILES:
+                raise CorrectionSkillError(f"技能包文件数超过 {SKILL_PACKAGE_MAX_FILES} 个")
+            parts = _check_package_entry(item).parts
+            if root_name and parts[0] != root_name:
+                raise CorrectionSkillError("技能包必须且只能包含一个根目录")
+            root_name = parts[0]
+            uncompressed_size += item.file_size
+            if uncompressed_size > SKILL_PACKAGE_MAX_UNCOMPRESSED_BYTES:
+                raise CorrectionSkillError("技能包解压后超过 100 MB")
+            if len(parts) == 2:
+                text_entries[parts[1]] = item
+
+        if not file_count:
+            raise CorrectionSkillError("技能包为空")
+        if not SKILL_PACKAGE_ALLOWED_ROOT_FILES <= text_entries.keys():
+            raise CorrectionSkillError("技能包缺少根目录下的 README.md 或 SKILL.md")
+        skill_text = _read_package_text(archive, text_entries["SKILL.md"])
+        readme_text = _read_package_text(archive, text_entries["README.md"])
+
+    return {
+        **validate_grading_skill_texts(root_name, skill_text, readme_text),
+        "fileCount": file_count,
         "uncompressedBytes": uncompressed_size,
     }
 
@@ -164,12 +215,16 @@ def _read_json_response(response: Any, operation: str) -> Dict[str, Any]:
     except ValueError as exc:
         preview = response.text[:500]
         raise CorrectionSkillError(
-            f"{operation}返回了非 JSON 响应（HTTP {response.status_code}）：{preview}"
+            f"{operation}返回了非 JSON 响应（HTTP {response.status_code}）：{preview}",
+            status_code=response.status_code,
         ) from exc
 
     if not response.ok:
         message = payload.get("msg") or payload.get("message") or payload.get("error")
-        raise CorrectionSkillError(f"{operation}失败（HTTP {response.status_code}）：{message or payload}")
+        raise CorrectionSkillError(
+            f"{operation}失败（HTTP {response.status_code}）：{message or payload}",
+            status_code=response.status_code,
+        )
 
     code = payload.get("code")
     success = payload.get("success")
@@ -193,24 +248,21 @@ def upload_student_attachment(
     if not path.is_file():
         raise CorrectionSkillError(f"学生作业文件不存在：{path.name}")
 
-    mime_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
-    identify_code = str(uuid.uuid4())
-    data = {
-        "identifyCode": identify_code,
-        "name": path.name,
-        "chunk": "0",
-        "chunks": "1",
-        "size": str(path.stat().st_size),
-    }
-    with path.open("rb") as source:
-        response = requests.post(
-            UPLOAD_URL,
+    try:
+        payload = upload_resource_file(
+            str(path),
             headers=_headers(authorization, cookie),
-            data=data,
-            files={"file": (path.name, source, mime_type)},
-            timeout=timeout_seconds,
+            url=UPLOAD_URL,
+            mime_type=mimetypes.guess_type(path.name)[0] or "application/octet-stream",
+            timeout_seconds=timeout_seconds,
         )
-    payload = _read_json_response(response, f"上传「{path.name}」")
+    except ResourceUploadError as exc:
+        raise CorrectionSkillError(str(exc), status_code=exc.status_code, error_class=exc.error_class) from exc
+    except requests.RequestException as exc:
+        raise CorrectionSkillError(
+            f"上传「{path.name}」请求失败：{exc}",
+            error_class=classify_exception(exc),
+        ) from exc
     uploaded = payload.get("data") or {}
     oss_url = uploaded.get("ossUrl")
     if not oss_url:
@@ -253,6 +305,7 @@ def execute_correction_skill(
         "studentSubmission": student_submission,
         "submissionRequirement": submission_requirement,
     }
+    throttle_cloud_endpoint("correction-skill-execute")
     response = requests.post(
         EXECUTE_URL,
         headers=_headers(authorization, cookie, json_request=True),
@@ -274,12 +327,17 @@ def get_correction_skill_report(
 ) -> Dict[str, Any]:
     import requests
 
-    response = requests.get(
-        REPORT_URL,
-        headers=_headers(authorization, cookie),
-        params={"taskId": task_id},
-        timeout=timeout_seconds,
-    )
+    def send() -> Any:
+        throttle_cloud_endpoint("correction-skill-report")
+        return requests.get(
+            REPORT_URL,
+            headers=_headers(authorization, cookie),
+            params={"taskId": task_id},
+            timeout=timeout_seconds,
+        )
+
+    # 报告查询是幂等读操作，慢于近期 p95 时补发一次请求
+    response = hedged_call("correction-skill-report", send)
     return _read_json_response(response, "读取 Skills 批阅报告")
 
 
@@ -382,20 +440,30 @@ def upload_agent_skill_package(
     skill_type: str = "2",
     source: str = "BUILTIN",
     timeout_seconds: int = 300,
+    package_bytes: Optional[bytes] = None,
 ) -> Dict[str, str]:
-    """上传一个已生成并校验通过的 Skill ZIP。"""
+    """上传一个已生成并校验通过的 Skill ZIP；传入 package_bytes 时 file_path 只用作文件名。"""
     import requests
 
     path = Path(file_path)
     mime_type = "application/zip"
-    with path.open("rb") as source_file:
+    if package_bytes is not None:
         response = requests.post(
             AGENT_SKILL_UPLOAD_URL,
             headers=_headers(authorization, cookie),
             data={"type": skill_type, "source": source},
-            files={"zipFile": (path.name, source_file, mime_type)},
+            files={"zipFile": (path.name, package_bytes, mime_type)},
             timeout=timeout_seconds,
         )
+    else:
+        with path.open("rb") as source_file:
+            response = requests.post(
+                AGENT_SKILL_UPLOAD_URL,
+                headers=_headers(authorization, cookie),
+                data={"type": skill_type, "source": source},
+                files={"zipFile": (path.name, source_file, mime_type)},
+                timeout=timeout_seconds,
+            )
     payload = _read_json_response(response, "上传 Skills 技能包")
     data = payload.get("data") if isinstance(payload.get("data"), dict) else {}
     skill_nid = str(data.get("skillNid") or "").strip()
@@ -414,6 +482,7 @@ def list_skill_cards(
     cookie: str,
     *,
     query_word: str = "",
+    page_num: int = 1,
     page_size: int = 50,
     timeout_seconds: int = 60,
 ) -> List[Dict[str, Any]]:
@@ -421,7 +490,7 @@ def list_skill_cards(
     import requests
 
     request_payload = {
-        "pageNum": 1,
+        "pageNum": max(1, page_num),
         "pageSize": min(100, max(1, page_size)),
         "typeTagId": None,
         "sourceTagId": None,
@@ -447,6 +516,33 @@ def list_skill_cards(
     return [item for item in records if isinstance(item, dict)]
 
 
+def find_skill_card(
+    authorization: str,
+    cookie: str,
+    *,
+    skill_nid: str,
+    query_word: str = "",
+    page_size: int = 50,
+    max_pages: int = 20,
+) -> Optional[Dict[str, Any]]:
+    """按 skillNid 精确查找卡片；同名结果超过一页时逐页查找，读到不满一页即停止。"""
+    for page_num in range(1, max(1, max_pages) + 1):
+        records = list_skill_cards(
+            authorization,
+            cookie,
+            query_word=query_word,
+            page_num=page_num,
+            page_size=page_size,
+        )
+        matched = next(
+            (item for item in records if str(item.get("skillNid") or "").strip() == skill_nid),
+            None,
+        )
+        if matched or len(records) < page_size:
+            return matched
+    return None
+
+
 def get_uploaded_skill_card(
     *,
     skill_nid: str,
@@ -458,15 +554,7 @@ def get_uploaded_skill_card(
 ) -> Dict[str, Any]:
     """等待刚上传的 Skill 出现在卡片列表，并按 skillNid 精确匹配。"""
     for attempt in range(max(1, attempts)):
-        records = list_skill_cards(
-            authorization,
-            cookie,
-            query_word=skill_name,
-        )
-        matched = next(
-            (item for item in records if str(item.get("skillNid") or "").strip() == skill_nid),
-            None,
-        )
+        matched = find_skill_card(authorization, cookie, skill_nid=skill_nid, query_word=skill_name)
         if matched:
             return matched
         if attempt + 1 < attempts:
@@ -530,14 +618,67 @@ def save_grading_skill_metadata(
     return result
 
 
+def is_registered_grading_skill_valid(
+    registered: Dict[str, Any],
+    authorization: str,
+    cookie: str,
+) -> bool:
+    """确认登记表中的 Skill 仍在卡片列表中、仍是批阅类型且版本未被替换。"""
+    card = find_skill_card(
+        authorization,
+        cookie,
+        skill_nid=str(registered.get("skillNid") or ""),
+        query_word=registered.get("name") or "",
+    )
+    if card is None:
+        return False
+    type_tag = card.get("typeTagId")
+    if type_tag is not None and str(type_tag) != "1":
+        return False
+    card_version = str(card.get("skillVersionNid") or card.get("skillVersionId") or "").strip()
+    return not card_version or card_version == registered.get("skillVersionId")
+
+
 def upload_and_prepare_grading_skill(
     file_path: str,
     authorization: str,
     cookie: str,
+    *,
+    registry: Optional[SkillPackageRegistry] = None,
+    validated_package: Optional[Dict[str, Any]] = None,
+    package_bytes: Optional[bytes] = None,
 ) -> Dict[str, Any]:
-    """校验、上传 Skill ZIP，并自动切换为可测试的批阅类型。"""
-    package = validate_grading_skill_package(file_path)
-    uploaded = upload_agent_skill_package(file_path, authorization, cookie)
+    """校验、上传 Skill ZIP，并自动切换为可测试的批阅类型。
+
+    传入 registry 时先按 ZIP 内容哈希查找：同一账号提交过完全相同的技能包、
+    且平台上的 Skill 仍然有效时，只发一次卡片查询就直接返回已有结果。
+    validated_package 是本服务刚生成并校验过的技能包信息，传入后不再重复校验 ZIP；
+    package_bytes 是内存中生成的 ZIP 内容，此时 file_path 只用作上传文件名。
+    """
+    if package_bytes is not None and validated_package is None:
+        raise CorrectionSkillError("内存中的技能包必须附带已校验的技能包信息")
+    digest = ""
+    if registry is not None:
+        digest = (
+            hashlib.sha256(package_bytes).hexdigest()
+            if package_bytes is not None
+            else package_digest(file_path)
+        )
+        registered = registry.get(authorization, digest)
+        if registered is not None:
+            import requests
+
+            try:
+                still_valid = is_registered_grading_skill_valid(registered, authorization, cookie)
+            except (CorrectionSkillError, requests.RequestException):
+                # 登记表只是加速手段：核对失败时按未登记处理，重新上传
+                still_valid = False
+            if still_valid:
+                return {**registered, "reused": True}
+            registry.discard(authorization, digest)
+
+    package = validated_package or validate_grading_skill_package(file_path)
+    uploaded = upload_agent_skill_package(file_path, authorization, cookie, package_bytes=package_bytes)
     skill_name = uploaded.get("name") or package["skillName"]
     card = get_uploaded_skill_card(
         skill_nid=uploaded["skillNid"],
@@ -561,7 +702,7 @@ def upload_and_prepare_grading_skill(
         "type": "1",
         "tab": "preview",
     })
-    return {
+    result = {
         **uploaded,
         "name": skill_name,
         "cnName": metadata_payload["cnName"],
@@ -570,8 +711,12 @@ def upload_and_prepare_grading_skill(
         "typeTagId": 1,
         "metadataUpdated": True,
         "previewUrl": preview_url,
-        "package": package,
+        "package": {**package, "sha256": digest} if digest else package,
+        "reused": False,
     }
+    if registry is not None:
+        registry.put(authorization, digest, result)
+    return result
 
 
 def build_submission_requirement_from_overview(response: Dict[str, Any]) -> str:
@@ -727,6 +872,38 @@ def compact_skill_report(
     }
 
 
+SKILL_SUMMARY_FIELDS = (
+    "success",
+    "skipped",
+    "variantIndex",
+    "fileName",
+    "fileIndex",
+    "attemptIndex",
+    "taskId",
+    "reportUrl",
+    "reportStatus",
+    "error",
+    "finishedAt",
+    "totalScore",
+    "fullMark",
+)
+
+
+def summarize_skill_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """只保留评分表需要的分数字段；评语和报告分区由完整报告按需读取。"""
+    summary = {key: result[key] for key in SKILL_SUMMARY_FIELDS if key in result}
+    summary["items"] = [
+        {
+            "itemIndex": item.get("itemIndex"),
+            "itemName": item.get("itemName"),
+            "itemScore": item.get("itemScore"),
+            "itemFullMark": item.get("itemFullMark"),
+        }
+        for item in result.get("items") or []
+    ]
+    return summary
+
+
 def _stats(values: Iterable[Optional[float]]) -> Dict[str, Optional[float]]:
     valid = [float(value) for value in values if isinstance(value, (int, float))]
     if not valid:
@@ -752,6 +929,7 @@ def build_skill_score_table(results: List[Dict[str, Any]], attempts: int) -> Dic
         total_scores: List[Optional[float]] = [None] * attempts
         item_map: Dict[str, Dict[str, Any]] = {}
         item_order: List[str] = []
+        skipped = [int(item.get("attemptIndex", 0)) for item in file_results if item.get("skipped")]
 
         for result in file_results:
             attempt_index = int(result.get("attemptIndex", 0))
@@ -788,6 +966,12 @@ def build_skill_score_table(results: List[Dict[str, Any]], attempts: int) -> Dic
             "name": Path(str(first.get("fileName") or f"作业{file_index + 1}")).stem,
             "full_mark": full_mark,
             "total_scores": total_scores,
+            "attempt_status": attempt_statuses(
+                attempts,
+                succeeded=[int(item.get("attemptIndex", 0)) for item in file_results if item.get("success")],
+                skipped=skipped,
+            ),
+            "skipped_attempts": len(skipped),
             **total_stats,
             "categories": [],
             "questions": questions,
@@ -797,6 +981,50 @@ def build_skill_score_table(results: List[Dict[str, Any]], attempts: int) -> Dic
     return {"attempts": attempts, "students": students}
 
 
+def build_skill_comparison_table(
+    results: List[Dict[str, Any]],
+    attempts: int,
+    variant_labels: List[str],
+) -> Dict[str, Any]:
+    """对比任务的并排评分表：每个学生的各变体相邻排列，另附各变体的整体均值与稳定性。"""
+    tables = [
+        build_skill_score_table(
+            [item for item in results if int(item.get("variantIndex", 0)) == index],
+            attempts,
+        )
+        for index in range(len(variant_labels))
+    ]
+
+    student_names: List[str] = []
+    by_variant: List[Dict[str, Dict[str, Any]]] = []
+    for table in tables:
+        rows = {}
+        for student in table["students"]:
+            rows[student["name"]] = student
+            if student["name"] not in student_names:
+                student_names.append(student["name"])
+        by_variant.append(rows)
+
+    students = []
+    for name in student_names:
+        for label, rows in zip(variant_labels, by_variant):
+            if name in rows:
+                students.append({**rows[name], "name": f"{name}（{label}）", "student": name, "variant": label})
+
+    variants = []
+    for label, rows in zip(variant_labels, by_variant):
+        means = [row["mean"] for row in rows.values() if row.get("mean") is not None]
+        variances = [row["variance"] for row in rows.values() if row.get("variance") is not None]
+        variants.append({
+            "label": label,
+            "students": len(rows),
+            "mean": round(statistics.fmean(means), 2) if means else None,
+            "meanVariance": round(statistics.fmean(variances), 2) if variances else None,
+        })
+
+    return {"attempts": attempts, "students": students, "variants": variants}
+
+
 def platform_report_url(
     *,
     skill_version_id: str,
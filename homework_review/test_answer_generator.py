@@ -0,0 +1,56 @@
+import io
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+from docx import Document
+
+try:
+    from .answer_generator import OLE_SIGNATURE, extract_questions_from_local, load_docx_text
+except ImportError:
+    from answer_generator import OLE_SIGNATURE, extract_questions_from_local, load_docx_text
+
+
+def exam_docx_bytes() -> bytes:
+    document = Document()
+    document.add_paragraph("大学物理期末考试")
+    document.add_paragraph("一、简答题")
+    document.add_table(rows=1, cols=2).cell(0, 0).text = "1. 简述牛顿第二定律"
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+class LoadDocxTextTest(unittest.TestCase):
+    def test_bytes_and_path_produce_the_same_text(self):
+        content = exam_docx_bytes()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "期末考试.docx"
+            path.write_bytes(content)
+            from_path = extract_questions_from_local(path)
+            from_memory = extract_questions_from_local(path.with_name("未写入.docx"), content)
+
+        self.assertEqual(from_path[1], "大学物理期末考试\n一、简答题\n1. 简述牛顿第二定律")
+        self.assertEqual(from_memory[1], from_path[1])
+
+    def test_specific_errors_are_kept(self):
+        pptx = io.BytesIO()
+        with zipfile.ZipFile(pptx, "w") as archive:
+            archive.writestr("_rels/.rels", "<Relationships/>")
+            archive.writestr("ppt/presentation.xml", "<p/>")
+        cases = {
+            "旧版二进制 .doc": OLE_SIGNATURE + b"\0" * 64,
+            "文件内容是 PDF": b"%PDF-1.7 ...",
+            "压缩包结构损坏": b"PK\x03\x04broken",
+            "不是有效的 Word .docx 压缩包（当前后缀为 .docx）": b"plain text",
+            "PowerPoint 文档": pptx.getvalue(),
+        }
+        for message, content in cases.items():
+            with self.subTest(message=message):
+                with self.assertRaisesRegex(ValueError, message):
+                    load_docx_text(content, "exam.docx")
+
+
+if __name__ == "__main__":
+    unittest.main()
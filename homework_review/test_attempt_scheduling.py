@@ -0,0 +1,119 @@
+import asyncio
+import unittest
+
+try:
+    from .attempt_scheduling import (
+        AdaptiveAttemptController,
+        BreadthFirstScheduler,
+        confidence_half_width,
+        has_converged,
+        parse_file_priorities,
+    )
+except ImportError:
+    from attempt_scheduling import (
+        AdaptiveAttemptController,
+        BreadthFirstScheduler,
+        confidence_half_width,
+        has_converged,
+        parse_file_priorities,
+    )
+
+
+class ConvergenceTest(unittest.TestCase):
+    def test_half_width_needs_two_scores(self):
+        self.assertEqual(confidence_half_width([80]), float("inf"))
+        self.assertEqual(confidence_half_width([80, 80, 80]), 0.0)
+        self.assertAlmostEqual(confidence_half_width([80, 82]), 12.706, places=3)
+
+    def test_converges_only_after_min_attempts_within_tolerance(self):
+        self.assertFalse(has_converged([85, 85], min_attempts=3, tolerance=1.0))
+        self.assertTrue(has_converged([85, 85, 85], min_attempts=3, tolerance=1.0))
+        self.assertFalse(has_converged([70, 85, 95], min_attempts=3, tolerance=1.0))
+
+
+class AdaptiveAttemptControllerTest(unittest.IsolatedAsyncioTestCase):
+    async def run_attempts(self, controller, scores):
+        ran = []
+
+        async def attempt(index):
+            if not await controller.should_run("学生A", index):
+                return
+            ran.append(index)
+            await asyncio.sleep(0.001 * index)
+            await controller.record("学生A", scores[index - 1])
+
+        await asyncio.gather(*(attempt(index) for index in range(1, len(scores) + 1)))
+        return sorted(ran)
+
+    async def test_stops_scheduling_once_scores_converge(self):
+        controller = AdaptiveAttemptController(5, enabled=True, min_attempts=2, tolerance=1.0)
+        ran = await self.run_attempts(controller, [86, 86, 90, 70, 99])
+
+        self.assertEqual(ran, [1, 2])
+        self.assertEqual(controller.skipped_attempts("学生A"), [3, 4, 5])
+        self.assertEqual(controller.summary()["skippedAttempts"], 3)
+
+    async def test_keeps_running_while_scores_disagree(self):
+        controller = AdaptiveAttemptController(4, enabled=True, min_attempts=2, tolerance=1.0)
+        ran = await self.run_attempts(controller, [60, 90, 75, None])
+
+        self.assertEqual(ran, [1, 2, 3, 4])
+        self.assertEqual(controller.skipped_attempts("学生A"), [])
+
+    async def test_disabled_controller_runs_every_attempt(self):
+        controller = AdaptiveAttemptController(3)
+        ran = await self.run_attempts(controller, [80, 80, 80])
+        self.assertEqual(ran, [1, 2, 3])
+
+
+class BreadthFirstSchedulerTest(unittest.IsolatedAsyncioTestCase):
+    async def test_runs_first_round_for_every_file_before_second(self):
+        scheduler = BreadthFirstScheduler(2)
+        started = []
+
+        async def attempt(name, index):
+            started.append((name, index))
+            await asyncio.sleep(0)
+            return f"{name}-{index}"
+
+        priorities = {"丙.docx": 5}
+        for name in ("甲.docx", "乙.docx", "丙.docx"):
+            for index in (1, 2):
+                scheduler.submit(index, lambda name=name, index=index: attempt(name, index), priority=priorities.get(name, 0))
+
+        results = await scheduler.run()
+
+        self.assertEqual(
+            started,
+            [("丙.docx", 1), ("甲.docx", 1), ("乙.docx", 1), ("丙.docx", 2), ("甲.docx", 2), ("乙.docx", 2)],
+        )
+        self.assertEqual(results, ["甲.docx-1", "甲.docx-2", "乙.docx-1", "乙.docx-2", "丙.docx-1", "丙.docx-2"])
+
+    async def test_concurrency_is_bounded_and_errors_cancel_the_rest(self):
+        scheduler = BreadthFirstScheduler(2)
+        active = 0
+        peak = 0
+
+        async def attempt(index):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            if index == 3:
+                raise RuntimeError("boom")
+
+        for index in range(1, 7):
+            scheduler.submit(index, lambda index=index: attempt(index))
+        with self.assertRaises(RuntimeError):
+            await scheduler.run()
+        self.assertEqual(peak, 2)
+
+    def test_parse_file_priorities_ignores_invalid_values(self):
+        self.assertEqual(parse_file_priorities('{"甲.docx": 2, "乙.docx": "高", "丙.docx": true}'), {"甲.docx": 2.0})
+        self.assertEqual(parse_file_priorities("[1, 2]"), {})
+        self.assertEqual(parse_file_priorities("not json"), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
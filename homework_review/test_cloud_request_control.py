@@ -0,0 +1,338 @@
+import asyncio
+import http.client
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest import mock
+
+import requests
+from urllib3.exceptions import MaxRetryError, NewConnectionError, ProtocolError
+
+try:
+    from .cloud_request_control import (
+        AdaptiveConcurrencyLimiter,
+        CircuitBreaker,
+        CircuitOpenError,
+        RequestHedger,
+        RetryBudget,
+        RetryPolicy,
+        TokenBucket,
+        call_with_retry_async,
+        classify_exception,
+        classify_legacy_outcome,
+        classify_result,
+        is_overload_error,
+        is_overload_result,
+    )
+except ImportError:
+    from cloud_request_control import (
+        AdaptiveConcurrencyLimiter,
+        CircuitBreaker,
+        CircuitOpenError,
+        RequestHedger,
+        RetryBudget,
+        RetryPolicy,
+        TokenBucket,
+        call_with_retry_async,
+        classify_exception,
+        classify_legacy_outcome,
+        classify_result,
+        is_overload_error,
+        is_overload_result,
+    )
+
+
+class StatusError(RuntimeError):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class OverloadClassificationTest(unittest.TestCase):
+    def test_classifies_status_codes_timeouts_and_legacy_results(self):
+        self.assertTrue(is_overload_error(StatusError(429)))
+        self.assertTrue(is_overload_error(StatusError(503)))
+        self.assertFalse(is_overload_error(StatusError(401)))
+        self.assertTrue(is_overload_error(TimeoutError()))
+        self.assertTrue(is_overload_result({"status_code": 502, "text": "<html>"}))
+        self.assertTrue(is_overload_result({"error": "Read timed out.", "errorClass": "timeout"}))
+        self.assertFalse(is_overload_result({"code": 400, "msg": "参数错误"}))
+
+    def test_error_text_alone_is_not_classified(self):
+        self.assertEqual(classify_result({"error": "第 500 题答案超时未作答"}), "unknown")
+        self.assertEqual(classify_exception(ValueError("HTTP 503 in message")), "unknown")
+        self.assertEqual(classify_exception(requests.ReadTimeout()), "timeout")
+        self.assertEqual(classify_exception(requests.ConnectionError()), "network")
+
+    def test_separates_failed_connects_from_dropped_requests(self):
+        refused = requests.ConnectionError(
+            MaxRetryError(None, "/execute", NewConnectionError(None, "[Errno 111] Connection refused"))
+        )
+        dropped = requests.ConnectionError(
+            ProtocolError("Connection aborted.", http.client.RemoteDisconnected("closed"))
+        )
+        self.assertEqual(classify_exception(refused), "connect")
+        self.assertEqual(classify_exception(requests.ConnectTimeout()), "connect")
+        self.assertEqual(classify_exception(dropped), "network")
+
+    def test_wrapper_error_class_is_honoured(self):
+        wrapped = RuntimeError("上传失败")
+        wrapped.error_class = "timeout"
+        self.assertEqual(classify_exception(wrapped), "timeout")
+
+
+class AdaptiveConcurrencyLimiterTest(unittest.IsolatedAsyncioTestCase):
+    async def test_cuts_once_per_cohort_and_grows_additively(self):
+        changes = []
+        limiter = AdaptiveConcurrencyLimiter(
+            8,
+            maximum=8,
+            on_change=lambda previous, current, reason: changes.append((previous, current, reason)),
+        )
+        permits = [await limiter.acquire() for _ in range(4)]
+        for permit in permits:
+            permit.mark_overload()
+            await limiter.release(permit)
+
+        self.assertEqual(limiter.limit, 4)
+        self.assertEqual(changes, [(8, 4, "overload")])
+
+        for _ in range(5):
+            async with limiter.slot():
+                pass
+        self.assertEqual(limiter.limit, 5)
+
+        snapshot = await limiter.snapshot()
+        self.assertEqual(snapshot["overloads"], 4)
+        self.assertEqual(snapshot["decreases"], 1)
+        self.assertEqual(snapshot["increases"], 1)
+        self.assertEqual(snapshot["active"], 0)
+
+    async def test_window_bounds_in_flight_calls(self):
+        limiter = AdaptiveConcurrencyLimiter(2, maximum=2)
+        active = 0
+        peak = 0
+
+        async def call():
+            nonlocal active, peak
+            async with limiter.slot():
+                active += 1
+                peak = max(peak, active)
+                await asyncio.sleep(0.01)
+                active -= 1
+
+        await asyncio.gather(*(call() for _ in range(6)))
+        self.assertEqual(peak, 2)
+
+    async def test_overload_exception_shrinks_window(self):
+        limiter = AdaptiveConcurrencyLimiter(4, maximum=4)
+        with self.assertRaises(StatusError):
+            async with limiter.slot():
+                raise StatusError(429)
+        self.assertEqual(limiter.limit, 2)
+
+
+class RetryEngineTest(unittest.IsolatedAsyncioTestCase):
+    async def test_retries_transient_failures_and_counts_attempts(self):
+        outcomes = [
+            (False, {"status_code": 503, "text": "busy"}),
+            (False, {"error": "reset", "errorClass": "network"}),
+            (True, {"success": True}),
+        ]
+        budget = RetryBudget(minimum=5)
+        retries = []
+
+        async def call():
+            return outcomes.pop(0)
+
+        with mock.patch("asyncio.sleep", new=mock.AsyncMock()):
+            success, _ = await call_with_retry_async(
+                call,
+                policy=RetryPolicy("execute-agent", max_attempts=5),
+                budget=budget,
+                classify_outcome=classify_legacy_outcome,
+                on_retry=lambda attempt, error_class, delay, value: retries.append(error_class),
+            )
+
+        self.assertTrue(success)
+        self.assertEqual(retries, ["server", "network"])
+        snapshot = budget.snapshot()
+        self.assertEqual(snapshot["attempts"], 3)
+        self.assertEqual(snapshot["retries"], 2)
+        self.assertEqual(snapshot["giveUps"], {})
+
+    async def test_gives_up_on_client_errors_and_exhausted_budget(self):
+        budget = RetryBudget(ratio=0, minimum=1)
+
+        async def rejected():
+            return False, {"code": 401, "msg": "登录失效"}
+
+        async def throttled():
+            return False, {"status_code": 429}
+
+        with mock.patch("asyncio.sleep", new=mock.AsyncMock()):
+            policy = RetryPolicy("execute-agent", max_attempts=5)
+            await call_with_retry_async(rejected, policy=policy, budget=budget, classify_outcome=classify_legacy_outcome)
+            await call_with_retry_async(throttled, policy=policy, budget=budget, classify_outcome=classify_legacy_outcome)
+
+        snapshot = budget.snapshot()
+        self.assertEqual(snapshot["giveUps"], {"nonRetryable": 1, "budget": 1})
+        self.assertEqual(snapshot["attempts"], 3)
+
+    def test_decorrelated_jitter_stays_within_bounds(self):
+        policy = RetryPolicy("report", base_delay=1.0, max_delay=10.0)
+        delay = policy.base_delay
+        for _ in range(50):
+            delay = policy.next_delay(delay)
+            self.assertGreaterEqual(delay, 1.0)
+            self.assertLessEqual(delay, 10.0)
+
+
+class CircuitBreakerTest(unittest.TestCase):
+    def test_opens_fails_fast_then_closes_after_probes(self):
+        transitions = []
+        breaker = CircuitBreaker(
+            "execute-agent",
+            failure_threshold=2,
+            open_seconds=30,
+            success_threshold=2,
+            on_change=lambda name, previous, state: transitions.append((previous, state)),
+        )
+        with mock.patch("time.monotonic", return_value=100.0):
+            for _ in range(2):
+                breaker.record("server", probe=breaker.before_call())
+            self.assertEqual(breaker.state, "open")
+            with self.assertRaises(CircuitOpenError):
+                breaker.before_call()
+
+        with mock.patch("time.monotonic", return_value=131.0):
+            self.assertTrue(breaker.before_call())
+            with self.assertRaises(CircuitOpenError):
+                breaker.before_call()
+            breaker.record(None, probe=True)
+            self.assertTrue(breaker.before_call())
+            breaker.record("client", probe=True)
+
+        self.assertEqual(breaker.state, "closed")
+        self.assertEqual(transitions, [("closed", "open"), ("open", "half_open"), ("half_open", "closed")])
+        self.assertEqual(breaker.snapshot()["rejected"], 2)
+
+    def test_failed_probe_reopens(self):
+        breaker = CircuitBreaker("llm", failure_threshold=1, open_seconds=10)
+        with mock.patch("time.monotonic", return_value=0.0):
+            breaker.record("timeout", probe=breaker.before_call())
+        with mock.patch("time.monotonic", return_value=11.0):
+            breaker.record("network", probe=breaker.before_call())
+            self.assertEqual(breaker.state, "open")
+            self.assertEqual(breaker.snapshot()["opens"], 2)
+
+
+class RetryWithBreakerTest(unittest.IsolatedAsyncioTestCase):
+    async def test_open_breaker_stops_retries_without_calling(self):
+        breaker = CircuitBreaker("report", failure_threshold=2, open_seconds=60)
+        budget = RetryBudget()
+        calls = 0
+
+        async def failing():
+            nonlocal calls
+            calls += 1
+            raise requests.ConnectionError("down")
+
+        with mock.patch("asyncio.sleep", new=mock.AsyncMock()):
+            with self.assertRaises(CircuitOpenError):
+                await call_with_retry_async(
+                    failing,
+                    policy=RetryPolicy("report", max_attempts=5),
+                    budget=budget,
+                    breaker=breaker,
+                )
+        self.assertEqual(calls, 2)
+        self.assertEqual(budget.snapshot()["giveUps"], {"circuitOpen": 1})
+
+
+class RequestHedgerTest(unittest.TestCase):
+    def test_slow_primary_is_hedged_and_backup_wins(self):
+        hedger = RequestHedger("get-task", max_extra_ratio=1.0, min_samples=5)
+        for _ in range(5):
+            hedger.call(lambda: "fast")
+
+        release_primary = threading.Event()
+        calls = []
+        lock = threading.Lock()
+
+        def request():
+            with lock:
+                calls.append(len(calls))
+                index = calls[-1]
+            if index == 0:
+                release_primary.wait(5)
+                return "primary"
+            return "backup"
+
+        try:
+            self.assertEqual(hedger.call(request), "backup")
+        finally:
+            release_primary.set()
+        snapshot = hedger.snapshot()
+        self.assertEqual(snapshot["hedgesSent"], 1)
+        self.assertEqual(snapshot["hedgesWon"], 1)
+
+    def test_hedges_respect_extra_load_cap(self):
+        hedger = RequestHedger("correction-skill-report", max_extra_ratio=0.0, min_samples=1)
+        hedger.call(lambda: "warm")
+
+        def slow():
+            threading.Event().wait(0.2)
+            return "primary"
+
+        self.assertEqual(hedger.call(slow), "primary")
+        snapshot = hedger.snapshot()
+        self.assertEqual(snapshot["hedgesSent"], 0)
+        self.assertEqual(snapshot["hedgesSkipped"], 1)
+
+    def test_time_queued_in_pool_does_not_trigger_hedge(self):
+        hedger = RequestHedger("get-task", max_extra_ratio=1.0, min_samples=1, min_delay=0.05)
+        hedger.call(lambda: "warm")
+        pool = ThreadPoolExecutor(max_workers=1)
+        busy = threading.Event()
+        pool.submit(busy.wait, 5)
+        threading.Timer(0.3, busy.set).start()
+        try:
+            with mock.patch(f"{RequestHedger.__module__}._hedge_executor", return_value=pool):
+                self.assertEqual(hedger.call(lambda: "primary"), "primary")
+        finally:
+            busy.set()
+            pool.shutdown()
+        self.assertEqual(hedger.snapshot()["hedgesSent"], 0)
+
+    def test_disabled_hedger_calls_once(self):
+        hedger = RequestHedger("llm", enabled=False, min_samples=1)
+        self.assertEqual(hedger.call(lambda: "ok"), "ok")
+        self.assertEqual(hedger.snapshot()["hedgesSent"], 0)
+
+
+class TokenBucketTest(unittest.TestCase):
+    def test_reservations_queue_behind_burst(self):
+        bucket = TokenBucket(2.0, 2)
+        with mock.patch("time.time", return_value=1000.0):
+            bucket._updated = 1000.0
+            waits = [bucket.reserve() for _ in range(4)]
+        self.assertEqual(waits, [0.0, 0.0, 0.5, 1.0])
+        self.assertEqual(bucket.snapshot()["throttled"], 2)
+
+    def test_state_file_is_shared_between_buckets(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            state_path = Path(temp_dir) / "execute-agent.json"
+            first = TokenBucket(1.0, 1, state_path=state_path)
+            second = TokenBucket(1.0, 1, state_path=state_path)
+            if first.state_path is None:
+                self.skipTest("shared buckets need fcntl")
+            with mock.patch("time.time", return_value=1000.0):
+                self.assertEqual(first.reserve(), 0.0)
+                self.assertEqual(second.reserve(), 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+from docx import Document
+from docx.enum.text import WD_BREAK
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+
+try:
+    from .docx_text import (
+        DocxParagraph,
+        DocxTableRow,
+        docx_paragraph_texts,
+        iter_docx_blocks,
+        paragraph_style_names,
+    )
+except ImportError:
+    from docx_text import (
+        DocxParagraph,
+        DocxTableRow,
+        docx_paragraph_texts,
+        iter_docx_blocks,
+        paragraph_style_names,
+    )
+
+
+def build_sample_docx(path: Path) -> None:
+    document = Document()
+    document.add_heading("期末作业", level=1)
+    document.add_paragraph("一、单项选择题")
+    run_paragraph = document.add_paragraph("第一行")
+    run_paragraph.runs[0].add_break()
+    run_paragraph.add_run("第二行\t制表")
+    run_paragraph.add_run("分页").add_break(WD_BREAK.PAGE)
+    document.add_paragraph("   ")
+
+    hyperlink = OxmlElement("w:hyperlink")
+    link_run = OxmlElement("w:r")
+    link_text = OxmlElement("w:t")
+    link_text.text = "参考链接"
+    link_run.append(link_text)
+    hyperlink.append(link_run)
+    document.add_paragraph("见 ")._p.append(hyperlink)
+
+    table = document.add_table(rows=3, cols=3)
+    table.cell(0, 0).text = "题号"
+    table.cell(0, 1).text = "答案"
+    table.cell(0, 2).text = "备注"
+    table.cell(1, 0).merge(table.cell(2, 0)).text = "1"
+    table.cell(1, 1).merge(table.cell(1, 2)).text = "横向合并"
+    table.cell(2, 1).text = "第一段"
+    table.cell(2, 1).add_paragraph("第二段")
+    document.add_paragraph("二、简答题")
+    document.add_table(rows=1, cols=2).cell(0, 1).text = "  "
+    document.add_heading("附录", level=2)
+    document.save(str(path))
+
+
+class DocxTextTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.temp_dir.name) / "sample.docx"
+        build_sample_docx(self.path)
+        self.document = Document(str(self.path))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_paragraph_texts_match_python_docx(self):
+        expected = [p.text.strip() for p in self.document.paragraphs if p.text.strip()]
+        self.assertEqual(docx_paragraph_texts(self.path), expected)
+
+    def test_blocks_follow_document_order_and_expand_merged_cells(self):
+        blocks = list(iter_docx_blocks(self.path))
+        paragraphs = [block.text for block in blocks if isinstance(block, DocxParagraph)]
+        rows = [block for block in blocks if isinstance(block, DocxTableRow)]
+
+        self.assertEqual(paragraphs, [p.text for p in self.document.paragraphs])
+        expected_rows = [
+            (table_index, tuple(cell.text for cell in row.cells))
+            for table_index, table in enumerate(self.document.tables, start=1)
+            for row in table.rows
+        ]
+        self.assertEqual([(row.table_index, row.cells) for row in rows], expected_rows)
+        first_row_index = blocks.index(rows[0])
+        self.assertIsInstance(blocks[first_row_index - 1], DocxParagraph)
+        self.assertEqual(blocks[first_row_index + 3], DocxParagraph("二、简答题", ""))
+
+    def test_style_names_identify_headings_like_python_docx(self):
+        with zipfile.ZipFile(self.path) as archive:
+            names, default_name = paragraph_style_names(archive)
+            blocks = [block for block in iter_docx_blocks(archive) if isinstance(block, DocxParagraph)]
+
+        for block, paragraph in zip(blocks, self.document.paragraphs):
+            name = names.get(block.style_id, default_name) if block.style_id else default_name
+            self.assertEqual(name, paragraph.style.name)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import io
+import unittest
+import zipfile
+
+from docx import Document
+
+try:
+    from .docx_writer import TITLE_PLACEHOLDER, DocxTemplate, paragraph_properties, paragraph_xml, run_properties
+except ImportError:
+    from docx_writer import TITLE_PLACEHOLDER, DocxTemplate, paragraph_properties, paragraph_xml, run_properties
+
+
+def document_xml(document) -> bytes:
+    buffer = io.BytesIO()
+    document.save(buffer)
+    with zipfile.ZipFile(buffer) as archive:
+        return archive.read("word/document.xml")
+
+
+class DocxWriterTest(unittest.TestCase):
+    def test_body_matches_python_docx_output(self):
+        expected = Document()
+        bold = expected.add_paragraph("期末 <试卷> & 答案")
+        bold.runs[0].bold = True
+        expected.add_paragraph("要点\t说明  ")
+        expected.add_heading("第一部分", level=1)
+        expected.add_paragraph("第一行\n第二行")
+
+        template = DocxTemplate.from_document(Document())
+        output = io.BytesIO()
+        template.write(
+            [
+                paragraph_xml("期末 <试卷> & 答案", rpr=run_properties(bold=True)),
+                paragraph_xml("要点\t说明  "),
+                paragraph_xml("第一部分", ppr=paragraph_properties(style_id="Heading1")),
+                paragraph_xml("第一行\n第二行"),
+            ],
+            output,
+        )
+
+        with zipfile.ZipFile(output) as archive:
+            self.assertEqual(archive.read("word/document.xml"), document_xml(expected))
+
+    def test_title_placeholder_and_invalid_characters(self):
+        base = Document()
+        base.core_properties.title = TITLE_PLACEHOLDER
+        template = DocxTemplate.from_document(base)
+        output = io.BytesIO()
+        template.write([paragraph_xml("控制\x01字符")], output, title="实验 & 报告")
+
+        written = Document(io.BytesIO(output.getvalue()))
+        self.assertEqual(written.core_properties.title, "实验 & 报告")
+        self.assertEqual([paragraph.text for paragraph in written.paragraphs], ["控制字符"])
+
+    def test_template_is_reusable(self):
+        template = DocxTemplate.from_document(Document())
+        texts = []
+        for index in range(3):
+            output = io.BytesIO()
+            template.write([paragraph_xml(f"第 {index} 份")], output)
+            texts.append([paragraph.text for paragraph in Document(io.BytesIO(output.getvalue())).paragraphs])
+        self.assertEqual(texts, [["第 0 份"], ["第 1 份"], ["第 2 份"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import os
+import tempfile
+import threading
+import unittest
+import zipfile
+from pathlib import Path
+
+from docx import Document
+
+try:
+    from .file_preview import PreviewCache, count_pptx_slides, load_preview_page, render_docx_preview_blocks
+except ImportError:
+    from file_preview import PreviewCache, count_pptx_slides, load_preview_page, render_docx_preview_blocks
+
+
+def write_pptx(path: Path, slides: int) -> None:
+    slide_ids = "".join(f'<p:sldId id="{256 + index}" r:id="rId{index + 2}"/>' for index in range(slides))
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr(
+            "_rels/.rels",
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="ppt/presentation.xml"/>'
+            "</Relationships>",
+        )
+        archive.writestr(
+            "ppt/presentation.xml",
+            '<p:presentation xmlns:p="http://schemas.openxmlformats.org/presentationml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            f"<p:sldIdLst>{slide_ids}</p:sldIdLst></p:presentation>",
+        )
+
+
+class FilePreviewTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_docx(self, name: str, paragraphs: int) -> Path:
+        document = Document()
+        document.add_heading("实验报告", level=1)
+        for index in range(paragraphs):
+            document.add_paragraph(f"第 {index} 段 <数据> & 结论")
+        path = self.root / name
+        document.save(path)
+        return path
+
+    def test_docx_blocks_escape_text_and_keep_heading_style(self):
+        blocks = render_docx_preview_blocks(self.write_docx("report.docx", 1))
+        self.assertEqual(blocks, ["<h3>实验报告</h3>", "<p>第 0 段 &lt;数据&gt; &amp; 结论</p>"])
+
+    def test_pages_are_served_from_cache_until_the_file_changes(self):
+        path = self.write_docx("report.docx", 4)
+        cache = PreviewCache()
+        calls = []
+
+        def counting_render(file_path):
+            calls.append(file_path)
+            return render_docx_preview_blocks(file_path)
+
+        first = cache.blocks(path, counting_render)
+        self.assertIs(cache.blocks(path, counting_render), first)
+        copy = self.root / "copy.docx"
+        copy.write_bytes(path.read_bytes())
+        self.assertIs(cache.blocks(copy, counting_render), first)
+        self.assertEqual(len(calls), 1)
+
+        self.write_docx("report.docx", 6)
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        self.assertEqual(len(cache.blocks(path, counting_render)), 7)
+        self.assertEqual(len(calls), 2)
+
+        page = load_preview_page(path, cache, page=2, page_size=3)
+        self.assertEqual((page["page"], page["pageCount"], page["blockCount"]), (2, 3, 7))
+        self.assertEqual(page["html"], "<p>第 2 段 &lt;数据&gt; &amp; 结论</p>\n<p>第 3 段 &lt;数据&gt; &amp; 结论</p>\n<p>第 4 段 &lt;数据&gt; &amp; 结论</p>")
+        self.assertEqual(load_preview_page(path, cache, page=99, page_size=3)["page"], 3)
+
+    def test_concurrent_requests_share_one_render(self):
+        path = self.write_docx("report.docx", 1)
+        cache = PreviewCache()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def slow_render(file_path):
+            calls.append(file_path)
+            started.set()
+            release.wait(5)
+            return ["<p>done</p>"]
+
+        results = []
+        first = threading.Thread(target=lambda: results.append(cache.blocks(path, slow_render)))
+        first.start()
+        started.wait(5)
+        second = threading.Thread(target=lambda: results.append(cache.blocks(path, slow_render)))
+        second.start()
+        release.set()
+        first.join(5)
+        second.join(5)
+
+        self.assertEqual(results, [["<p>done</p>"], ["<p>done</p>"]])
+        self.assertEqual(len(calls), 1)
+
+    def test_slide_count_comes_from_presentation_manifest(self):
+        path = self.root / "slides.pptx"
+        write_pptx(path, 12)
+        self.assertEqual(count_pptx_slides(path), 12)
+        page = load_preview_page(path, PreviewCache())
+        self.assertIn("共 12 页幻灯片", page["html"])
+
+    def test_same_slides_under_another_name_show_their_own_name(self):
+        cache = PreviewCache()
+        first = self.root / "第一份.pptx"
+        write_pptx(first, 3)
+        second = self.root / "第二份.pptx"
+        second.write_bytes(first.read_bytes())
+
+        self.assertIn("第一份.pptx", load_preview_page(first, cache)["html"])
+        page = load_preview_page(second, cache)
+        self.assertIn("第二份.pptx", page["html"])
+        self.assertNotIn("第一份.pptx", page["html"])
+        self.assertEqual(len(cache), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+
+try:
+    from .json_stream import IncrementalObjectScanner, JsonArrayItem, JsonMember, JsonStreamError
+except ImportError:
+    from json_stream import IncrementalObjectScanner, JsonArrayItem, JsonMember, JsonStreamError
+
+
+def feed_in_chunks(text: str, size: int):
+    scanner = IncrementalObjectScanner()
+    events = []
+    for index in range(0, len(text), size):
+        events.extend(scanner.feed(text[index:index + size]))
+    return scanner, events
+
+
+class JsonStreamTest(unittest.TestCase):
+    def test_members_and_array_items_are_emitted_as_they_complete(self):
+        text = '说明文字\n```json\n{"name": "评分 {草稿}", "items": [{"k": "a,b"}, [1, 2], "x\\"]"], "total": 3}\n```'
+        for size in (1, 4, len(text)):
+            scanner, events = feed_in_chunks(text, size)
+            self.assertTrue(scanner.finished)
+            self.assertEqual(
+                events,
+                [
+                    JsonMember("name", "评分 {草稿}"),
+                    JsonArrayItem("items", 0, {"k": "a,b"}),
+                    JsonArrayItem("items", 1, [1, 2]),
+                    JsonArrayItem("items", 2, 'x"]'),
+                    JsonMember("items", [{"k": "a,b"}, [1, 2], 'x"]']),
+                    JsonMember("total", 3),
+                ],
+            )
+
+    def test_member_is_reported_before_the_object_closes(self):
+        scanner = IncrementalObjectScanner()
+        self.assertEqual(scanner.feed('{"a": 1, "b": [tr'), [JsonMember("a", 1)])
+        self.assertFalse(scanner.finished)
+        self.assertEqual(scanner.feed("ue, "), [JsonArrayItem("b", 0, True)])
+
+    def test_completed_members_are_not_kept(self):
+        text = "{" + ", ".join(f'"k{index}": "{"x" * 50}"' for index in range(2000)) + ', "items": ['
+        scanner, events = feed_in_chunks(text, 7)
+        self.assertEqual(len(events), 2000)
+        self.assertLess(sum(len(chunk) for chunk in scanner._chunks), 30)
+        self.assertEqual(scanner.feed('1, 2], "done": true}'), [
+            JsonArrayItem("items", 0, 1),
+            JsonArrayItem("items", 1, 2),
+            JsonMember("items", [1, 2]),
+            JsonMember("done", True),
+        ])
+
+    def test_malformed_member_raises(self):
+        scanner = IncrementalObjectScanner()
+        with self.assertRaises(JsonStreamError):
+            scanner.feed('{"a": 1 "b": 2,')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,150 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from docx import Document
+
+try:
+    from .cloud_request_control import CircuitBreaker
+    from .llm_answer_corrector import (
+        call_llm_api,
+        correct_answers_in_batches,
+        plan_correction_batches,
+        select_issue_context,
+    )
+except ImportError:
+    from cloud_request_control import CircuitBreaker
+    from llm_answer_corrector import (
+        call_llm_api,
+        correct_answers_in_batches,
+        plan_correction_batches,
+        select_issue_context,
+    )
+
+ESSAY = "数字化转型需要组织、流程与技术协同推进，企业应当从业务痛点出发逐步建设数据能力。" * 20
+PARAGRAPHS = [
+    "期末作业",
+    "一、单项选择题",
+    "1.B 2.",
+    "二、论述题",
+    "1. 论述数字化转型的关键因素",
+    *[ESSAY for _ in range(6)],
+    "三、案例分析题",
+    "1. 分析原因",
+    ESSAY,
+]
+
+
+def write_docx(path: Path, paragraphs) -> Path:
+    document = Document()
+    for text in paragraphs:
+        document.add_paragraph(text)
+    document.save(path)
+    return path
+
+
+def text_input(*pairs) -> str:
+    return json.dumps([{"itemName": name, "stuAnswerContent": answer} for name, answer in pairs], ensure_ascii=False)
+
+
+class LlmAnswerCorrectorTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_context_is_limited_to_the_flagged_section(self):
+        context = select_issue_context(PARAGRAPHS, [{"itemName": "单项选择题第2题"}])
+        self.assertEqual(context, "一、单项选择题\n1.B 2.")
+        self.assertIsNone(select_issue_context(PARAGRAPHS, [{"itemName": "附加题"}]))
+
+        essay_context = select_issue_context(PARAGRAPHS, [{"itemName": "论述题第1题"}])
+        self.assertTrue(essay_context.startswith("二、论述题\n1. 论述数字化转型的关键因素"))
+        self.assertNotIn("三、案例分析题", essay_context)
+        self.assertLess(essay_context.count(ESSAY), 6)
+
+    def test_question_starts_are_matched_only_at_paragraph_start(self):
+        sub_points = "1. 外部性导致资源错配，占比约 2.5%；2. 公共物品存在搭便车；3. 信息不对称。" * 30
+        paragraphs = [
+            "一、简答题",
+            "1. 简述市场失灵的原因",
+            sub_points,
+            "2. 论述政府干预的边界",
+            "政府干预应以弥补市场失灵为限。",
+        ]
+        context = select_issue_context(paragraphs, [{"itemName": "简答题第2题"}])
+        self.assertEqual(context, "一、简答题\n……\n2. 论述政府干预的边界\n政府干预应以弥补市场失灵为限。")
+
+        # 题号在段首出现两次（作答中的分点另起一段）时无法确定题目位置，退回全文
+        ambiguous = paragraphs[:3] + ["2. 公共物品存在搭便车"] + paragraphs[3:]
+        self.assertIsNone(select_issue_context(ambiguous, [{"itemName": "简答题第2题"}]))
+        self.assertIsNone(select_issue_context(paragraphs, [{"itemName": "简答题第3题"}]))
+
+    def test_small_corrections_from_several_files_share_one_call(self):
+        first = write_docx(self.root / "first.docx", PARAGRAPHS)
+        second = write_docx(self.root / "second.docx", PARAGRAPHS)
+        unlocated = write_docx(self.root / "third.docx", PARAGRAPHS)
+        complete = write_docx(self.root / "fourth.docx", PARAGRAPHS)
+        entries = [
+            (first, text_input(("单项选择题第1题", "B"), ("单项选择题第2题", ""))),
+            (second, text_input(("单项选择题第1题", "B"), ("单项选择题第2题", "选C"))),
+            (unlocated, text_input(("附加题", ""))),
+            (complete, text_input(("单项选择题第1题", "B"))),
+        ]
+        prompts = []
+
+        def fake_llm(prompt, *args):
+            prompts.append(prompt)
+            if "=== 文件" in prompt:
+                return json.dumps({"files": [
+                    {"file": "F1", "corrections": [
+                        {"itemName": "单项选择题第2题", "stuAnswerContent": "A"},
+                        {"itemName": "单项选择题第1题", "stuAnswerContent": "D"},
+                    ]},
+                    {"file": "F2", "corrections": [{"itemName": "单项选择题第2题", "stuAnswerContent": "C"}]},
+                ]})
+            return json.dumps({"corrections": [{"itemName": "附加题", "stuAnswerContent": "补充作答"}]})
+
+        module = correct_answers_in_batches.__module__
+        with patch(f"{module}.load_llm_config", return_value=("key", "https://example.test", "model")), patch(
+            f"{module}.call_llm_api", side_effect=fake_llm
+        ):
+            outputs, usage = correct_answers_in_batches(entries)
+
+        self.assertEqual(len(prompts), 2)
+        batched = [prompt for prompt in prompts if "=== 文件 F1 ===" in prompt]
+        self.assertEqual(len(batched), 1)
+        self.assertIn("=== 文件 F2 ===", batched[0])
+        self.assertFalse(ESSAY in batched[0])
+        self.assertEqual([item["stuAnswerContent"] for item in json.loads(outputs[0])], ["B", "A"])
+        self.assertEqual(json.loads(outputs[1])[1]["stuAnswerContent"], "C")
+        self.assertEqual(json.loads(outputs[2])[0]["stuAnswerContent"], "补充作答")
+        self.assertEqual(outputs[3], entries[3][1])
+        self.assertEqual((usage.files, usage.calls, usage.failed_files), (3, 2, []))
+        self.assertLess(usage.prompt_tokens, usage.baseline_tokens)
+
+    def test_large_contexts_are_not_merged(self):
+        class Request:
+            def __init__(self, size, located=True):
+                self.context = "x" * size
+                self.located = located
+
+        small, large, other, full = Request(100), Request(7000), Request(200), Request(50, located=False)
+        batches = plan_correction_batches([small, large, other, full], max_chars=6000)
+        self.assertEqual(batches, [[large], [full], [small, other]])
+
+
+    def test_open_llm_breaker_skips_correction_without_posting(self):
+        breaker = CircuitBreaker("llm", failure_threshold=1, open_seconds=60)
+        breaker.record("server", probe=False)
+        module = call_llm_api.__module__
+        with patch(f"{module}.get_circuit_breaker", return_value=breaker), patch("requests.post") as post:
+            self.assertIsNone(call_llm_api("prompt", "key", "https://example.test", "model"))
+        post.assert_not_called()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+try:
+    from .local_parser import (
+        QuestionGrammar,
+        load_default_grammar,
+        parse_choice_answers,
+        parse_judge_answers,
+        parse_paragraphs,
+        save_subjective_answer,
+    )
+except ImportError:
+    from local_parser import (
+        QuestionGrammar,
+        load_default_grammar,
+        parse_choice_answers,
+        parse_judge_answers,
+        parse_paragraphs,
+        save_subjective_answer,
+    )
+
+
+class QuestionGrammarTest(unittest.TestCase):
+    def test_default_grammar_parses_objective_and_subjective_sections(self):
+        items = parse_paragraphs([
+            "**一、单项选择题**",
+            "1.b 2.C",
+            "二、判断题",
+            "1.对 2.F",
+            "三、案例分析题",
+            "案例背景：某企业推进数字化转型。",
+            "1. 分析原因",
+            "1.8% 的员工提出异议",
+            "2、提出对策",
+        ])
+
+        self.assertEqual(
+            [(item["itemName"], item["stuAnswerContent"]) for item in items],
+            [
+                ("单项选择题第1题", "B"),
+                ("单项选择题第2题", "C"),
+                ("判断题第1题", "√"),
+                ("判断题第2题", "×"),
+                ("案例分析题第1问", "1. 分析原因\n\n1.8% 的员工提出异议"),
+                ("案例分析题第2问", "2、提出对策"),
+            ],
+        )
+
+    def test_sections_are_matched_in_configured_priority(self):
+        grammar = QuestionGrammar()
+        self.assertEqual(grammar.section("一、判断题；二、单项选择题").name, "单项选择题")
+        self.assertIsNone(grammar.section("单项选择题"))
+
+    def test_new_template_is_added_through_configuration(self):
+        config = {
+            "sections": [
+                {"name": "多项选择题", "kind": "choice", "answerPattern": r"(\d+)[\.．]([A-Fa-f]+)"},
+                {"name": "实验报告题", "kind": "subjective", "itemUnit": "部分"},
+            ],
+            "maxQuestionNumber": 20,
+        }
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config_path = Path(temp_dir) / "grammar.json"
+            config_path.write_text(json.dumps(config, ensure_ascii=False), encoding="utf-8")
+            grammar = QuestionGrammar.from_file(config_path)
+
+        items = parse_paragraphs(
+            ["一、多项选择题", "1.abd 2.CE", "二、实验报告题", "15. 数据处理", "误差分析"],
+            grammar,
+        )
+        self.assertEqual(
+            [(item["itemName"], item["stuAnswerContent"]) for item in items],
+            [
+                ("多项选择题第1题", "ABD"),
+                ("多项选择题第2题", "CE"),
+                ("实验报告题第15部分", "15. 数据处理\n\n误差分析"),
+            ],
+        )
+        self.assertIsNotNone(grammar.section("三、简答题"))
+
+    def test_objective_section_requires_answer_pattern(self):
+        with self.assertRaisesRegex(ValueError, "answer_pattern"):
+            QuestionGrammar.from_config({"sections": [{"name": "填空题", "kind": "choice"}]})
+
+    def test_default_grammar_without_configuration(self):
+        self.assertIsNotNone(load_default_grammar().section("五、论述题"))
+
+    def test_legacy_helpers_keep_their_signatures(self):
+        items = []
+        parse_choice_answers("**1.b 2．C**", items, "多项选择题")
+        parse_judge_answers("1.对 2.F", items)
+        save_subjective_answer(items, "案例分析题", 2, ["第一段", "第二段"])
+        save_subjective_answer(items, "简答题", 1, [])
+        self.assertEqual(
+            [(item["itemName"], item["stuAnswerContent"]) for item in items],
+            [
+                ("多项选择题第1题", "B"),
+                ("多项选择题第2题", "C"),
+                ("判断题第1题", "√"),
+                ("判断题第2题", "×"),
+                ("案例分析题第2问", "第一段\n\n第二段"),
+            ],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import fitz
+
+try:
+    from . import pdf_text
+    from .skill_generation_service import MAX_MATERIAL_CHARS_PER_FILE, _truncate_text
+except ImportError:
+    import pdf_text
+    from skill_generation_service import MAX_MATERIAL_CHARS_PER_FILE, _truncate_text
+
+
+def write_pdf(path: Path, pages: int, lines_per_page: int = 30) -> None:
+    document = fitz.open()
+    for page_index in range(pages):
+        page = document.new_page()
+        for line in range(lines_per_page):
+            page.insert_text((40, 40 + line * 20), f"page {page_index} line {line} course material", fontsize=9)
+    document.save(str(path))
+    document.close()
+
+
+def sequential_pages(path: Path):
+    document = fitz.open(str(path))
+    try:
+        return [page.get_text("text") for page in document]
+    finally:
+        document.close()
+
+
+class PdfTextTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.temp_dir.name) / "material.pdf"
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_parallel_page_ranges_keep_page_order(self):
+        write_pdf(self.path, pages=24, lines_per_page=3)
+        with mock.patch.object(pdf_text, "PDF_PAGES_PER_TASK", 4), \
+                mock.patch.object(pdf_text, "PDF_PARALLEL_MIN_PAGES", 8):
+            pages = pdf_text.extract_pdf_pages(self.path, max_workers=2)
+
+        self.assertEqual(pages, sequential_pages(self.path))
+
+    def test_documents_share_one_process_pool(self):
+        write_pdf(self.path, pages=24, lines_per_page=3)
+        with mock.patch.object(pdf_text, "PDF_PAGES_PER_TASK", 4), \
+                mock.patch.object(pdf_text, "PDF_PARALLEL_MIN_PAGES", 8), \
+                mock.patch.object(pdf_text, "PDF_MAX_WORKERS", 2):
+            pdf_text.shutdown_pdf_pool()
+            pdf_text.extract_pdf_pages(self.path)
+            pool = pdf_text._PDF_POOL
+            pages = pdf_text.extract_pdf_pages(self.path)
+
+        self.assertIsNotNone(pool)
+        self.assertIs(pdf_text._PDF_POOL, pool)
+        self.assertEqual(pages, sequential_pages(self.path))
+
+    def test_char_budget_stops_early_without_changing_truncated_text(self):
+        write_pdf(self.path, pages=60)
+        pages = pdf_text.extract_pdf_pages(self.path, char_budget=MAX_MATERIAL_CHARS_PER_FILE)
+        expected = sequential_pages(self.path)
+
+        self.assertLess(len(pages), len(expected))
+        self.assertEqual(pages, expected[:len(pages)])
+        self.assertEqual(
+            _truncate_text("\n".join(pages), MAX_MATERIAL_CHARS_PER_FILE),
+            _truncate_text("\n".join(expected), MAX_MATERIAL_CHARS_PER_FILE),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
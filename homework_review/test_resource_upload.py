@@ -0,0 +1,90 @@
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import requests
+
+try:
+    from .resource_upload import ResourceUploadError, plan_upload_chunks, upload_resource_file
+except ImportError:
+    from resource_upload import ResourceUploadError, plan_upload_chunks, upload_resource_file
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload):
+        self.status_code = status_code
+        self.ok = status_code < 400
+        self._payload = payload
+        self.text = str(payload)
+
+    def json(self):
+        return self._payload
+
+
+class ResourceUploadTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.temp_dir.name) / "scan.pdf"
+        self.path.write_bytes(b"0123456789" * 5)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_plan_upload_chunks_covers_file(self):
+        self.assertEqual(plan_upload_chunks(50, 20), [(0, 20), (20, 20), (40, 10)])
+        self.assertEqual(plan_upload_chunks(0, 20), [(0, 0)])
+
+    def test_chunked_upload_retries_only_failed_part_and_sends_last_part_last(self):
+        calls = []
+        failed_once = set()
+        lock = threading.Lock()
+
+        def fake_post(url, *, headers, data, files, timeout):
+            index = int(data["chunk"])
+            with lock:
+                calls.append((index, data["identifyCode"], data["chunks"], files["file"][1]))
+                if index == 1 and index not in failed_once:
+                    failed_once.add(index)
+                    return FakeResponse(503, {"msg": "busy"})
+            if index == 4:
+                return FakeResponse(200, {"code": 200, "success": True, "data": {"ossUrl": "https://oss/scan.pdf"}})
+            return FakeResponse(200, {"code": 200, "success": True, "data": {}})
+
+        with mock.patch("requests.post", side_effect=fake_post), mock.patch("time.sleep"):
+            payload = upload_resource_file(
+                str(self.path),
+                headers={},
+                chunked=True,
+                chunk_bytes=12,
+                max_workers=3,
+            )
+
+        self.assertEqual(payload["data"]["ossUrl"], "https://oss/scan.pdf")
+        self.assertEqual([call[0] for call in calls].count(1), 2)
+        self.assertEqual([call[0] for call in calls].count(0), 1)
+        self.assertEqual(calls[-1][0], 4)
+        self.assertEqual(len({call[1] for call in calls}), 1)
+        self.assertEqual({call[2] for call in calls}, {"5"})
+        uploaded = {call[0]: call[3] for call in calls}
+        self.assertEqual(b"".join(uploaded[index] for index in range(5)), self.path.read_bytes())
+
+    def test_chunked_upload_does_not_retry_rejected_part(self):
+        def fake_post(url, *, headers, data, files, timeout):
+            return FakeResponse(200, {"code": 401, "success": False, "msg": "登录失效"})
+
+        with mock.patch("requests.post", side_effect=fake_post) as post:
+            with self.assertRaisesRegex(ResourceUploadError, "登录失效"):
+                upload_resource_file(str(self.path), headers={}, chunked=True, chunk_bytes=25, max_workers=1)
+        self.assertEqual(post.call_count, 1)
+
+    def test_failed_part_keeps_network_error_class(self):
+        with mock.patch("requests.post", side_effect=requests.ReadTimeout("slow")), mock.patch("time.sleep"):
+            with self.assertRaises(ResourceUploadError) as caught:
+                upload_resource_file(str(self.path), headers={}, chunked=True, chunk_bytes=25, max_workers=1)
+        self.assertEqual(caught.exception.error_class, "timeout")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import asyncio
+import unittest
+
+try:
+    from .response_cache import StaleWhileRevalidateCache
+except ImportError:
+    from response_cache import StaleWhileRevalidateCache
+
+
+class CountingLoader:
+    def __init__(self, *values, delay=0.0):
+        self.values = list(values)
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        value = self.values.pop(0)
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+
+class StaleWhileRevalidateCacheTest(unittest.IsolatedAsyncioTestCase):
+    async def test_fresh_entries_are_served_without_loading(self):
+        cache = StaleWhileRevalidateCache(ttl=60, stale_ttl=120)
+        loader = CountingLoader("models-v1")
+
+        self.assertEqual(await cache.get("scope", loader), "models-v1")
+        self.assertEqual(await cache.get("scope", loader), "models-v1")
+
+        self.assertEqual(loader.calls, 1)
+        self.assertEqual(cache.snapshot()["hits"], 1)
+
+    async def test_concurrent_misses_share_one_load(self):
+        cache = StaleWhileRevalidateCache(ttl=60, stale_ttl=120)
+        loader = CountingLoader("overview", delay=0.02)
+
+        results = await asyncio.gather(*(cache.get("skill-1", loader) for _ in range(5)))
+
+        self.assertEqual(results, ["overview"] * 5)
+        self.assertEqual(loader.calls, 1)
+
+    async def test_stale_entry_is_served_while_refreshing_in_background(self):
+        cache = StaleWhileRevalidateCache(ttl=0, stale_ttl=60)
+        loader = CountingLoader("v1", "v2", "v3", delay=0.01)
+
+        self.assertEqual(await cache.get("key", loader), "v1")
+        self.assertEqual(await cache.get("key", loader), "v1")
+        self.assertEqual(await cache.get("key", loader), "v1")
+        await asyncio.sleep(0.05)
+
+        self.assertEqual(loader.calls, 2)
+        self.assertEqual(cache.snapshot()["staleHits"], 2)
+        self.assertEqual(await cache.get("key", loader), "v2")
+
+    async def test_failed_refresh_keeps_stale_value_and_misses_are_not_cached(self):
+        cache = StaleWhileRevalidateCache(ttl=0, stale_ttl=60)
+        loader = CountingLoader("v1", RuntimeError("upstream down"))
+
+        await cache.get("key", loader)
+        self.assertEqual(await cache.get("key", loader), "v1")
+        await asyncio.sleep(0.01)
+        self.assertEqual(cache.snapshot()["refreshErrors"], 1)
+
+        failing = CountingLoader(RuntimeError("boom"), "ok")
+        with self.assertRaisesRegex(RuntimeError, "boom"):
+            await cache.get("other", failing)
+        self.assertEqual(await cache.get("other", failing), "ok")
+
+
+if __name__ == "__main__":
+    unittest.main()
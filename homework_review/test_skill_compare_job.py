@@ -0,0 +1,153 @@
+import asyncio
+import http.client
+import tempfile
+import unittest
+from unittest import mock
+
+import requests
+from urllib3.exceptions import MaxRetryError, NewConnectionError, ProtocolError
+
+try:
+    from . import main
+    from .test_skill_review_service import sample_report
+except ImportError:
+    import main
+    from test_skill_review_service import sample_report
+
+
+class SkillCompareJobTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.job_id = "compare-test-job"
+        self.temp_dir = tempfile.TemporaryDirectory()
+        main.REVIEW_JOBS[self.job_id] = {
+            "jobId": self.job_id,
+            "ownerId": "user-a",
+            "status": "queued",
+            "files": ["/tmp/学生A.docx", "/tmp/学生B.docx"],
+            "chunkUploads": {},
+            "logs": [],
+            "outputRoot": self.temp_dir.name,
+        }
+
+    def tearDown(self):
+        main.REVIEW_JOBS.pop(self.job_id, None)
+        self.temp_dir.cleanup()
+
+    async def test_uploads_once_and_fans_out_across_variants(self):
+        uploads = []
+        submissions = []
+        scores = {"v1": 90, "v2": 70}
+        task_variants = {}
+
+        async def fake_cloud(func, *args, endpoint, **kwargs):
+            if endpoint == "file-upload":
+                uploads.append(args[0])
+                return {"fileUrl": f"https://oss/{len(uploads)}", "fileName": "x.docx"}
+            if endpoint == "correction-skill-execute":
+                submissions.append((kwargs["skill_version_id"], kwargs["model_name"]))
+                task_variants[kwargs["task_id"]] = kwargs["skill_version_id"]
+                return {"code": 200}
+            return sample_report(scores[task_variants[args[0]]], 10)
+
+        variants = [
+            {"skillVersionId": "v1", "skillNid": "", "modelName": "model-a", "label": "旧版"},
+            {"skillVersionId": "v2", "skillNid": "", "modelName": "model-a", "label": "新版"},
+        ]
+        with mock.patch.object(main, "call_skill_cloud", side_effect=fake_cloud):
+            await main.execute_async_skill_review_job(
+                self.job_id,
+                authorization="token",
+                cookie="cookie",
+                variants=variants,
+                submission_requirement="按要求完成实验报告",
+                student_submission="见附件",
+                attempts=2,
+                max_concurrency=3,
+                poll_interval_seconds=0.01,
+            )
+
+        job = main.REVIEW_JOBS[self.job_id]
+        self.assertEqual(job["status"], "completed")
+        self.assertEqual(len(uploads), 2)
+        self.assertEqual(len(submissions), 8)
+        summary = job["result"]["summary"]
+        self.assertEqual(summary["totalRuns"], 8)
+        self.assertEqual(summary["succeededRuns"], 8)
+        table = job["result"]["scoreTable"]
+        self.assertEqual(
+            [row["name"] for row in table["students"]],
+            ["学生A（旧版）", "学生A（新版）", "学生B（旧版）", "学生B（新版）"],
+        )
+        self.assertEqual([item["mean"] for item in table["variants"]], [90.0, 70.0])
+
+        # 内存中只保留分数摘要，完整报告从分页接口读取
+        first = summary["results"][0]
+        self.assertNotIn("sections", first)
+        self.assertNotIn("comment", first["items"][0])
+        page = await main.list_review_job_reports(self.job_id, offset=6, limit=5, task_id=None, review_user_id="user-a")
+        self.assertEqual(page["total"], 8)
+        self.assertEqual(len(page["reports"]), 2)
+        self.assertIn("sections", page["reports"][0])
+        single = await main.list_review_job_reports(
+            self.job_id, offset=0, limit=20, task_id=first["taskId"], review_user_id="user-a"
+        )
+        self.assertEqual(single["reports"][0]["items"][0]["comment"], "数据完整")
+
+    async def test_pending_reports_do_not_hold_submission_slots(self):
+        submissions = []
+        all_submitted = asyncio.Event()
+
+        async def fake_cloud(func, *args, endpoint, **kwargs):
+            if endpoint == "file-upload":
+                return {"fileUrl": f"https://oss/{args[0]}", "fileName": "x.docx"}
+            if endpoint == "correction-skill-execute":
+                submissions.append(kwargs["task_id"])
+                if len(submissions) == 4:
+                    all_submitted.set()
+                return {"code": 200}
+            # 报告要等全部测评都已提交才返回：提交名额若被等待报告占住，这里会超时
+            await asyncio.wait_for(all_submitted.wait(), timeout=2)
+            return sample_report(80, 10)
+
+        with mock.patch.object(main, "call_skill_cloud", side_effect=fake_cloud):
+            await asyncio.wait_for(
+                main.execute_async_skill_review_job(
+                    self.job_id,
+                    authorization="token",
+                    cookie="cookie",
+                    variants=[{"skillVersionId": "v1", "skillNid": "", "modelName": "model-a", "label": "v1"}],
+                    submission_requirement="按要求完成实验报告",
+                    student_submission="见附件",
+                    attempts=2,
+                    max_concurrency=1,
+                    poll_interval_seconds=0.01,
+                ),
+                timeout=10,
+            )
+
+        job = main.REVIEW_JOBS[self.job_id]
+        self.assertEqual(job["status"], "completed")
+        self.assertEqual(len(submissions), 4)
+        self.assertEqual(job["result"]["summary"]["succeededRuns"], 4)
+
+    async def test_execute_retries_only_failures_before_the_request_was_sent(self):
+        dropped = requests.ConnectionError(
+            ProtocolError("Connection aborted.", http.client.RemoteDisconnected("closed"))
+        )
+        refused = requests.ConnectionError(
+            MaxRetryError(None, "/execute", NewConnectionError(None, "[Errno 111] Connection refused"))
+        )
+        for error, expected_calls in ((dropped, 1), (refused, main.SKILL_EXECUTE_RETRY_POLICY.max_attempts)):
+            execute = mock.Mock(side_effect=error)
+            with self.subTest(error=error), mock.patch("asyncio.sleep", new=mock.AsyncMock()):
+                with self.assertRaises(requests.ConnectionError):
+                    await main.call_skill_cloud(
+                        execute,
+                        endpoint=f"test-execute-{expected_calls}",
+                        retry_policy=main.SKILL_EXECUTE_RETRY_POLICY,
+                    )
+                self.assertEqual(execute.call_count, expected_calls)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,5 @@
+import base64
+import json
 import tempfile
 import unittest
 from pathlib import Path
@@ -6,25 +8,43 @@ from unittest.mock import patch
 from docx import Document
 
 try:
+    from .cloud_request_control import CircuitBreaker
     from .skill_generation_service import (
+        MAX_MATERIAL_CONTEXT_CHARS,
+        MaterialTextCache,
+        SkillGenerationError,
         build_grading_skill_zip,
+        build_material_context,
+        call_agenteval_llm,
         create_student_sample_docx,
         generate_student_sample_docx_files,
+        generate_skill_blueprint,
         generate_student_sample_blueprints,
         parse_json_object,
         select_sample_levels,
+        stream_agenteval_llm,
         validate_skill_blueprint,
     )
+    from .skill_review_service import validate_grading_skill_package
 except ImportError:
+    from cloud_request_control import CircuitBreaker
     from skill_generation_service import (
+        MAX_MATERIAL_CONTEXT_CHARS,
+        MaterialTextCache,
+        SkillGenerationError,
         build_grading_skill_zip,
+        build_material_context,
+        call_agenteval_llm,
         create_student_sample_docx,
         generate_student_sample_docx_files,
+        generate_skill_blueprint,
         generate_student_sample_blueprints,
         parse_json_object,
         select_sample_levels,
+        stream_agenteval_llm,
         validate_skill_blueprint,
     )
+    from skill_review_service import validate_grading_skill_package
 
 
 def sample_blueprint():
@@ -72,14 +92,19 @@ class SkillGenerationServiceTest(unittest.TestCase):
     def test_blueprint_and_generated_zip_pass_platform_validation(self):
         blueprint = sample_blueprint()
         self.assertEqual(validate_skill_blueprint(blueprint), [])
+        in_memory = build_grading_skill_zip(blueprint=blueprint)
+        self.assertNotIn("zipPath", in_memory)
+        self.assertEqual(base64.b64decode(in_memory["zipBase64"]), in_memory["zipBytes"])
         with tempfile.TemporaryDirectory() as temp_dir:
             result = build_grading_skill_zip(
                 blueprint=blueprint,
                 output_dir=Path(temp_dir),
             )
             zip_path = Path(result["zipPath"])
-            self.assertTrue(zip_path.is_file())
+            self.assertEqual(sorted(path.name for path in Path(temp_dir).iterdir()), [zip_path.name])
+            self.assertEqual(zip_path.read_bytes(), result["zipBytes"])
             self.assertEqual(result["package"]["rootName"], "physics-report-grading")
+            self.assertEqual(result["package"], validate_grading_skill_package(str(zip_path)))
             self.assertEqual(result["submissionRequirement"], blueprint["submissionRequirement"])
 
     def test_create_student_sample_docx_has_neutral_content_and_styles(self):
@@ -148,6 +173,180 @@ class SkillGenerationServiceTest(unittest.TestCase):
         self.assertEqual(llm_call.call_count, 2)
         self.assertIn("泄漏了内部测试标签", llm_call.call_args_list[1].kwargs["user_prompt"])
 
+    def test_material_context_shares_budget_fairly_between_files(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            paths = []
+            for index, size in enumerate((30_000, 30_000, 30_000, 2_000)):
+                path = root / f"material-{index}.txt"
+                path.write_text("\n".join(f"第{index}份材料第{line}行" for line in range(size // 10)), encoding="utf-8")
+                paths.append(path)
+
+            context = build_material_context(paths, "")
+
+        self.assertLessEqual(len(context), MAX_MATERIAL_CONTEXT_CHARS)
+        sections = context.split("\n\n")
+        self.assertEqual(len(sections), 4)
+        self.assertIn("第3份材料第199行", sections[3])
+        lengths = [len(section) for section in sections[:3]]
+        self.assertLess(max(lengths) - min(lengths), 5)
+
+    def test_material_cache_skips_parsing_the_same_content_again(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            first = Path(temp_dir) / "lecture.md"
+            first.write_text("# 实验原理\n" + "测量数据与误差分析\n" * 5_000, encoding="utf-8")
+            copy = Path(temp_dir) / "lecture-copy.md"
+            copy.write_bytes(first.read_bytes())
+            cache = MaterialTextCache()
+
+            expected = build_material_context([first], "", material_cache=cache)
+            with patch(f"{build_material_context.__module__}._iter_material_lines") as parse:
+                cached = build_material_context([copy], "", material_cache=cache)
+
+        parse.assert_not_called()
+        self.assertEqual(cached, expected.replace("lecture.md", "lecture-copy.md"))
+
+    def test_per_level_generation_retries_only_the_failed_level(self):
+        leaked = '{"assignments":[{"title":"较差作业","sections":[{"heading":"正文","paragraphs":["内容。"]}]}]}'
+        calls = []
+
+        def fake_llm(**kwargs):
+            prompt = kwargs["user_prompt"]
+            calls.append(prompt)
+            level = "较差" if "其内部目标档位为较差" in prompt else "优秀"
+            if level == "较差" and "泄漏了内部测试标签" not in prompt:
+                return leaked
+            return '{"assignments":[{"title":"课程作业","sections":[{"heading":"正文","paragraphs":["%s档位的完整作答。"]}]}]}' % len(calls)
+
+        with tempfile.TemporaryDirectory() as temp_dir, patch(
+            f"{generate_student_sample_docx_files.__module__}.call_agenteval_llm",
+            side_effect=fake_llm,
+        ):
+            result = generate_student_sample_docx_files(
+                assignment_title="课程作业",
+                submission_requirement="请完成一份结构完整的课程报告，包含背景、分析、结论，并以 DOCX 文件提交。",
+                count=2,
+                output_dir=Path(temp_dir),
+                api_key="test",
+                api_url="https://example.test/chat/completions",
+                model="test-model",
+                per_level=True,
+            )
+
+        self.assertEqual(len(calls), 3)
+        self.assertTrue(all("assignments 数量必须恰好为 1" in prompt for prompt in calls))
+        self.assertTrue(all("内部目标档位为优秀" in prompt and "内部目标档位为较差" in prompt for prompt in calls))
+        self.assertEqual([item["level"] for item in result], ["优秀", "较差"])
+        self.assertEqual([item["name"] for item in result], ["学生作业_01.docx", "学生作业_02.docx"])
+        self.assertTrue(all(item["base64"] for item in result))
+
+    def test_streaming_blueprint_aborts_at_first_invalid_field_and_retries(self):
+        invalid = sample_blueprint()
+        invalid["scoreItems"][1]["score"] = 50
+        attempts = []
+
+        def fake_stream(**kwargs):
+            blueprint = sample_blueprint() if attempts else invalid
+            text = json.dumps(blueprint, ensure_ascii=False)
+            chunks = [text[index:index + 20] for index in range(0, len(text), 20)]
+            attempts.append({"prompt": kwargs["user_prompt"], "sent": 0, "total": len(chunks)})
+
+            def generate():
+                for chunk in chunks:
+                    attempts[-1]["sent"] += 1
+                    yield chunk
+
+            return generate()
+
+        progress = []
+        with patch(f"{generate_skill_blueprint.__module__}.stream_agenteval_llm", side_effect=fake_stream):
+            result = generate_skill_blueprint(
+                material_context="实验报告评分标准",
+                api_key="test",
+                api_url="https://example.test/chat/completions",
+                model="test-model",
+                stream=True,
+                on_progress=progress.append,
+            )
+
+        self.assertEqual(result, sample_blueprint())
+        self.assertEqual(len(attempts), 2)
+        self.assertLess(attempts[0]["sent"], attempts[0]["total"])
+        self.assertIn("scoreItems 分值合计 90，应为 100", attempts[1]["prompt"])
+        self.assertEqual(attempts[1]["sent"], attempts[1]["total"])
+        self.assertIn("已生成评分项 2：计算与分析", progress)
+
+    def test_stream_agenteval_llm_reads_server_sent_deltas(self):
+        class FakeResponse:
+            ok = True
+            headers = {"Content-Type": "text/event-stream; charset=utf-8"}
+            closed = False
+
+            def iter_lines(self):
+                yield b": keep-alive"
+                for text in ('{"ok"', ': "完成"}'):
+                    delta = {"choices": [{"delta": {"content": text}}]}
+                    yield f"data: {json.dumps(delta, ensure_ascii=False)}".encode("utf-8")
+                yield b"data: [DONE]"
+
+            def close(self):
+                self.closed = True
+
+        response = FakeResponse()
+        with patch("requests.post", return_value=response) as post:
+            chunks = list(stream_agenteval_llm(
+                system_prompt="system",
+                user_prompt="user",
+                api_key="test",
+                api_url="https://example.test/chat/completions",
+                model="test-model",
+            ))
+
+        self.assertEqual(chunks, ['{"ok"', ': "完成"}'])
+        self.assertTrue(post.call_args.kwargs["json"]["stream"])
+        self.assertTrue(post.call_args.kwargs["stream"])
+        self.assertTrue(response.closed)
+
+
+    def test_llm_calls_retry_overload_and_fail_fast_when_breaker_is_open(self):
+        class FakeResponse:
+            def __init__(self, status_code):
+                self.status_code = status_code
+                self.ok = status_code < 400
+                self.text = "busy"
+
+            def json(self):
+                return {"choices": [{"message": {"content": "完成"}}]}
+
+            def close(self):
+                pass
+
+        module = call_agenteval_llm.__module__
+        request = dict(
+            system_prompt="system",
+            user_prompt="user",
+            api_key="test",
+            api_url="https://example.test/chat/completions",
+            model="test-model",
+        )
+        breaker = CircuitBreaker("llm", failure_threshold=2, open_seconds=60)
+        with patch(f"{module}.get_circuit_breaker", return_value=breaker), patch("time.sleep"):
+            with patch("requests.post", side_effect=[FakeResponse(503), FakeResponse(200)]) as post:
+                self.assertEqual(call_agenteval_llm(**request), "完成")
+            self.assertEqual(post.call_count, 2)
+
+            with patch("requests.post", return_value=FakeResponse(400)) as post:
+                with self.assertRaisesRegex(SkillGenerationError, "HTTP 400"):
+                    call_agenteval_llm(**request)
+            self.assertEqual(post.call_count, 1)
+
+            with patch("requests.post", return_value=FakeResponse(502)):
+                with self.assertRaises(SkillGenerationError):
+                    call_agenteval_llm(**request)
+            with patch("requests.post") as post:
+                with self.assertRaisesRegex(SkillGenerationError, "暂不可用"):
+                    list(stream_agenteval_llm(**request))
+            post.assert_not_called()
 
 if __name__ == "__main__":
     unittest.main()
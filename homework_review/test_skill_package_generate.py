@@ -0,0 +1,54 @@
+import asyncio
+import threading
+import unittest
+from unittest import mock
+
+try:
+    from . import main
+except ImportError:
+    import main
+
+
+class SkillPackageGenerateStreamTest(unittest.IsolatedAsyncioTestCase):
+    async def test_client_disconnect_skips_upload(self):
+        release = threading.Event()
+
+        def fake_generate(**kwargs):
+            kwargs["on_progress"]("正在生成")
+            release.wait(5)
+            return {"zipBytes": b"zip", "zipFileName": "skill.zip", "package": {}}
+
+        created = []
+
+        def track_task(coro):
+            task = asyncio.ensure_future(coro)
+            created.append(task)
+            return task
+
+        with mock.patch.object(main, "generate_grading_skill_zip", side_effect=fake_generate), \
+                mock.patch.object(main, "upload_and_prepare_grading_skill") as upload, \
+                mock.patch.object(main.asyncio, "create_task", side_effect=track_task):
+            response = await main.generate_upload_grading_skill_package(
+                materials=None,
+                material_text="课程材料",
+                authorization="token",
+                cookie="cookie",
+                llm_api_key="key",
+                llm_api_url="https://example.test",
+                llm_model="model",
+                stream=True,
+            )
+            body = response.body_iterator
+            first = await asyncio.wait_for(body.__anext__(), timeout=5)
+            await body.aclose()
+            release.set()
+            result = await asyncio.wait_for(created[0], timeout=5)
+
+        self.assertIn("正在生成", first)
+        upload.assert_not_called()
+        self.assertIsNone(result["upload"])
+        self.assertIn("客户端已断开", result["uploadError"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import asyncio
+import unittest
+
+try:
+    from .skill_report_poller import SkillReportPoller
+except ImportError:
+    from skill_report_poller import SkillReportPoller
+
+
+def report(status):
+    return {"data": {"skill": {"reportStatus": status}}}
+
+
+def is_final(response):
+    return response["data"]["skill"]["reportStatus"] in {"SUCCESS", "FAILED"}
+
+
+class SkillReportPollerTest(unittest.IsolatedAsyncioTestCase):
+    async def test_tracks_many_tasks_and_backs_off_while_pending(self):
+        poller = SkillReportPoller(is_final, max_interval=0.04, backoff=2.0)
+        calls = {"a": 0, "b": 0}
+        statuses = {"a": ["RUNNING", "RUNNING", "SUCCESS"], "b": ["FAILED"]}
+
+        def fetcher(task_id):
+            async def fetch():
+                calls[task_id] += 1
+                return report(statuses[task_id].pop(0))
+            return fetch
+
+        first, second = await asyncio.gather(
+            poller.wait_for_report("a", fetcher("a"), interval=0.01),
+            poller.wait_for_report("b", fetcher("b"), interval=0.01),
+        )
+
+        self.assertEqual(first, report("SUCCESS"))
+        self.assertEqual(second, report("FAILED"))
+        self.assertEqual(calls, {"a": 3, "b": 1})
+        snapshot = poller.snapshot()
+        self.assertEqual(snapshot["pending"], 0)
+        self.assertEqual(snapshot["polls"], 4)
+        self.assertEqual(snapshot["completed"], 2)
+
+    async def test_fetch_errors_and_cancellation_release_the_task(self):
+        poller = SkillReportPoller(is_final, max_interval=0.05)
+
+        async def broken():
+            raise RuntimeError("登录失效")
+
+        with self.assertRaisesRegex(RuntimeError, "登录失效"):
+            await poller.wait_for_report("broken", broken, interval=0.01)
+
+        async def pending():
+            return report("RUNNING")
+
+        waiter = asyncio.create_task(poller.wait_for_report("slow", pending, interval=0.01))
+        await asyncio.sleep(0.03)
+        self.assertEqual(poller.snapshot()["pending"], 1)
+        waiter.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await waiter
+        self.assertEqual(poller.snapshot()["pending"], 0)
+
+    async def test_reports_waiting_time(self):
+        poller = SkillReportPoller(is_final, max_interval=0.02)
+        statuses = ["RUNNING"] * 3 + ["SUCCESS"]
+        waited = []
+
+        async def fetch():
+            return report(statuses.pop(0))
+
+        await poller.wait_for_report("a", fetch, interval=0.01, on_waiting=waited.append, waiting_log_seconds=0.02)
+        self.assertTrue(waited)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,25 +2,34 @@ import unittest
 import tempfile
 import zipfile
 from pathlib import Path
+from unittest import mock
 
 try:
+    from . import skill_review_service
+    from .skill_package_registry import SkillPackageRegistry
     from .skill_review_service import (
         CorrectionSkillError,
         build_grading_skill_metadata_payload,
         build_submission_requirement_from_overview,
+        build_skill_comparison_table,
         build_skill_score_table,
         compact_skill_report,
         normalize_skill_models,
+        upload_and_prepare_grading_skill,
         validate_grading_skill_package,
     )
 except ImportError:
+    import skill_review_service
+    from skill_package_registry import SkillPackageRegistry
     from skill_review_service import (
         CorrectionSkillError,
         build_grading_skill_metadata_payload,
         build_submission_requirement_from_overview,
+        build_skill_comparison_table,
         build_skill_score_table,
         compact_skill_report,
         normalize_skill_models,
+        upload_and_prepare_grading_skill,
         validate_grading_skill_package,
     )
 
@@ -167,6 +176,81 @@ description: 批阅大学物理实验报告，依据数据、图表和分析过
             with self.assertRaisesRegex(CorrectionSkillError, "模板外目录"):
                 validate_grading_skill_package(str(package_path))
 
+    def test_validate_grading_skill_package_rejects_compression_bomb_and_large_text(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            package_path = Path(temp_dir) / "physics-lab-grading.zip"
+            self._write_skill_zip(package_path)
+            with zipfile.ZipFile(package_path, "a", compression=zipfile.ZIP_DEFLATED) as archive:
+                archive.writestr("physics-lab-grading/references/zeros.md", b"\0" * (4 * 1024 * 1024))
+            with self.assertRaisesRegex(CorrectionSkillError, "压缩比异常"):
+                validate_grading_skill_package(str(package_path))
+
+            oversized_path = Path(temp_dir) / "oversized.zip"
+            with zipfile.ZipFile(oversized_path, "w", compression=zipfile.ZIP_STORED) as archive:
+                archive.writestr("physics-lab-grading/README.md", "批阅技能 · 文件结构说明")
+                archive.writestr("physics-lab-grading/SKILL.md", "x" * (600 * 1024))
+            with self.assertRaisesRegex(CorrectionSkillError, "SKILL.md 不能超过"):
+                validate_grading_skill_package(str(oversized_path))
+
+    def test_registry_reuses_unchanged_package_while_card_is_still_valid(self):
+        registry = SkillPackageRegistry()
+        card = {"skillNid": "nid-1", "typeTagId": 1, "cnName": "物理实验"}
+        uploaded = {"skillNid": "nid-1", "skillVersionId": "ver-1", "name": "physics-lab-grading"}
+        with tempfile.TemporaryDirectory() as temp_dir, \
+                mock.patch.object(skill_review_service, "upload_agent_skill_package", return_value=uploaded) as upload, \
+                mock.patch.object(skill_review_service, "list_skill_cards", return_value=[card]) as cards, \
+                mock.patch.object(skill_review_service, "save_grading_skill_metadata") as save:
+            package_path = Path(temp_dir) / "physics-lab-grading.zip"
+            self._write_skill_zip(package_path)
+
+            first = upload_and_prepare_grading_skill(str(package_path), "token", "cookie", registry=registry)
+            second = upload_and_prepare_grading_skill(str(package_path), "token", "cookie", registry=registry)
+            other_account = upload_and_prepare_grading_skill(str(package_path), "other", "cookie", registry=registry)
+            card["typeTagId"] = 2
+            after_type_change = upload_and_prepare_grading_skill(
+                str(package_path), "token", "cookie", registry=registry
+            )
+
+        self.assertFalse(first["reused"])
+        self.assertEqual(len(first["package"]["sha256"]), 64)
+        self.assertTrue(second["reused"])
+        self.assertEqual(second["skillVersionId"], "ver-1")
+        self.assertFalse(other_account["reused"])
+        self.assertFalse(after_type_change["reused"])
+        self.assertEqual(upload.call_count, 3)
+        self.assertEqual(save.call_count, 3)
+        self.assertEqual(cards.call_count, 5)
+
+    def test_registry_check_failure_falls_back_to_fresh_upload(self):
+        registry = SkillPackageRegistry()
+        uploaded = {"skillNid": "nid-1", "skillVersionId": "ver-1", "name": "physics-lab-grading"}
+        filler = [{"skillNid": f"other-{index}", "typeTagId": 1} for index in range(50)]
+        card = {"skillNid": "nid-1", "typeTagId": 1}
+        pages = {1: filler, 2: [card]}
+        with tempfile.TemporaryDirectory() as temp_dir, \
+                mock.patch.object(skill_review_service, "upload_agent_skill_package", return_value=uploaded) as upload, \
+                mock.patch.object(
+                    skill_review_service,
+                    "list_skill_cards",
+                    side_effect=lambda *args, page_num=1, **kwargs: pages.get(page_num, []),
+                ), \
+                mock.patch.object(skill_review_service, "save_grading_skill_metadata"):
+            package_path = Path(temp_dir) / "physics-lab-grading.zip"
+            self._write_skill_zip(package_path)
+            upload_and_prepare_grading_skill(str(package_path), "token", "cookie", registry=registry)
+            reused = upload_and_prepare_grading_skill(str(package_path), "token", "cookie", registry=registry)
+
+            with mock.patch.object(
+                skill_review_service,
+                "is_registered_grading_skill_valid",
+                side_effect=CorrectionSkillError("登录失效"),
+            ):
+                after_error = upload_and_prepare_grading_skill(str(package_path), "token", "cookie", registry=registry)
+
+        self.assertTrue(reused["reused"])
+        self.assertFalse(after_error["reused"])
+        self.assertEqual(upload.call_count, 2)
+
     def test_build_grading_metadata_preserves_card_fields_and_sets_type_one(self):
         payload = build_grading_skill_metadata_payload(
             skill_nid="A4hMufA32w",
@@ -308,6 +392,56 @@ description: 批阅大学物理实验报告，依据数据、图表和分析过
         self.assertEqual(student["questions"][0]["scores"], [13.0, 15.0])
         self.assertEqual(student["questions"][0]["variance"], 1.0)
 
+    def test_score_table_marks_skipped_attempts(self):
+        first = compact_skill_report(
+            sample_report(88, 13),
+            file_name="学生A.docx",
+            file_index=0,
+            attempt_index=1,
+            task_id="test-1",
+            report_url="https://example.test/report/1",
+        )
+        skipped = {
+            "success": False,
+            "skipped": True,
+            "fileName": "学生A.docx",
+            "fileIndex": 0,
+            "attemptIndex": 3,
+            "reportStatus": "SKIPPED",
+            "items": [],
+        }
+
+        table = build_skill_score_table([skipped, first], attempts=3)
+        student = table["students"][0]
+
+        self.assertEqual(student["total_scores"], [88.0, None, None])
+        self.assertEqual(student["attempt_status"], ["ok", "failed", "skipped"])
+        self.assertEqual(student["skipped_attempts"], 1)
+        self.assertEqual(student["mean"], 88.0)
+
+    def test_comparison_table_places_variants_side_by_side(self):
+        results = []
+        for variant_index, scores in enumerate(([88, 90], [70, 80])):
+            for attempt_index, score in enumerate(scores, start=1):
+                result = compact_skill_report(
+                    sample_report(score, 13),
+                    file_name="学生A.docx",
+                    file_index=0,
+                    attempt_index=attempt_index,
+                    task_id=f"test-{variant_index}-{attempt_index}",
+                    report_url="https://example.test/report",
+                )
+                result["variantIndex"] = variant_index
+                results.append(result)
+
+        table = build_skill_comparison_table(results, 2, ["v1", "v2"])
+
+        self.assertEqual([row["name"] for row in table["students"]], ["学生A（v1）", "学生A（v2）"])
+        self.assertEqual(table["students"][1]["total_scores"], [70.0, 80.0])
+        self.assertEqual(table["students"][1]["variant"], "v2")
+        self.assertEqual(table["variants"][0], {"label": "v1", "students": 1, "mean": 89.0, "meanVariance": 1.0})
+        self.assertEqual(table["variants"][1]["meanVariance"], 25.0)
+
 
 if __name__ == "__main__":
     unittest.main()